@@ -0,0 +1,97 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Benchmark of the tiles storage of ND_Elt_RectGrid on a big simulation map:
+the old dict[(x, y), id] storage against ND_ChunkedGrid, for filling, exporting and searching an empty case.
+
+Usage: python bench_chunked_grid.py [map_size]
+
+"""
+
+#
+import os
+import sys
+import time
+#
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+#
+from typing import Any, Callable
+#
+import numpy as np
+
+#
+from lib_nadisplay_chunked_grid import ND_ChunkedGrid
+
+
+#
+def timed(name: str, fn: Callable[[], Any], results: dict[str, float], key: str) -> float:
+    #
+    t0: float = time.perf_counter()
+    fn()
+    dt: float = time.perf_counter() - t0
+    #
+    print(f"  {name:<50} {dt * 1000:>10.2f} ms")
+    #
+    results[key] = dt * 1000
+    #
+    return dt
+
+
+#
+def run(size: int = 2000) -> dict[str, float]:
+    #
+    results: dict[str, float] = {}
+    #
+    rng: np.random.Generator = np.random.default_rng(0)
+    # Map with 8 kinds of tiles and ~10% of empty cases
+    tiles: np.ndarray = rng.integers(0, 8, size=(size, size)).astype(np.int32)
+    tiles[rng.random((size, size)) < 0.1] = -1
+    #
+    xs, ys = np.nonzero(tiles >= 0)
+    values: np.ndarray = tiles[xs, ys]
+
+    #
+    print(f"Map {size} x {size}, {len(xs)} tiles")
+
+    # Old storage
+    print("dict storage")
+    old_grid: dict[tuple[int, int], int] = {}
+    #
+    def old_fill() -> None:
+        for x, y, v in zip(xs.tolist(), ys.tolist(), values.tolist()):
+            old_grid[(x, y)] = v
+    #
+    def old_export() -> None:
+        grid: np.ndarray = np.zeros((size, size), dtype=np.float32)
+        for x in range(size):
+            for y in range(size):
+                grid[x, y] = old_grid.get((x, y), -1)
+    #
+    timed("fill (one case at a time)", old_fill, results, "dict.fill_ms")
+    timed("export whole map", old_export, results, "dict.export_ms")
+
+    # New storage
+    print("ND_ChunkedGrid")
+    new_grid: ND_ChunkedGrid = ND_ChunkedGrid()
+    #
+    timed("fill (set_cells)", lambda: new_grid.set_cells(xs, ys, values), results, "chunked.fill_ms")
+    timed("export whole map (export_area)", lambda: new_grid.export_area(0, 0, size, size), results, "chunked.export_ms")
+    timed("export one chunk (zero-copy view)", lambda: new_grid.export_area(0, 0, new_grid.chunk_size, new_grid.chunk_size), results, "chunked.export_chunk_ms")
+    timed("find empty case in the whole map", lambda: new_grid.find_empty_case(0, size - 1, 0, size - 1), results, "chunked.find_empty_ms")
+    timed("clear an area of 500 x 500 (set_area)", lambda: new_grid.set_area(0, 0, 500, 500, -1), results, "chunked.clear_area_ms")
+    #
+    return results
+
+
+#
+def main() -> None:
+    #
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
+
+
+#
+if __name__ == "__main__":
+    main()
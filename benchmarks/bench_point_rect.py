@@ -0,0 +1,140 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Microbenchmarks of the ND_Point / ND_Rect value types: construction, hashing and dict lookup.
+
+The "before" classes are copies of the old implementations (instance __dict__, hash of an f-string),
+to compare them with the current ones (__slots__, tuple hash, plain tuple lookups, cached immutable variants).
+
+Usage: python bench_point_rect.py [nb_loops]
+
+"""
+
+#
+import os
+import sys
+import timeit
+#
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+#
+import re
+from typing import Any, Callable
+
+#
+from lib_nadisplay_point import ND_Point, ND_ImmutablePoint
+from lib_nadisplay_rects import ND_Rect, ND_ImmutableRect
+
+
+#
+class Old_ND_Point:
+    #
+    def __init__(self, x: int, y: int) -> None:
+        #
+        self.x: int = x
+        self.y: int = y
+
+    #
+    def __hash__(self) -> int:
+        return hash(f"{self.x}_{self.y}")
+
+    #
+    def __eq__(self, other: object) -> bool:
+        #
+        if not isinstance(other, Old_ND_Point):
+            return NotImplemented
+        #
+        return self.x == other.x and self.y == other.y
+
+
+#
+class Old_ND_Rect:
+    #
+    def __init__(self, x: int, y: int, w: int = 1, h: int = 1) -> None:
+        #
+        self.x: int = x
+        self.y: int = y
+        self.w: int = w
+        self.h: int = h
+
+    #
+    def __hash__(self) -> int:
+        return hash(f"{self.x}_{self.y}_{self.w}_{self.h}")
+
+
+#
+GRID_SIZE: int = 64
+
+
+#
+def bench(name: str, fn: Callable[[], Any], nb_loops: int, results: dict[str, float]) -> float:
+    #
+    t: float = min(timeit.repeat(fn, number=nb_loops, repeat=3)) / nb_loops * 1e9
+    #
+    print(f"  {name:<45} {t:>10.1f} ns")
+    # ex: "before: hash(Old_ND_Point)" -> "before_hash_old_nd_point_ns"
+    results[re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") + "_ns"] = t
+    #
+    return t
+
+
+#
+def run(nb_loops: int = 200000) -> dict[str, float]:
+    #
+    results: dict[str, float] = {}
+
+    #
+    old_pt: Old_ND_Point = Old_ND_Point(12, 34)
+    new_pt: ND_Point = ND_Point(12, 34)
+    old_rect: Old_ND_Rect = Old_ND_Rect(1, 2, 3, 4)
+    new_rect: ND_Rect = ND_Rect(1, 2, 3, 4)
+
+    # Dicts keyed by grid cases
+    old_grid: dict[Old_ND_Point, int] = {Old_ND_Point(x, y): x * GRID_SIZE + y for x in range(GRID_SIZE) for y in range(GRID_SIZE)}
+    new_grid: dict[ND_Point, int] = {ND_Point(x, y): x * GRID_SIZE + y for x in range(GRID_SIZE) for y in range(GRID_SIZE)}
+
+    #
+    print("Construction")
+    bench("before: Old_ND_Point(x, y)", lambda: Old_ND_Point(12, 34), nb_loops, results)
+    bench("after:  ND_Point(x, y)", lambda: ND_Point(12, 34), nb_loops, results)
+    bench("after:  ND_ImmutablePoint.get(x, y) (cached)", lambda: ND_ImmutablePoint.get(12, 34), nb_loops, results)
+    bench("before: Old_ND_Rect(x, y, w, h)", lambda: Old_ND_Rect(1, 2, 3, 4), nb_loops, results)
+    bench("after:  ND_Rect(x, y, w, h)", lambda: ND_Rect(1, 2, 3, 4), nb_loops, results)
+    bench("after:  ND_ImmutableRect.get(x, y, w, h) (cached)", lambda: ND_ImmutableRect.get(1, 2, 3, 4), nb_loops, results)
+
+    #
+    print("Hashing")
+    bench("before: hash(Old_ND_Point)", lambda: hash(old_pt), nb_loops, results)
+    bench("after:  hash(ND_Point)", lambda: hash(new_pt), nb_loops, results)
+    bench("before: hash(Old_ND_Rect)", lambda: hash(old_rect), nb_loops, results)
+    bench("after:  hash(ND_Rect)", lambda: hash(new_rect), nb_loops, results)
+
+    #
+    print("Dict lookup (grid case)")
+    bench("before: grid[Old_ND_Point(x, y)]", lambda: old_grid[Old_ND_Point(12, 34)], nb_loops, results)
+    bench("after:  grid[ND_Point(x, y)]", lambda: new_grid[ND_Point(12, 34)], nb_loops, results)
+    bench("after:  grid[(x, y)]", lambda: new_grid[(12, 34)], nb_loops, results)
+    bench("after:  grid.get((x, y)) (missing case)", lambda: new_grid.get((-1, -1)), nb_loops, results)
+
+    #
+    print("Memory")
+    print(f"  {'before: Old_ND_Point instance + __dict__':<45} {sys.getsizeof(old_pt) + sys.getsizeof(old_pt.__dict__):>10} bytes")
+    print(f"  {'after:  ND_Point instance':<45} {sys.getsizeof(new_pt):>10} bytes")
+    #
+    results["before_point_bytes"] = sys.getsizeof(old_pt) + sys.getsizeof(old_pt.__dict__)
+    results["after_point_bytes"] = sys.getsizeof(new_pt)
+    #
+    return results
+
+
+#
+def main() -> None:
+    #
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
+
+
+#
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Benchmark of complete synthetic scenes rendered by a backend (the headless one by default, no display needed):
+    - "buttons": N buttons in a row_wrap ND_Elt_Container,
+    - "grid": a M x M ND_Elt_RectGrid seen entirely through an ND_Elt_CameraGrid,
+    - "multilayer": ND_Elt_MultiLayer nested D times,
+    - "text": panels of wrapped ND_Elt_Text.
+
+For each scene, measures the build time, the memory allocated by the build, the layout time (window resize)
+and the frame time percentiles, then the events dispatch throughput on the buttons scene.
+
+Usage: python bench_scenes.py [backend] [nb_frames]
+
+"""
+
+#
+import os
+import sys
+import time
+import random
+import tracemalloc
+#
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+#
+from typing import Callable
+
+#
+import lib_nadisplay as nd
+import lib_nadisplay_events as nd_event
+
+
+#
+WINDOW_SIZE: tuple[int, int] = (1280, 720)
+NB_LAYOUTS: int = 10
+
+
+#
+def build_buttons_scene(win: nd.ND_Window, scene_id: str, nb_buttons: int) -> nd.ND_Scene:
+    #
+    scene: nd.ND_Scene = nd.ND_Scene(window=win, scene_id=scene_id, origin=nd.ND_Point(0, 0), elements_layers={}, on_window_state=scene_id)
+    #
+    container: nd.ND_Elt_Container = nd.ND_Elt_Container(window=win, elt_id=f"{scene_id}_container", position=nd.ND_Position_FullWindow(win), element_alignment="row_wrap")
+    scene.add_element(0, container)
+    #
+    i: int
+    for i in range(nb_buttons):
+        container.add_element(nd.ND_Elt_Button(
+            window=win,
+            elt_id=f"{scene_id}_bt_{i}",
+            position=nd.ND_Position_Container(w=60, h=24, container=container, position_margins=nd.ND_Position_Margins(margin=2)),
+            onclick=None,
+            text=f"bt {i}",
+            font_size=12
+        ))
+    #
+    return scene
+
+
+#
+def build_grid_scene(win: nd.ND_Window, scene_id: str, grid_size: int) -> nd.ND_Scene:
+    #
+    scene: nd.ND_Scene = nd.ND_Scene(window=win, scene_id=scene_id, origin=nd.ND_Point(0, 0), elements_layers={}, on_window_state=scene_id)
+    #
+    grid: nd.ND_Elt_RectGrid = nd.ND_Elt_RectGrid(window=win, elt_id=f"{scene_id}_grid", position=nd.ND_Position(), grid_tx=16, grid_ty=16)
+    # 4 kinds of tiles, by rows
+    tiles_ids: list[int] = [
+        grid.add_element_to_grid(
+            nd.ND_Elt_Rectangle(window=win, elt_id=f"{scene_id}_tile_{k}", position=nd.ND_Position_RectGrid(grid), border=False, base_bg_color=nd.ND_Color(60 * k, 255 - 60 * k, 120)),
+            nd.ND_Point(0, k)
+        )
+        for k in range(4)
+    ]
+    #
+    y: int
+    for y in range(grid_size):
+        grid.fill_area_with_element(tiles_ids[y % 4], 0, y, grid_size, y + 1)
+    #
+    camera: nd.ND_Elt_CameraGrid = nd.ND_Elt_CameraGrid(window=win, elt_id=f"{scene_id}_camera", position=nd.ND_Position_FullWindow(win), grids_to_render=[grid])
+    camera.move_camera_to_grid_area(nd.ND_Rect(0, 0, grid_size, grid_size))
+    scene.add_element(0, camera)
+    #
+    return scene
+
+
+#
+def build_multilayer_scene(win: nd.ND_Window, scene_id: str, depth: int) -> nd.ND_Scene:
+    #
+    scene: nd.ND_Scene = nd.ND_Scene(window=win, scene_id=scene_id, origin=nd.ND_Point(0, 0), elements_layers={}, on_window_state=scene_id)
+    #
+    parent: nd.ND_Elt_MultiLayer = nd.ND_Elt_MultiLayer(window=win, elt_id=f"{scene_id}_ml_0", position=nd.ND_Position_FullWindow(win), elements_layers={})
+    scene.add_element(0, parent)
+    # Each level: a background rectangle and the next level
+    i: int
+    for i in range(1, depth + 1):
+        #
+        parent.add_element(0, nd.ND_Elt_Rectangle(window=win, elt_id=f"{scene_id}_bg_{i}", position=nd.ND_Position_MultiLayer(parent, w="100%", h="100%"), border=False, base_bg_color=nd.ND_Color(i % 256, 40, 80)))
+        #
+        child: nd.ND_Elt_MultiLayer = nd.ND_Elt_MultiLayer(window=win, elt_id=f"{scene_id}_ml_{i}", position=nd.ND_Position_MultiLayer(parent, w="98%", h="98%"), elements_layers={})
+        parent.add_element(1, child)
+        parent = child
+    #
+    return scene
+
+
+#
+def build_text_scene(win: nd.ND_Window, scene_id: str, nb_texts: int) -> nd.ND_Scene:
+    #
+    scene: nd.ND_Scene = nd.ND_Scene(window=win, scene_id=scene_id, origin=nd.ND_Point(0, 0), elements_layers={}, on_window_state=scene_id)
+    #
+    panels: nd.ND_Elt_Container = nd.ND_Elt_Container(window=win, elt_id=f"{scene_id}_panels", position=nd.ND_Position_FullWindow(win), element_alignment="row_wrap")
+    scene.add_element(0, panels)
+    # Panels of 10 paragraphs
+    panel: nd.ND_Elt_Container = panels
+    i: int
+    for i in range(nb_texts):
+        #
+        if i % 10 == 0:
+            panel = nd.ND_Elt_Container(window=win, elt_id=f"{scene_id}_panel_{i // 10}", position=nd.ND_Position_Container(w=300, h=350, container=panels), element_alignment="col")
+            panels.add_element(panel)
+        #
+        panel.add_element(nd.ND_Elt_Text(
+            window=win,
+            elt_id=f"{scene_id}_txt_{i}",
+            position=nd.ND_Position_Container(w="100%", h=34, container=panel),
+            text=f"Paragraph {i}: the quick brown fox jumps over the lazy dog",
+            font_size=12,
+            text_wrap=True,
+            text_h_align="left"
+        ))
+    #
+    return scene
+
+
+#
+SCENES: dict[str, Callable[[nd.ND_Window, str, int], nd.ND_Scene]] = {
+    "buttons": build_buttons_scene,
+    "grid": build_grid_scene,
+    "multilayer": build_multilayer_scene,
+    "text": build_text_scene
+}
+
+# Default size of each scene (number of buttons, grid side, depth, number of texts)
+DEFAULT_SIZES: dict[str, int] = {
+    "buttons": 500,
+    "grid": 64,
+    "multilayer": 50,
+    "text": 200
+}
+
+
+#
+def percentile(sorted_values: list[float], p: float) -> float:
+    #
+    if not sorted_values:
+        return 0.0
+    #
+    return sorted_values[min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))]
+
+
+#
+def create_app(backend: str) -> tuple[nd.ND_MainApp, nd.ND_Window]:
+    #
+    DisplayClass, WindowClass, EventsManagerClass = nd.prepare_backend(backend)
+    #
+    app: nd.ND_MainApp = nd.ND_MainApp(DisplayClass=DisplayClass, WindowClass=WindowClass, EventsManagerClass=EventsManagerClass)
+    #
+    if app.display is None:
+        raise UserWarning(f"Error: no display created for the backend {backend}")
+    #
+    win: nd.ND_Window | None = app.display.get_window(app.display.create_window({"title": "Benchmark", "size": WINDOW_SIZE, "window_id": 0}))
+    #
+    if win is None:
+        raise UserWarning(f"Error: no window created for the backend {backend}")
+    #
+    return app, win
+
+
+#
+def bench_scene(app: nd.ND_MainApp, win: nd.ND_Window, name: str, size: int, nb_frames: int) -> dict[str, float]:
+    #
+    res: dict[str, float] = {}
+
+    # Memory allocated by the build (a first copy of the scene, traced)
+    tracemalloc.start()
+    mem_before: int = tracemalloc.get_traced_memory()[0]
+    win.add_scene(SCENES[name](win, f"{name}_mem", size))
+    res["memory_kb"] = (tracemalloc.get_traced_memory()[0] - mem_before) / 1024.0
+    tracemalloc.stop()
+    win.remove_scene(f"{name}_mem")
+
+    # Build time (the scene measured by the next benchmarks)
+    t0: float = time.perf_counter()
+    win.add_scene(SCENES[name](win, name, size))
+    res["build_ms"] = (time.perf_counter() - t0) * 1000.0
+    #
+    win.set_state(name)
+
+    # Layout of the whole scene, forced by window resizes
+    t0 = time.perf_counter()
+    i: int
+    for i in range(NB_LAYOUTS):
+        win.update_size(WINDOW_SIZE[0] - (i % 2) * 100, WINDOW_SIZE[1])
+    res["layout_ms"] = (time.perf_counter() - t0) * 1000.0 / NB_LAYOUTS
+    win.update_size(*WINDOW_SIZE)
+
+    # Frames: events and display, without waiting between the frames
+    frames_ms: list[float] = []
+    for i in range(nb_frames):
+        #
+        t0 = time.perf_counter()
+        app.process_events()
+        app.update_display()
+        frames_ms.append((time.perf_counter() - t0) * 1000.0)
+    #
+    frames_ms.sort()
+    res["frame_ms_mean"] = sum(frames_ms) / max(1, len(frames_ms))
+    res["frame_ms_p50"] = percentile(frames_ms, 50)
+    res["frame_ms_p90"] = percentile(frames_ms, 90)
+    res["frame_ms_p99"] = percentile(frames_ms, 99)
+    res["frame_ms_max"] = frames_ms[-1] if frames_ms else 0.0
+    #
+    return res
+
+
+#
+def bench_events(app: nd.ND_MainApp, win: nd.ND_Window, nb_events: int) -> dict[str, float]:
+    # On the buttons scene: hovers and clicks at random positions (not coalesced: the mouse motions are separated by the clicks)
+    win.set_state("buttons")
+    rng: random.Random = random.Random(0)
+    #
+    events: list[nd_event.ND_Event] = []
+    while len(events) < nb_events:
+        #
+        x: int = rng.randrange(WINDOW_SIZE[0])
+        y: int = rng.randrange(WINDOW_SIZE[1])
+        events += [nd_event.ND_EventMouseMotion(x=x, y=y), nd_event.ND_EventMouseButtonDown(x=x, y=y, button_id=1), nd_event.ND_EventMouseButtonUp(x=x, y=y, button_id=1)]
+
+    #
+    dispatched_before: int = app.get_events_stats()["dispatched"]
+    t0: float = time.perf_counter()
+    # Batches smaller than the events queue, through the backend events manager if it supports scripted events
+    batch_size: int = min(app.events_queue_max_size, app.max_events_per_pump) // 2
+    i: int
+    for i in range(0, len(events), batch_size):
+        #
+        event: nd_event.ND_Event
+        for event in events[i: i + batch_size]:
+            #
+            if hasattr(app.events_manager, "inject_event"):
+                app.events_manager.inject_event(event)
+            else:
+                app.post_event(event)
+        #
+        app.process_events()
+    #
+    dt: float = time.perf_counter() - t0
+    nb_dispatched: int = app.get_events_stats()["dispatched"] - dispatched_before
+    #
+    return {
+        "dispatched": nb_dispatched,
+        "dispatch_per_sec": nb_dispatched / dt if dt > 0 else 0.0
+    }
+
+
+#
+def run(backend: str = "headless", nb_frames: int = 100, sizes: dict[str, int] = DEFAULT_SIZES, nb_events: int = 20000) -> dict[str, float]:
+    #
+    app, win = create_app(backend)
+    #
+    results: dict[str, float] = {}
+    #
+    print(f"Backend {backend}, window {WINDOW_SIZE[0]} x {WINDOW_SIZE[1]}, {nb_frames} frames per scene")
+    print(f"{'scene':>12} | {'size':>6} | {'build ms':>9} | {'mem kB':>9} | {'layout ms':>9} | {'p50 ms':>8} | {'p90 ms':>8} | {'p99 ms':>8}")
+    print("-" * 88)
+    #
+    name: str
+    for name in SCENES:
+        #
+        res: dict[str, float] = bench_scene(app, win, name, sizes.get(name, DEFAULT_SIZES[name]), nb_frames)
+        print(f"{name:>12} | {sizes.get(name, DEFAULT_SIZES[name]):>6} | {res['build_ms']:>9.2f} | {res['memory_kb']:>9.1f} | {res['layout_ms']:>9.2f} | {res['frame_ms_p50']:>8.2f} | {res['frame_ms_p90']:>8.2f} | {res['frame_ms_p99']:>8.2f}")
+        #
+        results.update({f"{name}.{key}": value for key, value in res.items()})
+
+    #
+    res_events: dict[str, float] = bench_events(app, win, nb_events)
+    print("-" * 88)
+    print(f"Events: {int(res_events['dispatched'])} dispatched, {res_events['dispatch_per_sec']:.0f} events / s")
+    results["events.dispatch_per_sec"] = res_events["dispatch_per_sec"]
+    #
+    if app.display is not None:
+        app.display.destroy_display()
+    #
+    return results
+
+
+#
+def main() -> None:
+    #
+    backend: str = sys.argv[1] if len(sys.argv) > 1 else "headless"
+    nb_frames: int = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    #
+    run(backend, nb_frames)
+
+
+#
+if __name__ == "__main__":
+    main()
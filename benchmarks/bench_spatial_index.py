@@ -0,0 +1,151 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Benchmark of the two spatial indexes usable for the collisions layers of the scenes:
+ND_Quadtree (pure Python) and ND_SpatialIndex_NP (NumPy structure of arrays).
+
+For each number of elements, measures the build (bulk_load), point queries, rect queries and updates,
+then prints the number of elements from which the NumPy index is faster for the point queries (crossover).
+
+Usage: python bench_spatial_index.py [max_nb_elements]
+
+"""
+
+#
+import os
+import sys
+import time
+import random
+#
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+#
+from typing import Callable, Optional
+
+#
+from lib_nadisplay_rects import ND_Rect
+from lib_nadisplay_quadtree import ND_Quadtree
+from lib_nadisplay_spatial_index import ND_SpatialIndex_NP
+
+
+#
+WORLD_SIZE: int = 4096
+NB_QUERIES: int = 2000
+
+
+#
+def generate_rects(nb_elements: int, seed: int = 0) -> list[tuple[ND_Rect, str]]:
+    # Like a grid editor / a map: a lot of small rects
+    rng: random.Random = random.Random(seed)
+    #
+    return [
+        (ND_Rect(rng.randint(0, WORLD_SIZE), rng.randint(0, WORLD_SIZE), rng.randint(4, 64), rng.randint(4, 64)), f"elt_{i}")
+        for i in range(nb_elements)
+    ]
+
+
+#
+def time_per_call(fn: Callable[[], None], nb_calls: int) -> float:
+    """Returns the mean time of one call in microseconds."""
+    #
+    t0: float = time.perf_counter()
+    fn()
+    #
+    return (time.perf_counter() - t0) / nb_calls * 1e6
+
+
+#
+def bench_index(index: ND_Quadtree | ND_SpatialIndex_NP, objects: list[tuple[ND_Rect, str]]) -> dict[str, float]:
+    #
+    rng: random.Random = random.Random(1)
+    points: list[tuple[int, int]] = [(rng.randint(0, WORLD_SIZE), rng.randint(0, WORLD_SIZE)) for _ in range(NB_QUERIES)]
+    rects: list[ND_Rect] = [ND_Rect(x, y, 256, 256) for x, y in points]
+    moves: list[tuple[str, ND_Rect]] = [(objects[rng.randrange(len(objects))][1], ND_Rect(x, y, 32, 32)) for x, y in points]
+
+    #
+    def build() -> None:
+        index.bulk_load(objects)
+
+    #
+    def point_queries() -> None:
+        for pt in points:
+            index.get_colliding_ids(pt)
+
+    #
+    def rect_queries() -> None:
+        for rect in rects:
+            index.get_colliding_ids_with_rect(rect)
+
+    #
+    def updates() -> None:
+        for obj_id, rect in moves:
+            index.update(obj_id, rect)
+
+    #
+    return {
+        "build_ms": time_per_call(build, 1) / 1000,
+        "point_us": time_per_call(point_queries, NB_QUERIES),
+        "rect_us": time_per_call(rect_queries, NB_QUERIES),
+        "update_us": time_per_call(updates, NB_QUERIES)
+    }
+
+
+#
+def run(max_nb_elements: int = 100000) -> dict[str, float]:
+    #
+    results: dict[str, float] = {}
+
+    #
+    # 10, 20, 50, 100, 200, 500, ...
+    sizes: list[int] = []
+    decade: int = 10
+    while decade <= max_nb_elements:
+        sizes.extend(n for n in (decade, 2 * decade, 5 * decade) if n <= max_nb_elements)
+        decade *= 10
+
+    #
+    print(f"{'nb elts':>8} | {'index':>8} | {'build ms':>9} | {'point us':>9} | {'rect us':>9} | {'update us':>9}")
+    print("-" * 66)
+
+    #
+    crossover: Optional[int] = None
+    #
+    nb_elements: int
+    for nb_elements in sizes:
+        #
+        objects: list[tuple[ND_Rect, str]] = generate_rects(nb_elements)
+        #
+        res_qt: dict[str, float] = bench_index(ND_Quadtree(max_objects=10, max_levels=8), objects)
+        res_np: dict[str, float] = bench_index(ND_SpatialIndex_NP(), objects)
+        #
+        name: str
+        res: dict[str, float]
+        for name, res in [("quadtree", res_qt), ("numpy", res_np)]:
+            print(f"{nb_elements:>8} | {name:>8} | {res['build_ms']:>9.2f} | {res['point_us']:>9.2f} | {res['rect_us']:>9.2f} | {res['update_us']:>9.2f}")
+            #
+            results.update({f"{name}_{nb_elements}.{key}": value for key, value in res.items()})
+        #
+        if crossover is None and res_np["point_us"] < res_qt["point_us"]:
+            crossover = nb_elements
+
+    #
+    print("-" * 66)
+    if crossover is not None:
+        print(f"ND_SpatialIndex_NP is faster than ND_Quadtree for the point queries from about {crossover} elements.")
+    else:
+        print(f"ND_Quadtree stays faster than ND_SpatialIndex_NP for the point queries up to {sizes[-1]} elements.")
+    #
+    return results
+
+
+#
+def main() -> None:
+    #
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
+
+
+#
+if __name__ == "__main__":
+    main()
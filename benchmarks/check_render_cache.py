@@ -0,0 +1,150 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Pixel comparison of the render cache (the headless backend, no display needed):
+each scene is rendered once with render_cache=False and once with render_cache=True,
+and the two frames must be identical, also after scrolling the containers.
+
+Scenes:
+    - "multilayer_in_container": a cached ND_Elt_MultiLayer placed by an ND_Position_Container,
+    - "scrolled_container": a cached ND_Elt_Container of buttons, scrolled between the frames.
+
+Usage: python check_render_cache.py
+
+Exits with the status 1 if a scene renders differently with the cache.
+
+"""
+
+#
+import os
+import sys
+#
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+#
+from typing import Callable
+
+#
+import numpy as np
+from numpy.typing import NDArray
+
+#
+import lib_nadisplay as nd
+import lib_nadisplay_events as nd_event
+
+
+#
+WINDOW_SIZE: tuple[int, int] = (400, 300)
+NB_FRAMES: int = 4
+
+
+#
+def build_multilayer_in_container(win: nd.ND_Window, scene: nd.ND_Scene, render_cache: bool) -> list[nd.ND_Elt_Container]:
+    #
+    container: nd.ND_Elt_Container = nd.ND_Elt_Container(window=win, elt_id="container", position=nd.ND_Position(30, 20, 300, 200), element_alignment="col", element_alignment_kargs={}, scroll_h=True)
+    scene.add_element(0, container)
+    #
+    container.add_element(nd.ND_Elt_Rectangle(window=win, elt_id="top", position=nd.ND_Position_Container(w=100, h=20, container=container), border=False, base_bg_color=nd.ND_Color(0, 0, 255)))
+    #
+    multilayer: nd.ND_Elt_MultiLayer = nd.ND_Elt_MultiLayer(window=win, elt_id="multilayer", position=nd.ND_Position_Container(w=100, h=60, container=container), elements_layers={}, render_cache=render_cache)
+    multilayer.add_element(0, nd.ND_Elt_Rectangle(window=win, elt_id="bg", position=nd.ND_Position_MultiLayer(multilayer, w="100%", h="100%"), border=False, base_bg_color=nd.ND_Color(255, 0, 0)))
+    multilayer.add_element(1, nd.ND_Elt_Rectangle(window=win, elt_id="fg", position=nd.ND_Position_MultiLayer(multilayer, w="50%", h="50%"), border=False, base_bg_color=nd.ND_Color(0, 255, 0)))
+    container.add_element(multilayer)
+    #
+    for i in range(6):
+        container.add_element(nd.ND_Elt_Rectangle(window=win, elt_id=f"filler_{i}", position=nd.ND_Position_Container(w=80, h=40, container=container), border=False, base_bg_color=nd.ND_Color(40 * i, 40 * i, 40 * i)))
+    #
+    return [container]
+
+
+#
+def build_scrolled_container(win: nd.ND_Window, scene: nd.ND_Scene, render_cache: bool) -> list[nd.ND_Elt_Container]:
+    #
+    container: nd.ND_Elt_Container = nd.ND_Elt_Container(window=win, elt_id="container", position=nd.ND_Position(20, 20, 250, 250), element_alignment="col", element_alignment_kargs={}, scroll_h=True, render_cache=render_cache)
+    scene.add_element(0, container)
+    #
+    for i in range(30):
+        container.add_element(nd.ND_Elt_Button(window=win, elt_id=f"button_{i}", position=nd.ND_Position_Container(w=200, h=25, container=container), onclick=None, text=f"item {i}", font_size=12))
+    #
+    return [container]
+
+
+#
+SCENES: dict[str, Callable[[nd.ND_Window, nd.ND_Scene, bool], list[nd.ND_Elt_Container]]] = {
+    "multilayer_in_container": build_multilayer_in_container,
+    "scrolled_container": build_scrolled_container,
+}
+
+
+#
+def render_frames(build_fn: Callable[[nd.ND_Window, nd.ND_Scene, bool], list[nd.ND_Elt_Container]], render_cache: bool) -> list[NDArray[np.uint8]]:
+    #
+    DisplayClass, WindowClass, EventsManagerClass = nd.prepare_backend("headless")
+    #
+    app: nd.ND_MainApp = nd.ND_MainApp(DisplayClass=DisplayClass, WindowClass=WindowClass, EventsManagerClass=EventsManagerClass)
+    #
+    if app.display is None:
+        raise UserWarning("Error: no display created for the headless backend")
+    #
+    win: nd.ND_Window | None = app.display.get_window(app.display.create_window({"title": "Render cache check", "size": WINDOW_SIZE, "window_id": 0}))
+    #
+    if win is None:
+        raise UserWarning("Error: no window created for the headless backend")
+
+    #
+    scene: nd.ND_Scene = nd.ND_Scene(window=win, scene_id="check", origin=nd.ND_Point(0, 0), elements_layers={}, on_window_state="check")
+    containers: list[nd.ND_Elt_Container] = build_fn(win, scene, render_cache)
+    #
+    win.add_scene(scene)
+    win.set_state("check")
+
+    #
+    frames: list[NDArray[np.uint8]] = []
+    #
+    for _ in range(NB_FRAMES):
+        #
+        app.update_display()
+        frames.append(win.get_frame_array().copy())
+        #
+        for container in containers:
+            container.handle_event(nd_event.ND_EventMouseWheelScrolled(x=0, y=0, scroll_x=0, scroll_y=5))
+
+    #
+    app.display.destroy_display()
+    #
+    return frames
+
+
+#
+def run() -> int:
+    #
+    nb_failures: int = 0
+    #
+    for name, build_fn in SCENES.items():
+        #
+        uncached: list[NDArray[np.uint8]] = render_frames(build_fn, False)
+        cached: list[NDArray[np.uint8]] = render_frames(build_fn, True)
+        #
+        nb_diffs: list[int] = [int((a != b).any(axis=2).sum()) for a, b in zip(uncached, cached)]
+        #
+        status: str = "ok" if max(nb_diffs) == 0 else "FAILED"
+        #
+        if max(nb_diffs) > 0:
+            nb_failures += 1
+        #
+        print(f"{name:<25} | differing pixels per frame: {nb_diffs} | {status}")
+    #
+    return nb_failures
+
+
+#
+def main() -> None:
+    #
+    sys.exit(1 if run() > 0 else 0)
+
+
+#
+if __name__ == "__main__":
+    main()
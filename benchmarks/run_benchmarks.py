@@ -0,0 +1,199 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Runs the whole benchmark suite (scenes, layout, events, value types, spatial index, chunked grid)
+and saves the results as a JSON file, so two runs (two commits, two backends, ...) can be compared.
+
+Every result is a flat "<benchmark>.<metric>" float. Lower is better, except for the metrics ending with "_per_sec".
+
+Usage:
+    python run_benchmarks.py run [--backend headless] [--frames 100] [--quick] [--only scenes,point_rect] [--output results.json]
+    python run_benchmarks.py compare baseline.json current.json [--threshold 10]
+
+The compare command exits with the status 1 if a metric regressed by more than threshold percent.
+
+"""
+
+#
+import os
+import sys
+#
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+#
+import argparse
+import json
+import platform
+import subprocess
+import time
+from typing import Any, Callable
+
+#
+import bench_chunked_grid
+import bench_point_rect
+import bench_scenes
+import bench_spatial_index
+
+
+#
+QUICK_SIZES: dict[str, int] = {"buttons": 100, "grid": 16, "multilayer": 10, "text": 50}
+
+
+#
+def get_commit() -> str:
+    #
+    try:
+        #
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    #
+    except (OSError, subprocess.CalledProcessError):
+        #
+        return "unknown"
+
+
+#
+def get_benchmarks(args: argparse.Namespace) -> dict[str, Callable[[], dict[str, float]]]:
+    #
+    sizes: dict[str, int] = QUICK_SIZES if args.quick else bench_scenes.DEFAULT_SIZES
+    nb_frames: int = min(args.frames, 20) if args.quick else args.frames
+    #
+    return {
+        "scenes": lambda: bench_scenes.run(args.backend, nb_frames, sizes, 2000 if args.quick else 20000),
+        "point_rect": lambda: bench_point_rect.run(20000 if args.quick else 200000),
+        "spatial_index": lambda: bench_spatial_index.run(1000 if args.quick else 10000),
+        "chunked_grid": lambda: bench_chunked_grid.run(300 if args.quick else 1000),
+    }
+
+
+#
+def cmd_run(args: argparse.Namespace) -> int:
+    #
+    benchmarks: dict[str, Callable[[], dict[str, float]]] = get_benchmarks(args)
+    #
+    selected: list[str] = [name.strip() for name in args.only.split(",")] if args.only else list(benchmarks)
+    #
+    for name in selected:
+        if name not in benchmarks:
+            raise UserWarning(f"Error: unknown benchmark `{name}`, available ones are: {', '.join(benchmarks)}")
+
+    #
+    results: dict[str, float] = {}
+    #
+    for name in selected:
+        #
+        print(f"\n=== {name} ===")
+        #
+        for key, value in benchmarks[name]().items():
+            results[f"{name}.{key}"] = float(value)
+
+    #
+    data: dict[str, Any] = {
+        "meta": {
+            "commit": get_commit(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "params": {"frames": args.frames, "quick": args.quick, "only": selected},
+        },
+        "results": results,
+    }
+
+    #
+    if args.output:
+        #
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        #
+        print(f"\nResults saved to `{args.output}`")
+    #
+    else:
+        #
+        print(json.dumps(data, indent=4))
+
+    #
+    return 0
+
+
+#
+def cmd_compare(args: argparse.Namespace) -> int:
+    #
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline: dict[str, float] = json.load(f)["results"]
+    #
+    with open(args.current, "r", encoding="utf-8") as f:
+        current: dict[str, float] = json.load(f)["results"]
+
+    #
+    nb_regressions: int = 0
+    #
+    print(f"{'metric':<45} | {'baseline':>12} | {'current':>12} | {'change':>8} |")
+    print("-" * 92)
+    #
+    for key in sorted(set(baseline) & set(current)):
+        #
+        before: float = baseline[key]
+        after: float = current[key]
+        #
+        if before == 0:
+            continue
+        #
+        change: float = (after - before) / abs(before) * 100
+        #
+        worse: float = change if key.endswith("_per_sec") is False else -change
+        #
+        status: str = ""
+        #
+        if worse > args.threshold:
+            #
+            status = "REGRESSION"
+            nb_regressions += 1
+        #
+        elif worse < -args.threshold:
+            #
+            status = "improved"
+        #
+        print(f"{key:<45} | {before:>12.3f} | {after:>12.3f} | {change:>+7.1f}% | {status}")
+
+    #
+    for key in sorted(set(baseline) ^ set(current)):
+        print(f"{key:<45} | only in {'baseline' if key in baseline else 'current'}")
+
+    #
+    print(f"\n{nb_regressions} regression(s) above {args.threshold}%")
+    #
+    return 1 if nb_regressions > 0 else 0
+
+
+#
+def main() -> None:
+    #
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="NappEngine benchmark suite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    #
+    run_parser: argparse.ArgumentParser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--backend", default="headless", help="backend used by the scenes benchmarks")
+    run_parser.add_argument("--frames", type=int, default=100, help="number of rendered frames per scene")
+    run_parser.add_argument("--quick", action="store_true", help="smaller sizes, for a quick check")
+    run_parser.add_argument("--only", default="", help="comma separated list of benchmarks to run")
+    run_parser.add_argument("--output", default="", help="JSON file to save the results into")
+    #
+    compare_parser: argparse.ArgumentParser = subparsers.add_parser("compare", help="compare two JSON results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression, in percent")
+    #
+    args: argparse.Namespace = parser.parse_args()
+    #
+    sys.exit(cmd_run(args) if args.command == "run" else cmd_compare(args))
+
+
+#
+if __name__ == "__main__":
+    main()
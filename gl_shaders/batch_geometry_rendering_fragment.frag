@@ -0,0 +1,8 @@
+#version 330 core
+in vec4 vColor; // Interpolated vertex color
+
+out vec4 FragColor;
+
+void main() {
+    FragColor = vColor; // Set the output color to the vertex color
+}
\ No newline at end of file
@@ -0,0 +1,13 @@
+#version 330 core
+layout(location = 0) in vec2 aPos; // Vertex position, in screen pixels
+layout(location = 1) in vec2 aTexCoord; // Texture coordinate
+
+uniform vec2 screenSize; // Size of the window, in pixels
+
+out vec2 TexCoord; // Pass texture coordinate to fragment shader
+
+void main() {
+    // Convert from screen space (top-left origin) to NDC
+    gl_Position = vec4(2.0 * aPos.x / screenSize.x - 1.0, 1.0 - 2.0 * aPos.y / screenSize.y, 0.0, 1.0);
+    TexCoord = aTexCoord;
+}
\ No newline at end of file
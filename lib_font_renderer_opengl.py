@@ -12,7 +12,11 @@ SDL + OPENGL backend for lib_nadisplay.
 # Import NumPy for numerical operations
 import numpy as np  # type: ignore
 #
-from typing import Any
+from typing import Any, Optional
+#
+from collections import OrderedDict
+#
+from math import ceil, sqrt
 
 # To optimize speed in production, OpenGL error checking and logging can be disabled
 # import OpenGL
@@ -38,20 +42,40 @@ from lib_nadisplay_backend_opengl import compile_shaders
 BASE_PATH: str = "../../../"
 
 
+# Default maximum number of glyphs kept at the same time in the atlas of a font renderer
+FONT_ATLAS_DEFAULT_MAX_GLYPHS: int = 1024
+
+
 #
 WindowOpenGLClass = Any  # "ND_Window_SDL2_OPENGL" | "ND_Window_SDL3_OPENGL" | "ND_Window_GLFW_OPENGL"
 
 
 #
 class FontRenderer:
-    def __init__(self, font_path: str, window: WindowOpenGLClass) -> None:
+    def __init__(self, font_path: str, window: WindowOpenGLClass, font_size: int = 48, atlas_max_glyphs: int = FONT_ATLAS_DEFAULT_MAX_GLYPHS) -> None:
         self.window: WindowOpenGLClass = window  # Reference to the window object
+        self.font_size: int = font_size  # Size (in pixels) at which the glyphs are rasterized in the atlas
+        self.glyph_scale: float = 48 / font_size  # Glyph metrics are expressed relative to the historical 48px rasterization
         self.shader_program: int = 0  # OpenGL shader program
         self.shader_projection: int = 0  # OpenGL shader projection matrix
+        self.shader_text_color: int = 0  # OpenGL shader text color uniform
         self.projection = glm.ortho(0, self.window.width, self.window.height, 0, -100000, 100000)  # Default projection
-        self.characters: dict = {}  # Dictionary to store font character data
+        self.face: Optional[freetype.Face] = None  # FreeType font face, kept open to rasterize glyphs on demand
+        self.characters: OrderedDict[str, dict] = OrderedDict()  # Glyphs in the atlas (slot, uv, size, bearing, advance), least recently used first
+        self.atlas_texture_id: int = 0  # Single texture containing the glyphs of this font face and size
+        self.atlas_max_glyphs: int = max(1, atlas_max_glyphs)  # Budget : number of glyph slots in the atlas
+        self.atlas_cols: int = 0  # Number of glyph slots per atlas row
+        self.atlas_cell_width: int = 0  # Width of a glyph slot, in pixels
+        self.atlas_cell_height: int = 0  # Height of a glyph slot, in pixels
+        self.atlas_width: int = 0  # Atlas texture width, in pixels
+        self.atlas_height: int = 0  # Atlas texture height, in pixels
+        self.atlas_free_slots: list[int] = []  # Slots not used by any glyph
+        self.glyphs_in_current_string: set[str] = set()  # Glyphs that can't be evicted before the pending quads are drawn
+        self.nb_glyphs_rasterized: int = 0  # Statistics
+        self.nb_glyphs_evicted: int = 0  # Statistics
         self.vao: int = 0  # Vertex Array Object ID
         self.vbo: int = 0  # Vertex Buffer Object ID
+        self.vbo_capacity: int = 0  # Allocated size of the VBO, in bytes
 
         # Ensure context is current on this thread
         if hasattr(self.window, "_ensure_context"):
@@ -62,7 +86,7 @@ class FontRenderer:
         self.load_font(font_path)  # Load font
 
     #
-    def _get_rendering_buffer(self, xpos: float, ypos: float, w: float, h: float, zfix: float = 0.0) -> np.ndarray:
+    def _get_rendering_buffer(self, xpos: float, ypos: float, w: float, h: float, uv: tuple[float, float, float, float]) -> np.ndarray:
         """
         Generate the vertex data for rendering a textured quad.
 
@@ -70,16 +94,17 @@ class FontRenderer:
         :param ypos: Y position of the bottom-left corner of the quad.
         :param w: Width of the quad.
         :param h: Height of the quad.
-        :param zfix: Z position fix (usually 0.0).
+        :param uv: Texture coordinates of the glyph in the atlas (u0, v0, u1, v1), v0 being the top of the glyph.
         :return: A NumPy array representing the vertices of the quad.
         """
+        u0, v0, u1, v1 = uv
         return np.asarray([
-            xpos,     ypos - h, 0, 0,  # Bottom-left vertex
-            xpos,     ypos,     0, 1,  # Top-left vertex
-            xpos + w, ypos,     1, 1,  # Top-right vertex
-            xpos,     ypos - h, 0, 0,  # Bottom-left vertex again
-            xpos + w, ypos,     1, 1,  # Top-right vertex
-            xpos + w, ypos - h, 1, 0   # Bottom-right vertex
+            xpos,     ypos - h, u0, v0,  # Top-left vertex
+            xpos,     ypos,     u0, v1,  # Bottom-left vertex
+            xpos + w, ypos,     u1, v1,  # Bottom-right vertex
+            xpos,     ypos - h, u0, v0,  # Top-left vertex again
+            xpos + w, ypos,     u1, v1,  # Bottom-right vertex again
+            xpos + w, ypos - h, u1, v0   # Top-right vertex
         ], np.float32)
 
     def init_shader(self) -> None:
@@ -105,6 +130,9 @@ class FontRenderer:
         self.shader_projection = gl.glGetUniformLocation(self.shader_program, "projection")
         gl.glUniformMatrix4fv(self.shader_projection, 1, gl.GL_FALSE, glm.value_ptr(self.projection))
 
+        #
+        self.shader_text_color = gl.glGetUniformLocation(self.shader_program, "textColor")
+
         # Disable byte-alignment restriction for texture
         gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
 
@@ -128,38 +156,37 @@ class FontRenderer:
         gl.glEnable(gl.GL_BLEND)
         gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
 
-        # Load font using FreeType
-        face = freetype.Face(font_path)  # Load font face
-        face.set_char_size(48 * 64)  # Set character size
-
-        # Load ASCII characters (0-127)
-        for c in range(128):
-            # Load character glyph
-            face.load_char(chr(c))
-            glyph = face.glyph
-
-            # Create texture for the glyph bitmap
-            texture_id = gl.glGenTextures(1)
-            gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id)
-            gl.glTexImage2D(
-                gl.GL_TEXTURE_2D, 0, gl.GL_RED,
-                glyph.bitmap.width, glyph.bitmap.rows,
-                0, gl.GL_RED, gl.GL_UNSIGNED_BYTE, glyph.bitmap.buffer
-            )
-
-            # Set texture parameters
-            gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
-            gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
-            gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
-            gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
-
-            # Store character data
-            self.characters[chr(c)] = {
-                'texture_id': texture_id,
-                'size': (glyph.bitmap.width, glyph.bitmap.rows),
-                'bearing': (glyph.bitmap_left, glyph.bitmap_top),
-                'advance': glyph.advance.x
-            }
+        # Load font using FreeType, the glyphs are rasterized later, on first use
+        self.face = freetype.Face(font_path)  # Load font face
+        self.face.set_char_size(self.font_size * 64)  # Set character size
+
+        # All the atlas slots have the same size, so an evicted glyph slot can be reused by any other glyph
+        padding: int = 1
+        self.atlas_cell_width = max(1, self.face.size.max_advance >> 6) + padding
+        self.atlas_cell_height = max(1, self.face.size.height >> 6) + padding
+        #
+        self.atlas_cols = ceil(sqrt(self.atlas_max_glyphs))
+        atlas_rows: int = ceil(self.atlas_max_glyphs / self.atlas_cols)
+        #
+        self.atlas_width = self.atlas_cols * self.atlas_cell_width
+        self.atlas_height = atlas_rows * self.atlas_cell_height
+        #
+        self.atlas_free_slots = list(range(self.atlas_max_glyphs - 1, -1, -1))
+
+        # Create the (empty) atlas texture
+        self.atlas_texture_id = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.atlas_texture_id)
+        gl.glTexImage2D(
+            gl.GL_TEXTURE_2D, 0, gl.GL_RED,
+            self.atlas_width, self.atlas_height,
+            0, gl.GL_RED, gl.GL_UNSIGNED_BYTE, np.zeros((self.atlas_height, self.atlas_width), dtype=np.uint8)
+        )
+
+        # Set texture parameters
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
 
         # Unbind texture
         gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
@@ -168,9 +195,12 @@ class FontRenderer:
         self.vao = gl.glGenVertexArrays(1)
         self.vbo = gl.glGenBuffers(1)
 
+        # Room for 64 characters, grows with the longest rendered string
+        self.vbo_capacity = 64 * 6 * 4 * 4
+
         gl.glBindVertexArray(self.vao)
         gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, 6 * 4 * 4, None, gl.GL_DYNAMIC_DRAW)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, self.vbo_capacity, None, gl.GL_DYNAMIC_DRAW)
         gl.glEnableVertexAttribArray(0)
 
         #
@@ -189,6 +219,107 @@ class FontRenderer:
         gl.glBindVertexArray(0)
 
 
+    def _get_glyph(self, char: str, pending_quads: list[np.ndarray]) -> dict:
+        """
+        Get the glyph of a character, rasterizing it in the atlas if it is not already there.
+
+        :param char: Character to get.
+        :param pending_quads: Quads of the string being rendered, drawn before evicting a glyph they use.
+        :return: The glyph data (slot, uv, size, bearing, advance).
+        """
+
+        # Already in the atlas, mark it as the most recently used
+        if char in self.characters:
+            self.characters.move_to_end(char)
+            return self.characters[char]
+
+        # Find a slot for the new glyph, evicting the least recently used glyph if the atlas is full
+        if not self.atlas_free_slots:
+            #
+            cold_char: str = next(iter(self.characters))
+            # The pending quads still use it, draw them before replacing it
+            if cold_char in self.glyphs_in_current_string:
+                self._draw_quads(pending_quads)
+                pending_quads.clear()
+                self.glyphs_in_current_string.clear()
+            #
+            cold_glyph: dict = self.characters.pop(cold_char)
+            self.atlas_free_slots.append(cold_glyph['slot'])
+            self.nb_glyphs_evicted += 1
+        #
+        slot: int = self.atlas_free_slots.pop()
+
+        # Rasterize the glyph
+        self.face.load_char(char)
+        glyph = self.face.glyph
+
+        # Copy the glyph bitmap (rows may be padded to `pitch` bytes), cropped to the slot size
+        bw: int = min(glyph.bitmap.width, self.atlas_cell_width - 1)
+        bh: int = min(glyph.bitmap.rows, self.atlas_cell_height - 1)
+        cell: np.ndarray = np.zeros((self.atlas_cell_height, self.atlas_cell_width), dtype=np.uint8)
+        if bw > 0 and bh > 0:
+            cell[:bh, :bw] = np.asarray(glyph.bitmap.buffer, dtype=np.uint8).reshape(glyph.bitmap.rows, glyph.bitmap.pitch)[:bh, :bw]
+
+        # Upload it in its slot (the whole slot is overwritten, clearing the previous glyph)
+        px: int = (slot % self.atlas_cols) * self.atlas_cell_width
+        py: int = (slot // self.atlas_cols) * self.atlas_cell_height
+        #
+        gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.atlas_texture_id)
+        gl.glTexSubImage2D(
+            gl.GL_TEXTURE_2D, 0, px, py,
+            self.atlas_cell_width, self.atlas_cell_height,
+            gl.GL_RED, gl.GL_UNSIGNED_BYTE, cell
+        )
+        self.nb_glyphs_rasterized += 1
+
+        # Store character data
+        self.characters[char] = {
+            'slot': slot,
+            'uv': (
+                px / self.atlas_width, py / self.atlas_height,
+                (px + bw) / self.atlas_width, (py + bh) / self.atlas_height
+            ),
+            'size': (bw, bh),
+            'bearing': (glyph.bitmap_left, glyph.bitmap_top),
+            'advance': glyph.advance.x
+        }
+        #
+        return self.characters[char]
+
+    def _draw_quads(self, quads: list[np.ndarray]) -> None:
+        """
+        Upload the quads at once, and draw them in one draw call (the shader and the color must already be set).
+        """
+        #
+        if not quads:
+            return
+
+        #
+        vertices: np.ndarray = np.concatenate(quads)
+
+        # Bind the atlas, the same texture is used by all the characters
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.atlas_texture_id)
+
+        # Bind the VAO
+        gl.glBindVertexArray(self.vao)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
+
+        # Upload all the quads at once, orphaning the previous storage (and growing it if needed)
+        self.vbo_capacity = max(self.vbo_capacity, vertices.nbytes)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, self.vbo_capacity, None, gl.GL_DYNAMIC_DRAW)
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
+
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+
+        # Render the quads in one draw call
+        gl.glDrawArrays(gl.GL_TRIANGLES, 0, len(vertices) // 4)
+
+        # Unbind VAO and texture
+        gl.glBindVertexArray(0)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+
     def handle_resize(self, new_width: int, new_height: int) -> None:
         """
         Updates the projection matrix when the window is resized.
@@ -219,20 +350,13 @@ class FontRenderer:
         # Use program
         gl.glUseProgram(self.shader_program)
 
-        #
-        scale /= 50
-
         # Ensure OpenGL context is active
         if hasattr(self.window, "_ensure_context"):
             #
             self.window._ensure_context()
 
         # Set text color
-        gl.glUniform3f(
-            gl.glGetUniformLocation(self.shader_program, "textColor"),
-            color.r / 255, color.g / 255, color.b / 255
-        )
-        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glUniform3f(self.shader_text_color, color.r / 255, color.g / 255, color.b / 255)
 
         # Disable depth to render the text correctly
         gl.glDisable(gl.GL_DEPTH_TEST)
@@ -241,50 +365,35 @@ class FontRenderer:
         gl.glEnable(gl.GL_BLEND)
         gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
 
-        # Iterate over characters in the text
-        for char in text:
-            # Only ASCII characters are supported
-            if char not in self.characters:
-                continue
+        #
+        scale /= 50
+        # Offset of the baseline from the top of the text
+        baseline: float = y + 40 * scale
+        #
+        scale *= self.glyph_scale
 
-            # Get the character font glyph
-            ch = self.characters[char]
+        # Build the quads of all the characters of the string
+        quads: list[np.ndarray] = []
+        self.glyphs_in_current_string.clear()
+        #
+        for char in text:
+            # Get the character font glyph (rasterized on first use)
+            ch = self._get_glyph(char, quads)
 
             # Calculate position and size for the character
             xpos = x + ch['bearing'][0] * scale
-            ypos = y + 40 * scale + (ch['size'][1] - ch['bearing'][1]) * scale
+            ypos = baseline + (ch['size'][1] - ch['bearing'][1]) * scale
             w = ch['size'][0] * scale
             h = ch['size'][1] * scale
 
-            # Convert screen coordinates to NDC
-            xpos_ndc, ypos_ndc = self.window.screen_to_ndc(xpos, ypos)
-            w_ndc, h_ndc = self.window.screen_to_ndc(w, h)
-
-            # Bind the VAO
-            gl.glBindVertexArray(self.vao)
-
-            # Define vertex data for the character
-            vertices = self._get_rendering_buffer(xpos, ypos, w, h)
-
-            # Render the glyph texture over a quad
-            gl.glBindTexture(gl.GL_TEXTURE_2D, ch['texture_id'])
-
-            # Update the VBO with new vertex data
-            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
-            gl.glBufferData(gl.GL_ARRAY_BUFFER, 6 * 4 * 4, None, gl.GL_DYNAMIC_DRAW)
-
-            gl.glEnableVertexAttribArray(0)
-            gl.glBufferSubData(gl.GL_ARRAY_BUFFER, 0, vertices.nbytes, vertices)
-
-            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-
-            # Render the character as triangles
-            gl.glDrawArrays(gl.GL_TRIANGLES, 0, 6)
+            # Invisible characters (spaces) only advance the cursor
+            if w > 0 and h > 0:
+                quads.append(self._get_rendering_buffer(xpos, ypos, w, h, ch['uv']))
+                self.glyphs_in_current_string.add(char)
 
             # Advance the cursor to the next position (in pixels)
             x += (ch['advance'] >> 6) * scale  # Advance is in 1/64th pixels
 
-        # Unbind VAO and texture
-        gl.glBindVertexArray(0)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
-
+        # Render the whole string in one draw call
+        self._draw_quads(quads)
+        self.glyphs_in_current_string.clear()
@@ -16,8 +16,8 @@ from lib_nadisplay_prepare_backend import prepare_backend
 #
 from lib_nadisplay_colors import ND_Color, cl
 #
-from lib_nadisplay_point import ND_Point
-from lib_nadisplay_rects import ND_Rect
+from lib_nadisplay_point import ND_Point, ND_ImmutablePoint
+from lib_nadisplay_rects import ND_Rect, ND_ImmutableRect
 #
 from lib_nadisplay_transformation import ND_Transformation
 #
@@ -42,5 +42,15 @@ from lib_nadisplay_elt_number_input import ND_Elt_NumberInput
 from lib_nadisplay_elt_select_options import ND_Elt_SelectOptions
 #
 from lib_nadisplay_elt_rect_grid import ND_Elt_RectGrid, ND_Position_RectGrid, ND_Elt_CameraGrid
+#
+from lib_nadisplay_quadtree import ND_Quadtree
+from lib_nadisplay_spatial_index import ND_SpatialIndex_NP
+#
+from lib_nadisplay_scheduler import ND_FixedTimestepScheduler, ND_FrameStats
+from lib_nadisplay_double_buffer import ND_DoubleBuffer
+from lib_nadisplay_jobs import ND_JobsPool, ND_Job
+from lib_nadisplay_global_vars import ND_GlobalVarsStore, ND_GlobalVarsSnapshot, ND_GlobalVarsTransaction, ND_GlobalVarsConflictError
 
 
+from lib_nadisplay_profiler import ND_FrameProfiler
+from lib_nadisplay_elt_profiler_overlay import ND_Elt_ProfilerOverlay
@@ -50,9 +50,10 @@ from lib_nadisplay_colors import ND_Color
 from lib_nadisplay_transformation import ND_Transformation
 from lib_nadisplay_rects import ND_Rect, ND_Point
 from lib_nadisplay_core import ND_MainApp, ND_Display, ND_Window, ND_Scene
-from lib_nadisplay_backend_opengl import compile_shaders
+from lib_nadisplay_backend_opengl import compile_shaders, create_gl_render_target, delete_gl_render_target
 from lib_nadisplay_backend_glfw import get_display_info, ND_Window_GLFW
 from lib_nadisplay_math import calc_rad_agl_about_h_axis, calc_point_with_angle_and_distance_from_another_point, convert_deg_to_rad, earcut_triangulate_polygon
+from lib_nadisplay_backend_opengl_batch import ND_GeometryBatch_OPENGL, ND_SpriteBatch_OPENGL
 from lib_font_renderer_opengl import FontRenderer
 
 #
@@ -189,7 +190,7 @@ class ND_Display_GLFW_OPENGL(ND_Display):
                 if font not in self.fonts_renderers:
                     self.fonts_renderers[font] = {}
                 #
-                font_renderer: Optional[FontRenderer] = FontRenderer(font_path, window)
+                font_renderer: Optional[FontRenderer] = FontRenderer(font_path, window, font_size)
                 self.fonts_renderers[font][font_size] = font_renderer
                 #
                 # if font_renderer is not None:
@@ -330,6 +331,7 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         #
         self.next_texture_id: int = 0
         self.gl_textures: dict[int, int] = {}
+        self.textures_dimensions: dict[int, tuple[int, int]] = {}
         self.mutex_gl_textures: Lock = Lock()
 
         # Compile textures shaders
@@ -355,6 +357,16 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         # Disable byte-alignment restriction for texture
         gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
 
+        # Batched geometry renderer (lines, triangles, points)
+        self.geometry_batch: ND_GeometryBatch_OPENGL = ND_GeometryBatch_OPENGL(self)
+        # Batched textured quads renderer, with a persistent streaming vertex buffer
+        self.sprite_batch: ND_SpriteBatch_OPENGL = ND_SpriteBatch_OPENGL(self)
+
+        # Framebuffers of the render target textures (texture id -> framebuffer)
+        self.gl_framebuffers: dict[int, int] = {}
+        # Window sizes to restore after rendering into a texture
+        self.previous_render_sizes: list[tuple[int, int]] = []
+
         #
         log_opengl_context_info()
         log_opengl_context_attributes()
@@ -397,6 +409,10 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
             #
             self.destroy_prepared_texture(texture_id)
 
+        #
+        self.geometry_batch.destroy()
+        self.sprite_batch.destroy()
+
         #
         glfw.destroy_window(self.glw_window)
         #
@@ -563,49 +579,17 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
     def blit_texture(self, texture_id: int, dst_rect: ND_Rect) -> None:
         """
         Renders a texture using OpenGL shaders.
+        Consecutive blits of the same texture are merged into one draw call by the sprite batch.
         """
         if texture_id not in self.gl_textures:
             print("Texture ID not found.")
             return
 
-        #
-        self._ensure_shaderProgram_textures()
-        self._ensure_context()
-
-        gl.glBindTexture(gl.GL_TEXTURE_2D, self.gl_textures[texture_id])
-
-        vertices = np.array([
-            # Position       # Texture Coords
-            dst_rect.x, dst_rect.y, 0.0, 1.0,  # Top-left corner
-            dst_rect.x + dst_rect.w, dst_rect.y, 1.0, 1.0,  # Top-right corner
-            dst_rect.x + dst_rect.w, dst_rect.y + dst_rect.h, 1.0, 0.0,  # Bottom-right corner
-            dst_rect.x, dst_rect.y + dst_rect.h, 0.0, 0.0   # Bottom-left corner
-        ], dtype=np.float32)
-
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
-
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
-
-        # Position attribute
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 4 * vertices.itemsize, None)
-        gl.glEnableVertexAttribArray(0)
-
-        # Texture coordinate attribute
-        gl.glVertexAttribPointer(1, 2, gl.GL_FLOAT, gl.GL_FALSE, 4 * vertices.itemsize, ctypes.c_void_p(2 * vertices.itemsize))
-        gl.glEnableVertexAttribArray(1)
-
-        gl.glUseProgram(self.shader_program_textures)
-        gl.glDrawArrays(gl.GL_TRIANGLE_FAN, 0, 4)
-
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        # Keep the drawing order, the pending geometry has to be drawn before this quad
+        self.geometry_batch.flush()
 
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        #
+        self.sprite_batch.add_quad(self.gl_textures[texture_id], dst_rect.x, dst_rect.y, dst_rect.w, dst_rect.h)
 
     #
     def prepare_text_to_render(self, text: str, color: ND_Color, font_size: int, font_name: Optional[str] = None) -> int:
@@ -666,6 +650,8 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         if texture_id not in self.gl_textures:
             return ND_Point(0, 0)
         #
+        if texture_id in self.textures_dimensions:
+            return ND_Point(*self.textures_dimensions[texture_id])
 
         w: int = -1
         h: int = -1
@@ -676,151 +662,252 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
 
     #
     def destroy_prepared_texture(self, texture_id: int) -> None:
+        # The texture may still be used by pending quads in the sprite batch
+        self.flush_batches()
         #
         self._ensure_shaderProgram_textures()
         #
         with self.mutex_gl_textures:
-            if texture_id in self.gl_textures:
+            #
+            if texture_id in self.gl_framebuffers:
+                delete_gl_render_target(self.gl_textures[texture_id], self.gl_framebuffers[texture_id])
+                del self.gl_framebuffers[texture_id]
+                del self.gl_textures[texture_id]
+                del self.textures_dimensions[texture_id]
+            #
+            elif texture_id in self.gl_textures:
                 gl.glDeleteTextures(1, [self.gl_textures[texture_id]])
                 del self.gl_textures[texture_id]
 
     #
-    def _render_lines(self, points: list[ ND_Point ], color: ND_Color) -> None:
+    def create_render_target_texture(self, width: int, height: int) -> int:
         #
         if not self.display.initialized:
-            return
+            return -1
+
+        #
+        self._ensure_context()
+
+        #
+        gl_texture: int
+        framebuffer: int
+        gl_texture, framebuffer = create_gl_render_target(width, height)
+        #
+        if framebuffer == -1:
+            return -1
+
         #
-        N: int = len(points)
+        texture_id: int = -1
+        with self.mutex_gl_textures:
+            #
+            texture_id = self.next_texture_id
+            self.next_texture_id += 1
+            #
+            self.gl_textures[texture_id] = gl_texture
+            self.textures_dimensions[texture_id] = (width, height)
+            self.gl_framebuffers[texture_id] = framebuffer
+
         #
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *color.to_float_tuple())
+        return texture_id
+
+    #
+    def _set_render_size(self, width: int, height: int) -> None:
+        """
+        The drawing functions and shaders use the window size as the size of the current render target.
+        """
         #
-        vertices_pts: list[tuple[float, float]]=[(0, 0)] * N
+        self.width, self.height = width, height
+        gl.glViewport(0, 0, width, height)
         #
-        x: float
-        y: float
-        for i in range(N):
+        for font_renderer in self.display.get_all_loaded_fonts():
             #
-            x, y = self.screen_to_ndc(points[i].x, points[i].y)
+            if not font_renderer:
+                continue
             #
-            vertices_pts[i] = (x, y)
+            font_renderer.handle_resize(width, height)
+
+    #
+    def begin_render_to_texture(self, texture_id: int) -> bool:
         #
-        vertices = np.array(vertices_pts, dtype=np.float32)
+        if not self.display.initialized or texture_id not in self.gl_framebuffers:
+            return False
 
         #
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
+        self._ensure_context()
 
+        # The pending geometry and sprites are for the previous render target
+        self.flush_batches()
+
+        #
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.gl_framebuffers[texture_id])
         #
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 0, None)
-        gl.glEnableVertexAttribArray(0)
+        self.render_targets_stack.append(texture_id)
+        self.save_and_clear_clip_rect_stack()
+        gl.glDisable(gl.GL_SCISSOR_TEST)
 
         #
-        gl.glDrawArrays(gl.GL_LINE_STRIP, 0, N)
+        self.previous_render_sizes.append((self.width, self.height))
+        self._set_render_size(*self.textures_dimensions[texture_id])
 
         #
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        gl.glClearColor(0, 0, 0, 0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        #
+        return True
 
     #
-    def _render_uniform_colored_triangles(self, triangles: list[ tuple[ ND_Point, ND_Point, ND_Point ] ], color: ND_Color) -> None:
+    def end_render_to_texture(self) -> None:
         #
-        if not self.display.initialized:
+        if not self.render_targets_stack:
             return
+
         #
-        N: int = len(triangles)
+        self.flush_batches()
 
         #
-        self._ensure_shaderProgram_base()
-        self._ensure_context()
+        self.render_targets_stack.pop(-1)
+        #
+        if self.render_targets_stack:
+            gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.gl_framebuffers[self.render_targets_stack[-1]])
+        else:
+            gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
 
         #
-        gl.glUseProgram(self.shader_program)
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *color.to_float_tuple())
+        self._set_render_size(*self.previous_render_sizes.pop(-1))
 
         #
-        vertices_pts: list[tuple[float, float]] = [(0, 0)] * (3 * N)
+        self.restore_clip_rect_stack()
         #
-        x: float
-        y: float
-        for i in range(N):
-            #
-            x, y = self.screen_to_ndc(triangles[i][0].x, triangles[i][0].y)
-            #
-            vertices_pts[3*i] = (x, y)
-            #
-            x, y = self.screen_to_ndc(triangles[i][1].x, triangles[i][1].y)
-            #
-            vertices_pts[3*i + 1] = (x, y)
-            #
-            x, y = self.screen_to_ndc(triangles[i][2].x, triangles[i][2].y)
-            #
-            vertices_pts[3*i + 2] = (x, y)
+        clip_rect: Optional[ND_Rect] = self.get_top_of_clip_rect_stack()
+        #
+        if clip_rect is None:
+            gl.glDisable(gl.GL_SCISSOR_TEST)
+        else:
+            self.apply_area_drawing_constraint(clip_rect.x, clip_rect.y, clip_rect.w, clip_rect.h)
 
-        # Define vertices for two triangles forming the rectangle
-        vertices = np.array(vertices_pts, dtype=np.float32)
+    #
+    def render_part_of_prepared_texture(self, texture_id: int, x: int, y: int, w: int, h: int, src_x: int, src_y: int, src_w: int, src_h: int, transformations: ND_Transformation = ND_Transformation()) -> None:
 
         #
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
+        if not self.display.initialized:
+            return
 
         #
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 0, None)
-        gl.glEnableVertexAttribArray(0)
+        if texture_id not in self.gl_textures or texture_id not in self.textures_dimensions:
+            return
 
         #
-        gl.glDrawArrays(gl.GL_TRIANGLES, 0, 3 * N)
-
+        tex_w: int
+        tex_h: int
+        tex_w, tex_h = self.textures_dimensions[texture_id]
         #
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        u0: float = src_x / tex_w
+        u1: float = (src_x + src_w) / tex_w
+        v0: float = src_y / tex_h
+        v1: float = (src_y + src_h) / tex_h
+        # The render targets are drawn from the bottom left corner, their rows are upside down
+        if texture_id in self.gl_framebuffers:
+            v0, v1 = 1.0 - v0, 1.0 - v1
 
+        # Keep the drawing order, the pending geometry has to be drawn before this quad
+        self.geometry_batch.flush()
+        #
+        self.sprite_batch.add_quad(self.gl_textures[texture_id], x, y, w, h, u0, v0, u1, v1)
 
     #
-    def _render_point(self, point: ND_Point, color: ND_Color) -> None:
+    def render_prepared_texture_batch(self, texture_id: int, dst_rects: np.ndarray, src_rect: Optional[ND_Rect] = None) -> None:
+
         #
         if not self.display.initialized:
-            print("Display not initialized.")
             return
 
         #
-        self._ensure_shaderProgram_base()
-        self._ensure_context()
-
-        gl.glUseProgram(self.shader_program)
-        gl.glPointSize(1)
+        if texture_id not in self.gl_textures or texture_id not in self.textures_dimensions:
+            return
 
-        # Set color uniform
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *color.to_float_tuple())
+        #
+        u0: float = 0.0
+        u1: float = 1.0
+        v0: float = 0.0
+        v1: float = 1.0
+        #
+        if src_rect is not None:
+            #
+            tex_w: int
+            tex_h: int
+            tex_w, tex_h = self.textures_dimensions[texture_id]
+            #
+            u0, u1 = src_rect.x / tex_w, (src_rect.x + src_rect.w) / tex_w
+            v0, v1 = src_rect.y / tex_h, (src_rect.y + src_rect.h) / tex_h
+            # The render targets are drawn from the bottom left corner, their rows are upside down
+            if texture_id in self.gl_framebuffers:
+                v0, v1 = 1.0 - v0, 1.0 - v1
 
-        vertices = np.array([*self.screen_to_ndc(point.x, point.y)], dtype=np.float32)
+        # Keep the drawing order, the pending geometry has to be drawn before these quads
+        self.geometry_batch.flush()
+        # All the quads go in the same sprite batch, so in one draw call
+        self.sprite_batch.add_quads(self.gl_textures[texture_id], dst_rects, u0, v0, u1, v1)
 
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
+    #
+    def draw_thick_lines_batch(self, lines: np.ndarray, line_thickness: int, color: ND_Color) -> None:
 
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
+        #
+        if not self.display.initialized:
+            return
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        #
+        self.geometry_batch.add_thick_lines(lines, line_thickness, color.to_float_tuple())
 
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 2 * vertices.itemsize, None)
-        gl.glEnableVertexAttribArray(0)
+    #
+    def flush_batches(self) -> None:
+        """
+        Send the accumulated batched geometry and sprites to the GPU.
+        Has to be called before any other OpenGL state change (scissor, shader) and before swapping buffers.
+        """
+        #
+        if not self.display.initialized:
+            return
+        #
+        self.geometry_batch.flush()
+        self.sprite_batch.flush()
 
-        gl.glDrawArrays(gl.GL_POINTS, 0, 1)
+    #
+    def _render_lines(self, points: list[ ND_Point ], color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        self.geometry_batch.add_line_strip(
+            [(p.x, p.y) for p in points],
+            color.to_float_tuple()
+        )
 
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
+    #
+    def _render_uniform_colored_triangles(self, triangles: list[ tuple[ ND_Point, ND_Point, ND_Point ] ], color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        self.geometry_batch.add_triangles(
+            [(p.x, p.y) for triangle in triangles for p in triangle],
+            color.to_float_tuple()
+        )
 
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+    #
+    def _render_point(self, point: ND_Point, color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            print("Display not initialized.")
+            return
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        self.geometry_batch.add_points(
+            [(point.x, point.y)],
+            color.to_float_tuple()
+        )
 
     #
     def draw_text(self, txt: str, x: int, y: int, font_size: int, font_color: ND_Color, font_name: Optional[str] = None) -> None:
@@ -845,6 +932,9 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         #
         self._ensure_context()
 
+        # The font shader is going to be bound, send the pending geometry and sprites first
+        self.flush_batches()
+
         # No texture cache, calcul it each time
 
         font_renderer.render_text(txt, x, y, font_size, font_color)
@@ -1148,6 +1238,9 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         self._ensure_shaderProgram_base()
         self._ensure_context()
 
+        # The pending geometry and sprites were drawn with the previous clip area
+        self.flush_batches()
+
         # Convert to OpenGL coordinate system (bottom-left origin)
         gl.glEnable(gl.GL_SCISSOR_TEST)
         gl.glScissor(x, self.height - (y + h), w, h)
@@ -1163,6 +1256,9 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         self._ensure_shaderProgram_base()
         self._ensure_context()
 
+        # The pending geometry and sprites were drawn with the previous clip area
+        self.flush_batches()
+
         gl.glDisable(gl.GL_SCISSOR_TEST)
 
     #
@@ -1171,7 +1267,9 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         Enable constraints and push to stack.
         """
         self.push_to_clip_rect_stack(x, y, width, height)
-        self.apply_area_drawing_constraint(x, y, width, height)
+        # The top of the stack is the intersection with the parent clip areas
+        clip_rect: ND_Rect = self.clip_rect_stack[-1]
+        self.apply_area_drawing_constraint(clip_rect.x, clip_rect.y, clip_rect.w, clip_rect.h)
 
     #
     def disable_area_drawing_constraints(self) -> None:
@@ -1195,6 +1293,10 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         if not self.display.initialized:
             return
 
+        # Nothing changed since the last frame in retained mode, the previous frame is still displayed
+        if self.pop_redraw_area() is None:
+            return
+
         #
         glfw.make_context_current(self.glw_window)
         gl.glViewport(0, 0, self.width, self.height)
@@ -1217,6 +1319,9 @@ class ND_Window_GLFW_OPENGL(ND_Window_GLFW):
         for scene in self.scenes.values():
             scene.render()
 
+        # Send the remaining batched geometry and sprites of this frame
+        self.flush_batches()
+
         #
         glfw.swap_buffers(self.glw_window)
 
@@ -0,0 +1,1435 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Headless backend for lib_nadisplay: the windows are in-memory RGBA NumPy framebuffers (no display server is needed).
+
+It is made for the benchmarks and the rendering tests on machines without screen:
+    - the frame rate is not capped (or time can be simulated with a virtual clock, for deterministic animations),
+    - the events are scripted (injected by the test code, at a given frame),
+    - the frames can be captured to NumPy arrays or PNG files,
+    - the app can stop itself after a given number of frames,
+    - ND_MainApp.run() runs the mainloop queues in worker threads (the events and the display stay in the main thread),
+      except with the virtual clock, where everything runs in the main thread so the frames are reproducible.
+
+The fonts, images and PNG files are handled with Pillow.
+
+"""
+
+
+from typing import Optional, Any, Callable, cast, Type
+from threading import Lock, current_thread, main_thread
+from collections import OrderedDict
+
+import os
+import math
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from lib_nadisplay_colors import ND_Color
+from lib_nadisplay_transformation import ND_Transformation
+from lib_nadisplay_rects import ND_Rect, ND_Point
+from lib_nadisplay_core import ND_MainApp, ND_Display, ND_EventsManager, ND_Window, ND_Scene
+import lib_nadisplay_events as nd_event
+
+
+#
+def color_to_array(color: ND_Color) -> np.ndarray:
+    return np.array([color.r, color.g, color.b, color.a], dtype=np.uint8)
+
+
+#
+def blend_pixels(dst: np.ndarray, src: np.ndarray) -> np.ndarray:
+    # Source over, for (N, 4) pixels (src can be a single color)
+    src_f: np.ndarray = src.astype(np.float32)
+    alpha: np.ndarray = src_f[..., 3:4] / 255.0
+    #
+    out: np.ndarray = dst.astype(np.float32) * (1.0 - alpha)
+    out[..., :3] += src_f[..., :3] * alpha
+    out[..., 3:4] += 255.0 * alpha
+    #
+    return np.clip(np.rint(out), 0, 255).astype(np.uint8)
+
+
+#
+def blend_into(dst: np.ndarray, src: np.ndarray, mask: Optional[np.ndarray] = None) -> None:
+    """
+    Alpha blending (source over) of src (RGBA, same shape as dst or a single color) into dst, only where mask is True if given.
+    The opaque pixels are copied and the transparent ones skipped, only the other ones are blended.
+    """
+    #
+    if src.ndim == 1:
+        #
+        if src[3] == 0:
+            return
+        #
+        if mask is None:
+            dst[...] = src if src[3] == 255 else blend_pixels(dst, src)
+        elif src[3] == 255:
+            dst[mask] = src
+        else:
+            dst[mask] = blend_pixels(dst[mask], src)
+        #
+        return
+
+    #
+    alpha: np.ndarray = src[..., 3]
+    opaque: np.ndarray = alpha == 255
+    partial: np.ndarray = (alpha > 0) & ~opaque
+    #
+    if mask is not None:
+        opaque &= mask
+        partial &= mask
+    #
+    dst[opaque] = src[opaque]
+    #
+    if partial.any():
+        dst[partial] = blend_pixels(dst[partial], src[partial])
+
+
+#
+def scale_nearest(img: np.ndarray, w: int, h: int) -> np.ndarray:
+    #
+    src_h: int = img.shape[0]
+    src_w: int = img.shape[1]
+    #
+    if (src_w, src_h) == (w, h):
+        return img
+    #
+    rows: np.ndarray = (np.arange(h) * src_h) // h
+    cols: np.ndarray = (np.arange(w) * src_w) // w
+    #
+    return img[rows[:, None], cols[None, :]]
+
+
+#
+class ND_Display_Headless(ND_Display):
+
+    #
+    def __init__(self, main_app: ND_MainApp, WindowClass: Type[ND_Window]) -> None:
+        #
+        super().__init__(main_app=main_app, WindowClass=WindowClass)
+        # The events and the display in the main thread, the mainloop queues in worker threads (see set_virtual_clock)
+        self.main_not_threading: bool = False
+        self.events_thread_in_main_thread: bool = True
+        self.display_thread_in_main_thread: bool = True
+        #
+        self.pil_fonts: dict[str, dict[int, Any]] = {}
+
+        # Number of frames displayed since the beginning of the app
+        self.nb_frames: int = 0
+        # If > 0, the app stops itself (main_app.is_running = False) after this number of frames
+        self.max_frames: int = -1
+        # If False, the app waits between two frames like the other backends
+        self.uncapped_fps: bool = True
+        # If > 0, the time doesn't depend on the real time: each displayed frame lasts exactly this duration (in ms)
+        self.virtual_frame_duration: float = -1
+        self.virtual_time: float = 0.0
+
+    #
+    def set_virtual_clock(self, frame_duration_msec: float) -> None:
+        """
+        Each frame will last exactly frame_duration_msec for the app (animations, physics, ...), whatever the real rendering time.
+        A negative value goes back to the real clock.
+        With the virtual clock, ND_MainApp.run() runs everything in the main thread, so the frames are reproducible.
+        """
+        #
+        self.virtual_frame_duration = frame_duration_msec
+        self.virtual_time = 0.0
+        #
+        self.main_not_threading = frame_duration_msec > 0
+
+
+    #
+    def get_time_msec(self) -> float:
+        #
+        if self.virtual_frame_duration > 0:
+            return self.virtual_time
+        #
+        return time.perf_counter() * 1000.0
+
+
+    #
+    def wait_time_msec(self, delay_in_msec: float) -> None:
+        #
+        if self.virtual_frame_duration > 0:
+            return
+        # Only the frames are uncapped, the worker threads of the mainloop queues still wait
+        if self.uncapped_fps and current_thread() is main_thread():
+            return
+        #
+        time.sleep(delay_in_msec / 1000.0)
+
+
+    #
+    def init_display(self) -> None:
+
+        # Init system fonts
+        self.load_system_fonts()
+
+        #
+        self.initialized = True
+
+
+    #
+    def destroy_display(self) -> None:
+
+        #
+        w: Optional[ND_Window] = None
+        #
+        for w in self.windows.values():
+            #
+            if not w:
+                continue
+            #
+            w.destroy_window()
+
+        #
+        self.initialized = False
+
+
+    #
+    def get_font(self, font: str, font_size: int) -> Optional[Any]:
+        #
+        if not self.initialized:
+            return None
+        #
+        if font not in self.pil_fonts:
+            self.pil_fonts[font] = {}
+        #
+        if font_size < 8:
+            font_size = 8
+        #
+        if font_size not in self.pil_fonts[font]:
+            #
+            font_path: str = self.font_names.get(font, "")
+            #
+            if (font_path.endswith(".ttf") or font_path.endswith(".otf")) and os.path.exists(font_path):
+                self.pil_fonts[font][font_size] = ImageFont.truetype(font_path, size=font_size)
+            # The machines without fonts installed (CI) still get a text rendering
+            else:
+                self.pil_fonts[font][font_size] = ImageFont.load_default(size=font_size)
+        #
+        return self.pil_fonts[font][font_size]
+
+
+    #
+    def get_focused_window_id(self) -> int:
+        # The first window is considered as focused
+        for win_id in self.windows:
+            #
+            if self.windows[win_id] is not None:
+                return win_id
+        #
+        return -1
+
+
+    #
+    def create_window(self, window_params: dict[str, Any], error_if_win_id_not_available: bool = False) -> int:
+        #
+        win_id: int = -1
+        if "window_id" in window_params:
+            win_id = window_params["window_id"]
+        #
+        with self.thread_create_window:
+            #
+            if win_id == -1:
+                win_id = len(self.windows)
+                #
+            elif win_id in self.windows and error_if_win_id_not_available:
+                raise UserWarning(f"Window id {win_id} isn't available!")
+            #
+            while win_id in self.windows:
+                win_id += 1
+            #
+            window_params["window_id"] = win_id
+            #
+            self.windows[win_id] = self.WindowClass(self, **window_params)
+
+        #
+        return win_id
+
+
+    #
+    def destroy_window(self, win_id: int) -> None:
+        #
+        with self.thread_create_window:
+            #
+            if win_id not in self.windows:
+                return
+            #
+            if self.windows[win_id] is not None:
+                #
+                win: ND_Window = cast(ND_Window, self.windows[win_id])
+                #
+                win.destroy_window()
+            #
+            del(self.windows[win_id])
+
+
+    #
+    def update_display(self) -> None:
+        #
+        super().update_display()
+        #
+        self.nb_frames += 1
+        #
+        if self.virtual_frame_duration > 0:
+            self.virtual_time += self.virtual_frame_duration
+        #
+        if self.max_frames > 0 and self.nb_frames >= self.max_frames:
+            self.main_app.is_running = False
+
+
+    #
+    def capture_frame(self, window_id: int) -> np.ndarray:
+        #
+        win: Optional[ND_Window] = self.get_window(window_id)
+        #
+        if not isinstance(win, ND_Window_Headless):
+            raise UserWarning(f"Error: there is no headless window with id {window_id}")
+        #
+        return win.get_frame_array()
+
+
+#
+class ND_Window_Headless(ND_Window):
+    #
+    def __init__(
+            self,
+            display: ND_Display,
+            window_id: int,
+            size: tuple[int, int] | str | None,
+            title: str = "Headless App",
+            fullscreen: bool = False,
+            init_state: Optional[str] = None
+        ):
+
+        #
+        super().__init__(display=display, window_id=window_id, init_state=init_state)
+
+        # There is no screen, the "max" sizes are the ones of a 1920x1080 screen
+        if isinstance(size, str):
+            #
+            if size == "max":
+                self.width, self.height = 1920, 1080
+            elif size == "max/1.5":
+                self.width, self.height = 1280, 720
+        #
+        elif isinstance(size, tuple):
+            #
+            self.width = size[0]
+            self.height = size[1]
+
+        #
+        self.base_width: int = self.width
+        self.base_height: int = self.height
+        #
+        self.title: str = title
+        self.clear_color: ND_Color = ND_Color(0, 0, 0)
+
+        #
+        self.mutex_display: Lock = Lock()
+
+        # The window itself, (height, width, RGBA)
+        self.framebuffer: np.ndarray = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        # Current render target, the framebuffer or a render target texture (see begin_render_to_texture)
+        self.screen: np.ndarray = self.framebuffer
+        self.previous_screens: list[np.ndarray] = []
+
+        #
+        self.x = 0
+        self.y = 0
+        self.rect = ND_Rect(self.x, self.y, self.width, self.height)
+
+        # sdl_or_glfw_window_id is int and has been initialized to -1 in parent class
+        self.sdl_or_glfw_window_id = self.window_id
+
+        # The framebuffer keeps its content between two frames
+        self.supports_partial_redraw = True
+
+        #
+        self.next_texture_id: int = 0
+        #
+        self.textures: dict[int, np.ndarray] = {}
+        self.mutex_textures: Lock = Lock()
+        #
+        # Rendered texts cache : (text, font name, font size, color) -> texture id, least recently used first
+        self.prepared_font_textures: OrderedDict[tuple[str, str, int, tuple[int, int, int, int]], int] = OrderedDict()
+        self.prepared_font_textures_max_size: int = 512
+        # (width, height, radius, border thickness) -> (fill mask, border mask) of the rounded rects
+        self.rounded_rect_masks: dict[tuple[int, int, int, int], tuple[np.ndarray, np.ndarray]] = {}
+
+
+    #
+    def destroy_window(self) -> None:
+        #
+        with self.mutex_display:
+            #
+            self.display.main_app.delete_mainloop_fns_queue(f"window_{self.window_id}")
+            #
+            for texture_id in list(self.textures.keys()):
+                #
+                self.destroy_prepared_texture(texture_id)
+
+
+    #
+    def get_frame_array(self) -> np.ndarray:
+        """
+        Copy of the last displayed frame, (height, width, RGBA) uint8 array.
+        """
+        #
+        with self.mutex_display:
+            return self.framebuffer.copy()
+
+
+    #
+    def save_frame_png(self, path: str) -> None:
+        #
+        Image.fromarray(self.get_frame_array(), mode="RGBA").save(path, format="PNG")
+
+
+    #
+    def set_title(self, new_title: str) -> None:
+        #
+        self.title = new_title
+
+
+    #
+    def resize_framebuffer(self, new_width: int, new_height: int) -> None:
+        #
+        with self.mutex_display:
+            #
+            self.width, self.height = new_width, new_height
+            self.rect = ND_Rect(self.x, self.y, self.width, self.height)
+            #
+            is_drawing_on_window: bool = self.screen is self.framebuffer
+            self.framebuffer = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+            #
+            if is_drawing_on_window:
+                self.screen = self.framebuffer
+        #
+        self.mark_all_dirty()
+
+
+    #
+    def set_size(self, new_width: int, new_height: int) -> None:
+        #
+        self.base_width, self.base_height = new_width, new_height
+        self.resize_framebuffer(new_width, new_height)
+        self.update_scene_sizes()
+
+
+    #
+    def update_size(self, new_w: int, new_h: int) -> None:
+        #
+        self.base_width, self.base_height = new_w, new_h
+        self.resize_framebuffer(new_w, new_h)
+        self.update_scene_sizes()
+
+
+    #
+    def set_fullscreen(self, mode: int) -> None:
+        # Fullscreen modes are the size of a 1920x1080 screen
+        if mode in [1, 2]:
+            self.resize_framebuffer(1920, 1080)
+        else:
+            self.resize_framebuffer(self.base_width, self.base_height)
+        #
+        self.update_scene_sizes()
+
+
+    #
+    def get_clip_bounds(self) -> tuple[int, int, int, int]:
+        """
+        Area (x0, y0, x1, y1) of the current render target that can be drawn on: its size intersected with the clip rect.
+        """
+        #
+        x0: int = 0
+        y0: int = 0
+        x1: int = self.screen.shape[1]
+        y1: int = self.screen.shape[0]
+        #
+        clip_rect: Optional[ND_Rect] = self.get_top_of_clip_rect_stack()
+        #
+        if clip_rect is not None:
+            x0, y0 = max(x0, clip_rect.x), max(y0, clip_rect.y)
+            x1, y1 = min(x1, clip_rect.x + clip_rect.w), min(y1, clip_rect.y + clip_rect.h)
+        #
+        return x0, y0, x1, y1
+
+
+    #
+    def draw_array(self, x: int, y: int, src: np.ndarray, mask: Optional[np.ndarray] = None) -> None:
+        """
+        Blend an RGBA array (or a single color, with a mask giving the size) at the position (x, y) of the current render target.
+        """
+        #
+        h: int = mask.shape[0] if mask is not None else src.shape[0]
+        w: int = mask.shape[1] if mask is not None else src.shape[1]
+        #
+        cx0, cy0, cx1, cy1 = self.get_clip_bounds()
+        x0: int = max(x, cx0)
+        y0: int = max(y, cy0)
+        x1: int = min(x + w, cx1)
+        y1: int = min(y + h, cy1)
+        #
+        if x0 >= x1 or y0 >= y1:
+            return
+        #
+        sub_mask: Optional[np.ndarray] = mask[y0 - y: y1 - y, x0 - x: x1 - x] if mask is not None else None
+        sub_src: np.ndarray = src if src.ndim == 1 else src[y0 - y: y1 - y, x0 - x: x1 - x]
+        #
+        blend_into(self.screen[y0: y1, x0: x1], sub_src, sub_mask)
+
+
+    #
+    def draw_mask(self, x: int, y: int, mask: np.ndarray, color: ND_Color) -> None:
+        #
+        self.draw_array(x, y, color_to_array(color), mask)
+
+
+    #
+    def get_grid(self, x0: int, y0: int, w: int, h: int) -> tuple[np.ndarray, np.ndarray]:
+        # Coordinates of the centers of the pixels of an area
+        yy, xx = np.mgrid[y0: y0 + h, x0: x0 + w]
+        #
+        return xx.astype(np.float32) + 0.5, yy.astype(np.float32) + 0.5
+
+
+    #
+    def add_texture(self, img: np.ndarray) -> int:
+        #
+        texture_id: int = -1
+        with self.mutex_textures:
+            #
+            texture_id = self.next_texture_id
+            self.next_texture_id += 1
+            #
+            self.textures[texture_id] = img
+        #
+        return texture_id
+
+
+    #
+    def apply_transformations(self, img: np.ndarray, transformations: ND_Transformation) -> np.ndarray:
+        #
+        if transformations.flip_x:
+            img = img[:, ::-1]
+        if transformations.flip_y:
+            img = img[::-1, :]
+        #
+        if transformations.rotation is not None and transformations.rotation != 0:
+            # Clockwise, around the center, like the other backends
+            img = np.asarray(Image.fromarray(np.ascontiguousarray(img), mode="RGBA").rotate(-transformations.rotation, resample=Image.Resampling.NEAREST))
+        #
+        if transformations.color_modulation is not None:
+            #
+            cm: ND_Color = transformations.color_modulation
+            img = (img.astype(np.float32) * (np.array([cm.r, cm.g, cm.b, cm.a], dtype=np.float32) / 255.0)).astype(np.uint8)
+        #
+        return img
+
+
+    #
+    def blit_texture(self, texture: Any, dst_rect: ND_Rect) -> None:
+
+        #
+        if not isinstance(texture, np.ndarray):
+            #
+            return
+
+        #
+        if not self.display.initialized:
+            return
+
+        # Resize texture if needed
+        resize_w: int = dst_rect.w if dst_rect.w > 0 else texture.shape[1]
+        resize_h: int = dst_rect.h if dst_rect.h > 0 else texture.shape[0]
+
+        #
+        self.draw_array(dst_rect.x, dst_rect.y, scale_nearest(texture, resize_w, resize_h))
+
+
+    #
+    def prepare_text_to_render(self, text: str, color: ND_Color, font_size: int, font_name: Optional[str] = None) -> int:
+
+        #
+        if not self.display.initialized:
+            return -1
+
+        #
+        if font_name is None:
+            font_name = self.display.default_font
+
+        # Get font
+        font: Optional[Any] = self.display.get_font(font_name, font_size)
+
+        # Do nothing if not font got
+        if font is None:
+            return -1
+
+        #
+        size: ND_Point = self.get_text_size_with_font(text, font_size, font_name)
+        #
+        img: Image.Image = Image.new("RGBA", (max(1, size.x), max(1, size.y)), (0, 0, 0, 0))
+        ImageDraw.Draw(img).text((0, 0), text, font=font, fill=(color.r, color.g, color.b, color.a))
+
+        #
+        return self.add_texture(np.asarray(img, dtype=np.uint8))
+
+
+    #
+    def prepare_image_to_render(self, img_path: str) -> int:
+
+        #
+        if not self.display.initialized:
+            return -1
+
+        #
+        try:
+            img: Image.Image = Image.open(img_path).convert("RGBA")
+        #
+        except OSError:
+            print(f"Failed to load image: {img_path}")
+            return -1
+
+        #
+        return self.add_texture(np.asarray(img, dtype=np.uint8))
+
+
+    #
+    def render_prepared_texture(self, texture_id: int, x: int, y: int, width: int = -1, height: int = -1, transformations: ND_Transformation = ND_Transformation()) -> None:
+
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if texture_id not in self.textures:
+            return
+
+        #
+        self.blit_texture(self.apply_transformations(self.textures[texture_id], transformations), ND_Rect(x, y, width, height))
+
+
+    #
+    def render_part_of_prepared_texture(self, texture_id: int, x: int, y: int, w: int, h: int, src_x: int, src_y: int, src_w: int, src_h: int, transformations: ND_Transformation = ND_Transformation()) -> None:
+
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if texture_id not in self.textures:
+            return
+
+        #
+        texture: np.ndarray = self.textures[texture_id]
+        part: np.ndarray = texture[max(0, src_y): min(texture.shape[0], src_y + src_h), max(0, src_x): min(texture.shape[1], src_x + src_w)]
+        #
+        if part.shape[0] <= 0 or part.shape[1] <= 0:
+            return
+
+        #
+        self.blit_texture(self.apply_transformations(part, transformations), ND_Rect(x, y, w, h))
+
+
+    #
+    def create_render_target_texture(self, width: int, height: int) -> int:
+        #
+        if not self.display.initialized:
+            return -1
+
+        #
+        return self.add_texture(np.zeros((height, width, 4), dtype=np.uint8))
+
+
+    #
+    def begin_render_to_texture(self, texture_id: int) -> bool:
+        #
+        if not self.display.initialized or texture_id not in self.textures:
+            return False
+
+        #
+        target: np.ndarray = self.textures[texture_id]
+        target[...] = 0
+
+        # All the drawing functions draw on self.screen
+        self.previous_screens.append(self.screen)
+        self.screen = target
+        #
+        self.render_targets_stack.append(texture_id)
+        self.save_and_clear_clip_rect_stack()
+        #
+        return True
+
+
+    #
+    def end_render_to_texture(self) -> None:
+        #
+        if not self.render_targets_stack:
+            return
+
+        #
+        self.render_targets_stack.pop(-1)
+        self.screen = self.previous_screens.pop(-1)
+        #
+        self.restore_clip_rect_stack()
+
+
+    #
+    def get_prepared_texture_size(self, texture_id: int) -> ND_Point:
+        #
+        if texture_id not in self.textures:
+            return ND_Point(0, 0)
+        #
+        return ND_Point(self.textures[texture_id].shape[1], self.textures[texture_id].shape[0])
+
+
+    #
+    def destroy_prepared_texture(self, texture_id: int) -> None:
+        with self.mutex_textures:
+            if texture_id in self.textures:
+                del self.textures[texture_id]
+
+
+    #
+    def draw_text(self, txt: str, x: int, y: int, font_size: int, font_color: ND_Color, font_name: Optional[str] = None) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if font_name is None:
+            font_name = self.display.default_font
+        #
+        tid: tuple[str, str, int, tuple[int, int, int, int]] = (txt, font_name, font_size, (font_color.r, font_color.g, font_color.b, font_color.a))
+        #
+        texture_id: int = self.prepared_font_textures.get(tid, -1)
+        #
+        if texture_id >= 0:
+            #
+            self.prepared_font_textures.move_to_end(tid)
+        #
+        else:
+            #
+            texture_id = self.prepare_text_to_render(text=txt, color=font_color, font_name=font_name, font_size=font_size)
+            #
+            if texture_id < 0:
+                return
+            #
+            self.prepared_font_textures[tid] = texture_id
+            # Evict (and destroy) the least recently used texts
+            while len(self.prepared_font_textures) > self.prepared_font_textures_max_size:
+                #
+                _, evicted_texture_id = self.prepared_font_textures.popitem(last=False)
+                self.destroy_prepared_texture(evicted_texture_id)
+
+        #
+        self.render_prepared_texture(texture_id, x, y)
+
+
+    #
+    def get_text_size_with_font(self, txt: str, font_size: int, font_name: Optional[str] = None) -> ND_Point:
+        #
+        if not self.display.initialized:
+            return ND_Point(0, 0)
+
+        #
+        if font_name is None:
+            font_name = self.display.default_font
+        #
+        if not txt:
+            return ND_Point(0, 0)
+
+        #
+        font: Optional[Any] = self.display.get_font(font_name, font_size)
+        #
+        if font is None:
+            return ND_Point(-1, -1)
+
+        # The height doesn't depend on the characters, so the texts are aligned
+        ascent, descent = font.getmetrics()
+        #
+        return ND_Point(int(math.ceil(font.getlength(txt))), ascent + descent)
+
+
+    #
+    def get_count_of_renderable_chars_fitting_given_width(self, txt: str, given_width: int, font_size: int, font_name: Optional[str] = None) -> tuple[int, int]:
+        #
+        if not self.display.initialized:
+            return 0, 0
+
+        #
+        if font_name is None:
+            font_name = self.display.default_font
+        #
+        if not txt:
+            return 0, 0
+
+        #
+        font: Optional[Any] = self.display.get_font(font_name, font_size)
+        #
+        if font is None:
+            return -1, -1
+
+        # (width of the fitting text, number of fitting chars), like TTF_MeasureUTF8
+        extent: int = 0
+        #
+        i: int
+        for i in range(1, len(txt) + 1):
+            #
+            width: int = int(math.ceil(font.getlength(txt[:i])))
+            #
+            if width > given_width:
+                return extent, i - 1
+            #
+            extent = width
+        #
+        return extent, len(txt)
+
+
+    #
+    def draw_pixel(self, x: int, y: int, color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        self.draw_mask(x, y, np.ones((1, 1), dtype=bool), color)
+
+
+    #
+    def draw_hline(self, x1: int, x2: int, y: int, color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        self.draw_filled_rect(min(x1, x2), y, abs(x2 - x1) + 1, 1, color)
+
+
+    #
+    def draw_vline(self, x: int, y1: int, y2: int, color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        self.draw_filled_rect(x, min(y1, y2), 1, abs(y2 - y1) + 1, color)
+
+
+    #
+    def draw_line(self, x1: int, x2: int, y1: int, y2: int, color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        # One pixel per step along the longest axis
+        n: int = max(abs(x2 - x1), abs(y2 - y1)) + 1
+        xs: np.ndarray = np.rint(np.linspace(x1, x2, n)).astype(np.int64)
+        ys: np.ndarray = np.rint(np.linspace(y1, y2, n)).astype(np.int64)
+        #
+        x0: int = int(xs.min())
+        y0: int = int(ys.min())
+        mask: np.ndarray = np.zeros((int(ys.max()) - y0 + 1, int(xs.max()) - x0 + 1), dtype=bool)
+        mask[ys - y0, xs - x0] = True
+        #
+        self.draw_mask(x0, y0, mask, color)
+
+
+    #
+    def draw_thick_line(self, x1: int, x2: int, y1: int, y2: int, line_thickness: int, color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if line_thickness <= 1:
+            self.draw_line(x1, x2, y1, y2, color)
+            return
+
+        # Pixels at a distance of the segment lower than half the thickness
+        r: float = line_thickness / 2.0
+        x0: int = int(math.floor(min(x1, x2) - r))
+        y0: int = int(math.floor(min(y1, y2) - r))
+        w: int = int(math.ceil(max(x1, x2) + r)) - x0 + 1
+        h: int = int(math.ceil(max(y1, y2) + r)) - y0 + 1
+        #
+        xx, yy = self.get_grid(x0, y0, w, h)
+        dx: float = x2 - x1
+        dy: float = y2 - y1
+        length2: float = dx * dx + dy * dy
+        #
+        t: np.ndarray = np.clip(((xx - x1) * dx + (yy - y1) * dy) / length2, 0.0, 1.0) if length2 > 0 else np.zeros_like(xx)
+        dist2: np.ndarray = (xx - (x1 + t * dx)) ** 2 + (yy - (y1 + t * dy)) ** 2
+        #
+        self.draw_mask(x0, y0, dist2 <= r * r, color)
+
+
+    #
+    def get_rounded_rect_mask(self, width: int, height: int, radius: int) -> np.ndarray:
+        #
+        mask: np.ndarray = np.ones((height, width), dtype=bool)
+        radius = max(0, min(radius, width // 2, height // 2))
+        #
+        if radius == 0:
+            return mask
+        # Only the corners are not full: quarter of disk of the top left corner, mirrored for the other ones
+        xx, yy = self.get_grid(0, 0, radius, radius)
+        corner: np.ndarray = (xx - radius) ** 2 + (yy - radius) ** 2 <= radius * radius
+        #
+        mask[:radius, :radius] = corner
+        mask[:radius, width - radius:] = corner[:, ::-1]
+        mask[height - radius:, :radius] = corner[::-1, :]
+        mask[height - radius:, width - radius:] = corner[::-1, ::-1]
+        #
+        return mask
+
+
+    #
+    def draw_rounded_rect(self, x: int, y: int, width: int, height: int, radius: int, fill_color: ND_Color, border_color: ND_Color, border_thickness: int = 1) -> None:
+
+        #
+        if not self.display.initialized or width <= 0 or height <= 0:
+            return
+
+        #
+        t: int = max(0, border_thickness)
+        # Side of the corners blocks, the rest of the rect is made of straight bands
+        c: int = max(0, min(max(radius, t), width // 2, height // 2))
+        # The masks are only computed on a small rect with the same corners (if the rect is bigger than it in both directions)
+        small: bool = width > 2 * c + 1 and height > 2 * c + 1
+        sw: int = 2 * c + 1 if small else width
+        sh: int = 2 * c + 1 if small else height
+        #
+        # The elements of the same style share the same masks
+        key: tuple[int, int, int, int] = (sw, sh, radius, t)
+        #
+        if key not in self.rounded_rect_masks:
+            #
+            outer: np.ndarray = self.get_rounded_rect_mask(sw, sh, radius)
+            inner_mask: np.ndarray = np.zeros_like(outer)
+            #
+            if sw > 2 * t and sh > 2 * t:
+                inner_mask[t: sh - t, t: sw - t] = self.get_rounded_rect_mask(sw - 2 * t, sh - 2 * t, max(0, radius - t))
+            #
+            if len(self.rounded_rect_masks) >= 256:
+                self.rounded_rect_masks.clear()
+            #
+            self.rounded_rect_masks[key] = (inner_mask, outer & ~inner_mask)
+        #
+        inner: np.ndarray
+        border: np.ndarray
+        inner, border = self.rounded_rect_masks[key]
+        #
+        if not small:
+            self.draw_mask(x, y, inner, fill_color)
+            self.draw_mask(x, y, border, border_color)
+            return
+
+        # Corners
+        bx: int
+        by: int
+        sx: int
+        sy: int
+        for bx, by, sx, sy in [(0, 0, 0, 0), (width - c, 0, sw - c, 0), (0, height - c, 0, sh - c), (width - c, height - c, sw - c, sh - c)]:
+            self.draw_mask(x + bx, y + by, inner[sy: sy + c, sx: sx + c], fill_color)
+            self.draw_mask(x + bx, y + by, border[sy: sy + c, sx: sx + c], border_color)
+
+        # Straight bands: border on the t first pixels from the edges, then fill
+        tb: int = min(t, c)
+        mw: int = width - 2 * c
+        mh: int = height - 2 * c
+        #
+        self.draw_filled_rect(x + c, y, mw, tb, border_color)
+        self.draw_filled_rect(x + c, y + height - tb, mw, tb, border_color)
+        self.draw_filled_rect(x, y + c, tb, mh, border_color)
+        self.draw_filled_rect(x + width - tb, y + c, tb, mh, border_color)
+        #
+        self.draw_filled_rect(x + c, y + tb, mw, c - tb, fill_color)
+        self.draw_filled_rect(x + c, y + height - c, mw, c - tb, fill_color)
+        self.draw_filled_rect(x + tb, y + c, c - tb, mh, fill_color)
+        self.draw_filled_rect(x + width - c, y + c, c - tb, mh, fill_color)
+        self.draw_filled_rect(x + c, y + c, mw, mh, fill_color)
+
+
+    #
+    def draw_unfilled_rect(self, x: int, y: int, width: int, height: int, outline_color: ND_Color, border_thickness: int = 1) -> None:
+        #
+        if not self.display.initialized or width <= 0 or height <= 0:
+            return
+
+        #
+        t: int = max(1, border_thickness)
+        mask: np.ndarray = np.ones((height, width), dtype=bool)
+        mask[t: height - t, t: width - t] = False
+        #
+        self.draw_mask(x, y, mask, outline_color)
+
+
+    #
+    def draw_filled_rect(self, x: int, y: int, width: int, height: int, fill_color: ND_Color) -> None:
+        #
+        if not self.display.initialized or width <= 0 or height <= 0:
+            return
+
+        #
+        cx0, cy0, cx1, cy1 = self.get_clip_bounds()
+        x0: int = max(x, cx0)
+        y0: int = max(y, cy0)
+        x1: int = min(x + width, cx1)
+        y1: int = min(y + height, cy1)
+        #
+        if x0 >= x1 or y0 >= y1:
+            return
+        #
+        if fill_color.a == 255:
+            self.screen[y0: y1, x0: x1] = color_to_array(fill_color)
+        else:
+            blend_into(self.screen[y0: y1, x0: x1], color_to_array(fill_color))
+
+
+    #
+    def get_ellipse_mask(self, x: int, y: int, rx: float, ry: float, border_thickness: int = -1) -> tuple[int, int, np.ndarray]:
+        # Filled if border_thickness <= 0
+        x0: int = int(math.floor(x - rx))
+        y0: int = int(math.floor(y - ry))
+        w: int = int(math.ceil(x + rx)) - x0 + 1
+        h: int = int(math.ceil(y + ry)) - y0 + 1
+        #
+        xx, yy = self.get_grid(x0, y0, w, h)
+        xx -= x + 0.5
+        yy -= y + 0.5
+        #
+        mask: np.ndarray = (xx / max(rx, 0.5)) ** 2 + (yy / max(ry, 0.5)) ** 2 <= 1.0
+        #
+        if border_thickness > 0 and rx > border_thickness and ry > border_thickness:
+            mask &= (xx / (rx - border_thickness)) ** 2 + (yy / (ry - border_thickness)) ** 2 > 1.0
+        #
+        return x0, y0, mask
+
+
+    #
+    def draw_unfilled_circle(self, x: int, y: int, radius: int, outline_color: ND_Color, border_thickness: int = 1) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        x0, y0, mask = self.get_ellipse_mask(x, y, radius, radius, max(1, border_thickness))
+        self.draw_mask(x0, y0, mask, outline_color)
+
+
+    #
+    def draw_filled_circle(self, x: int, y: int, radius: int, fill_color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        x0, y0, mask = self.get_ellipse_mask(x, y, radius, radius)
+        self.draw_mask(x0, y0, mask, fill_color)
+
+
+    #
+    def draw_unfilled_ellipse(self, x: int, y: int, rx: int, ry: int, outline_color: ND_Color, border_thickness: int = 1) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        x0, y0, mask = self.get_ellipse_mask(x, y, rx, ry, max(1, border_thickness))
+        self.draw_mask(x0, y0, mask, outline_color)
+
+
+    #
+    def draw_filled_ellipse(self, x: int, y: int, rx: int, ry: int, fill_color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        x0, y0, mask = self.get_ellipse_mask(x, y, rx, ry)
+        self.draw_mask(x0, y0, mask, fill_color)
+
+
+    #
+    def get_angle_mask(self, x: int, y: int, x0: int, y0: int, shape: tuple[int, ...], angle_start: float, angle_end: float) -> np.ndarray:
+        # Angles in degrees, clockwise from the x axis (the y axis goes down), like SDL_gfx
+        xx, yy = self.get_grid(x0, y0, shape[1], shape[0])
+        angles: np.ndarray = np.degrees(np.arctan2(yy - (y + 0.5), xx - (x + 0.5))) % 360.0
+        #
+        start: float = angle_start % 360.0
+        end: float = angle_end % 360.0
+        #
+        if start <= end:
+            return (angles >= start) & (angles <= end)
+        #
+        return (angles >= start) | (angles <= end)
+
+
+    #
+    def draw_arc(self, x: int, y: int, radius: float, angle_start: float, angle_end: float, color: ND_Color, line_thickness: int = 1) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        x0, y0, mask = self.get_ellipse_mask(x, y, radius, radius, max(1, line_thickness))
+        self.draw_mask(x0, y0, mask & self.get_angle_mask(x, y, x0, y0, mask.shape, angle_start, angle_end), color)
+
+
+    #
+    def draw_unfilled_pie(self, x: int, y: int, radius: float, angle_start: float, angle_end: float, outline_color: ND_Color, line_thickness: int = 1) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        self.draw_arc(x, y, radius, angle_start, angle_end, outline_color, line_thickness)
+        #
+        angle: float
+        for angle in [angle_start, angle_end]:
+            #
+            x2: int = int(round(x + radius * math.cos(math.radians(angle))))
+            y2: int = int(round(y + radius * math.sin(math.radians(angle))))
+            self.draw_thick_line(x, x2, y, y2, line_thickness, outline_color)
+
+
+    #
+    def draw_filled_pie(self, x: int, y: int, radius: float, angle_start: float, angle_end: float, fill_color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        x0, y0, mask = self.get_ellipse_mask(x, y, radius, radius)
+        self.draw_mask(x0, y0, mask & self.get_angle_mask(x, y, x0, y0, mask.shape, angle_start, angle_end), fill_color)
+
+
+    #
+    def draw_unfilled_triangle(self, x1: int, y1: int, x2: int, y2: int, x3: int, y3: int, outline_color: ND_Color, border_thickness: int = 1) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        self.draw_unfilled_polygon([x1, x2, x3], [y1, y2, y3], outline_color, border_thickness)
+
+
+    #
+    def draw_filled_triangle(self, x1: int, y1: int, x2: int, y2: int, x3: int, y3: int, fill_color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        self.draw_filled_polygon([x1, x2, x3], [y1, y2, y3], fill_color)
+
+
+    #
+    def get_polygon_mask(self, x_coords: list[int], y_coords: list[int]) -> tuple[int, int, np.ndarray]:
+        # Even-odd rule, tested at the center of each pixel of the bounding box
+        x0: int = min(x_coords)
+        y0: int = min(y_coords)
+        #
+        xx, yy = self.get_grid(x0, y0, max(x_coords) - x0 + 1, max(y_coords) - y0 + 1)
+        mask: np.ndarray = np.zeros(xx.shape, dtype=bool)
+        #
+        n: int = len(x_coords)
+        #
+        i: int
+        for i in range(n):
+            #
+            xa, ya = x_coords[i], y_coords[i]
+            xb, yb = x_coords[(i + 1) % n], y_coords[(i + 1) % n]
+            #
+            if ya == yb:
+                continue
+            #
+            crosses: np.ndarray = (ya <= yy) != (yb <= yy)
+            mask ^= crosses & (xx < xa + (yy - ya) * (xb - xa) / (yb - ya))
+        #
+        return x0, y0, mask
+
+
+    #
+    def draw_unfilled_polygon(self, x_coords: list[int], y_coords: list[int], outline_color: ND_Color, border_thickness: int = 1) -> None:
+
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if len(x_coords) != len(y_coords) or len(x_coords) < 3:
+            return
+
+        #
+        n: int = len(x_coords)
+
+        #
+        i: int
+        for i in range(n):
+            self.draw_thick_line(x_coords[i], x_coords[(i + 1) % n], y_coords[i], y_coords[(i + 1) % n], border_thickness, outline_color)
+
+
+    #
+    def draw_filled_polygon(self, x_coords: list[int], y_coords: list[int], fill_color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if len(x_coords) != len(y_coords) or len(x_coords) < 3:
+            return
+
+        #
+        x0, y0, mask = self.get_polygon_mask(x_coords, y_coords)
+        self.draw_mask(x0, y0, mask, fill_color)
+
+
+    #
+    def draw_textured_polygon(self, x_coords: list[int], y_coords: list[int], texture_id: int, texture_dx: int = 0, texture_dy: int = 0) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if texture_id not in self.textures or len(x_coords) != len(y_coords) or len(x_coords) < 3:
+            return
+
+        # The texture is repeated over the polygon, from the offset (texture_dx, texture_dy)
+        x0, y0, mask = self.get_polygon_mask(x_coords, y_coords)
+        texture: np.ndarray = self.textures[texture_id]
+        #
+        rows: np.ndarray = (np.arange(mask.shape[0]) + texture_dy) % texture.shape[0]
+        cols: np.ndarray = (np.arange(mask.shape[1]) + texture_dx) % texture.shape[1]
+        #
+        self.draw_array(x0, y0, texture[rows[:, None], cols[None, :]], mask)
+
+
+    #
+    def draw_bezier_curve(self, x_coords: list[int], y_coords: list[int], line_color: ND_Color, nb_interpolations: int = 3) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if len(x_coords) != len(y_coords) or len(x_coords) < nb_interpolations:
+            return
+
+        # De Casteljau, nb_interpolations steps per control point
+        ts: np.ndarray = np.linspace(0.0, 1.0, max(2, nb_interpolations * len(x_coords)))
+        pts: np.ndarray = np.repeat(np.array([x_coords, y_coords], dtype=np.float64).T[None, :, :], len(ts), axis=0)
+        #
+        while pts.shape[1] > 1:
+            pts = pts[:, :-1] * (1.0 - ts[:, None, None]) + pts[:, 1:] * ts[:, None, None]
+        #
+        pts_int: list[list[int]] = np.rint(pts[:, 0]).astype(np.int64).tolist()
+        #
+        i: int
+        for i in range(len(pts_int) - 1):
+            self.draw_line(pts_int[i][0], pts_int[i + 1][0], pts_int[i][1], pts_int[i + 1][1], line_color)
+
+
+    #
+    def enable_area_drawing_constraints(self, x: int, y: int, width: int, height: int) -> None:
+        # The drawing functions clip to the top of the stack
+        self.push_to_clip_rect_stack(x, y, width, height)
+
+
+    #
+    def disable_area_drawing_constraints(self) -> None:
+        #
+        self.remove_top_of_clip_rect_stack()
+
+
+    #
+    def update_display(self) -> None:
+
+        #
+        redraw_area: Optional[ND_Rect] = self.pop_redraw_area()
+
+        # Nothing changed since the last frame in retained mode, the previous frame is still in the framebuffer
+        if redraw_area is None:
+            return
+
+        #
+        with self.mutex_display:
+
+            #
+            self.enable_area_drawing_constraints(redraw_area.x, redraw_area.y, redraw_area.w, redraw_area.h)
+
+            #
+            self.draw_filled_rect(redraw_area.x, redraw_area.y, redraw_area.w, redraw_area.h, self.clear_color)
+
+            #
+            if self.state is not None and self.state in self.display_states:
+                #
+                if self.display_states[self.state] is not None:
+                    #
+                    display_fn: Callable[[ND_Window], None] = cast(Callable[[ND_Window], None], self.display_states[self.state])
+                    display_fn(self)
+
+            #
+            scene: ND_Scene
+            for scene in list(self.scenes.values()):
+                scene.render()
+
+            #
+            self.disable_area_drawing_constraints()
+
+
+#
+class ND_EventsManager_Headless(ND_EventsManager):
+    #
+    def __init__(self, main_app: ND_MainApp) -> None:
+        #
+        super().__init__(main_app)
+        # (frame, event): the events are polled at the first frame >= their frame
+        self.scripted_events: list[tuple[int, nd_event.ND_Event]] = []
+        self.mutex_scripted_events: Lock = Lock()
+        #
+        self.mouse_x: int = 0
+        self.mouse_y: int = 0
+
+    #
+    def get_current_frame(self) -> int:
+        #
+        if isinstance(self.main_app.display, ND_Display_Headless):
+            return self.main_app.display.nb_frames
+        #
+        return 0
+
+    #
+    def inject_event(self, event: nd_event.ND_Event, at_frame: int = -1) -> None:
+        """
+        Add an event to poll at the frame at_frame (the current frame if < 0).
+        The events of the same frame are polled in their injection order.
+        """
+        #
+        frame: int = at_frame if at_frame >= 0 else self.get_current_frame()
+        #
+        with self.mutex_scripted_events:
+            #
+            i: int = len(self.scripted_events)
+            while i > 0 and self.scripted_events[i - 1][0] > frame:
+                i -= 1
+            #
+            self.scripted_events.insert(i, (frame, event))
+
+    #
+    def load_script(self, script: list[tuple[int, nd_event.ND_Event]]) -> None:
+        #
+        frame: int
+        event: nd_event.ND_Event
+        for frame, event in script:
+            self.inject_event(event, frame)
+
+    #
+    def key_down(self, key: str, at_frame: int = -1) -> None:
+        self.inject_event(nd_event.ND_EventKeyDown(key=key), at_frame)
+
+    #
+    def key_up(self, key: str, at_frame: int = -1) -> None:
+        self.inject_event(nd_event.ND_EventKeyUp(key=key), at_frame)
+
+    #
+    def press_key(self, key: str, at_frame: int = -1) -> None:
+        # Released at the next frame
+        frame: int = at_frame if at_frame >= 0 else self.get_current_frame()
+        self.key_down(key, frame)
+        self.key_up(key, frame + 1)
+
+    #
+    def mouse_move(self, x: int, y: int, at_frame: int = -1) -> None:
+        # rel_x / rel_y are computed when the event is polled
+        self.inject_event(nd_event.ND_EventMouseMotion(x=x, y=y), at_frame)
+
+    #
+    def mouse_button_down(self, x: int, y: int, button_id: int = 1, at_frame: int = -1) -> None:
+        self.inject_event(nd_event.ND_EventMouseButtonDown(x=x, y=y, button_id=button_id), at_frame)
+
+    #
+    def mouse_button_up(self, x: int, y: int, button_id: int = 1, at_frame: int = -1) -> None:
+        self.inject_event(nd_event.ND_EventMouseButtonUp(x=x, y=y, button_id=button_id), at_frame)
+
+    #
+    def click(self, x: int, y: int, button_id: int = 1, at_frame: int = -1) -> None:
+        # Moves the mouse, then presses the button and releases it at the next frame
+        frame: int = at_frame if at_frame >= 0 else self.get_current_frame()
+        self.mouse_move(x, y, frame)
+        self.mouse_button_down(x, y, button_id, frame)
+        self.mouse_button_up(x, y, button_id, frame + 1)
+
+    #
+    def scroll(self, scroll_x: int, scroll_y: int, at_frame: int = -1) -> None:
+        self.inject_event(nd_event.ND_EventMouseWheelScrolled(scroll_x=scroll_x, scroll_y=scroll_y), at_frame)
+
+    #
+    def resize_window(self, window_id: int, w: int, h: int, at_frame: int = -1) -> None:
+        self.inject_event(nd_event.ND_EventWindowResized(window_id=window_id, w=w, h=h), at_frame)
+
+    #
+    def poll_next_event(self) -> Optional[nd_event.ND_Event]:
+        #
+        if self.main_app.display is None or not self.main_app.display.initialized:
+            return None
+
+        #
+        with self.mutex_scripted_events:
+            #
+            if not self.scripted_events or self.scripted_events[0][0] > self.get_current_frame():
+                return None
+            #
+            event: nd_event.ND_Event = self.scripted_events.pop(0)[1]
+
+        # The state of the keyboard and the mouse follows the polled events
+        if isinstance(event, nd_event.ND_EventKeyDown) and event.key != "":
+            self.keys_pressed.add(event.key)
+        #
+        elif isinstance(event, nd_event.ND_EventKeyUp):
+            self.keys_pressed.discard(event.key)
+        #
+        elif isinstance(event, nd_event.ND_EventMouseMotion):
+            #
+            event.rel_x, event.rel_y = event.x - self.mouse_x, event.y - self.mouse_y
+            self.mouse_x, self.mouse_y = event.x, event.y
+            #
+            if event.rel_x == 0 and event.rel_y == 0:
+                return nd_event.ND_EventEmpty()
+        #
+        elif isinstance(event, nd_event.ND_EventMouseButtonDown):
+            self.mouse_x, self.mouse_y = event.x, event.y
+            self.mouse_buttons_pressed.add(event.button_id)
+        #
+        elif isinstance(event, nd_event.ND_EventMouseButtonUp):
+            self.mouse_x, self.mouse_y = event.x, event.y
+            self.mouse_buttons_pressed.discard(event.button_id)
+        #
+        elif isinstance(event, nd_event.ND_EventMouseWheelScrolled):
+            event.x, event.y = self.mouse_x, self.mouse_y
+
+        #
+        return event
+
+
+    #
+    def get_mouse_position(self) -> ND_Point:
+        #
+        if self.main_app.display is None or not self.main_app.display.initialized:
+            return ND_Point(-1, -1)
+
+        #
+        return ND_Point(self.mouse_x, self.mouse_y)
+
+
+    #
+    def get_global_mouse_position(self) -> ND_Point:
+        # The windows are all at (0, 0)
+        return self.get_mouse_position()
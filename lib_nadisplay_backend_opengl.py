@@ -153,3 +153,52 @@ def compile_shaders(vertex_source: str, fragment_source: str)  -> int:
     #
     return shader_program
 
+
+
+#
+def create_gl_render_target(width: int, height: int) -> tuple[int, int]:
+    """
+    Creates a transparent RGBA texture with a framebuffer object to render into it.
+
+    :param width: Width of the render target in pixels
+    :param height: Height of the render target in pixels
+    :return: (texture, framebuffer) OpenGL ids, (-1, -1) if the framebuffer is not complete
+    """
+
+    #
+    texture: int = gl.glGenTextures(1)  # type: ignore
+    gl.glBindTexture(gl.GL_TEXTURE_2D, texture)  # type: ignore
+    gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, width, height, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)  # type: ignore
+    #
+    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)  # type: ignore
+    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)  # type: ignore
+    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)  # type: ignore
+    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)  # type: ignore
+    gl.glBindTexture(gl.GL_TEXTURE_2D, 0)  # type: ignore
+
+    #
+    framebuffer: int = gl.glGenFramebuffers(1)  # type: ignore
+    gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, framebuffer)  # type: ignore
+    gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_TEXTURE_2D, texture, 0)  # type: ignore
+    #
+    status: int = gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER)  # type: ignore
+    gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)  # type: ignore
+
+    #
+    if status != gl.GL_FRAMEBUFFER_COMPLETE:
+        #
+        print(f"Error: incomplete framebuffer (status {status}) for a render target of size {width}x{height}.")
+        #
+        delete_gl_render_target(texture, framebuffer)
+        #
+        return (-1, -1)
+
+    #
+    return (texture, framebuffer)
+
+
+#
+def delete_gl_render_target(texture: int, framebuffer: int) -> None:
+    #
+    gl.glDeleteFramebuffers(1, [framebuffer])  # type: ignore
+    gl.glDeleteTextures(1, [texture])  # type: ignore
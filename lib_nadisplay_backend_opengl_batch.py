@@ -0,0 +1,388 @@
+# type: ignore
+
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Batched renderers shared by the OpenGL backends of lib_nadisplay.
+
+Instead of creating / deleting a VAO and a VBO for each drawn primitive,
+each window owns its batches, that accumulate vertices in a growable NumPy
+buffer, and stream them to a persistent VBO (orphaned at each upload) in as
+few glDrawArrays calls as possible.
+
+  - ND_GeometryBatch_OPENGL : lines, triangles and points with per-vertex colors.
+  - ND_SpriteBatch_OPENGL   : textured quads, consecutive quads sharing the same texture are drawn together.
+
+The batches are flushed when their primitive / texture changes, and must be
+flushed by the window before any other OpenGL state change (scissor, shader)
+and at the end of each frame.
+
+"""
+
+# Import NumPy for numerical operations
+import numpy as np  # type: ignore
+
+#
+from typing import Any
+
+# Import ctypes for low-level operations
+import ctypes
+
+# Import OpenGL functionalities for rendering
+import OpenGL.GL as gl  # type: ignore
+
+# Import lib_nadisplay functions
+from lib_nadisplay_backend_opengl import create_and_validate_gl_shader_program
+
+
+#
+BASE_PATH: str = "../../../"
+
+# Vertex shader source code for batched geometry rendering
+with open(f"{BASE_PATH}gl_shaders/batch_geometry_rendering_vertex.vert", "r", encoding="utf-8") as f:
+    VERTEX_SHADER_BATCH_GEOMETRY_SRC: str = f.read()
+
+# Fragment shader source code for batched geometry rendering
+with open(f"{BASE_PATH}gl_shaders/batch_geometry_rendering_fragment.frag", "r", encoding="utf-8") as f:
+    FRAGMENT_SHADER_BATCH_GEOMETRY_SRC: str = f.read()
+
+# Vertex shader source code for batched textured quads rendering
+with open(f"{BASE_PATH}gl_shaders/batch_texture_rendering_vertex.vert", "r", encoding="utf-8") as f:
+    VERTEX_SHADER_BATCH_TEXTURES_SRC: str = f.read()
+
+# Fragment shader for rendering with textures
+with open(f"{BASE_PATH}gl_shaders/texture_rendering_fragment.frag", "r", encoding="utf-8") as f:
+    FRAGMENT_SHADER_TEXTURES_SRC: str = f.read()
+
+
+#
+WindowOpenGLClass = Any  # "ND_Window_SDL2_OPENGL" | "ND_Window_SDL3_OPENGL" | "ND_Window_GLFW_OPENGL"
+
+
+#
+class ND_VertexBatch_OPENGL:
+    #
+    def __init__(self, window: WindowOpenGLClass, vertex_shader_src: str, fragment_shader_src: str, attributes_sizes: list[int], initial_capacity: int = 4096) -> None:
+
+        #
+        self.window: WindowOpenGLClass = window  # Reference to the window object, used for its size
+
+        # Compile shaders and create a program (the OpenGL context must be current)
+        self.shader_program: int = create_and_validate_gl_shader_program(vertex_shader_src, fragment_shader_src)
+        if self.shader_program <= 0:
+            raise UserWarning("Failed to create batch shader program.")
+        #
+        self.shader_screen_size: int = gl.glGetUniformLocation(self.shader_program, "screenSize")
+
+        # Number of floats per vertex
+        self.vertex_size: int = sum(attributes_sizes)
+
+        # CPU side vertex buffer, grows when needed
+        self.capacity: int = max(16, initial_capacity)
+        self.vertices: np.ndarray = np.zeros((self.capacity, self.vertex_size), dtype=np.float32)
+        self.nb_vertices: int = 0
+
+        # Statistics
+        self.nb_draw_calls: int = 0
+
+        # GPU side vertex buffer, persistent for the whole life of the window
+        self.vbo_capacity: int = self.vertices.nbytes
+        self.vao: int = gl.glGenVertexArrays(1)
+        self.vbo: int = gl.glGenBuffers(1)
+
+        #
+        gl.glBindVertexArray(self.vao)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, self.vbo_capacity, None, gl.GL_STREAM_DRAW)
+
+        # Fixed attributes layout, set once
+        stride: int = self.vertex_size * self.vertices.itemsize
+        offset: int = 0
+        #
+        location: int
+        attribute_size: int
+        for location, attribute_size in enumerate(attributes_sizes):
+            #
+            gl.glVertexAttribPointer(location, attribute_size, gl.GL_FLOAT, gl.GL_FALSE, stride, ctypes.c_void_p(offset) if offset > 0 else None)
+            gl.glEnableVertexAttribArray(location)
+            #
+            offset += attribute_size * self.vertices.itemsize
+
+        #
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glBindVertexArray(0)
+
+    #
+    def _ensure_capacity(self, nb_new_vertices: int) -> None:
+        #
+        needed: int = self.nb_vertices + nb_new_vertices
+        #
+        if needed <= self.capacity:
+            return
+        #
+        new_capacity: int = self.capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        #
+        new_vertices: np.ndarray = np.zeros((new_capacity, self.vertex_size), dtype=np.float32)
+        new_vertices[:self.nb_vertices] = self.vertices[:self.nb_vertices]
+        #
+        self.vertices = new_vertices
+        self.capacity = new_capacity
+
+    #
+    def _reserve(self, nb_new_vertices: int) -> int:
+        """
+        Reserve space for nb_new_vertices vertices, and returns the index of the first one.
+        """
+        #
+        self._ensure_capacity(nb_new_vertices)
+        #
+        i: int = self.nb_vertices
+        self.nb_vertices += nb_new_vertices
+        #
+        return i
+
+    #
+    def _bind_draw_state(self) -> None:
+        # To override if the batch needs more state (textures, ...)
+        pass
+
+    #
+    def _draw(self, primitive: int) -> None:
+        """
+        Stream all the accumulated vertices to the GPU and draw them in one draw call.
+        """
+        #
+        if self.nb_vertices == 0:
+            return
+
+        #
+        data: np.ndarray = self.vertices[:self.nb_vertices]
+
+        #
+        gl.glUseProgram(self.shader_program)
+        gl.glUniform2f(self.shader_screen_size, float(self.window.width), float(self.window.height))
+        #
+        self._bind_draw_state()
+
+        #
+        gl.glBindVertexArray(self.vao)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
+
+        # Orphan the previous storage so the driver doesn't have to wait for the previous draw
+        if data.nbytes > self.vbo_capacity:
+            self.vbo_capacity = self.vertices.nbytes
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, self.vbo_capacity, None, gl.GL_STREAM_DRAW)
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, 0, data.nbytes, data)
+
+        #
+        gl.glDrawArrays(primitive, 0, self.nb_vertices)
+        self.nb_draw_calls += 1
+
+        #
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glBindVertexArray(0)
+
+        #
+        self.nb_vertices = 0
+
+    #
+    def destroy(self) -> None:
+        #
+        gl.glDeleteBuffers(1, [self.vbo])
+        gl.glDeleteVertexArrays(1, [self.vao])
+        gl.glDeleteProgram(self.shader_program)
+
+
+#
+class ND_GeometryBatch_OPENGL(ND_VertexBatch_OPENGL):
+    #
+    def __init__(self, window: WindowOpenGLClass, initial_capacity: int = 4096) -> None:
+        # Vertex : x, y, r, g, b, a
+        super().__init__(
+            window=window,
+            vertex_shader_src=VERTEX_SHADER_BATCH_GEOMETRY_SRC,
+            fragment_shader_src=FRAGMENT_SHADER_BATCH_GEOMETRY_SRC,
+            attributes_sizes=[2, 4],
+            initial_capacity=initial_capacity
+        )
+
+        # Primitive of the vertices currently in the batch (GL_TRIANGLES, GL_LINES or GL_POINTS)
+        self.current_primitive: int = -1
+
+    #
+    def _push(self, primitive: int, coords: np.ndarray, color: tuple[float, float, float, float]) -> None:
+        #
+        N: int = len(coords)
+        #
+        if N == 0:
+            return
+        # Cannot merge different primitives in the same draw call
+        if primitive != self.current_primitive:
+            self.flush()
+            self.current_primitive = primitive
+        #
+        i: int = self._reserve(N)
+        self.vertices[i:i+N, 0:2] = coords
+        self.vertices[i:i+N, 2:6] = color
+
+    #
+    def add_triangles(self, coords: np.ndarray | list[tuple[float, float]], color: tuple[float, float, float, float]) -> None:
+        """
+        Add triangles to the batch, coords is a (3 * N, 2) list of screen space points.
+        """
+        #
+        self._push(gl.GL_TRIANGLES, np.asarray(coords, dtype=np.float32).reshape(-1, 2), color)
+
+    #
+    def add_line_strip(self, coords: np.ndarray | list[tuple[float, float]], color: tuple[float, float, float, float]) -> None:
+        """
+        Add a connected line (like GL_LINE_STRIP) to the batch, converted to independent segments to be mergeable.
+        """
+        #
+        pts: np.ndarray = np.asarray(coords, dtype=np.float32).reshape(-1, 2)
+        #
+        if len(pts) < 2:
+            return
+        # [p0, p1, p2, p3] -> [p0, p1, p1, p2, p2, p3]
+        self._push(gl.GL_LINES, np.repeat(pts, 2, axis=0)[1:-1], color)
+
+    #
+    def add_points(self, coords: np.ndarray | list[tuple[float, float]], color: tuple[float, float, float, float]) -> None:
+        #
+        self._push(gl.GL_POINTS, np.asarray(coords, dtype=np.float32).reshape(-1, 2), color)
+
+    #
+    def add_thick_lines(self, lines: np.ndarray | list[tuple[float, float, float, float]], line_thickness: float, color: tuple[float, float, float, float]) -> None:
+        """
+        Add N thick segments to the batch, lines is a (N, 4) list of (x1, y1, x2, y2), each one is converted to two triangles.
+        """
+        #
+        segs: np.ndarray = np.asarray(lines, dtype=np.float32).reshape(-1, 4)
+        #
+        if len(segs) == 0:
+            return
+        #
+        p1: np.ndarray = segs[:, 0:2]
+        p2: np.ndarray = segs[:, 2:4]
+        # Normals of the segments, of length line_thickness (like draw_thick_line)
+        d: np.ndarray = p2 - p1
+        length: np.ndarray = np.hypot(d[:, 0], d[:, 1])
+        length[length == 0] = 1
+        n: np.ndarray = np.stack([-d[:, 1], d[:, 0]], axis=1) * (line_thickness / length)[:, None]
+        # Quad a (p1 above), b (p1 below), c (p2 above), e (p2 below) -> triangles (a, b, e) and (a, e, c)
+        a: np.ndarray = p1 + n
+        b: np.ndarray = p1 - n
+        c: np.ndarray = p2 + n
+        e: np.ndarray = p2 - n
+        #
+        self._push(gl.GL_TRIANGLES, np.stack([a, b, e, a, e, c], axis=1).reshape(-1, 2), color)
+
+    #
+    def _bind_draw_state(self) -> None:
+        #
+        if self.current_primitive == gl.GL_POINTS:
+            gl.glPointSize(1)
+
+    #
+    def flush(self) -> None:
+        """
+        Send all the accumulated vertices to the GPU in one draw call.
+        """
+        #
+        self._draw(self.current_primitive)
+
+
+#
+class ND_SpriteBatch_OPENGL(ND_VertexBatch_OPENGL):
+    #
+    def __init__(self, window: WindowOpenGLClass, initial_capacity: int = 4096) -> None:
+        # Vertex : x, y, u, v
+        super().__init__(
+            window=window,
+            vertex_shader_src=VERTEX_SHADER_BATCH_TEXTURES_SRC,
+            fragment_shader_src=FRAGMENT_SHADER_TEXTURES_SRC,
+            attributes_sizes=[2, 2],
+            initial_capacity=initial_capacity
+        )
+        #
+        self.shader_texture_sampler: int = gl.glGetUniformLocation(self.shader_program, "textureSampler")
+
+        # OpenGL texture of the quads currently in the batch
+        self.current_gl_texture: int = -1
+
+    #
+    def add_quad(self, gl_texture: int, x: float, y: float, w: float, h: float, u0: float = 0.0, v0: float = 0.0, u1: float = 1.0, v1: float = 1.0) -> None:
+        """
+        Add a textured quad to the batch, (x, y, w, h) is in screen space, (u0, v0, u1, v1) in texture space.
+        """
+        # Cannot merge quads with different textures in the same draw call
+        if gl_texture != self.current_gl_texture:
+            self.flush()
+            self.current_gl_texture = gl_texture
+        #
+        i: int = self._reserve(6)
+        # Two triangles : top-left, top-right, bottom-right / top-left, bottom-right, bottom-left
+        self.vertices[i:i+6] = (
+            (x,     y,     u0, v0),
+            (x + w, y,     u1, v0),
+            (x + w, y + h, u1, v1),
+            (x,     y,     u0, v0),
+            (x + w, y + h, u1, v1),
+            (x,     y + h, u0, v1)
+        )
+
+    #
+    def add_quads(self, gl_texture: int, rects: np.ndarray | list[tuple[float, float, float, float]], u0: float = 0.0, v0: float = 0.0, u1: float = 1.0, v1: float = 1.0) -> None:
+        """
+        Add N textured quads with the same texture coordinates to the batch, rects is a (N, 4) list of (x, y, w, h) in screen space.
+        """
+        #
+        r: np.ndarray = np.asarray(rects, dtype=np.float32).reshape(-1, 4)
+        N: int = len(r)
+        #
+        if N == 0:
+            return
+        # Cannot merge quads with different textures in the same draw call
+        if gl_texture != self.current_gl_texture:
+            self.flush()
+            self.current_gl_texture = gl_texture
+        #
+        i: int = self._reserve(6 * N)
+        quads: np.ndarray = self.vertices[i:i+6*N].reshape(N, 6, 4)
+        #
+        x0: np.ndarray = r[:, 0]
+        y0: np.ndarray = r[:, 1]
+        x1: np.ndarray = x0 + r[:, 2]
+        y1: np.ndarray = y0 + r[:, 3]
+        # Same vertices order as add_quad
+        quads[:, :, 0] = np.stack([x0, x1, x1, x0, x1, x0], axis=1)
+        quads[:, :, 1] = np.stack([y0, y0, y1, y0, y1, y1], axis=1)
+        quads[:, :, 2] = (u0, u1, u1, u0, u1, u0)
+        quads[:, :, 3] = (v0, v0, v1, v0, v1, v1)
+
+    #
+    def _bind_draw_state(self) -> None:
+        #
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        #
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.current_gl_texture)
+        gl.glUniform1i(self.shader_texture_sampler, 0)
+
+    #
+    def flush(self) -> None:
+        """
+        Send all the accumulated quads to the GPU in one draw call.
+        """
+        #
+        if self.nb_vertices == 0:
+            return
+        #
+        self._draw(gl.GL_TRIANGLES)
+        #
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
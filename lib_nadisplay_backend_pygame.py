@@ -10,10 +10,13 @@ PYGAME backend for lib_nadisplay.
 
 from typing import Optional, Any, Callable, cast, Type
 from threading import Lock
+from collections import OrderedDict
 
 import os
 
 import pygame
+#
+import numpy as np
 
 from lib_nadisplay_colors import ND_Color
 from lib_nadisplay_transformation import ND_Transformation
@@ -249,13 +252,20 @@ class ND_Window_Pygame(ND_Window):
         # sdl_or_glfw_window_id is int and has been initialized to -1 in parent class
         self.sdl_or_glfw_window_id = self.window_id
 
+        # The screen surface is not cleared between two frames, so the retained mode can only redraw the dirty areas
+        self.supports_partial_redraw = True
+
         #
         self.next_texture_id: int = 0
         #
         self.pygame_surfaces: dict[int, pygame.Surface] = {}
         self.mutex_sdl_textures: Lock = Lock()
         #
-        self.prepared_font_textures: dict[str, int] = {}
+        # Rendered texts cache : (text, font name, font size, color) -> texture id, least recently used first
+        self.prepared_font_textures: OrderedDict[tuple[str, str, int, tuple[int, int, int, int]], int] = OrderedDict()
+        self.prepared_font_textures_max_size: int = 512
+        # Surfaces that were drawn on before the current render target (see begin_render_to_texture)
+        self.previous_pygame_screens: list[pygame.Surface] = []
 
 
     #
@@ -472,6 +482,142 @@ class ND_Window_Pygame(ND_Window):
         self.blit_texture(surface_to_render, ND_Rect(x, y, width, height))
 
 
+    #
+    def render_prepared_texture_batch(self, texture_id: int, dst_rects: np.ndarray, src_rect: Optional[ND_Rect] = None) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if texture_id not in self.pygame_surfaces:
+            return
+
+        #
+        surface: pygame.Surface = self.pygame_surfaces[texture_id]
+        #
+        if src_rect is not None:
+            #
+            area: pygame.Rect = pygame.Rect(src_rect.x, src_rect.y, src_rect.w, src_rect.h).clip(surface.get_rect())
+            #
+            if area.w <= 0 or area.h <= 0:
+                return
+            #
+            surface = surface.subsurface(area)
+
+        # The surface is only scaled once for each different size (all the tiles of a grid have the same size)
+        scaled_surfaces: dict[tuple[int, int], pygame.Surface] = {}
+        blits: list[tuple[pygame.Surface, tuple[int, int]]] = []
+        #
+        x: int
+        y: int
+        w: int
+        h: int
+        for x, y, w, h in np.asarray(dst_rects).tolist():
+            #
+            if w <= 0 or h <= 0:
+                continue
+            #
+            if (w, h) not in scaled_surfaces:
+                scaled_surfaces[(w, h)] = surface if surface.get_size() == (w, h) else pygame.transform.scale(surface, (w, h))
+            #
+            blits.append( (scaled_surfaces[(w, h)], (x, y)) )
+
+        #
+        self.pygame_screen.blits(blits, doreturn=False)
+
+
+    #
+    def render_part_of_prepared_texture(self, texture_id: int, x: int, y: int, w: int, h: int, src_x: int, src_y: int, src_w: int, src_h: int, transformations: ND_Transformation = ND_Transformation()) -> None:
+        #
+        # TODO: add Transformations
+
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if texture_id not in self.pygame_surfaces:
+            return
+
+        #
+        area: pygame.Rect = pygame.Rect(src_x, src_y, src_w, src_h).clip(self.pygame_surfaces[texture_id].get_rect())
+        #
+        if area.w <= 0 or area.h <= 0:
+            return
+
+        # Same size, no need to create a resized surface
+        if area.w == w and area.h == h:
+            self.pygame_screen.blit(self.pygame_surfaces[texture_id], (x, y), area)
+        #
+        else:
+            self.blit_texture(self.pygame_surfaces[texture_id].subsurface(area), ND_Rect(x, y, w, h))
+
+
+    #
+    def create_render_target_texture(self, width: int, height: int) -> int:
+        #
+        if not self.display.initialized:
+            return -1
+
+        #
+        surf: pygame.Surface = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        #
+        texture_id: int = -1
+        with self.mutex_sdl_textures:
+            #
+            texture_id = self.next_texture_id
+            self.next_texture_id += 1
+            #
+            self.pygame_surfaces[texture_id] = surf
+
+        #
+        return texture_id
+
+
+    #
+    def begin_render_to_texture(self, texture_id: int) -> bool:
+        #
+        if not self.display.initialized or texture_id not in self.pygame_surfaces:
+            return False
+
+        #
+        target: pygame.Surface = self.pygame_surfaces[texture_id]
+        #
+        target.set_clip(None)
+        target.fill(pygame.Color(0, 0, 0, 0))
+
+        # All the drawing functions draw on self.pygame_screen
+        self.previous_pygame_screens.append(self.pygame_screen)
+        self.pygame_screen = target
+        #
+        self.render_targets_stack.append(texture_id)
+        self.save_and_clear_clip_rect_stack()
+        #
+        return True
+
+
+    #
+    def end_render_to_texture(self) -> None:
+        #
+        if not self.render_targets_stack:
+            return
+
+        #
+        self.render_targets_stack.pop(-1)
+        self.pygame_screen = self.previous_pygame_screens.pop(-1)
+        #
+        self.restore_clip_rect_stack()
+
+        #
+        clip_rect: Optional[ND_Rect] = self.get_top_of_clip_rect_stack()
+        #
+        if clip_rect is None:
+            self.pygame_screen.set_clip(None)
+        else:
+            self.pygame_screen.set_clip(pyrect(clip_rect))
+
+
     #
     def get_prepared_texture_size(self, texture_id: int) -> ND_Point:
         #
@@ -498,13 +644,31 @@ class ND_Window_Pygame(ND_Window):
         if font_name is None:
             font_name = self.display.default_font
         #
-        tid: str = f"{txt}_|||_{font_name}_|||_{font_size}_|||_{font_color}"
+        tid: tuple[str, str, int, tuple[int, int, int, int]] = (txt, font_name, font_size, (font_color.r, font_color.g, font_color.b, font_color.a))
+        #
+        texture_id: int = self.prepared_font_textures.get(tid, -1)
         #
-        if tid not in self.prepared_font_textures:
-            self.prepared_font_textures[tid] = self.prepare_text_to_render(text=txt, color=font_color, font_name=font_name, font_size=font_size)
+        if texture_id >= 0:
+            #
+            self.prepared_font_textures.move_to_end(tid)
         #
-        tsize: ND_Point = self.get_prepared_texture_size(self.prepared_font_textures[tid])
-        self.render_prepared_texture(self.prepared_font_textures[tid], x, y, tsize.x, tsize.y)
+        else:
+            #
+            texture_id = self.prepare_text_to_render(text=txt, color=font_color, font_name=font_name, font_size=font_size)
+            #
+            if texture_id < 0:
+                return
+            #
+            self.prepared_font_textures[tid] = texture_id
+            # Evict (and destroy) the least recently used texts
+            while len(self.prepared_font_textures) > self.prepared_font_textures_max_size:
+                #
+                _, evicted_texture_id = self.prepared_font_textures.popitem(last=False)
+                self.destroy_prepared_texture(evicted_texture_id)
+
+        #
+        tsize: ND_Point = self.get_prepared_texture_size(texture_id)
+        self.render_prepared_texture(texture_id, x, y, tsize.x, tsize.y)
 
 
     #
@@ -783,7 +947,9 @@ class ND_Window_Pygame(ND_Window):
         if not self.display.initialized:
             return
 
-        self.pygame_screen.set_clip(pygame.Rect(x, y, width, height))
+        # The top of the stack is the intersection with the parent clip areas
+        clip_rect: ND_Rect = self.clip_rect_stack[-1]
+        self.pygame_screen.set_clip(pygame.Rect(clip_rect.x, clip_rect.y, clip_rect.w, clip_rect.h))
 
 
     #
@@ -813,6 +979,19 @@ class ND_Window_Pygame(ND_Window):
         self.width, self.height = self.pygame_screen.get_size()
         # print(f"DEBUG | update window {self.window_id}, x : {self.x}, y : {self.y}, w: {self.width}, h: {self.height}, screen : {self.pygame_screen}")
 
+        #
+        redraw_area: Optional[ND_Rect] = self.pop_redraw_area()
+
+        # Nothing changed since the last frame in retained mode, the previous frame is still displayed
+        if redraw_area is None:
+            return
+
+        # The pygame screen surface keeps its content between frames, so only the dirty area can be redrawn
+        partial_redraw: bool = redraw_area.w < self.width or redraw_area.h < self.height
+        #
+        if partial_redraw:
+            self.enable_area_drawing_constraints(redraw_area.x, redraw_area.y, redraw_area.w, redraw_area.h)
+
         #
         self.pygame_screen.fill(pygame.Color(0, 0, 0))
 
@@ -829,11 +1008,19 @@ class ND_Window_Pygame(ND_Window):
         for scene in list(self.scenes.values()):
             scene.render()
 
+        #
+        if partial_redraw:
+            self.disable_area_drawing_constraints()
+
         #
         try:
             with self.mutex_display:
-                # pygame.display.flip()
-                pygame.display.update()
+                #
+                if partial_redraw:
+                    pygame.display.update(pygame.Rect(redraw_area.x, redraw_area.y, redraw_area.w, redraw_area.h))
+                else:
+                    # pygame.display.flip()
+                    pygame.display.update()
         except Exception as e:
             print(f"Warning: could not update the screen with pygame.display.update().\n{e}")
 
@@ -13,6 +13,7 @@ SDL + SDLGFX backend for lib_nadisplay.
 
 from typing import Optional, Any, Callable, cast, Type
 from threading import Lock
+from collections import OrderedDict
 
 import os
 
@@ -24,6 +25,8 @@ import sdl2.sdlgfx as sdlgfx  # type: ignore
 import ctypes
 
 from ctypes import c_int, byref
+#
+import numpy as np
 
 from lib_nadisplay_colors import ND_Color
 from lib_nadisplay_transformation import ND_Transformation
@@ -270,8 +273,11 @@ class ND_Window_SDL2_SDLGFX(ND_Window):
         self.texture_moduled: set[int] = set()
         self.sdl_textures: dict[int, object] = {}
         self.mutex_sdl_textures: Lock = Lock()
-        #
-        self.prepared_font_textures: dict[str, int] = {}
+        # Rendered texts cache : (text, font name, font size, color) -> texture id, least recently used first
+        self.prepared_font_textures: OrderedDict[tuple[str, str, int, tuple[int, int, int, int]], int] = OrderedDict()
+        self.prepared_font_textures_max_size: int = 512
+        self.prepared_font_textures_hits: int = 0
+        self.prepared_font_textures_misses: int = 0
 
 
     #
@@ -508,6 +514,41 @@ class ND_Window_SDL2_SDLGFX(ND_Window):
             sdl2.SDL_RenderCopy(self.renderer, self.sdl_textures[texture_id], None, sdl2.SDL_Rect(x, y, width, height))
 
 
+    #
+    def render_prepared_texture_batch(self, texture_id: int, dst_rects: np.ndarray, src_rect: Optional[ND_Rect] = None) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        if texture_id not in self.sdl_textures:
+            return
+
+        # No color modulation for the batched quads
+        if texture_id in self.texture_moduled:
+            #
+            sdl2.SDL_SetTextureColorMod(self.sdl_textures[texture_id], 255, 255, 255)
+            sdl2.SDL_SetTextureAlphaMod(self.sdl_textures[texture_id], 255)
+            #
+            self.texture_moduled.remove(texture_id)
+
+        #
+        texture: sdl2.SDL_Texture = self.sdl_textures[texture_id]
+        src: Optional[sdl2.SDL_Rect] = sdl2.SDL_Rect(src_rect.x, src_rect.y, src_rect.w, src_rect.h) if src_rect is not None else None
+        # Same SDL_Rect reused for all the quads
+        dst: sdl2.SDL_Rect = sdl2.SDL_Rect(0, 0, 0, 0)
+
+        #
+        x: int
+        y: int
+        w: int
+        h: int
+        for x, y, w, h in np.asarray(dst_rects).tolist():
+            #
+            dst.x, dst.y, dst.w, dst.h = x, y, w, h
+            sdl2.SDL_RenderCopy(self.renderer, texture, src, dst)
+
+
     #
     def render_part_of_prepared_texture(self, texture_id: int, x: int, y: int, w: int, h: int, src_x: int, src_y: int, src_w: int, src_h: int, transformations: ND_Transformation = ND_Transformation()) -> None:
 
@@ -581,6 +622,83 @@ class ND_Window_SDL2_SDLGFX(ND_Window):
             sdl2.SDL_RenderCopy(self.renderer, self.sdl_textures[texture_id], sdl2.SDL_Rect(src_x, src_y, src_w, src_h), sdl2.SDL_Rect(x, y, w, h))
 
 
+    #
+    def create_render_target_texture(self, width: int, height: int) -> int:
+        #
+        if not self.display.initialized:
+            return -1
+
+        #
+        texture = sdl2.SDL_CreateTexture(self.renderer, sdl2.SDL_PIXELFORMAT_RGBA8888, sdl2.SDL_TEXTUREACCESS_TARGET, width, height)
+        #
+        if not texture:
+            print(f"Warning error : sdl2.SDL_CreateTexture couldn't create a render target texture of size {width}x{height} !\n{sdl2.SDL_GetError().decode()}")
+            return -1
+        # The transparent areas of the render target must not hide what is behind
+        sdl2.SDL_SetTextureBlendMode(texture, sdl2.SDL_BLENDMODE_BLEND)
+
+        #
+        texture_id: int = -1
+        with self.mutex_sdl_textures:
+            #
+            texture_id = self.next_texture_id
+            self.next_texture_id += 1
+            #
+            self.sdl_textures[texture_id] = texture
+            self.textures_dimensions[texture_id] = (width, height)
+
+        #
+        return texture_id
+
+
+    #
+    def begin_render_to_texture(self, texture_id: int) -> bool:
+        #
+        if not self.display.initialized or texture_id not in self.sdl_textures:
+            return False
+
+        #
+        if sdl2.SDL_SetRenderTarget(self.renderer, self.sdl_textures[texture_id]) != 0:
+            print(f"Warning error : sdl2.SDL_SetRenderTarget failed !\n{sdl2.SDL_GetError().decode()}")
+            return False
+
+        #
+        self.render_targets_stack.append(texture_id)
+        self.save_and_clear_clip_rect_stack()
+        #
+        sdl2.SDL_RenderSetClipRect(self.renderer, None)
+        sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 0)
+        sdl2.SDL_RenderClear(self.renderer)
+        #
+        return True
+
+
+    #
+    def end_render_to_texture(self) -> None:
+        #
+        if not self.render_targets_stack:
+            return
+
+        #
+        self.render_targets_stack.pop(-1)
+        #
+        if self.render_targets_stack:
+            sdl2.SDL_SetRenderTarget(self.renderer, self.sdl_textures[self.render_targets_stack[-1]])
+        else:
+            sdl2.SDL_SetRenderTarget(self.renderer, None)
+
+        #
+        self.restore_clip_rect_stack()
+
+        #
+        clip_rect: Optional[ND_Rect] = self.get_top_of_clip_rect_stack()
+        #
+        if clip_rect is None:
+            sdl2.SDL_RenderSetClipRect(self.renderer, None)
+        else:
+            sdl2.SDL_RenderSetClipRect(self.renderer, sdl2.SDL_Rect(clip_rect.x, clip_rect.y, clip_rect.w, clip_rect.h))
+
+
     #
     def get_prepared_texture_size(self, texture_id: int) -> ND_Point:
         #
@@ -618,21 +736,48 @@ class ND_Window_SDL2_SDLGFX(ND_Window):
         if not font:
             return
 
+        # Static texts are rasterized once, and then only copied
+        tid: tuple[str, str, int, tuple[int, int, int, int]] = (txt, font_name, font_size, (font_color.r, font_color.g, font_color.b, font_color.a))
+        #
+        texture_id: int = self.prepared_font_textures.get(tid, -1)
         #
-        # tid: str = f"{txt}_|||_{font}_|||_{font_size}_|||_{font_color}"
-        # #
-        # if tid not in self.prepared_font_textures:
-        #     self.prepared_font_textures[tid] = self.prepare_text_to_render(text=txt, color=font_color, font_name=font, font_size=font_size)
-        # #
-        # tsize: ND_Point = self.get_prepared_texture_size(self.prepared_font_textures[tid])
-        # self.render_prepared_texture(self.prepared_font_textures[tid], x, y, tsize.x, tsize.y)
+        if texture_id in self.sdl_textures:
+            #
+            self.prepared_font_textures_hits += 1
+            self.prepared_font_textures.move_to_end(tid)
+        #
+        else:
+            #
+            self.prepared_font_textures_misses += 1
+            #
+            texture_id = self._create_text_texture(txt, font, font_color)
+            #
+            if texture_id < 0:
+                return
+            #
+            self.prepared_font_textures[tid] = texture_id
+            # Evict (and destroy) the least recently used texts
+            while len(self.prepared_font_textures) > self.prepared_font_textures_max_size:
+                #
+                _, evicted_texture_id = self.prepared_font_textures.popitem(last=False)
+                self.destroy_prepared_texture(evicted_texture_id)
+
+        #
+        width: int
+        height: int
+        width, height = self.textures_dimensions[texture_id]
+        #
+        sdl2.SDL_RenderCopy(self.renderer, self.sdl_textures[texture_id], None, sdl2.SDL_Rect(x, y, width, height))
 
-        # DONE: render directly text instead of creating texture, and etc...
+
+    #
+    def _create_text_texture(self, txt: str, font: sdlttf.TTF_OpenFont, font_color: ND_Color) -> int:
+        #
         surface: sdl2.SDL_Surface = sdlttf.TTF_RenderUTF8_Blended(font, txt.encode("utf-8"), to_sdl_color(font_color))
         #
         if not surface:
             print(f"Warning error : sdlttf.TTF_RenderUTF8_Blended couldn't not create a surface for the font : {font} and the text {txt} !")
-            return
+            return -1
         #
         width: int = surface.contents.w
         height: int = surface.contents.h
@@ -641,10 +786,21 @@ class ND_Window_SDL2_SDLGFX(ND_Window):
         sdl2.SDL_FreeSurface(surface)
         #
         if not texture:
-            print(f"Warning error : sdl2.SDL_CreateTextureFromSurface couldn't not create a texture for the surface : {surface} that was rendered with the font {font_name} and the text {txt} !")
-            return
+            print(f"Warning error : sdl2.SDL_CreateTextureFromSurface couldn't not create a texture for the surface : {surface} that was rendered with the font {font} and the text {txt} !")
+            return -1
+
+        #
+        texture_id: int = -1
+        with self.mutex_sdl_textures:
+            #
+            texture_id = self.next_texture_id
+            self.next_texture_id += 1
+            #
+            self.sdl_textures[texture_id] = texture
+            self.textures_dimensions[texture_id] = (width, height)
+
         #
-        sdl2.SDL_RenderCopy(self.renderer, texture, None, sdl2.SDL_Rect(x, y, width, height))
+        return texture_id
 
 
     #
@@ -760,6 +916,46 @@ class ND_Window_SDL2_SDLGFX(ND_Window):
         sdlgfx.thickLineRGBA(self.renderer, x1, y1, x2, y2, line_thickness, color.r, color.g, color.b, color.a)
 
 
+    #
+    def draw_thick_lines_batch(self, lines: np.ndarray, line_thickness: int, color: ND_Color) -> None:
+        #
+        if not self.display.initialized:
+            return
+
+        #
+        segs: np.ndarray = np.asarray(lines, dtype=np.int32).reshape(-1, 4)
+        #
+        if len(segs) == 0:
+            return
+
+        # Only the horizontal and vertical lines can be drawn as rects
+        if not np.all((segs[:, 0] == segs[:, 2]) | (segs[:, 1] == segs[:, 3])):
+            super().draw_thick_lines_batch(segs, line_thickness, color)
+            return
+
+        # Each line becomes a rect of line_thickness width centered on the line, all drawn in one call
+        half: int = line_thickness // 2
+        xs: np.ndarray = np.minimum(segs[:, 0], segs[:, 2])
+        ys: np.ndarray = np.minimum(segs[:, 1], segs[:, 3])
+        ws: np.ndarray = np.abs(segs[:, 2] - segs[:, 0])
+        hs: np.ndarray = np.abs(segs[:, 3] - segs[:, 1])
+        #
+        vertical: np.ndarray = ws == 0
+        xs = np.where(vertical, xs - half, xs)
+        ws = np.where(vertical, line_thickness, ws + 1)
+        ys = np.where(vertical, ys, ys - half)
+        hs = np.where(vertical, hs + 1, line_thickness)
+
+        #
+        rects = (sdl2.SDL_Rect * len(segs))(*[
+            sdl2.SDL_Rect(x, y, w, h) for x, y, w, h in zip(xs.tolist(), ys.tolist(), ws.tolist(), hs.tolist())
+        ])
+        #
+        sdl2.SDL_SetRenderDrawBlendMode(self.renderer, sdl2.SDL_BLENDMODE_BLEND if color.a < 255 else sdl2.SDL_BLENDMODE_NONE)
+        sdl2.SDL_SetRenderDrawColor(self.renderer, color.r, color.g, color.b, color.a)
+        sdl2.SDL_RenderFillRects(self.renderer, rects, len(segs))
+
+
     #
     def draw_rounded_rect(self, x: int, y: int, width: int, height: int, radius: int, fill_color: ND_Color, border_color: ND_Color) -> None:
         #
@@ -977,8 +1173,9 @@ class ND_Window_SDL2_SDLGFX(ND_Window):
         if not self.display.initialized:
             return
 
-        # Enable clipping area
-        sdl2.SDL_RenderSetClipRect(self.renderer, sdl2.SDL_Rect(x, y, width, height))
+        # Enable clipping area, the top of the stack is the intersection with the parent clip areas
+        clip_rect: ND_Rect = self.clip_rect_stack[-1]
+        sdl2.SDL_RenderSetClipRect(self.renderer, sdl2.SDL_Rect(clip_rect.x, clip_rect.y, clip_rect.w, clip_rect.h))
 
 
     #
@@ -1013,6 +1210,10 @@ class ND_Window_SDL2_SDLGFX(ND_Window):
         if not self.display.initialized:
             return
 
+        # Nothing changed since the last frame in retained mode, the previous frame is still displayed
+        if self.pop_redraw_area() is None:
+            return
+
         #
         # print(f"DEBUG | update window {self.window_id} that has current state {self.state}.")
 
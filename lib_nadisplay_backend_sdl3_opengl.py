@@ -50,7 +50,8 @@ from lib_nadisplay_transformation import ND_Transformation
 from lib_nadisplay_rects import ND_Rect, ND_Point
 from lib_nadisplay_core import ND_MainApp, ND_Display, ND_Window, ND_Scene
 from lib_nadisplay_SDL3 import to_sdl_color, get_display_info
-from lib_nadisplay_backend_opengl import create_and_validate_gl_shader_program
+from lib_nadisplay_backend_opengl import create_and_validate_gl_shader_program, create_gl_render_target, delete_gl_render_target
+from lib_nadisplay_backend_opengl_batch import ND_GeometryBatch_OPENGL, ND_SpriteBatch_OPENGL
 from lib_font_renderer_opengl import FontRenderer
 
 #
@@ -362,6 +363,16 @@ class ND_Window_SDL3_OPENGL(ND_Window):
             raise UserWarning("Failed to create texture shader program.")
         print("Shader program created successfully.")
 
+        # Batched geometry renderer (lines, triangles, points)
+        self.geometry_batch: ND_GeometryBatch_OPENGL = ND_GeometryBatch_OPENGL(self)
+        # Batched textured quads renderer, with a persistent streaming vertex buffer
+        self.sprite_batch: ND_SpriteBatch_OPENGL = ND_SpriteBatch_OPENGL(self)
+
+        # Framebuffers of the render target textures (texture id -> framebuffer)
+        self.gl_framebuffers: dict[int, int] = {}
+        # Window sizes to restore after rendering into a texture
+        self.previous_render_sizes: list[tuple[int, int]] = []
+
 
     #
     def _ensure_shaderProgram_base(self) -> None:
@@ -396,6 +407,10 @@ class ND_Window_SDL3_OPENGL(ND_Window):
             #
             self.destroy_prepared_texture(texture_id)
 
+        #
+        self.geometry_batch.destroy()
+        self.sprite_batch.destroy()
+
         #
         sdl3.SDL_GL_DeleteContext(self.gl_context)
         sdl3.SDL_DestroyWindow(self.sdl_window)
@@ -468,49 +483,17 @@ class ND_Window_SDL3_OPENGL(ND_Window):
     def blit_texture(self, texture_id: int, dst_rect: ND_Rect) -> None:
         """
         Renders a texture using OpenGL shaders.
+        Consecutive blits of the same texture are merged into one draw call by the sprite batch.
         """
         if texture_id not in self.gl_textures:
             print("Texture ID not found.")
             return
 
-        #
-        self._ensure_shaderProgram_textures()
-        self._ensure_context()
-
-        gl.glBindTexture(gl.GL_TEXTURE_2D, self.gl_textures[texture_id])
-
-        vertices = np.array([
-            # Position       # Texture Coords
-            dst_rect.x, dst_rect.y, 0.0, 1.0,  # Top-left corner
-            dst_rect.x + dst_rect.w, dst_rect.y, 1.0, 1.0,  # Top-right corner
-            dst_rect.x + dst_rect.w, dst_rect.y + dst_rect.h, 1.0, 0.0,  # Bottom-right corner
-            dst_rect.x, dst_rect.y + dst_rect.h, 0.0, 0.0   # Bottom-left corner
-        ], dtype=np.float32)
-
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
-
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
-
-        # Position attribute
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 4 * vertices.itemsize, None)
-        gl.glEnableVertexAttribArray(0)
+        # Keep the drawing order, the pending geometry has to be drawn before this quad
+        self.geometry_batch.flush()
 
-        # Texture coordinate attribute
-        gl.glVertexAttribPointer(1, 2, gl.GL_FLOAT, gl.GL_FALSE, 4 * vertices.itemsize, ctypes.c_void_p(2 * vertices.itemsize))
-        gl.glEnableVertexAttribArray(1)
-
-        gl.glUseProgram(self.shader_program_textures)
-        gl.glDrawArrays(gl.GL_TRIANGLE_FAN, 0, 4)
-
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
-
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        #
+        self.sprite_batch.add_quad(self.gl_textures[texture_id], dst_rect.x, dst_rect.y, dst_rect.w, dst_rect.h)
 
     #
     def prepare_text_to_render(self, text: str, color: ND_Color, font_size: int, font_name: Optional[str] = None) -> int:
@@ -602,11 +585,20 @@ class ND_Window_SDL3_OPENGL(ND_Window):
 
     #
     def destroy_prepared_texture(self, texture_id: int) -> None:
+        # The texture may still be used by pending quads in the sprite batch
+        self.flush_batches()
         #
         self._ensure_shaderProgram_textures()
         #
         with self.mutex_sdl_textures:
-            if texture_id in self.gl_textures:
+            #
+            if texture_id in self.gl_framebuffers:
+                delete_gl_render_target(self.gl_textures[texture_id], self.gl_framebuffers[texture_id])
+                del self.gl_framebuffers[texture_id]
+                del self.gl_textures[texture_id]
+                del self.textures_dimensions[texture_id]
+            #
+            elif texture_id in self.gl_textures:
                 gl.glDeleteTextures(1, [self.gl_textures[texture_id]])
                 sdl3.SDL_FreeSurface(self.sdl_textures_surfaces[texture_id])
                 del self.sdl_textures_surfaces[texture_id]
@@ -678,171 +670,250 @@ class ND_Window_SDL3_OPENGL(ND_Window):
         #
         self._ensure_context()
 
+        # The font shader is going to be bound, send the pending geometry and sprites first
+        self.flush_batches()
+
         # No texture cache, calcul it each time
 
         font_renderer.render_text(txt, x, y, font_size, font_color)
 
     #
-    def draw_pixel(self, x: int, y: int, color: ND_Color) -> None:
-        """
-        Draw a single pixel on the screen at (x, y).
-        """
+    def create_render_target_texture(self, width: int, height: int) -> int:
+        #
         if not self.display.initialized:
-            print("Display not initialized.")
-            return
+            return -1
 
         #
-        self._ensure_shaderProgram_base()
         self._ensure_context()
 
-        gl.glUseProgram(self.shader_program)
-        gl.glPointSize(1)
-
-        # Set color uniform
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *color.to_float_tuple())
-
-        vertices = np.array([x, y], dtype=np.float32)
-
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
-
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
-
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 2 * vertices.itemsize, None)
-        gl.glEnableVertexAttribArray(0)
-
-        gl.glDrawArrays(gl.GL_POINTS, 0, 1)
+        #
+        gl_texture: int
+        framebuffer: int
+        gl_texture, framebuffer = create_gl_render_target(width, height)
+        #
+        if framebuffer == -1:
+            return -1
 
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
+        #
+        texture_id: int = -1
+        with self.mutex_sdl_textures:
+            #
+            texture_id = self.next_texture_id
+            self.next_texture_id += 1
+            #
+            self.gl_textures[texture_id] = gl_texture
+            self.textures_dimensions[texture_id] = (width, height)
+            self.gl_framebuffers[texture_id] = framebuffer
 
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        #
+        return texture_id
 
     #
-    def draw_hline(self, x1: int, x2: int, y: int, color: ND_Color) -> None:
+    def _set_render_size(self, width: int, height: int) -> None:
         """
-        Draw a horizontal line between (x1, y) and (x2, y).
+        The drawing functions and shaders use the window size as the size of the current render target.
         """
-        if not self.display.initialized:
-            print("Display not initialized.")
-            return
+        #
+        self.width, self.height = width, height
+        gl.glViewport(0, 0, width, height)
+
+    #
+    def begin_render_to_texture(self, texture_id: int) -> bool:
+        #
+        if not self.display.initialized or texture_id not in self.gl_framebuffers:
+            return False
 
         #
-        self._ensure_shaderProgram_base()
         self._ensure_context()
 
-        gl.glUseProgram(self.shader_program)
+        # The pending geometry and sprites are for the previous render target
+        self.flush_batches()
 
-        # Set color uniform
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *color.to_float_tuple())
+        #
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.gl_framebuffers[texture_id])
+        #
+        self.render_targets_stack.append(texture_id)
+        self.save_and_clear_clip_rect_stack()
+        gl.glDisable(gl.GL_SCISSOR_TEST)
 
-        vertices = np.array([
-            x1, y,  # Start point
-            x2, y   # End point
-        ], dtype=np.float32)
+        #
+        self.previous_render_sizes.append((self.width, self.height))
+        self._set_render_size(*self.textures_dimensions[texture_id])
 
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
+        #
+        gl.glClearColor(0, 0, 0, 0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        #
+        return True
 
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
+    #
+    def end_render_to_texture(self) -> None:
+        #
+        if not self.render_targets_stack:
+            return
 
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 2 * vertices.itemsize, None)
-        gl.glEnableVertexAttribArray(0)
+        #
+        self.flush_batches()
 
-        gl.glDrawArrays(gl.GL_LINES, 0, 2)
+        #
+        self.render_targets_stack.pop(-1)
+        #
+        if self.render_targets_stack:
+            gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.gl_framebuffers[self.render_targets_stack[-1]])
+        else:
+            gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
 
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
+        #
+        self._set_render_size(*self.previous_render_sizes.pop(-1))
 
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        #
+        self.restore_clip_rect_stack()
+        #
+        clip_rect: Optional[ND_Rect] = self.get_top_of_clip_rect_stack()
+        #
+        if clip_rect is None:
+            gl.glDisable(gl.GL_SCISSOR_TEST)
+        else:
+            self.apply_area_drawing_constraint(clip_rect.x, clip_rect.y, clip_rect.w, clip_rect.h)
 
     #
-    def draw_vline(self, x: int, y1: int, y2: int, color: ND_Color) -> None:
-        """
-        Draw a vertical line between (x, y1) and (x, y2).
-        """
+    def render_part_of_prepared_texture(self, texture_id: int, x: int, y: int, w: int, h: int, src_x: int, src_y: int, src_w: int, src_h: int, transformations: ND_Transformation = ND_Transformation()) -> None:
+
+        #
         if not self.display.initialized:
-            print("Display not initialized.")
             return
 
         #
-        self._ensure_shaderProgram_base()
-        self._ensure_context()
+        if texture_id not in self.gl_textures or texture_id not in self.textures_dimensions:
+            return
 
-        gl.glUseProgram(self.shader_program)
+        #
+        tex_w: int
+        tex_h: int
+        tex_w, tex_h = self.textures_dimensions[texture_id]
+        #
+        u0: float = src_x / tex_w
+        u1: float = (src_x + src_w) / tex_w
+        v0: float = src_y / tex_h
+        v1: float = (src_y + src_h) / tex_h
+        # The render targets are drawn from the bottom left corner, their rows are upside down
+        if texture_id in self.gl_framebuffers:
+            v0, v1 = 1.0 - v0, 1.0 - v1
 
-        # Set color uniform
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *color.to_float_tuple())
+        # Keep the drawing order, the pending geometry has to be drawn before this quad
+        self.geometry_batch.flush()
+        #
+        self.sprite_batch.add_quad(self.gl_textures[texture_id], x, y, w, h, u0, v0, u1, v1)
 
-        vertices = np.array([
-            x, y1,  # Start point
-            x, y2   # End point
-        ], dtype=np.float32)
+    #
+    def render_prepared_texture_batch(self, texture_id: int, dst_rects: np.ndarray, src_rect: Optional[ND_Rect] = None) -> None:
 
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
+        #
+        if not self.display.initialized:
+            return
 
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
+        #
+        if texture_id not in self.gl_textures or texture_id not in self.textures_dimensions:
+            return
 
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 2 * vertices.itemsize, None)
-        gl.glEnableVertexAttribArray(0)
+        #
+        u0: float = 0.0
+        u1: float = 1.0
+        v0: float = 0.0
+        v1: float = 1.0
+        #
+        if src_rect is not None:
+            #
+            tex_w: int
+            tex_h: int
+            tex_w, tex_h = self.textures_dimensions[texture_id]
+            #
+            u0, u1 = src_rect.x / tex_w, (src_rect.x + src_rect.w) / tex_w
+            v0, v1 = src_rect.y / tex_h, (src_rect.y + src_rect.h) / tex_h
+            # The render targets are drawn from the bottom left corner, their rows are upside down
+            if texture_id in self.gl_framebuffers:
+                v0, v1 = 1.0 - v0, 1.0 - v1
 
-        gl.glDrawArrays(gl.GL_LINES, 0, 2)
+        # Keep the drawing order, the pending geometry has to be drawn before these quads
+        self.geometry_batch.flush()
+        # All the quads go in the same sprite batch, so in one draw call
+        self.sprite_batch.add_quads(self.gl_textures[texture_id], dst_rects, u0, v0, u1, v1)
 
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
+    #
+    def draw_thick_lines_batch(self, lines: np.ndarray, line_thickness: int, color: ND_Color) -> None:
 
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        #
+        if not self.display.initialized:
+            return
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        #
+        self.geometry_batch.add_thick_lines(lines, line_thickness, color.to_float_tuple())
 
     #
-    def draw_line(self, x1: int, x2: int, y1: int, y2: int, color: ND_Color) -> None:
+    def flush_batches(self) -> None:
         """
-        Draw a straight line between (x1, y1) and (x2, y2).
+        Send the accumulated batched geometry and sprites to the GPU.
+        Has to be called before any other OpenGL state change (scissor, shader) and before swapping buffers.
         """
+        #
         if not self.display.initialized:
-            print("Display not initialized.")
             return
-
         #
-        self._ensure_shaderProgram_base()
-        self._ensure_context()
+        self.geometry_batch.flush()
+        self.sprite_batch.flush()
 
-        gl.glUseProgram(self.shader_program)
-
-        # Set color uniform
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *color.to_float_tuple())
+    #
+    def draw_pixel(self, x: int, y: int, color: ND_Color) -> None:
+        """
+        Draw a single pixel on the screen at (x, y).
+        """
+        if not self.display.initialized:
+            print("Display not initialized.")
+            return
 
-        vertices = np.array([
-            x1, y1,  # Start point
-            x2, y2   # End point
-        ], dtype=np.float32)
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        self.geometry_batch.add_points([(x, y)], color.to_float_tuple())
 
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
+    #
+    def draw_hline(self, x1: int, x2: int, y: int, color: ND_Color) -> None:
+        """
+        Draw a horizontal line between (x1, y) and (x2, y).
+        """
+        if not self.display.initialized:
+            print("Display not initialized.")
+            return
 
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        self.geometry_batch.add_line_strip([(x1, y), (x2, y)], color.to_float_tuple())
 
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 2 * vertices.itemsize, None)
-        gl.glEnableVertexAttribArray(0)
+    #
+    def draw_vline(self, x: int, y1: int, y2: int, color: ND_Color) -> None:
+        """
+        Draw a vertical line between (x, y1) and (x, y2).
+        """
+        if not self.display.initialized:
+            print("Display not initialized.")
+            return
 
-        gl.glDrawArrays(gl.GL_LINES, 0, 2)
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        self.geometry_batch.add_line_strip([(x, y1), (x, y2)], color.to_float_tuple())
 
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
+    #
+    def draw_line(self, x1: int, x2: int, y1: int, y2: int, color: ND_Color) -> None:
+        """
+        Draw a straight line between (x1, y1) and (x2, y2).
+        """
+        if not self.display.initialized:
+            print("Display not initialized.")
+            return
 
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        self.geometry_batch.add_line_strip([(x1, y1), (x2, y2)], color.to_float_tuple())
 
     #
     def draw_thick_line(self, x1: int, x2: int, y1: int, y2: int, line_thickness: int, color: ND_Color) -> None:
@@ -889,41 +960,15 @@ class ND_Window_SDL3_OPENGL(ND_Window):
         if not self.display.initialized:
             return
 
-        #
-        if self.shader_program <= 0:
-            print(f"Error: shader program hasn't been initialized (={self.shader_program}).")
-            return
-
-        #
-        self._ensure_shaderProgram_base()
-        self._ensure_context()
-
-        gl.glUseProgram(self.shader_program)
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *outline_color.to_float_tuple())
-
-        vertices = np.array([
-            x, y,  # Bottom-left
-            x + width, y,  # Bottom-right
-            x + width, y + height,  # Top-right
-            x, y + height,  # Top-left
-            x, y  # Back to bottom-left
-        ], dtype=np.float32)
-
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
-
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 0, None)
-        gl.glEnableVertexAttribArray(0)
-
-        gl.glDrawArrays(gl.GL_LINE_LOOP, 0, 5)
-
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        self.geometry_batch.add_line_strip([
+            (x, y),
+            (x + width, y),
+            (x + width, y + height),
+            (x, y + height),
+            (x, y)
+        ], outline_color.to_float_tuple())
 
     #
     def draw_filled_rect(self, x: int, y: int, width: int, height: int, fill_color: ND_Color) -> None:
@@ -931,41 +976,13 @@ class ND_Window_SDL3_OPENGL(ND_Window):
         if not self.display.initialized:
             return
 
-        #
-        if self.shader_program <= 0:
-            print(f"Error: shader program hasn't been initialized (={self.shader_program}).")
-            return
-
-        #
-        self._ensure_shaderProgram_base()
-        self._ensure_context()
-
-
-        gl.glUseProgram(self.shader_program)
-        gl.glUniform4f(gl.glGetUniformLocation(self.shader_program, "color"), *fill_color.to_float_tuple())
-
-        vertices = np.array([
-            x, y,  # Bottom-left
-            x + width, y,  # Bottom-right
-            x + width, y + height,  # Top-right
-            x, y + height  # Top-left
-        ], dtype=np.float32)
-
-        vao = gl.glGenVertexArrays(1)
-        vbo = gl.glGenBuffers(1)
-
-        gl.glBindVertexArray(vao)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, vbo)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices.nbytes, vertices, gl.GL_STATIC_DRAW)
-        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 0, None)
-        gl.glEnableVertexAttribArray(0)
-
-        gl.glDrawArrays(gl.GL_QUADS, 0, 4)
-
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
-        gl.glBindVertexArray(0)
-        gl.glDeleteBuffers(1, [vbo])
-        gl.glDeleteVertexArrays(1, [vao])
+        # Keep the drawing order, the pending sprites have to be drawn before this geometry
+        self.sprite_batch.flush()
+        # Two triangles, GL_QUADS isn't available in core profiles and can't be batched
+        self.geometry_batch.add_triangles([
+            (x, y), (x + width, y), (x + width, y + height),
+            (x, y), (x + width, y + height), (x, y + height)
+        ], fill_color.to_float_tuple())
 
     #
     def draw_unfilled_circle(self, x: int, y: int, radius: int, outline_color: ND_Color) -> None:
@@ -1217,8 +1234,15 @@ class ND_Window_SDL3_OPENGL(ND_Window):
     def apply_area_drawing_constraint(self, x: int, y: int, w: int, h: int) -> None:
 
         #
-        # TODO
-        pass
+        if not self.display.initialized:
+            return
+
+        # The pending geometry and sprites were drawn with the previous clip area
+        self.flush_batches()
+
+        # Convert to OpenGL coordinate system (bottom-left origin)
+        gl.glEnable(gl.GL_SCISSOR_TEST)
+        gl.glScissor(x, self.height - (y + h), w, h)
 
     #
     def enable_area_drawing_constraints(self, x: int, y: int, width: int, height: int) -> None:
@@ -1231,8 +1255,9 @@ class ND_Window_SDL3_OPENGL(ND_Window):
         #
         self._ensure_shaderProgram_base()
         self._ensure_context()
-        #
-        self.apply_area_drawing_constraint(x, y, width, height)
+        # The top of the stack is the intersection with the parent clip areas
+        clip_rect: ND_Rect = self.clip_rect_stack[-1]
+        self.apply_area_drawing_constraint(clip_rect.x, clip_rect.y, clip_rect.w, clip_rect.h)
 
     #
     def disable_area_drawing_constraints(self) -> None:
@@ -1249,6 +1274,8 @@ class ND_Window_SDL3_OPENGL(ND_Window):
         new_clip_rect: Optional[ND_Rect] = self.get_top_of_clip_rect_stack()
         #
         if new_clip_rect is None:
+            # The pending geometry and sprites were drawn with the previous clip area
+            self.flush_batches()
             #
             gl.glDisable(gl.GL_SCISSOR_TEST)
         else:
@@ -1262,6 +1289,10 @@ class ND_Window_SDL3_OPENGL(ND_Window):
         if not self.display.initialized:
             return
 
+        # Nothing changed since the last frame in retained mode, the previous frame is still displayed
+        if self.pop_redraw_area() is None:
+            return
+
         #
         sdl3.SDL_GL_MakeCurrent(self.sdl_window, self.gl_context)
         gl.glViewport(0, 0, self.width, self.height)
@@ -1279,6 +1310,9 @@ class ND_Window_SDL3_OPENGL(ND_Window):
         for scene in self.scenes.values():
             scene.render()
 
+        # Send the remaining batched geometry and sprites of this frame
+        self.flush_batches()
+
         #
         sdl3.SDL_GL_SwapWindow(self.sdl_window)
 
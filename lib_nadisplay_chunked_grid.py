@@ -0,0 +1,436 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Chunked storage of integer values on an infinite 2D grid, used by ND_Elt_RectGrid for its tiles.
+
+The grid is cut into square chunks of chunk_size x chunk_size cases, each one is a dense NumPy int32 array
+allocated on demand (indexed [x, y] like the exported arrays). The chunks with only a few cells set
+(far-flung cells) are kept in a sparse dict instead, and become dense when they get more cells.
+Empty cases have the value -1.
+
+"""
+
+#
+from typing import Any, Iterator, Optional
+#
+import random
+#
+import numpy as np
+
+
+#
+EMPTY_VALUE: int = -1
+
+
+#
+class ND_ChunkedGrid:
+    #
+    def __init__(self, chunk_size_bits: int = 6, sparse_max_cells_per_chunk: int = 16) -> None:
+
+        # Chunks of 2^chunk_size_bits cases of side, so the chunk of a case is found with a shift
+        self.chunk_size_bits: int = chunk_size_bits
+        self.chunk_size: int = 1 << chunk_size_bits
+        self.chunk_mask: int = self.chunk_size - 1
+
+        # Dense chunks: (chunk_x, chunk_y) -> int32 array (chunk_size, chunk_size), and their number of non-empty cells
+        self.chunks: dict[tuple[int, int], np.ndarray] = {}
+        self.chunks_nb_cells: dict[tuple[int, int], int] = {}
+
+        # Sparse chunks: (chunk_x, chunk_y) -> {(x, y): value}, for the chunks with at most sparse_max_cells_per_chunk cells
+        self.sparse_chunks: dict[tuple[int, int], dict[tuple[int, int], int]] = {}
+        self.sparse_max_cells_per_chunk: int = sparse_max_cells_per_chunk
+
+    #
+    def __len__(self) -> int:
+        """Number of non-empty cells."""
+        #
+        return sum(self.chunks_nb_cells.values()) + sum(len(cells) for cells in self.sparse_chunks.values())
+
+    #
+    def __contains__(self, case: Any) -> bool:
+        #
+        x, y = case
+        #
+        return self.get(x, y) != EMPTY_VALUE
+
+    #
+    def clear(self) -> None:
+        #
+        self.chunks.clear()
+        self.chunks_nb_cells.clear()
+        self.sparse_chunks.clear()
+
+    #
+    def get(self, x: int, y: int) -> int:
+        #
+        key: tuple[int, int] = (x >> self.chunk_size_bits, y >> self.chunk_size_bits)
+        #
+        chunk: Optional[np.ndarray] = self.chunks.get(key)
+        #
+        if chunk is not None:
+            return int(chunk[x & self.chunk_mask, y & self.chunk_mask])
+        #
+        cells: Optional[dict[tuple[int, int], int]] = self.sparse_chunks.get(key)
+        #
+        if cells is None:
+            return EMPTY_VALUE
+        #
+        return cells.get((x, y), EMPTY_VALUE)
+
+    #
+    def _new_chunk(self, key: tuple[int, int]) -> np.ndarray:
+        """Allocate the dense chunk key, and move its sparse cells into it."""
+        #
+        chunk: np.ndarray = np.full((self.chunk_size, self.chunk_size), EMPTY_VALUE, dtype=np.int32)
+        nb_cells: int = 0
+        #
+        cells: Optional[dict[tuple[int, int], int]] = self.sparse_chunks.pop(key, None)
+        #
+        if cells is not None:
+            #
+            x: int
+            y: int
+            value: int
+            for (x, y), value in cells.items():
+                chunk[x & self.chunk_mask, y & self.chunk_mask] = value
+            #
+            nb_cells = len(cells)
+        #
+        self.chunks[key] = chunk
+        self.chunks_nb_cells[key] = nb_cells
+        #
+        return chunk
+
+    #
+    def _update_chunk_nb_cells(self, key: tuple[int, int]) -> None:
+        """Recount the cells of a dense chunk after a bulk modification, and free it if it is empty."""
+        #
+        nb_cells: int = int(np.count_nonzero(self.chunks[key] != EMPTY_VALUE))
+        #
+        if nb_cells == 0:
+            del self.chunks[key]
+            del self.chunks_nb_cells[key]
+        else:
+            self.chunks_nb_cells[key] = nb_cells
+
+    #
+    def set(self, x: int, y: int, value: int) -> None:
+        #
+        if value < 0:
+            self.clear_cell(x, y)
+            return
+
+        #
+        key: tuple[int, int] = (x >> self.chunk_size_bits, y >> self.chunk_size_bits)
+        #
+        chunk: Optional[np.ndarray] = self.chunks.get(key)
+        #
+        if chunk is None:
+            #
+            cells: Optional[dict[tuple[int, int], int]] = self.sparse_chunks.get(key)
+            #
+            if cells is None:
+                cells = {}
+                self.sparse_chunks[key] = cells
+            #
+            if (x, y) in cells or len(cells) < self.sparse_max_cells_per_chunk:
+                cells[(x, y)] = value
+                return
+            # Too many cells for a sparse chunk
+            chunk = self._new_chunk(key)
+
+        #
+        lx: int = x & self.chunk_mask
+        ly: int = y & self.chunk_mask
+        #
+        if chunk[lx, ly] == EMPTY_VALUE:
+            self.chunks_nb_cells[key] += 1
+        #
+        chunk[lx, ly] = value
+
+    #
+    def clear_cell(self, x: int, y: int) -> None:
+        #
+        key: tuple[int, int] = (x >> self.chunk_size_bits, y >> self.chunk_size_bits)
+        #
+        chunk: Optional[np.ndarray] = self.chunks.get(key)
+        #
+        if chunk is not None:
+            #
+            lx: int = x & self.chunk_mask
+            ly: int = y & self.chunk_mask
+            #
+            if chunk[lx, ly] != EMPTY_VALUE:
+                #
+                chunk[lx, ly] = EMPTY_VALUE
+                self.chunks_nb_cells[key] -= 1
+                #
+                if self.chunks_nb_cells[key] == 0:
+                    del self.chunks[key]
+                    del self.chunks_nb_cells[key]
+            #
+            return
+
+        #
+        cells: Optional[dict[tuple[int, int], int]] = self.sparse_chunks.get(key)
+        #
+        if cells is not None:
+            #
+            cells.pop((x, y), None)
+            #
+            if not cells:
+                del self.sparse_chunks[key]
+
+    #
+    def _chunks_keys_in_area(self, x_0: int, y_0: int, x_1: int, y_1: int) -> Iterator[tuple[int, int]]:
+        """Keys of all the chunks (allocated or not) overlapping the area [x_0, x_1[ x [y_0, y_1[."""
+        #
+        cx: int
+        cy: int
+        for cx in range(x_0 >> self.chunk_size_bits, ((x_1 - 1) >> self.chunk_size_bits) + 1):
+            for cy in range(y_0 >> self.chunk_size_bits, ((y_1 - 1) >> self.chunk_size_bits) + 1):
+                yield (cx, cy)
+
+    #
+    def _chunk_slices(self, key: tuple[int, int], x_0: int, y_0: int, x_1: int, y_1: int) -> tuple[slice, slice, slice, slice]:
+        """Slices of the intersection of the chunk key with the area, in the chunk and in an array of the area."""
+        #
+        chunk_x: int = key[0] << self.chunk_size_bits
+        chunk_y: int = key[1] << self.chunk_size_bits
+        #
+        ix_0: int = max(x_0, chunk_x)
+        iy_0: int = max(y_0, chunk_y)
+        ix_1: int = min(x_1, chunk_x + self.chunk_size)
+        iy_1: int = min(y_1, chunk_y + self.chunk_size)
+        #
+        return (
+            slice(ix_0 - chunk_x, ix_1 - chunk_x), slice(iy_0 - chunk_y, iy_1 - chunk_y),
+            slice(ix_0 - x_0, ix_1 - x_0), slice(iy_0 - y_0, iy_1 - y_0)
+        )
+
+    #
+    def set_area(self, x_0: int, y_0: int, x_1: int, y_1: int, value: int) -> None:
+        """Set all the cases of the area [x_0, x_1[ x [y_0, y_1[ to value (a negative value clears them)."""
+        #
+        if x_0 >= x_1 or y_0 >= y_1:
+            return
+        #
+        if value < 0:
+            value = EMPTY_VALUE
+
+        #
+        key: tuple[int, int]
+        for key in self._chunks_keys_in_area(x_0, y_0, x_1, y_1):
+            #
+            chunk: Optional[np.ndarray] = self.chunks.get(key)
+            #
+            if chunk is None:
+                #
+                if value == EMPTY_VALUE:
+                    # Only the sparse cells of the area have to be removed
+                    cells: Optional[dict[tuple[int, int], int]] = self.sparse_chunks.get(key)
+                    #
+                    if cells is not None:
+                        #
+                        for case in [case for case in cells if x_0 <= case[0] < x_1 and y_0 <= case[1] < y_1]:
+                            del cells[case]
+                        #
+                        if not cells:
+                            del self.sparse_chunks[key]
+                    #
+                    continue
+                #
+                chunk = self._new_chunk(key)
+
+            #
+            sx, sy, _, _ = self._chunk_slices(key, x_0, y_0, x_1, y_1)
+            chunk[sx, sy] = value
+            #
+            self._update_chunk_nb_cells(key)
+
+    #
+    def set_cells(self, xs: np.ndarray, ys: np.ndarray, values: int | np.ndarray) -> None:
+        """Set the cases (xs[i], ys[i]) to values (or values[i]) at once, the negative values clear the cases."""
+        #
+        xs = np.asarray(xs, dtype=np.int64).ravel()
+        ys = np.asarray(ys, dtype=np.int64).ravel()
+        vals: np.ndarray = np.broadcast_to(np.asarray(values, dtype=np.int32), xs.shape)
+        vals = np.where(vals < 0, EMPTY_VALUE, vals).astype(np.int32)
+        #
+        if len(xs) == 0:
+            return
+
+        # Group the cases by chunk, with each chunk key packed in one int64 (a 2D np.unique on rows is much slower)
+        packed_keys: np.ndarray = ((xs >> self.chunk_size_bits) << 32) | ((ys >> self.chunk_size_bits) & 0xffffffff)
+        # Stable, so the last value still wins for the duplicated cases
+        order: np.ndarray = np.argsort(packed_keys, kind="stable")
+        sorted_keys: np.ndarray = packed_keys[order]
+        bounds: np.ndarray = np.concatenate(([0], np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1, [len(sorted_keys)]))
+
+        #
+        i: int
+        for i in range(len(bounds) - 1):
+            #
+            packed_key: int = int(sorted_keys[bounds[i]])
+            # Arithmetic shift for x, and sign extension of the low 32 bits for y (negative chunks coordinates)
+            key: tuple[int, int] = (packed_key >> 32, ((packed_key & 0xffffffff) ^ 0x80000000) - 0x80000000)
+            sel: np.ndarray = order[bounds[i]:bounds[i+1]]
+            #
+            chunk: Optional[np.ndarray] = self.chunks.get(key)
+            #
+            if chunk is None:
+                # Few cells in a not allocated chunk: keep them sparse
+                cells: dict[tuple[int, int], int] = self.sparse_chunks.get(key, {})
+                if len(cells) + len(sel) <= self.sparse_max_cells_per_chunk or not np.any(vals[sel] != EMPTY_VALUE):
+                    #
+                    j: int
+                    for j in sel.tolist():
+                        self.set(int(xs[j]), int(ys[j]), int(vals[j]))
+                    #
+                    continue
+                #
+                chunk = self._new_chunk(key)
+
+            # Last value wins for duplicated cases, like the successive assignments
+            chunk[xs[sel] & self.chunk_mask, ys[sel] & self.chunk_mask] = vals[sel]
+            #
+            self._update_chunk_nb_cells(key)
+
+    #
+    def replace_value(self, old_value: int, new_value: int) -> int:
+        """Replace all the cells with old_value by new_value (a negative value clears them), returns the number of cells changed."""
+        #
+        if new_value < 0:
+            new_value = EMPTY_VALUE
+        #
+        nb_changed: int = 0
+
+        #
+        key: tuple[int, int]
+        for key in list(self.chunks.keys()):
+            #
+            chunk: np.ndarray = self.chunks[key]
+            mask: np.ndarray = chunk == old_value
+            nb: int = int(np.count_nonzero(mask))
+            #
+            if nb > 0:
+                chunk[mask] = new_value
+                nb_changed += nb
+                self._update_chunk_nb_cells(key)
+
+        #
+        for key in list(self.sparse_chunks.keys()):
+            #
+            cells: dict[tuple[int, int], int] = self.sparse_chunks[key]
+            #
+            for case in [case for case, value in cells.items() if value == old_value]:
+                #
+                nb_changed += 1
+                #
+                if new_value == EMPTY_VALUE:
+                    del cells[case]
+                else:
+                    cells[case] = new_value
+            #
+            if not cells:
+                del self.sparse_chunks[key]
+
+        #
+        return nb_changed
+
+    #
+    def get_cells_with_value(self, value: int) -> list[tuple[int, int]]:
+        #
+        result: list[tuple[int, int]] = []
+
+        #
+        key: tuple[int, int]
+        chunk: np.ndarray
+        for key, chunk in self.chunks.items():
+            #
+            lxs, lys = np.nonzero(chunk == value)
+            result.extend(zip(((key[0] << self.chunk_size_bits) + lxs).tolist(), ((key[1] << self.chunk_size_bits) + lys).tolist()))
+
+        #
+        cells: dict[tuple[int, int], int]
+        for cells in self.sparse_chunks.values():
+            result.extend(case for case, v in cells.items() if v == value)
+
+        #
+        return result
+
+    #
+    def get_chunk_view(self, chunk_x: int, chunk_y: int) -> Optional[np.ndarray]:
+        """Read-only view (no copy) of a dense chunk, None if the chunk is not dense."""
+        #
+        chunk: Optional[np.ndarray] = self.chunks.get((chunk_x, chunk_y))
+        #
+        if chunk is None:
+            return None
+        #
+        view: np.ndarray = chunk.view()
+        view.flags.writeable = False
+        #
+        return view
+
+    #
+    def export_area(self, x_0: int, y_0: int, x_1: int, y_1: int) -> np.ndarray:
+        """Values of the area [x_0, x_1[ x [y_0, y_1[ in an int32 array indexed [x - x_0, y - y_0]. When the area is exactly a dense chunk, a read-only view is returned without copy."""
+        #
+        if x_1 - x_0 == self.chunk_size and y_1 - y_0 == self.chunk_size and (x_0 & self.chunk_mask) == 0 and (y_0 & self.chunk_mask) == 0:
+            #
+            view: Optional[np.ndarray] = self.get_chunk_view(x_0 >> self.chunk_size_bits, y_0 >> self.chunk_size_bits)
+            #
+            if view is not None:
+                return view
+
+        #
+        area: np.ndarray = np.full((max(0, x_1 - x_0), max(0, y_1 - y_0)), EMPTY_VALUE, dtype=np.int32)
+        #
+        if area.size == 0:
+            return area
+
+        #
+        key: tuple[int, int]
+        for key in self._chunks_keys_in_area(x_0, y_0, x_1, y_1):
+            #
+            chunk: Optional[np.ndarray] = self.chunks.get(key)
+            #
+            if chunk is not None:
+                #
+                sx, sy, ax, ay = self._chunk_slices(key, x_0, y_0, x_1, y_1)
+                area[ax, ay] = chunk[sx, sy]
+                continue
+            #
+            cells: Optional[dict[tuple[int, int], int]] = self.sparse_chunks.get(key)
+            #
+            if cells is not None:
+                #
+                x: int
+                y: int
+                value: int
+                for (x, y), value in cells.items():
+                    if x_0 <= x < x_1 and y_0 <= y < y_1:
+                        area[x - x_0, y - y_0] = value
+
+        #
+        return area
+
+    #
+    def find_empty_case(self, x_min: int, x_max: int, y_min: int, y_max: int) -> Optional[tuple[int, int]]:
+        """Random empty case in [x_min, x_max] x [y_min, y_max] (bounds included), None if there are none."""
+        #
+        if x_min > x_max or y_min > y_max:
+            return None
+        #
+        area: np.ndarray = self.export_area(x_min, y_min, x_max + 1, y_max + 1)
+        empty_cases: np.ndarray = np.flatnonzero(area == EMPTY_VALUE)
+        #
+        if len(empty_cases) == 0:
+            return None
+        #
+        i: int = int(empty_cases[random.randrange(len(empty_cases))])
+        #
+        return (x_min + i // area.shape[1], y_min + i % area.shape[1])
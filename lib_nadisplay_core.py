@@ -8,7 +8,7 @@ Main file for lib_nadisplay, all front-end elements and abstract classes of fron
 """
 
 
-from typing import Callable, Any, Optional, Type, cast
+from typing import Callable, Any, ContextManager, Optional, Type, cast
 
 import time
 
@@ -18,6 +18,9 @@ import atexit
 
 import os
 import pickle
+from collections import deque
+#
+import numpy as np
 
 from lib_nadisplay_colors import ND_Color
 from lib_nadisplay_point import ND_Point
@@ -25,6 +28,12 @@ from lib_nadisplay_rects import ND_Rect
 from lib_nadisplay_position import ND_Position
 from lib_nadisplay_transformation import ND_Transformation
 from lib_nadisplay_quadtree import ND_Quadtree
+from lib_nadisplay_spatial_index import ND_SpatialIndex_NP
+from lib_nadisplay_scheduler import ND_FixedTimestepScheduler, ND_FrameStats
+from lib_nadisplay_double_buffer import ND_DoubleBuffer
+from lib_nadisplay_jobs import ND_JobsPool, ND_Job
+from lib_nadisplay_global_vars import ND_GlobalVarsStore, ND_GlobalVarsSnapshot, ND_GlobalVarsTransaction
+from lib_nadisplay_profiler import ND_FrameProfiler
 
 import lib_nadisplay_events as nd_event
 
@@ -34,9 +43,8 @@ class ND_MainApp:
     #
     def __init__(self, DisplayClass: Type["ND_Display"], WindowClass: Type["ND_Window"], EventsManagerClass: Type["ND_EventsManager"], global_vars_to_save: list[str] = [], path_to_global_vars_save_file: str = "") -> None:
         #
-        self.global_vars: dict[str, Any] = {}
-        self.global_vars_muts: dict[str, Lock] = {}
-        self.global_vars_creation_mut: Lock = Lock()
+        # Lock-free reads of immutable snapshots, copy on write for the changes
+        self.global_vars_store: ND_GlobalVarsStore = ND_GlobalVarsStore()
         #
         self.global_vars_to_save: list[str] = global_vars_to_save
         self.path_to_global_vars_save_file: str = path_to_global_vars_save_file
@@ -48,8 +56,16 @@ class ND_MainApp:
         self.frame_duration_physics: float = 1000.0 / float(self.fps_physics)
         self.frame_duration_other_fns: float = 1000.0 / float(self.fps_other_fns)
         #
+        # The "physics" queue is run with a fixed timestep (frame_duration_physics), the other queues get the real elapsed time
+        self.max_physics_steps_per_frame: int = 5
+        self.physics_scheduler: ND_FixedTimestepScheduler = ND_FixedTimestepScheduler(self.frame_duration_physics, self.max_physics_steps_per_frame)
+        #
+        self.frame_stats: ND_FrameStats = ND_FrameStats()
         self.current_fps: int = 0
         #
+        # Per frame timings and draw calls, disabled by default (enable_profiler)
+        self.profiler: ND_FrameProfiler = ND_FrameProfiler(self)
+        #
         self.is_running: bool = False
         self.is_threading: bool = True
         #
@@ -66,8 +82,42 @@ class ND_MainApp:
         }
         self.mainloop_queue_fns_mutex: Lock = Lock()
         #
-        self.events_functions: dict[str, list[Callable[[ND_MainApp], None]]] = {}
-        self.events_functions_mutex: Lock = Lock()
+        # Typed subscriptions to the events: (event type, key) -> functions, the key is given by event.get_dispatch_key()
+        # (the key name for the keyboard events, the job name for the jobs events), None to receive the events of all the keys
+        self.events_subscribers: dict[tuple[Type[nd_event.ND_Event], Optional[str]], list[Callable[[ND_MainApp, Any], None]]] = {}
+        # Functions to call for a concrete event type and key (with the subscriptions to its parent types and to all the keys),
+        # resolved at the first event and cleared at each (un)subscription
+        self.events_handlers_cache: dict[tuple[type, Optional[str]], list[Callable[[ND_MainApp, Any], None]]] = {}
+        self.events_subscribers_mutex: Lock = Lock()
+        #
+        # Internal handling of the events by type, the handler returns False if the event must not be dispatched further
+        self.events_internal_handlers: dict[type, Callable[[Any], bool]] = {
+            nd_event.ND_EventQuit: self.handle_quit_event,
+            nd_event.ND_EventWindowShown: self.handle_window_visibility_event,
+            nd_event.ND_EventWindowHidden: self.handle_window_visibility_event,
+            nd_event.ND_EventWindowClose: self.handle_window_state_event,
+            nd_event.ND_EventWindowMoved: self.handle_window_state_event,
+            nd_event.ND_EventWindowResized: self.handle_window_state_event
+        }
+        # Events posted by the application itself (ex: jobs done), handled before the events of the backend
+        self.posted_events: deque[nd_event.ND_Event] = deque()
+        #
+        # Events drained from the backend and waiting to be dispatched.
+        # When it is full, the policy ("drop_oldest" or "drop_newest") decides which event is dropped,
+        # the events that would leave the application in a wrong state (quit, window close, key / button releases) are never dropped.
+        self.events_queue: deque[nd_event.ND_Event] = deque()
+        self.events_queue_max_size: int = 1024
+        self.events_queue_drop_policy: str = "drop_oldest"
+        # Maximum number of events drained from the backend in one pump
+        self.max_events_per_pump: int = 4096
+        #
+        self.nb_events_received: int = 0
+        self.nb_events_coalesced: int = 0
+        self.nb_events_dropped: int = 0
+        self.nb_events_dispatched: int = 0
+        #
+        # Process pool for the CPU-heavy jobs, the processes are started at the first job
+        self.jobs_pool: ND_JobsPool = ND_JobsPool(self)
         #
         self.threads: list[Thread] = []
         self.threads_names: list[str] = []
@@ -75,6 +125,10 @@ class ND_MainApp:
         self.mutex_threads_creation: Lock = Lock()
         self.threads_condition: Condition = Condition()
         #
+        # States shared between the update threads and the display thread
+        self.snapshots: dict[str, ND_DoubleBuffer] = {}
+        self.snapshots_mutex: Lock = Lock()
+        #
         #
         if self.path_to_global_vars_save_file != "" and os.path.exists(self.path_to_global_vars_save_file):
             #
@@ -92,6 +146,8 @@ class ND_MainApp:
         #
         if self.is_threading:
             self.waiting_all_threads()
+        #
+        self.jobs_pool.shutdown()
 
     #
     def get_time_msec(self) -> float:
@@ -108,19 +164,119 @@ class ND_MainApp:
         if self.display is not None:
             self.display.wait_time_msec(delay_in_msec)
         #
-        time.sleep(delay_in_msec / 1000.0)
+        else:
+            time.sleep(delay_in_msec / 1000.0)
+
+    #
+    def wait_next_frame(self, previous_deadline: float, frame_duration: float) -> float:
+        """
+        Wait until previous_deadline + frame_duration, and returns this new deadline.
+        The deadlines don't depend on the sleeps precision, so the frame rate doesn't drift.
+        If the frame is late, there is no wait and the next deadlines restart from now (no burst of frames to catch up).
+        """
+        #
+        deadline: float = previous_deadline + frame_duration
+        current_time: float = self.get_time_msec()
+        #
+        if current_time >= deadline:
+            return current_time
+        #
+        self.wait_time_msec(deadline - current_time)
+        #
+        return deadline
+
+    #
+    def set_target_fps(self, fps_display: Optional[int] = None, fps_physics: Optional[int] = None, fps_other_fns: Optional[int] = None) -> None:
+        #
+        if fps_display is not None:
+            self.fps_display = fps_display
+            self.frame_duration_display = 1000.0 / float(fps_display)
+        #
+        if fps_physics is not None:
+            self.fps_physics = fps_physics
+            self.frame_duration_physics = 1000.0 / float(fps_physics)
+            self.physics_scheduler.set_step_duration(self.frame_duration_physics)
+        #
+        if fps_other_fns is not None:
+            self.fps_other_fns = fps_other_fns
+            self.frame_duration_other_fns = 1000.0 / float(fps_other_fns)
+
+    #
+    def get_interpolation_alpha(self) -> float:
+        """
+        Fraction of physics step elapsed since the last physics step, in [0, 1[.
+        The rendering can display previous_state + alpha * (current_state - previous_state) to stay smooth when the display and physics rates differ.
+        """
+        #
+        return self.physics_scheduler.alpha
+
+    #
+    def get_frame_stats(self) -> dict[str, float]:
+        #
+        stats: dict[str, float] = self.frame_stats.get_stats()
+        #
+        stats["physics_steps"] = float(self.physics_scheduler.nb_steps)
+        stats["physics_overruns"] = float(self.physics_scheduler.nb_overruns)
+        stats["physics_dropped_time"] = self.physics_scheduler.dropped_time
+        #
+        return stats
+
+    #
+    def begin_frame(self) -> float:
+        """
+        Returns the time elapsed since the start of the previous frame.
+        """
+        #
+        delta: float = self.frame_stats.begin_frame(self.get_time_msec())
+        #
+        self.current_fps = int(round(self.frame_stats.get_fps()))
+        #
+        return delta
+
+    #
+    def end_frame(self) -> None:
+        #
+        self.frame_stats.end_frame(self.get_time_msec())
+        #
+        if self.profiler.enabled:
+            self.profiler.end_frame()
+
+    #
+    def enable_profiler(self, history_size: int = 300) -> None:
+        """
+        Record the timings of each frame (see ND_FrameProfiler), to call after the import of all the elements classes used.
+        """
+        #
+        if history_size != self.profiler.frames.maxlen:
+            self.profiler.frames = deque(self.profiler.frames, maxlen=history_size)
+        #
+        self.profiler.enable(ND_Window, ND_Scene, ND_Elt)
+
+    #
+    def disable_profiler(self) -> None:
+        #
+        self.profiler.disable()
+
+    #
+    def update_display(self) -> None:
+        #
+        if self.display is None:
+            return
+        #
+        if not self.profiler.enabled:
+            self.display.update_display()
+            return
+        #
+        t0: float = time.perf_counter()
+        self.display.update_display()
+        self.profiler.add_time("display_ms", (time.perf_counter() - t0) * 1000.0)
 
     #
     def global_vars_save_to_path(self, path: str, vars_to_save: list[str]) -> None:
         #
-        data_to_save: dict[str, Any] = {}
+        values: ND_GlobalVarsSnapshot = self.global_vars_store.snapshot()
         #
-        for var in vars_to_save:
-            if var in self.global_vars:
-                #
-                # print(f"DEBUG | global vars save {var}={self.global_vars[var]}")
-                #
-                data_to_save[var] = self.global_vars[var]
+        data_to_save: dict[str, Any] = {var: values[var] for var in vars_to_save if var in values}
         #
         with open(path, "wb") as f:
             pickle.dump(data_to_save, f)
@@ -134,11 +290,7 @@ class ND_MainApp:
         with open(path, "rb") as f:
             data_to_load: dict[str, Any] = pickle.load(f)
         #
-        for key in data_to_load:
-            #
-            # print(f"DEBUG | global vars load {key}={data_to_load[key]}")
-            #
-            self.global_vars_set(key, data_to_load[key])
+        self.global_vars_store.set_many(data_to_load)
         #
         print(f"MainApp : loaded global vars from {path}")
         #
@@ -146,209 +298,182 @@ class ND_MainApp:
     #
     def global_vars_create(self, var_name: str, var_value: Any, if_exists: str = "ignore") -> None:
         #
-        self.global_vars_creation_mut.acquire()
-        #
-        if var_name not in self.global_vars:
-            #
-            self.global_vars[var_name] = var_value
-            self.global_vars_muts[var_name] = Lock()
-            #
-        else:
-            #
-            if if_exists == "override":
-                self.global_vars[var_name] = var_value
-            #
-        #
-        self.global_vars_creation_mut.release()
+        if not self.global_vars_store.set_default(var_name, var_value) and if_exists == "override":
+            self.global_vars_store.set(var_name, var_value)
 
     #
     def global_vars_get_optional(self, var_name: str) -> Optional[Any]:
         #
-        if var_name in self.global_vars:
-            return self.global_vars[var_name]
-        return None
+        return self.global_vars_store.get(var_name)
 
     # If is in global vars, returns it, else return default_value, all the cases, that is not None
     def global_vars_get_default(self, var_name: str, default_value: Any) -> Any:
         #
-        if var_name in self.global_vars:
-            return self.global_vars[var_name]
-        #
-        return default_value
+        return self.global_vars_store.get(var_name, default_value)
 
     # Get Not None
     def global_vars_get(self, var_name: str) -> Any:
         #
-        if var_name in self.global_vars:
-            return self.global_vars[var_name]
+        values: ND_GlobalVarsSnapshot = self.global_vars_store.values
+        #
+        if var_name in values:
+            return values[var_name]
         #
         raise IndexError(f"CRITICAL ERROR !\nGlobal Vars Error: Index {var_name} not found in global variables !")
 
     #
     def global_vars_set(self, var_name: str, var_value: Any, if_not_exists: str = "create") -> None:
         #
-        if var_name in self.global_vars:
-            #
-            with self.global_vars_muts[var_name]:
-                #
-                self.global_vars[var_name] = var_value
-            #
-        else:
-            #
-            if if_not_exists == "create":
-                #
-                with self.global_vars_creation_mut:
-                    #
-                    self.global_vars[var_name] = var_value
-                    self.global_vars_muts[var_name] = Lock()
+        if var_name in self.global_vars_store or if_not_exists == "create":
+            self.global_vars_store.set(var_name, var_value)
+
+    #
+    def global_vars_snapshot(self) -> ND_GlobalVarsSnapshot:
+        """
+        Consistent read-only view of all the global variables, without any lock.
+        """
+        #
+        return self.global_vars_store.snapshot()
+
+    #
+    def global_vars_transaction(self) -> ContextManager[ND_GlobalVarsTransaction]:
+        """
+        Usage: with main_app.global_vars_transaction() as tx: tx["a"] = 1; tx["b"] = 2
+        Raises ND_GlobalVarsConflictError at the end if a variable read in the transaction was changed by another thread meanwhile.
+        """
+        #
+        return self.global_vars_store.transaction()
 
     #
+    def global_vars_run_transaction(self, fn: Callable[[ND_GlobalVarsTransaction], Any], max_retries: int = 100) -> Any:
+        """
+        Usage: main_app.global_vars_run_transaction(lambda tx: tx.__setitem__("a", tx.get("a", 0) + 1))
+        fn(tx) is called again in a new transaction after each conflict.
+        """
+        #
+        return self.global_vars_store.run_transaction(fn, max_retries)
+
+    #
+    def global_vars_increment(self, var_name: str, delta: int | float = 1) -> int | float:
+        #
+        return self.global_vars_store.increment(var_name, delta)
+
+    #
+    def global_vars_subscribe(self, var_name: str, fn: Callable[[str, Any], None]) -> None:
+        #
+        self.global_vars_store.subscribe(var_name, fn)
+
+    #
+    def global_vars_unsubscribe(self, var_name: str, fn: Callable[[str, Any], None]) -> None:
+        #
+        self.global_vars_store.unsubscribe(var_name, fn)
+
+    #
+    def global_vars_create_array(self, array_name: str, shape: int | tuple[int, ...], dtype: Any = np.float64, fill_value: int | float = 0) -> np.ndarray:
+        #
+        return self.global_vars_store.create_array(array_name, shape, dtype, fill_value)
+
+    #
+    def global_vars_get_array(self, array_name: str) -> np.ndarray:
+        #
+        return self.global_vars_store.get_array(array_name)
+
+    # The lists and dicts are copied at each change (the lists / dicts got by the readers are never modified),
+    # so each change costs O(length of the list or dict + number of global variables).
+    # For the lists growing a lot or updated very often, prefer the typed arrays (global_vars_create_array / global_vars_get_array).
     def global_vars_list_append(self, var_name: str, obj_value: Any, if_not_exists: str = "create") -> None:
         #
-        if var_name in self.global_vars:
-            #
-            with self.global_vars_muts[var_name]:
-                #
-                self.global_vars[var_name].append(obj_value)
-            #
+        if if_not_exists == "create":
+            self.global_vars_store.update(var_name, lambda lst: lst + [obj_value], [])
+        #
         else:
-            #
-            if if_not_exists == "create":
-                #
-                with self.global_vars_creation_mut:
-                    #
-                    self.global_vars[var_name] = [obj_value]
-                    self.global_vars_muts[var_name] = Lock()
+            self.global_vars_store.update_existing(var_name, lambda lst: lst + [obj_value])
 
     #
     def global_vars_list_remove(self, var_name: str, obj_value: Any, if_not_exists: str = "ignore") -> None:
         #
-        if var_name in self.global_vars:
+        def removed(lst: list[Any]) -> list[Any]:
             #
-            with self.global_vars_muts[var_name]:
-                #
-                self.global_vars[var_name].remove(obj_value)
-            #
-        else:
+            new_lst: list[Any] = list(lst)
+            new_lst.remove(obj_value)
             #
-            if not if_not_exists == "error":
-                raise UserWarning("#TODO: complete error message")
+            return new_lst
+        #
+        if not self.global_vars_store.update_existing(var_name, removed) and if_not_exists == "error":
+            raise UserWarning(f"Error: global variable {var_name} doesn't exist")
 
     #
     def global_vars_list_del_at_idx(self, var_name: str, idx: int, if_not_exists: str = "ignore") -> None:
         #
-        if var_name in self.global_vars:
-            #
-            with self.global_vars_muts[var_name]:
-                #
-                del self.global_vars[var_name][idx]
-            #
-        else:
-            #
-            if not if_not_exists == "error":
-                raise UserWarning("#TODO: complete error message")
+        if not self.global_vars_store.update_existing(var_name, lambda lst: lst[:idx] + lst[idx + 1:] if idx != -1 else lst[:-1]) and if_not_exists == "error":
+            raise UserWarning(f"Error: global variable {var_name} doesn't exist")
 
     #
     def global_vars_list_length(self, var_name: str) -> int:
         #
-        if var_name in self.global_vars:
-            #
-            return len(self.global_vars[var_name])
-            #
-        else:
-            #
-            return 0
+        return len(self.global_vars_store.get(var_name, []))
 
     #
     def global_vars_list_get_at_idx(self, var_name: str, idx: int) -> Optional[Any]:
         #
-        if var_name in self.global_vars:
-            #
-            if idx < len(self.global_vars[var_name]):
-                return self.global_vars[var_name][idx]
-            #
-            else:
-                return None
-            #
-        else:
-            #
+        lst: Optional[list[Any]] = self.global_vars_store.get(var_name)
+        #
+        if lst is None or idx >= len(lst):
             return None
+        #
+        return lst[idx]
 
     #
     def global_vars_list_set_at_idx(self, var_name: str, idx: int, obj_value: Any, if_not_exists: str = "error", if_idx_not_in_list_length: str = "error") -> None:
         #
-        if var_name in self.global_vars:
+        def with_value_set(lst: list[Any]) -> list[Any]:
             #
-            with self.global_vars_muts[var_name]:
+            if idx >= len(lst):
                 #
-                if idx < len(self.global_vars[var_name]):
-                    self.global_vars[var_name][idx] = obj_value
-                else:
-                    #
-                    if if_idx_not_in_list_length == "error":
-                        #
-                        raise UserWarning("Error, #TODO: complete error message")
+                if if_idx_not_in_list_length == "error":
+                    raise UserWarning(f"Error: index {idx} out of the global list {var_name} of length {len(lst)}")
+                #
+                return lst
             #
-        else:
+            new_lst: list[Any] = list(lst)
+            new_lst[idx] = obj_value
             #
-            if if_not_exists == "error":
-                #
-                raise UserWarning("Error, #TODO: complete error message")
+            return new_lst
+
+        #
+        if not self.global_vars_store.update_existing(var_name, with_value_set) and if_not_exists == "error":
+            raise UserWarning(f"Error: global variable {var_name} doesn't exist")
 
     #
     def global_vars_dict_set(self, var_name: str, dict_key: Any, obj_value: Any, if_not_exists: str = "ignore") -> None:
         #
-        if var_name in self.global_vars:
-            #
-            with self.global_vars_muts[var_name]:
-                #
-                self.global_vars[var_name][dict_key] = obj_value
-            #
+        if if_not_exists == "create":
+            self.global_vars_store.update(var_name, lambda dct: {**dct, dict_key: obj_value}, {})
+        #
         else:
-            #
-            if if_not_exists == "create":
-                #
-                with self.global_vars_creation_mut:
-                    #
-                    self.global_vars[var_name] = {
-                        dict_key: obj_value
-                    }
-                    self.global_vars_muts[var_name] = Lock()
+            self.global_vars_store.update_existing(var_name, lambda dct: {**dct, dict_key: obj_value})
 
     #
     def global_vars_dict_get(self, var_name: str, dict_key: Any, if_not_exists: str = "none") -> Any:
         #
-        if var_name in self.global_vars:
-            #
-            return self.global_vars[var_name][dict_key]
-            #
-        else:
-            #
-            if if_not_exists == "error":
-                #
-                raise UserWarning("Error, #TODO: complete error message")
+        if var_name in self.global_vars_store:
             #
-            elif if_not_exists == "none":
-                #
-                return None
+            return self.global_vars_store.get(var_name)[dict_key]
+        #
+        if if_not_exists == "error":
+            raise UserWarning(f"Error: global variable {var_name} doesn't exist")
+        #
+        return None
 
     #
     def global_vars_dict_del(self, var_name: str, dict_key: Any, if_not_exists: str = "ignore") -> None:
         #
-        if var_name in self.global_vars:
-            #
-            with self.global_vars_muts[var_name]:
-                #
-                del self.global_vars[var_name][dict_key]
-            #
-        else:
-            #
-            if not if_not_exists == "error":
-                raise UserWarning("#TODO: complete error message")
+        if not self.global_vars_store.update_existing(var_name, lambda dct: {k: v for k, v in dct.items() if k != dict_key}) and if_not_exists == "error":
+            raise UserWarning(f"Error: global variable {var_name} doesn't exist")
 
     #
     def global_vars_exists(self, var_name: str) -> bool:
-        return var_name in self.global_vars
+        return var_name in self.global_vars_store
 
     #
     def get_element(self, window_id: int, scene_id: str, elt_id: str) -> Optional["ND_Elt"]:
@@ -432,46 +557,189 @@ class ND_MainApp:
         return self.mainloop_queue_functions[mainloop_name]
 
     #
-    def add_function_to_event_fns_queue(self, event_name: str, fn: Callable[["ND_MainApp"], None]) -> None:
+    def create_snapshot_buffer(self, snapshot_name: str, factory: Callable[[], Any], copy_fn: Optional[Callable[[Any, Any], None]] = None) -> ND_DoubleBuffer:
+        """
+        Create (or returns if it already exists) a double-buffered state.
+        The mainloop functions write into get_back() and call publish(), the render functions read it with `with buffer.read() as state:`.
+        """
         #
-        with self.events_functions_mutex:
+        with self.snapshots_mutex:
             #
-            if event_name not in self.events_functions:
-                #
-                self.events_functions[event_name] = []
+            if snapshot_name not in self.snapshots:
+                self.snapshots[snapshot_name] = ND_DoubleBuffer(factory, copy_fn)
             #
-            self.events_functions[event_name].append( fn )
+            return self.snapshots[snapshot_name]
+
+    #
+    def get_snapshot_buffer(self, snapshot_name: str) -> ND_DoubleBuffer:
+        #
+        if snapshot_name not in self.snapshots:
+            raise UserWarning(f"Error: there is no snapshot buffer named {snapshot_name}")
         #
+        return self.snapshots[snapshot_name]
 
     #
-    def display_thread(self) -> None:
+    def submit_job(
+        self,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...] = (),
+        kwargs: Optional[dict[str, Any]] = None,
+        arrays: Optional[dict[str, np.ndarray]] = None,
+        callback: Optional[Callable[["ND_MainApp", ND_Job], None]] = None,
+        deliver_queue: str = "events",
+        job_name: str = "job",
+        block: bool = False
+    ) -> int:
+        """
+        Run fn(*args, **kwargs, **arrays) in a worker process, fn must be a top-level function.
+        When it is done, callback(main_app, job) is called in the thread of the mainloop queue deliver_queue ("events" for the events loop),
+        and an ND_EventJobDone event is posted (subscribe_to_event(ND_EventJobDone, fn, key=job_name) to receive it).
+        Returns the job id, or -1 if too many jobs are already in flight.
+        """
+        #
+        return self.jobs_pool.submit(fn, args, kwargs, arrays, callback, deliver_queue, job_name, block)
 
-        start_time: float = 0.0
-        elapsed_time: float = 0.0
-        delay: float = 0.0  # Delay with first frame
+    #
+    def cancel_job(self, job_id: int) -> bool:
+        #
+        return self.jobs_pool.cancel(job_id)
 
+    #
+    def post_event(self, event: nd_event.ND_Event) -> None:
         #
-        while self.is_running:
+        self.posted_events.append(event)
+
+    #
+    def subscribe_to_event(self, event_type: Type[nd_event.ND_Event], fn: Callable[["ND_MainApp", Any], None], key: Optional[str] = None) -> None:
+        """
+        fn(main_app, event) will be called for each event of type event_type (or of a subclass),
+        only for the given key (key name, job name) if key is not None.
+        """
+        #
+        with self.events_subscribers_mutex:
+            #
+            if (event_type, key) not in self.events_subscribers:
+                self.events_subscribers[(event_type, key)] = []
             #
-            elapsed_time = self.get_time_msec()
-            if start_time != 0:
-                delay = elapsed_time - start_time
-                if delay != 0:
-                    self.current_fps = int(1.0 / delay)
+            self.events_subscribers[(event_type, key)].append(fn)
             #
-            start_time = elapsed_time    # Start of the frame in milliseconds
+            self.events_handlers_cache.clear()
 
+    #
+    def unsubscribe_from_event(self, event_type: Type[nd_event.ND_Event], fn: Callable[["ND_MainApp", Any], None], key: Optional[str] = None) -> None:
+        #
+        with self.events_subscribers_mutex:
             #
-            if self.display is not None:
+            if fn in self.events_subscribers.get((event_type, key), []):
+                self.events_subscribers[(event_type, key)].remove(fn)
+            #
+            self.events_handlers_cache.clear()
+
+    #
+    def get_event_handlers(self, event_type: type, key: Optional[str]) -> list[Callable[["ND_MainApp", Any], None]]:
+        #
+        handlers: Optional[list[Callable[[ND_MainApp, Any], None]]] = self.events_handlers_cache.get((event_type, key))
+        #
+        if handlers is not None:
+            return handlers
+
+        #
+        with self.events_subscribers_mutex:
+            #
+            handlers = []
+            #
+            parent_type: type
+            for parent_type in event_type.__mro__:
+                #
+                handlers += self.events_subscribers.get((parent_type, key), [])
                 #
-                self.display.update_display()
+                if key is not None:
+                    handlers += self.events_subscribers.get((parent_type, None), [])
+            #
+            self.events_handlers_cache[(event_type, key)] = handlers
+        #
+        return handlers
+
+    #
+    def add_function_to_event_fns_queue(self, event_name: str, fn: Callable[["ND_MainApp"], None]) -> None:
+        """
+        Subscription by event name ("keydown_<key>", "keyup_<key>", "job_done_<job name>", "window_close", "window_moved", "window_resized"),
+        the name is translated once here into a typed subscription.
+        """
+        #
+        event_type: Optional[Type[nd_event.ND_Event]] = None
+        key: Optional[str] = None
+        #
+        prefix: str
+        prefix_type: Type[nd_event.ND_Event]
+        for prefix, prefix_type in [("keydown_", nd_event.ND_EventKeyDown), ("keyup_", nd_event.ND_EventKeyUp), ("job_done_", nd_event.ND_EventJobDone)]:
+            #
+            if event_name.startswith(prefix):
+                event_type, key = prefix_type, event_name[len(prefix):]
+                break
+        #
+        if event_type is None:
+            event_type = {
+                "window_close": nd_event.ND_EventWindowClose,
+                "window_moved": nd_event.ND_EventWindowMoved,
+                "window_resized": nd_event.ND_EventWindowResized
+            }.get(event_name)
+        #
+        if event_type is None:
+            print(f"Warning: unknown event name {event_name}, the function {fn} will never be called.")
+            return
+        #
+        self.subscribe_to_event(event_type, lambda main_app, _: fn(main_app), key)
 
-            # Calculate the time taken for this frame
-            elapsed_time = self.get_time_msec() - start_time
+    #
+    def run_mainloop_queue(self, queue_name: str, delta: float) -> None:
+        #
+        t0: float = time.perf_counter() if self.profiler.enabled else 0.0
+        #
+        self.jobs_pool.deliver_finished_jobs(queue_name)
+        #
+        fn: Callable[[ND_MainApp, float], None]
+        for fn in self.get_mainloop_fns_queue(queue_name):
+            fn(self, delta)
+        #
+        if self.profiler.enabled:
+            self.profiler.add_time("queues_ms", (time.perf_counter() - t0) * 1000.0, queue_name)
+
+    #
+    def run_physics_steps(self) -> int:
+        """
+        Run the "physics" queue as many fixed steps as the elapsed time requires (capped to max_physics_steps_per_frame).
+        Returns the number of steps run.
+        """
+        #
+        self.physics_scheduler.max_steps_per_frame = max(1, self.max_physics_steps_per_frame)
+        #
+        nb_steps: int = self.physics_scheduler.advance(self.get_time_msec())
+        #
+        _: int
+        for _ in range(nb_steps):
+            self.run_mainloop_queue("physics", self.physics_scheduler.step_duration)
+        #
+        return nb_steps
+
+    #
+    def display_thread(self) -> None:
+        #
+        next_frame_time: float = self.get_time_msec()
+
+        #
+        while self.is_running:
+            #
+            self.begin_frame()
+
+            #
+            self.update_display()
+
+            #
+            self.end_frame()
 
             # If the frame was rendered faster than the target duration, delay
-            if elapsed_time < self.frame_duration_display:
-                self.wait_time_msec(self.frame_duration_display - elapsed_time)
+            next_frame_time = self.wait_next_frame(next_frame_time, self.frame_duration_display)
 
     #
     def handle_event_to_display_windows(self, event: nd_event.ND_Event) -> None:
@@ -479,14 +747,17 @@ class ND_MainApp:
         if self.display is None:
             return
         #
+        # The mouse position is the same for all the windows
+        mouse_pos: ND_Point = self.events_manager.get_global_mouse_position()
+        #
         win: Optional[ND_Window]
         for win in list(self.display.windows.values()):
             #
-            if win is None or not win.is_hovered_by_mouse():
+            if win is None or not win.contains_global_point(mouse_pos.x, mouse_pos.y):
                 continue
             #
             scene: ND_Scene
-            for scene in win.scenes.values():
+            for scene in win.scenes_list:
                 #
                 scene.handle_event(event)  # Potentiel Blockage ici lors de la fermeture de l'application
 
@@ -533,52 +804,209 @@ class ND_MainApp:
         return ""
 
     #
-    def manage_events(self) -> bool:
+    def coalesce_event(self, event: nd_event.ND_Event) -> bool:
+        """
+        Merge the event into the last event of the queue if they are both mouse motions of the same mouse,
+        or both resizes / moves of the same window. Only the last state matters for these events.
+        Returns True if the event has been merged.
+        """
         #
-        event: Optional[nd_event.ND_Event] = self.events_manager.poll_next_event()
-
+        if not self.events_queue:
+            return False
+        #
+        last: nd_event.ND_Event = self.events_queue[-1]
         #
-        if event is None:
+        if type(last) is not type(event):
             return False
 
         #
-        event_name: str = ""
+        if isinstance(event, nd_event.ND_EventMouseMotion) and isinstance(last, nd_event.ND_EventMouseMotion):
+            #
+            if last.mouse_id != event.mouse_id:
+                return False
+            #
+            last.x, last.y = event.x, event.y
+            last.rel_x += event.rel_x
+            last.rel_y += event.rel_y
+            #
+            return True
 
         #
-        if isinstance(event, nd_event.ND_EventQuit):
+        if isinstance(event, nd_event.ND_EventWindowResized) and isinstance(last, nd_event.ND_EventWindowResized):
             #
-            self.quit()
+            if last.window_id != event.window_id:
+                return False
+            #
+            last.w, last.h = event.w, event.h
+            #
+            return True
+
+        #
+        if isinstance(event, nd_event.ND_EventWindowMoved) and isinstance(last, nd_event.ND_EventWindowMoved):
+            #
+            if last.window_id != event.window_id:
+                return False
+            #
+            last.x, last.y = event.x, event.y
             #
             return True
 
         #
-        elif isinstance(event, nd_event.ND_EventKeyDown) and event.key != "":
-            event_name = f"keydown_{event.key}"
+        return False
+
+    #
+    def is_event_droppable(self, event: nd_event.ND_Event) -> bool:
+        #
+        return not isinstance(event, (
+            nd_event.ND_EventQuit, nd_event.ND_EventWindowClose, nd_event.ND_EventKeyUp, nd_event.ND_EventMouseButtonUp, nd_event.ND_EventJobDone
+        ))
 
+    #
+    def queue_event(self, event: nd_event.ND_Event) -> None:
+        #
+        self.nb_events_received += 1
         #
-        elif isinstance(event, nd_event.ND_EventKeyUp) and event.key != "":
-            event_name = f"keyup_{event.key}"
+        if self.coalesce_event(event):
+            self.nb_events_coalesced += 1
+            return
 
         #
-        elif isinstance(event, nd_event.ND_EventWindow):
+        if len(self.events_queue) >= self.events_queue_max_size and self.is_event_droppable(event):
+            #
+            self.nb_events_dropped += 1
             #
-            if isinstance(event, nd_event.ND_EventWindowShown) or isinstance(event, nd_event.ND_EventWindowHidden):
-                return True
+            if self.events_queue_drop_policy == "drop_newest":
+                return
+            # Drop the oldest event that can be dropped
+            dropped_idx: int = next((i for i, e in enumerate(self.events_queue) if self.is_event_droppable(e)), -1)
             #
-            event_name = self.handle_windows_event(event)
+            if dropped_idx == -1:
+                return
+            #
+            del self.events_queue[dropped_idx]
+
+        #
+        self.events_queue.append(event)
+
+    #
+    def pump_events(self) -> int:
+        """
+        Drain the events posted by the application and all the events waiting in the backend into the events queue, in one batch.
+        Returns the number of events received.
+        """
+        #
+        self.jobs_pool.deliver_finished_jobs("events")
+        #
+        nb_received: int = 0
+        #
+        while self.posted_events:
+            self.queue_event(self.posted_events.popleft())
+            nb_received += 1
+        #
+        event: Optional[nd_event.ND_Event]
+        while nb_received < self.max_events_per_pump:
+            #
+            event = self.events_manager.poll_next_event()
+            #
+            if event is None:
+                break
+            #
+            self.queue_event(event)
+            nb_received += 1
+        #
+        return nb_received
+
+    #
+    def process_events(self, max_events: int = -1) -> int:
+        """
+        Pump the events, then dispatch the queued events (at most max_events, -1 for all of them).
+        The events not dispatched stay in the queue for the next call. Returns the number of events dispatched.
+        """
+        #
+        t0: float = time.perf_counter() if self.profiler.enabled else 0.0
+        #
+        self.pump_events()
+        #
+        nb_events: int = len(self.events_queue) if max_events < 0 else min(max_events, len(self.events_queue))
+        #
+        _: int
+        for _ in range(nb_events):
+            self.dispatch_event(self.events_queue.popleft())
+        #
+        if self.profiler.enabled:
+            self.profiler.add_time("events_ms", (time.perf_counter() - t0) * 1000.0)
+        #
+        return nb_events
+
+    #
+    def get_events_stats(self) -> dict[str, int]:
+        #
+        return {
+            "received": self.nb_events_received,
+            "coalesced": self.nb_events_coalesced,
+            "dropped": self.nb_events_dropped,
+            "dispatched": self.nb_events_dispatched,
+            "queued": len(self.events_queue)
+        }
+
+    #
+    def manage_events(self) -> bool:
+        """
+        Dispatch the next event, returns False if there was no event.
+        """
+        #
+        if not self.events_queue:
+            self.pump_events()
+        #
+        if not self.events_queue:
+            return False
+        #
+        self.dispatch_event(self.events_queue.popleft())
+        #
+        return True
+
+    #
+    def dispatch_event(self, event: nd_event.ND_Event) -> None:
+        #
+        self.nb_events_dispatched += 1
+        #
+        event_type: type = type(event)
+
+        #
+        internal_handler: Optional[Callable[[Any], bool]] = self.events_internal_handlers.get(event_type)
+        #
+        if internal_handler is not None and not internal_handler(event):
+            return
 
         #
         self.handle_event_to_display_windows(event)
 
         #
-        if False and event_name != "":
-            print(f"EVENT NAME : {event_name}")
+        fn: Callable[[ND_MainApp, Any], None]
+        for fn in self.get_event_handlers(event_type, event.get_dispatch_key()):
+            fn(self, event)
 
+    #
+    def handle_quit_event(self, event: nd_event.ND_EventQuit) -> bool:
         #
-        if event_name in self.events_functions:
-            #
-            for fn in self.events_functions[event_name]:
-                fn(self)
+        self.quit()
+        #
+        return False
+
+    #
+    def handle_window_visibility_event(self, event: nd_event.ND_EventWindow) -> bool:
+        #
+        shown_window: Optional[ND_Window] = self.display.get_window(event.window_id) if self.display is not None else None
+        # The content of the window may have been lost while it was hidden
+        if shown_window is not None and isinstance(event, nd_event.ND_EventWindowShown):
+            shown_window.mark_all_dirty()
+        #
+        return False
+
+    #
+    def handle_window_state_event(self, event: nd_event.ND_EventWindow) -> bool:
+        #
+        self.handle_windows_event(event)
         #
         return True
 
@@ -586,8 +1014,9 @@ class ND_MainApp:
     def events_thread(self) -> None:
         #
         while self.is_running:
-            #
-            self.manage_events()
+            # No event waiting, don't spin on the events queue
+            if self.process_events() == 0:
+                self.wait_time_msec(1)
 
     #
     def start_events_thread(self) -> None:
@@ -595,7 +1024,8 @@ class ND_MainApp:
         if not self.is_threading:
             return
         #
-        if self.display is not None and not self.display.events_thread_in_main_thread:
+        # Without display, run() handles the events in the main thread
+        if self.display is None or self.display.events_thread_in_main_thread:
             return
         #
         self.create_thread( self.events_thread, thread_name = "events_threads")
@@ -604,28 +1034,35 @@ class ND_MainApp:
     #
     def custom_function_queue_thread(self, thread_name: str) -> None:
         #
-        start_time: float = 0.0
-        elapsed_time: float = 0.0
+        if thread_name == "physics":
+            #
+            self.physics_scheduler.reset()
+            #
+            while self.is_running:
+                #
+                self.run_physics_steps()
+                # Sleep until the next step is due
+                wait_time: float = self.physics_scheduler.get_time_before_next_step(self.get_time_msec())
+                if wait_time > 0:
+                    self.wait_time_msec(wait_time)
+            #
+            return
+
+        #
+        last_time: float = self.get_time_msec()
+        next_frame_time: float = last_time
 
         #
         while self.is_running:
             #
-            start_time = self.get_time_msec()  # Start of the frame in milliseconds
+            current_time: float = self.get_time_msec()
             #
-            for fn in self.mainloop_queue_functions[thread_name]:
-                fn(self, elapsed_time)
+            self.run_mainloop_queue(thread_name, current_time - last_time)
             #
+            last_time = current_time
 
-            # Calculate the time taken for this frame
-            elapsed_time = self.get_time_msec() - start_time
-
-            # If the frame was rendered faster than the target duration, delay
-            if thread_name == "physics":
-                if elapsed_time < self.frame_duration_physics:
-                    self.wait_time_msec(self.frame_duration_physics - elapsed_time)
-            else:
-                if elapsed_time < self.frame_duration_other_fns:
-                    self.wait_time_msec(self.frame_duration_other_fns - elapsed_time)
+            # If the frame was faster than the target duration, delay
+            next_frame_time = self.wait_next_frame(next_frame_time, self.frame_duration_other_fns)
 
     #
     def start_init_queue_functions(self) -> None:
@@ -652,6 +1089,9 @@ class ND_MainApp:
             self.create_thread( self.display_thread, thread_name="display_thread")
             print(f" - thread {self.threads[-1]} for display created")
 
+        # Events thread
+        self.start_events_thread()
+
         # All the other functions thread
         thread_name: str
         for thread_name in self.mainloop_queue_functions:
@@ -712,8 +1152,8 @@ class ND_MainApp:
             print(f"Threads to wait :\n  - {spc.join([str(self.threads_names[t]) for t in list(self.threads_ids_not_joined)])}")
             #
             with self.threads_condition:
-                #
-                self.threads_condition.wait()  # Will block here until notified
+                # Will block here until notified (the timeout avoids missing the notifications sent before the wait)
+                self.threads_condition.wait(timeout=0.5)
                 #
                 for thread_id in list(self.threads_ids_not_joined):
                     #
@@ -733,82 +1173,58 @@ class ND_MainApp:
     #
     def mainloop_without_threads(self) -> None:
         #
-        start_time: float = 0.0
-        elapsed_time: float = 0.0
-        delay: float = 0.0  # Delay with first frame
+        next_frame_time: float = self.get_time_msec()
+        #
+        self.physics_scheduler.reset()
 
         #
         while self.is_running:
             #
-            elapsed_time = self.get_time_msec()
-            if start_time != 0:
-                delay = elapsed_time - start_time
-                if delay != 0:
-                    self.current_fps = int(1.0 / delay)
-            #
-            start_time = elapsed_time    # Start of the frame in milliseconds
+            delta: float = self.begin_frame()
 
-            # Manage events
-            max_events_per_frame: int = 200
-            current_events_per_frame: int = 0
-            while self.manage_events() and current_events_per_frame < max_events_per_frame:
-                current_events_per_frame += 1
+            # Manage events, the events over the limit stay in the queue for the next frame
+            self.process_events(max_events=200)
 
-            # Manage all the other mainloop runs
+            # Physics with a fixed timestep
+            self.run_physics_steps()
+
+            # Manage all the other mainloop runs, with the real time elapsed since the previous frame
             queue_name: str
-            fn: Callable[[ND_MainApp, float], None]
-            for queue_name in self.mainloop_queue_functions:
-                for fn in self.mainloop_queue_functions[queue_name]:
-                    fn(self, elapsed_time)
+            for queue_name in list(self.mainloop_queue_functions):
+                #
+                if queue_name != "physics":
+                    self.run_mainloop_queue(queue_name, delta)
 
             #
-            if self.display is not None:
-                #
-                self.display.update_display()
+            self.update_display()
 
-            # Calculate the time taken for this frame
-            elapsed_time = self.get_time_msec() - start_time
+            #
+            self.end_frame()
 
             # If the frame was rendered faster than the target duration, delay
-            if elapsed_time < self.frame_duration_display:
-                self.wait_time_msec(self.frame_duration_display - elapsed_time)
+            next_frame_time = self.wait_next_frame(next_frame_time, self.frame_duration_display)
 
     #
     def mainloop_threads_display_and_events(self) -> None:
         #
-        start_time: float = 0.0
-        elapsed_time: float = 0.0
-        delay: float = 0.0  # Delay with first frame
+        next_frame_time: float = self.get_time_msec()
 
         #
         while self.is_running:
             #
-            elapsed_time = self.get_time_msec()
-            if start_time != 0:
-                delay = elapsed_time - start_time
-                if delay != 0:
-                    self.current_fps = int(1.0 / delay)
-                print(f"Fps : {self.current_fps}")
-            #
-            start_time = elapsed_time    # Start of the frame in milliseconds
+            self.begin_frame()
 
-            # Manage events
-            max_events_per_frame: int = 200
-            current_events_per_frame: int = 0
-            while self.manage_events() and current_events_per_frame < max_events_per_frame:
-                current_events_per_frame += 1
+            # Manage events, the events over the limit stay in the queue for the next frame
+            self.process_events(max_events=200)
 
             #
-            if self.display is not None:
-                #
-                self.display.update_display()
+            self.update_display()
 
-            # Calculate the time taken for this frame
-            elapsed_time = self.get_time_msec() - start_time
+            #
+            self.end_frame()
 
             # If the frame was rendered faster than the target duration, delay
-            if elapsed_time < self.frame_duration_display:
-                self.wait_time_msec(self.frame_duration_display - elapsed_time)
+            next_frame_time = self.wait_next_frame(next_frame_time, self.frame_duration_display)
 
     #
     def run(self) -> None:
@@ -821,26 +1237,33 @@ class ND_MainApp:
         #
         self.start_init_queue_functions()
         #
-        if self.display is not None and not self.display.main_not_threading:
-            self.is_threading = False
-        self.is_threading = False
+        # The backends that need everything in the main thread set main_not_threading
+        self.is_threading = self.display is None or not self.display.main_not_threading
         #
-        if self.is_threading:
-            self.create_all_threads()
+        if not self.is_threading:
+            #
+            self.mainloop_without_threads()
+            #
+            return
+
+        # The mainloop queues on worker threads, and the display / events threads that don't have to be in the main thread
+        self.create_all_threads()
+
         #
-        if self.display is not None:
-            if not self.display.main_not_threading:
-                if self.display.display_thread_in_main_thread and not self.display.events_thread_in_main_thread:
-                    self.display_thread()
-                elif not self.display.display_thread_in_main_thread and self.display.events_thread_in_main_thread:
-                    self.events_thread()
-                elif not self.display.display_thread_in_main_thread and self.display.events_thread_in_main_thread:
-                    self.mainloop_threads_display_and_events()
-            else:
-                self.mainloop_without_threads()
+        display_in_main: bool = self.display is not None and self.display.display_thread_in_main_thread
+        events_in_main: bool = self.display is None or self.display.events_thread_in_main_thread
         #
-        if self.is_threading:
-            self.waiting_all_threads()
+        if display_in_main and events_in_main:
+            self.mainloop_threads_display_and_events()
+        #
+        elif display_in_main:
+            self.display_thread()
+        #
+        elif events_in_main:
+            self.events_thread()
+
+        #
+        self.waiting_all_threads()
 
     #
     def quit(self) -> None:
@@ -1020,14 +1443,107 @@ class ND_Window:
         self.clip_rect_stack: list[ND_Rect] = []
         #
         self.scenes: dict[str, ND_Scene] = {}
+        # Same scenes as a list, for the events dispatch, kept up to date by add_scene / remove_scene
+        self.scenes_list: list[ND_Scene] = []
 
         #
         self.next_texture_id: int = 0
 
+        # Retained mode: if enabled, the window is only redrawn when something marked itself dirty,
+        # and only the union of the dirty rects is redrawn on the backends that support it.
+        # Disabled by default, because the elements and display functions modified directly by the user code don't mark themselves dirty.
+        self.retained_mode: bool = False
+        self.supports_partial_redraw: bool = False  # Set by the backends that keep the content of the window between two frames
+        #
+        self.dirty_rects: list[ND_Rect] = []
+        self.full_redraw_needed: bool = True
+        #
+        self.mutex_dirty_rects: Lock = Lock()
+
+        # Stack of the textures currently rendered into (see begin_render_to_texture), the window itself if empty
+        self.render_targets_stack: list[int] = []
+        # Clip rect stacks of the previous render targets
+        self.saved_clip_rect_stacks: list[list[ND_Rect]] = []
+
+    #
+    def mark_dirty(self, rect: Optional[ND_Rect] = None) -> None:
+        """
+        Mark an area of the window (in window coordinates) to redraw at the next frame, the whole window if rect is None.
+        """
+        #
+        if not self.retained_mode:
+            return
+        #
+        with self.mutex_dirty_rects:
+            #
+            if self.full_redraw_needed:
+                return
+            #
+            if rect is None:
+                self.full_redraw_needed = True
+                self.dirty_rects.clear()
+            #
+            elif rect.w > 0 and rect.h > 0:
+                self.dirty_rects.append(rect)
+
+    #
+    def mark_all_dirty(self) -> None:
+        #
+        with self.mutex_dirty_rects:
+            #
+            self.full_redraw_needed = True
+            self.dirty_rects.clear()
+
+    #
+    def pop_redraw_area(self) -> Optional[ND_Rect]:
+        """
+        Returns the area of the window to redraw for this frame (and reset the dirty state), or None if nothing has to be redrawn.
+        """
+        #
+        window_area: ND_Rect = ND_Rect(0, 0, self.width, self.height)
+        #
+        if not self.retained_mode:
+            return window_area
+
+        #
+        with self.mutex_dirty_rects:
+            #
+            if self.full_redraw_needed or (self.dirty_rects and not self.supports_partial_redraw):
+                #
+                self.full_redraw_needed = False
+                self.dirty_rects.clear()
+                #
+                return window_area
+            #
+            if not self.dirty_rects:
+                return None
+            #
+            area: ND_Rect = self.dirty_rects[0]
+            #
+            rect: ND_Rect
+            for rect in self.dirty_rects[1:]:
+                area = area.union(rect)
+            #
+            self.dirty_rects.clear()
+
+        #
+        return area.get_intersection_area_with_other_rect(window_area)
+
     #
     def push_to_clip_rect_stack(self, x: int, y: int, w: int, h: int) -> None:
+        """
+        The new clip rect is restricted to the current top of the stack, so the nested clip areas (and the redraw area) are respected.
+        """
         #
-        self.clip_rect_stack.append(ND_Rect(x, y, w, y))
+        clip_rect: ND_Rect = ND_Rect(x, y, w, h)
+        #
+        if self.clip_rect_stack:
+            #
+            inter: Optional[ND_Rect] = self.clip_rect_stack[-1].get_intersection_area_with_other_rect(clip_rect)
+            #
+            clip_rect = inter if inter is not None else ND_Rect(x, y, 0, 0)
+        #
+        self.clip_rect_stack.append(clip_rect)
 
     #
     def get_top_of_clip_rect_stack(self) -> Optional[ND_Rect]:
@@ -1043,6 +1559,18 @@ class ND_Window:
         if self.clip_rect_stack:
             self.clip_rect_stack.pop(-1)
 
+    #
+    def save_and_clear_clip_rect_stack(self) -> None:
+        # The clip areas of the current render target don't apply to the new one
+        self.saved_clip_rect_stacks.append(self.clip_rect_stack)
+        self.clip_rect_stack = []
+
+    #
+    def restore_clip_rect_stack(self) -> None:
+        #
+        if self.saved_clip_rect_stacks:
+            self.clip_rect_stack = self.saved_clip_rect_stacks.pop(-1)
+
     #
     def destroy_window(self) -> None:
         #
@@ -1071,6 +1599,8 @@ class ND_Window:
         self.width, self.height = new_w, new_h
         #
         self.rect = ND_Rect(self.x, self.y, self.width, self.height)
+        #
+        self.mark_all_dirty()
 
     #
     def set_fullscreen(self, mode: int) -> None:
@@ -1086,6 +1616,20 @@ class ND_Window:
     def add_scene(self, scene: "ND_Scene") -> None:
         #
         self.scenes[scene.scene_id] = scene
+        self.scenes_list = list(self.scenes.values())
+        #
+        self.mark_all_dirty()
+
+    #
+    def remove_scene(self, scene_id: str) -> None:
+        #
+        if scene_id not in self.scenes:
+            return
+        #
+        del self.scenes[scene_id]
+        self.scenes_list = list(self.scenes.values())
+        #
+        self.mark_all_dirty()
 
     #
     def update_scene_sizes(self) -> None:
@@ -1099,14 +1643,20 @@ class ND_Window:
     def set_state(self, state: str) -> None:
         #
         self.state = state
+        #
+        self.mark_all_dirty()
 
     #
     def is_hovered_by_mouse(self) -> bool:
         #
-        rect_window: ND_Rect = ND_Rect(self.x, self.y, self.width, self.height)
         pt_mouse: ND_Point = self.display.main_app.events_manager.get_global_mouse_position()
         #
-        return rect_window.contains_point( pt_mouse )
+        return self.contains_global_point(pt_mouse.x, pt_mouse.y)
+
+    #
+    def contains_global_point(self, x: int, y: int) -> bool:
+        #
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
 
     #
     def blit_texture(self, texture: Any, dst_rect: ND_Rect) -> None:
@@ -1133,6 +1683,46 @@ class ND_Window:
         #
         return
 
+    #
+    def render_prepared_texture_batch(self, texture_id: int, dst_rects: np.ndarray, src_rect: Optional[ND_Rect] = None) -> None:
+        """
+        Render the texture (or only its src_rect part) at each (x, y, w, h) row of dst_rects.
+        The backends that can draw all the quads at once override it.
+        """
+        #
+        x: int
+        y: int
+        w: int
+        h: int
+        for x, y, w, h in np.asarray(dst_rects).tolist():
+            #
+            if src_rect is None:
+                self.render_prepared_texture(texture_id, x, y, w, h)
+            else:
+                self.render_part_of_prepared_texture(texture_id, x, y, w, h, src_rect.x, src_rect.y, src_rect.w, src_rect.h)
+
+    #
+    def create_render_target_texture(self, width: int, height: int) -> int:
+        """
+        Create a transparent texture that can be rendered into, returns -1 if the backend doesn't support it.
+        """
+        #
+        return -1
+
+    #
+    def begin_render_to_texture(self, texture_id: int) -> bool:
+        """
+        Redirect all the next drawings into the given render target texture (same coordinates as the window, from its top left corner).
+        Returns False if the texture cannot be rendered into.
+        """
+        #
+        return False
+
+    #
+    def end_render_to_texture(self) -> None:
+        # Go back to the previous render target
+        return
+
     #
     def get_prepared_texture_size(self, texture_id: int) -> ND_Point:
         #
@@ -1183,6 +1773,19 @@ class ND_Window:
         #
         return
 
+    #
+    def draw_thick_lines_batch(self, lines: np.ndarray, line_thickness: int, color: ND_Color) -> None:
+        """
+        Draw each (x1, y1, x2, y2) row of lines, the backends that can draw all the lines at once override it.
+        """
+        #
+        x1: int
+        y1: int
+        x2: int
+        y2: int
+        for x1, y1, x2, y2 in np.asarray(lines).tolist():
+            self.draw_thick_line(x1=x1, x2=x2, y1=y1, y2=y2, line_thickness=line_thickness, color=color)
+
     #
     def draw_rounded_rect(self, x: int, y: int, width: int, height: int, radius: int, fill_color: ND_Color, border_color: ND_Color) -> None:
         #
@@ -1341,12 +1944,89 @@ class ND_Elt:
         self.elt_id: str = elt_id
         #
         self.position: ND_Position = position
+        self.position.on_change = self.on_position_change
+        # Container element that contains this element (set by the containers)
+        self.parent: Optional[ND_Elt] = None
+        # Scene that contains this element directly (set by the scene), to keep its collisions layers up to date
+        self.scene: Optional[ND_Scene] = None
         #
         self._visible: bool = True
         self.clickable: bool = True
+        # If the pointer events hitting this element are not given to the elements below it
+        self.block_events_below: bool = False
+        #
+        self._state: str = "normal"
         #
         self.transformations: ND_Transformation = ND_Transformation()
 
+    #
+    def mark_dirty(self) -> None:
+        """
+        Ask the window to redraw the area of this element at the next frame (only used in retained mode),
+        and invalidate the render caches of the containers above it.
+        """
+        #
+        if self.parent is not None:
+            self.parent.invalidate_render_cache()
+        #
+        if self.window.retained_mode:
+            self.window.mark_dirty(self.position.rect)
+
+    #
+    def on_position_change(self, old_rect: ND_Rect) -> None:
+        #
+        if self.parent is not None:
+            self.parent.invalidate_render_cache()
+        #
+        if self.scene is not None:
+            self.scene.on_element_moved(self)
+        # A resized element changes the layout of its container
+        if self.parent is not None and (old_rect.w != self.position.w or old_rect.h != self.position.h):
+            self.parent.on_child_resized(self)
+        # Both the old and the new areas of the element have to be redrawn
+        if self.window.retained_mode:
+            self.window.mark_dirty(old_rect)
+            self.window.mark_dirty(self.position.rect)
+
+    #
+    def get_hit_rect(self) -> ND_Rect:
+        """
+        Area where the element receives the pointer events from the scene (its position rect by default).
+        The scene reads it again after each move or state change of the element.
+        """
+        #
+        return self.position.rect
+
+    #
+    def on_child_resized(self, child: "ND_Elt") -> None:
+        # No layout depending on the children sizes by default
+        pass
+
+    #
+    def invalidate_render_cache(self) -> None:
+        # No render cache by default, just propagates to the parents
+        if self.parent is not None:
+            self.parent.invalidate_render_cache()
+
+    #
+    @property
+    def state(self) -> str:
+        #
+        return self._state
+
+    #
+    @state.setter
+    def state(self, new_state: str) -> None:
+        #
+        if new_state == self._state:
+            return
+        #
+        self._state = new_state
+        self.mark_dirty()
+        # The hit area can depend on the state (see get_hit_rect)
+        if self.scene is not None:
+            self.scene.on_element_moved(self)
+
     #
     @property
     def visible(self) -> bool:
@@ -1356,6 +2036,10 @@ class ND_Elt:
     #
     @visible.setter
     def visible(self, new_visible: bool) -> None:
+        #
+        if new_visible != self._visible:
+            self.mark_dirty()
+        #
         self._visible = new_visible
 
     #
@@ -1378,6 +2062,15 @@ class ND_Elt:
         # Abstract class, so do nothing
         return
 
+    #
+    def get_tile_texture(self) -> Optional[tuple[int, Optional[ND_Rect]]]:
+        """
+        (texture_id, source rect or None for the whole texture) if the element is just a texture without transformations,
+        so the grids can draw all its tiles at once. None if the element has to be rendered with render().
+        """
+        #
+        return None
+
     #
     def handle_event(self, event: nd_event.ND_Event) -> None:
         # Abstract class, so do nothing
@@ -1531,7 +2224,8 @@ class ND_Scene:
                     scene_id: str,
                     origin: ND_Point,
                     elements_layers: dict[int, dict[str, ND_Elt]] = {},
-                    on_window_state: Optional[str | set[str]] = None
+                    on_window_state: Optional[str | set[str]] = None,
+                    collisions_index: str = "quadtree"
     ) -> None:
 
         # id
@@ -1554,13 +2248,30 @@ class ND_Scene:
 
         # list of elements sorted by render importance with layers (ascending order)
         self.elements_layers: dict[int, dict[str, ND_Elt]] = elements_layers
-        self.collisions_layers: dict[int, ND_Quadtree] = {}
+        # Spatial index used for the collisions layers: "quadtree" (ND_Quadtree) or "numpy" (ND_SpatialIndex_NP, faster for scenes with a lot of elements)
+        if collisions_index not in ["quadtree", "numpy"]:
+            raise UserWarning(f"Error: unknown collisions index type: {collisions_index}!")
+        self.collisions_index: str = collisions_index
+        self.collisions_layers: dict[int, ND_Quadtree | ND_SpatialIndex_NP] = {}
         self.elements_by_id: dict[str, ND_Elt] = {}
+        self.elements_layer: dict[str, int] = {}
+        # Insertion order of the elements (also their render order inside a layer), the newest ones receive the pointer events first
+        self.elements_order: dict[str, int] = {}
+        self.next_element_order: int = 0
+        # Elements that moved since the last hit test, their rects are updated in the collisions layers before the next one
+        self.moved_elements_ids: set[str] = set()
+
+        # Element that received the last mouse click, it receives the keyboard events
+        self.focused_element_id: Optional[str] = None
+        # Elements that receive all the keyboard events, even if not focused
+        self.key_events_subscribers: set[str] = set()
+        # Elements that were under the pointer at the last pointer event, they receive the next one to be able to leave their hover state
+        self.hovered_elements_ids: set[str] = set()
 
         #
         for layer in self.elements_layers:
             #
-            self.collisions_layers[layer] = ND_Quadtree()
+            self.collisions_layers[layer] = self.create_collisions_layer()
             #
             for element_id in self.elements_layers[layer]:
                 #
@@ -1570,8 +2281,12 @@ class ND_Scene:
                 elt: ND_Elt = self.elements_layers[layer][element_id]
                 #
                 self.elements_by_id[element_id] = elt
-                #
-                self.collisions_layers[layer].insert(elt.position.rect, element_id)
+                self.elements_layer[element_id] = layer
+                self.elements_order[element_id] = self.next_element_order
+                self.next_element_order += 1
+                elt.scene = self
+            #
+            self.collisions_layers[layer].bulk_load( [(elt.get_hit_rect(), elt_id) for elt_id, elt in self.elements_layers[layer].items()] )
 
         #
         self.layers_keys: list[int] = sorted(list(self.elements_layers.keys()))
@@ -1586,6 +2301,46 @@ class ND_Scene:
         #
         return win_state not in cast(set[str], self.on_window_state)
 
+    #
+    def create_collisions_layer(self) -> ND_Quadtree | ND_SpatialIndex_NP:
+        #
+        if self.collisions_index == "numpy":
+            return ND_SpatialIndex_NP()
+        #
+        return ND_Quadtree()
+
+    #
+    def on_element_moved(self, elt: ND_Elt) -> None:
+        # The position can change several times per frame (x, y, w, h setters, layouts, scrolls), the quadtree is only updated once before the next hit test
+        if elt.elt_id in self.elements_layer:
+            self.moved_elements_ids.add(elt.elt_id)
+
+    #
+    def update_collisions_layers(self) -> None:
+        #
+        elt_id: str
+        for elt_id in self.moved_elements_ids:
+            #
+            if elt_id in self.elements_by_id:
+                self.collisions_layers[self.elements_layer[elt_id]].update(elt_id, self.elements_by_id[elt_id].get_hit_rect())
+        #
+        self.moved_elements_ids.clear()
+
+    #
+    def subscribe_to_key_events(self, elt_id: str) -> None:
+        #
+        self.key_events_subscribers.add(elt_id)
+
+    #
+    def unsubscribe_from_key_events(self, elt_id: str) -> None:
+        #
+        self.key_events_subscribers.discard(elt_id)
+
+    #
+    def set_focused_element(self, elt_id: Optional[str]) -> None:
+        #
+        self.focused_element_id = elt_id
+
     #
     def handle_event(self, event: nd_event.ND_Event) -> None:
         #
@@ -1596,24 +2351,97 @@ class ND_Scene:
             return
 
         #
-        for elt in self.elements_by_id.values():
-
+        if isinstance(event, nd_event.ND_EventMouse):
+            self.handle_pointer_event(event)
+        #
+        elif isinstance(event, nd_event.ND_EventKeyboard):
+            self.handle_keyboard_event(event)
+        #
+        else:
             #
-            if hasattr(elt, "handle_event"):
+            elt: ND_Elt
+            for elt in list(self.elements_by_id.values()):
+                elt.handle_event(event)
+
+    #
+    def handle_pointer_event(self, event: nd_event.ND_EventMouse) -> None:
+        """
+        Hit-test the collisions layers from the top one to the bottom one, and stops at the first element that blocks the events below it.
+        """
+        #
+        px: int = event.x
+        py: int = event.y
+        # The wheel events don't have a position
+        if isinstance(event, nd_event.ND_EventMouseWheelScrolled):
+            mouse_pos: ND_Point = self.window.main_app.events_manager.get_mouse_position()
+            px, py = mouse_pos.x, mouse_pos.y
+
+        #
+        if self.moved_elements_ids:
+            self.update_collisions_layers()
+
+        #
+        hit_ids: set[str] = set()
+        # Elements that received the event, top one first
+        hit_order: list[str] = []
+        blocked: bool = False
+        #
+        layer: int
+        for layer in self.layers_keys[::-1]:
+            # The spatial indexes return the ids in their own order, the element rendered on top of the others (the newest) comes first
+            elt_id: str
+            for elt_id in sorted(self.collisions_layers[layer].get_colliding_ids( (px, py) ), key=self.elements_order.__getitem__, reverse=True):
+                #
+                elt: ND_Elt = self.elements_by_id[elt_id]
                 #
+                if not elt.visible:
+                    continue
+                #
+                hit_ids.add(elt_id)
+                hit_order.append(elt_id)
                 elt.handle_event(event)
+                #
+                if event.blocked or elt.block_events_below:
+                    blocked = True
+                    break
+            #
+            if blocked:
+                break
 
-        # #
-        # layer: int
-        # for layer in self.layers_keys[::-1]:
+        # The focused element and the previously hovered ones have to know that the pointer is not on them anymore
+        missed_ids: set[str] = self.hovered_elements_ids - hit_ids
+        if self.focused_element_id is not None and self.focused_element_id not in hit_ids:
+            missed_ids.add(self.focused_element_id)
+        #
+        for elt_id in missed_ids:
+            #
+            if elt_id in self.elements_by_id:
+                self.elements_by_id[elt_id].handle_event(event)
+
+        #
+        self.hovered_elements_ids = hit_ids
 
-        #     elt_list: list[str] = self.collisions_layers[layer].get_colliding_ids( (event.button.x, event.button.y) )
+        # A click gives the focus (so the keyboard events) to the top element clicked
+        if isinstance(event, nd_event.ND_EventMouseButtonDown):
+            self.focused_element_id = hit_order[0] if hit_order else None
 
-        #     for elt_id in elt_list:
-        #         self.elements_by_id[elt_id].handle_event(event)
+    #
+    def handle_keyboard_event(self, event: nd_event.ND_EventKeyboard) -> None:
+        #
+        elt_id: str
+        for elt_id in list(self.key_events_subscribers):
+            #
+            if elt_id in self.elements_by_id:
+                self.elements_by_id[elt_id].handle_event(event)
+            #
+            if event.blocked:
+                return
 
-        #     if len(elt_list) > 0:
-        #         return
+        #
+        if self.focused_element_id is not None and self.focused_element_id not in self.key_events_subscribers:
+            #
+            if self.focused_element_id in self.elements_by_id:
+                self.elements_by_id[self.focused_element_id].handle_event(event)
 
     #
     def handle_window_resize(self) -> None:
@@ -1622,6 +2450,9 @@ class ND_Scene:
             # TODO: Optimisation
             pass
 
+        #
+        self.window.mark_all_dirty()
+
         #
         dict_elt: dict[str, ND_Elt]
         for dict_elt in self.elements_layers.values():
@@ -1631,6 +2462,21 @@ class ND_Scene:
                 if hasattr(elt, "update_layout"):
                     elt.update_layout()
 
+        # The sizes computed from the window or container sizes (full window, percentages) changed without notifying the scene
+        self.reindex_collisions_layers()
+
+    #
+    def reindex_collisions_layers(self) -> None:
+        """
+        Load again the hit rects of all the elements in the collisions layers.
+        """
+        #
+        layer: int
+        for layer in self.layers_keys:
+            self.collisions_layers[layer].bulk_load( [(elt.get_hit_rect(), elt_id) for elt_id, elt in self.elements_layers[layer].items()] )
+        #
+        self.moved_elements_ids.clear()
+
     #
     def insert_to_layers_keys(self, layer_key: int) -> None:
 
@@ -1658,15 +2504,47 @@ class ND_Scene:
         #
         if layer_id not in self.elements_layers:
             self.elements_layers[layer_id] = {}
-            self.collisions_layers[layer_id] = ND_Quadtree()
+            self.collisions_layers[layer_id] = self.create_collisions_layer()
             self.insert_to_layers_keys(layer_id)
 
         #
         self.elements_layers[layer_id][elt_id] = elt
         self.elements_by_id[elt_id] = elt
+        self.elements_layer[elt_id] = layer_id
+        self.elements_order[elt_id] = self.next_element_order
+        self.next_element_order += 1
+        elt.scene = self
+
+        #
+        self.collisions_layers[layer_id].insert(elt.get_hit_rect(), elt_id)
+
+        #
+        elt.mark_dirty()
+
+    #
+    def remove_element(self, elt_id: str) -> None:
+        #
+        if elt_id not in self.elements_by_id:
+            return
+
+        #
+        elt: ND_Elt = self.elements_by_id.pop(elt_id)
+        layer_id: int = self.elements_layer.pop(elt_id)
+        del self.elements_layers[layer_id][elt_id]
+        del self.elements_order[elt_id]
+        elt.scene = None
+
+        #
+        self.collisions_layers[layer_id].remove(elt_id)
+        #
+        self.moved_elements_ids.discard(elt_id)
+        self.hovered_elements_ids.discard(elt_id)
+        self.key_events_subscribers.discard(elt_id)
+        if self.focused_element_id == elt_id:
+            self.focused_element_id = None
 
         #
-        self.collisions_layers[layer_id].insert(elt.position.rect, elt_id)
+        self.window.mark_dirty(elt.position.rect)
 
     #
     def render(self) -> None:
@@ -0,0 +1,88 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Double-buffered state shared between the update threads and the display thread (threaded mode of ND_MainApp).
+
+The update thread writes the next state into the back buffer, then publishes it (swap of the two buffers).
+The display thread only reads the front buffer, so it always renders a consistent snapshot
+(never a state half-updated by the physics), without locking the update thread during its whole frame.
+
+"""
+
+#
+from typing import Any, Callable, Iterator, Optional
+from threading import Condition
+from contextlib import contextmanager
+
+
+#
+class ND_DoubleBuffer:
+    #
+    def __init__(self, factory: Callable[[], Any], copy_fn: Optional[Callable[[Any, Any], None]] = None) -> None:
+        """
+        factory creates an empty state, it is called twice (front and back buffers).
+        copy_fn(dst, src), if given, copies the published state into the new back buffer after each swap,
+        for the states that are updated incrementally (ex: np.copyto for NumPy arrays).
+        """
+        #
+        self.buffers: list[Any] = [factory(), factory()]
+        self.front_idx: int = 0
+        self.copy_fn: Optional[Callable[[Any, Any], None]] = copy_fn
+
+        # Incremented at each publish, the readers can skip the work if the snapshot didn't change
+        self.version: int = 0
+
+        # The swap waits for the readers of the front buffer
+        self.nb_readers: int = 0
+        self.condition: Condition = Condition()
+
+    #
+    def get_back(self) -> Any:
+        """
+        Buffer to write the next state into, only for the writer thread.
+        """
+        #
+        return self.buffers[1 - self.front_idx]
+
+    #
+    def publish(self) -> None:
+        """
+        Swap the buffers, the written state becomes the one read by the display.
+        """
+        #
+        with self.condition:
+            #
+            self.condition.wait_for(lambda: self.nb_readers == 0)
+            #
+            self.front_idx = 1 - self.front_idx
+            self.version += 1
+
+        # The new back buffer is not read by anyone
+        if self.copy_fn is not None:
+            self.copy_fn(self.buffers[1 - self.front_idx], self.buffers[self.front_idx])
+
+    #
+    @contextmanager
+    def read(self) -> Iterator[Any]:
+        """
+        Usage: with double_buffer.read() as state: ...
+        The state must not be kept outside of the with block, it will be reused by the writer.
+        """
+        #
+        with self.condition:
+            self.nb_readers += 1
+            front: Any = self.buffers[self.front_idx]
+        #
+        try:
+            yield front
+        #
+        finally:
+            #
+            with self.condition:
+                #
+                self.nb_readers -= 1
+                #
+                if self.nb_readers == 0:
+                    self.condition.notify_all()
@@ -98,6 +98,8 @@ class ND_Elt_AnimatedSprite(ND_Elt):
         #
         self.current_frame = 0
         self.last_update = time.time()
+        #
+        self.mark_dirty()
 
     #
     def render(self) -> None:
@@ -123,6 +125,10 @@ class ND_Elt_AnimatedSprite(ND_Elt):
             #
             self.current_frame = (self.current_frame + 1) % (len(self.animations[self.current_animation]))
 
+        # In retained mode, an animation has to be redrawn at the next frames to be able to advance
+        if len(self.animations[self.current_animation]) > 1:
+            self.mark_dirty()
+
         #
         current_frame: Optional[int | ND_Elt_Sprite_of_AtlasTexture] = self.animations[self.current_animation][self.current_frame]
 
@@ -66,6 +66,8 @@ class ND_Elt_Checkbox(ND_Elt):
     def set_value(self, new_value: Any) -> None:
         #
         self.checked = bool(new_value)
+        #
+        self.mark_dirty()
 
     #
     def render(self) -> None:
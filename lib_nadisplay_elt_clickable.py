@@ -34,7 +34,7 @@ class ND_Elt_Clickable(ND_Elt):
         #
         super().__init__(window=window, elt_id=elt_id, position=position)
         self.onclick: Optional[Callable[[ND_Elt_Clickable], None]] = onclick
-        self.state: str = "normal"  # Can be "normal", "hover", or "clicked"
+        self.state = "normal"  # Can be "normal", "hover", or "clicked"
         self.mouse_bt_down_on_hover: bool = False
         self.block_events_below: bool = block_events_below
         #
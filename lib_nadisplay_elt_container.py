@@ -15,6 +15,7 @@ from lib_nadisplay_point import ND_Point
 from lib_nadisplay_position import ND_Position, ND_Position_Constraints, ND_Position_Margins
 from lib_nadisplay_utils import clamp, get_percentage_from_str
 from lib_nadisplay_core import ND_Window, ND_Elt
+from lib_nadisplay_render_cache import ND_RenderCache
 from lib_nadisplay_elt_scrollbar import ND_Elt_H_ScrollBar, ND_Elt_V_ScrollBar
 
 
@@ -38,7 +39,8 @@ class ND_Elt_Container(ND_Elt):
             scrollbar_w_height: int = 20,
             scrollbar_h_width: int = 20,
             scroll_speed_w: int = 4,
-            scroll_speed_h: int = 4
+            scroll_speed_h: int = 4,
+            render_cache: bool = False
         ) -> None:
 
         #
@@ -58,8 +60,6 @@ class ND_Elt_Container(ND_Elt):
         #
         self.scroll_x: float = 0
         self.scroll_y: float = 0
-        self.last_scroll_x: float = 0
-        self.last_scroll_y: float = 0
 
         # The current scroll value
         self.scroll: ND_Point = ND_Point(0, 0)
@@ -90,6 +90,33 @@ class ND_Elt_Container(ND_Elt):
         self.min_space_width_containing_elements: int = min_space_width_containing_elements
         self.min_space_height_containing_elements: int = min_space_height_containing_elements
 
+        # Opt-in render to texture cache, for the static subtrees (settings panels, menus, ...).
+        # The elements content is always clipped to the container area when cached.
+        self.render_cache: Optional[ND_RenderCache] = ND_RenderCache(window) if render_cache else None
+
+        # Incremental layout: the elements are only arranged again if the elements changed (layout_dirty)
+        # or if the size of the container changed since the last layout (last_layout_key).
+        # The positions of the elements are relative to the content of the container (see ND_Position_Container),
+        # so moving or scrolling the container doesn't need a new layout.
+        self.layout_dirty: bool = True
+        self.last_layout_key: Optional[tuple[int, int]] = None
+        # The positions of the elements read while layout_dirty is set lay out the container on demand, except during update_layout()
+        self.layout_in_progress: bool = False
+
+        # Position and scroll of the container (x, y, scroll_x, scroll_y) when the elements in window coordinates and the scrollbars were placed
+        self.last_placement_key: Optional[tuple[int, int, int, int]] = None
+        # Elements to move or to place again when the container moves or scrolls: the elements with a position in window coordinates,
+        # and the composed elements (multi-layers, select options, ...) that place their own sub elements in window coordinates
+        self.window_positioned_elements: list[ND_Elt] = []
+
+        # Origin of the elements in window coordinates while they are rendered into the render cache texture, None otherwise
+        self.content_origin_override: Optional[tuple[int, int]] = None
+
+        # Cached measures of the elements: elt_id -> (width with margins, height with margins, width stretch ratio, height stretch ratio)
+        # Only valid for the size and minimum spaces of the container in last_measures_key.
+        self.elements_measures: dict[str, tuple[int, int, float, float]] = {}
+        self.last_measures_key: Optional[tuple[int, int, int, int]] = None
+
     #
     def get_element_recursively_from_subchild(self, elt_id: str) -> Optional[ND_Elt]:
         #
@@ -108,44 +135,100 @@ class ND_Elt_Container(ND_Elt):
         #
         return None
 
+    #
+    @property
+    def content_x(self) -> int:
+        """
+        X of the origin of the elements, in window coordinates (the scroll is already applied).
+        """
+        #
+        if self.content_origin_override is not None:
+            return self.content_origin_override[0]
+        #
+        return self.x + int(self.scroll_x)
+
+    #
+    @property
+    def content_y(self) -> int:
+        """
+        Y of the origin of the elements, in window coordinates (the scroll is already applied).
+        """
+        #
+        if self.content_origin_override is not None:
+            return self.content_origin_override[1]
+        #
+        return self.y + int(self.scroll_y)
+
     #
     def update_scroll_layout(self) -> None:
         #
         self.scroll_x = -self.w_scrollbar.scroll_position if self.w_scrollbar else 0
         self.scroll_y = -self.h_scrollbar.scroll_position if self.h_scrollbar else 0
+        # Scrolling doesn't move the elements relative to the container, a cached render stays valid, only its blit offset changes
+        if self.render_cache is not None:
+            self.render_cache.frozen = True
+        # Only the elements in window coordinates are moved
+        self.refresh_layout()
         #
-        self.update_layout()
+        if self.render_cache is not None:
+            self.render_cache.frozen = False
+        #
+        self.mark_dirty()
+
+    #
+    def translate_elements(self, dx: int, dy: int) -> None:
+        """
+        Move the elements in window coordinates by (dx, dy), without computing the layout again.
+        The elements with positions relative to the container don't have to be moved.
+        """
         #
-        return
-        # #
-        # scroll_dx: int = int(self.last_scroll_x - self.scroll_x)
-        # scroll_dy: int = int(self.last_scroll_y - self.scroll_y)
-        # #
-        # elt: ND_Elt
-        # for elt in self.elements:
-        #     #
-        #     elt.position.x += scroll_dx
-        #     elt.position.y += scroll_dy
-        #     #
-        #     if hasattr(elt, "update_scroll_layout"):
-        #         elt.update_scroll_layout()
-        # #
-        # self.last_scroll_x = self.scroll_x
-        # self.last_scroll_y = self.scroll_y
+        if dx == 0 and dy == 0:
+            return
+        #
+        elt: ND_Elt
+        for elt in self.window_positioned_elements:
+            #
+            if not self._is_relative_element(elt):
+                #
+                elt.position.set_x(elt.position.x + dx)
+                elt.position.set_y(elt.position.y + dy)
+            # The composed elements place their own sub elements
+            elt.update_layout()
 
     #
     def add_element(self, element: ND_Elt) -> None:
+        """
+        The layout is not computed here, but at the next update_layout(), render() or handle_event() of the container,
+        or when the position of one of its elements is read.
+        """
         #
-        if element.elt_id in self.elements_by_id:
-            raise IndexError(f"Error: Trying to add an element with id {element.elt_id} in container {self.elt_id}, but there was already an element with the same id in there!")
+        self.add_elements([element])
+
+    #
+    def add_elements(self, elements: list[ND_Elt]) -> None:
+        """
+        Add several elements at once, their layout is computed in only one pass, like for add_element().
+        """
         #
-        self.elements.append(element)
-        self.elements_by_id[element.elt_id] = element
+        new_ids: set[str] = set()
         #
-        self.update_layout()
+        element: ND_Elt
+        for element in elements:
+            #
+            if element.elt_id in self.elements_by_id or element.elt_id in new_ids:
+                raise IndexError(f"Error: Trying to add an element with id {element.elt_id} in container {self.elt_id}, but there was already an element with the same id in there!")
+            #
+            new_ids.add(element.elt_id)
         #
-        if hasattr(element, "update_layout"):
-            element.update_layout()
+        for element in elements:
+            #
+            self.elements.append(element)
+            self.elements_by_id[element.elt_id] = element
+            element.parent = self
+        #
+        self.invalidate_render_cache()
+        #
+        self.invalidate_layout()
 
     #
     def remove_element(self, element: ND_Elt) -> None:
@@ -155,8 +238,12 @@ class ND_Elt_Container(ND_Elt):
         #
         self.elements.remove(element)
         del self.elements_by_id[element.elt_id]
+        self.elements_measures.pop(element.elt_id, None)
+        element.parent = None
         #
-        self.update_layout()
+        self.invalidate_render_cache()
+        #
+        self.invalidate_layout()
 
     #
     def remove_element_from_elt_id(self, elt_id: str) -> None:
@@ -166,13 +253,151 @@ class ND_Elt_Container(ND_Elt):
         #
         element: ND_Elt = self.elements_by_id[elt_id]
         #
-        self.elements.remove(element)
-        del self.elements_by_id[element.elt_id]
+        self.remove_element(element)
+
+    #
+    def get_layout_key(self) -> tuple[int, int]:
         #
-        self.update_layout()
+        return (self.w, self.h)
+
+    #
+    def get_placement_key(self) -> tuple[int, int, int, int]:
+        #
+        return (self.x, self.y, int(self.scroll_x), int(self.scroll_y))
+
+    #
+    def needs_layout(self) -> bool:
+        #
+        return self.layout_dirty or self.last_layout_key != self.get_layout_key()
+
+    #
+    def needs_placement(self) -> bool:
+        #
+        return self.last_placement_key != self.get_placement_key()
+
+    #
+    def refresh_layout(self) -> None:
+        """
+        Arrange the elements if needed, else only follow the moves and scroll of the container, without looking at the sub elements.
+        """
+        #
+        if self.needs_layout():
+            self.update_layout()
+        #
+        elif self.needs_placement():
+            self._update_placement()
+
+    #
+    def _is_relative_element(self, elt: ND_Elt) -> bool:
+        #
+        return isinstance(elt.position, ND_Position_Container) and elt.position.container is self
+
+    #
+    def _place_element(self, elt: ND_Elt, x: int, y: int) -> None:
+        """
+        Place the element at (x, y) relative to the content of the container.
+        """
+        #
+        if self._is_relative_element(elt):
+            #
+            elt.position.set_x(x)
+            elt.position.set_y(y)
+        #
+        else:
+            #
+            elt.position.set_x(self.content_x + x)
+            elt.position.set_y(self.content_y + y)
+
+    #
+    def _update_placement(self) -> None:
+        #
+        if self.last_placement_key is not None:
+            #
+            last_x, last_y, last_scroll_x, last_scroll_y = self.last_placement_key
+            #
+            self.translate_elements(self.content_x - (last_x + last_scroll_x), self.content_y - (last_y + last_scroll_y))
+        #
+        self._place_scrollbars()
+        #
+        self.last_placement_key = self.get_placement_key()
+
+    #
+    def invalidate_layout(self) -> None:
+        """
+        Force the next update_layout() to place all the elements again and to measure them again
+        (to call after changing the alignment, its arguments, or something else the layout depends on).
+        """
+        #
+        self.layout_dirty = True
+        self.elements_measures.clear()
+        #
+        self.mark_dirty()
+
+    #
+    def on_child_resized(self, child: ND_Elt) -> None:
+        #
+        self.elements_measures.pop(child.elt_id, None)
+        self.layout_dirty = True
+        #
+        self.mark_dirty()
+
+    #
+    def get_element_measure(self, elt: ND_Elt) -> tuple[int, int, float, float]:
+        """
+        Returns (width with margins, height with margins, width stretch ratio, height stretch ratio) of the element, cached until it is resized.
+        """
+        #
+        measure: Optional[tuple[int, int, float, float]] = self.elements_measures.get(elt.elt_id)
+        #
+        if measure is None:
+            #
+            measure = (
+                max(elt.w, self.min_space_width_containing_elements) + elt.get_margin_left() + elt.get_margin_right(),
+                max(elt.h, self.min_space_height_containing_elements) + elt.get_margin_top() + elt.get_margin_bottom(),
+                elt.get_width_stretch_ratio(),
+                elt.get_height_stretch_ratio()
+            )
+            #
+            self.elements_measures[elt.elt_id] = measure
+        #
+        return measure
 
     #
     def update_layout(self) -> None:
+        """
+        Place the elements only if they or the geometry of the container changed since the last layout,
+        then update the layouts of the elements (that also return quickly if nothing changed for them).
+        """
+        #
+        self.layout_in_progress = True
+        #
+        try:
+            #
+            if self.needs_layout():
+                self._arrange_elements()
+            #
+            elif self.needs_placement():
+                self._update_placement()
+            #
+            elt: ND_Elt
+            for elt in self.elements:
+                elt.update_layout()
+        #
+        finally:
+            self.layout_in_progress = False
+
+    #
+    def _arrange_elements(self) -> None:
+        # Cleared before placing the elements, so a child resized during this layout asks for another one
+        self.layout_dirty = False
+        #
+        measures_key: tuple[int, int, int, int] = (self.w, self.h, self.min_space_width_containing_elements, self.min_space_height_containing_elements)
+        #
+        if measures_key != self.last_measures_key:
+            #
+            self.elements_measures.clear()
+            self.last_measures_key = measures_key
+
         #
         if self.element_alignment == "row_wrap":
             self._layout_row_wrap()
@@ -185,10 +410,14 @@ class ND_Elt_Container(ND_Elt):
         else:  #  self.element_alignment == "row"
             self._layout_row()
 
+        # After the layout, because the row and col layouts can change the size of the container
+        self.last_layout_key = self.get_layout_key()
+        self.last_placement_key = self.get_placement_key()
         #
-        for elt in self.elements:
-            if hasattr(elt, "update_layout"):
-                elt.update_layout()
+        self.window_positioned_elements = [
+            elt for elt in self.elements
+            if not self._is_relative_element(elt) or (type(elt).update_layout is not ND_Elt.update_layout and not isinstance(elt, ND_Elt_Container))
+        ]
 
         #
         if self.scroll_w:
@@ -206,10 +435,6 @@ class ND_Elt_Container(ND_Elt):
                 #
                 else:
                     self.w_scrollbar.content_width = self.content_width
-                    self.w_scrollbar.position.set_x(self.x)
-                    self.w_scrollbar.position.set_y(self.y + self.h - self.scrollbar_w_height)
-                    self.w_scrollbar.position.set_w(self.w)
-                    self.w_scrollbar.position.set_h(self.scrollbar_w_height)
             #
             elif self.w_scrollbar:
                 #
@@ -232,16 +457,32 @@ class ND_Elt_Container(ND_Elt):
                 #
                 else:
                     self.h_scrollbar.content_height = self.content_height
-                    self.h_scrollbar.position.set_x(self.x + self.w - self.scrollbar_h_width)
-                    self.h_scrollbar.position.set_y(self.y)
-                    self.h_scrollbar.position.set_w(self.scrollbar_h_width)
-                    self.h_scrollbar.position.set_h(self.h)
             #
             elif self.h_scrollbar:
                 #
                 del(self.h_scrollbar)
                 self.h_scrollbar = None
 
+        #
+        self._place_scrollbars()
+
+    #
+    def _place_scrollbars(self) -> None:
+        #
+        if self.w_scrollbar:
+            #
+            self.w_scrollbar.position.set_x(self.x)
+            self.w_scrollbar.position.set_y(self.y + self.h - self.scrollbar_w_height)
+            self.w_scrollbar.position.set_w(self.w)
+            self.w_scrollbar.position.set_h(self.scrollbar_w_height)
+        #
+        if self.h_scrollbar:
+            #
+            self.h_scrollbar.position.set_x(self.x + self.w - self.scrollbar_h_width)
+            self.h_scrollbar.position.set_y(self.y)
+            self.h_scrollbar.position.set_w(self.scrollbar_h_width)
+            self.h_scrollbar.position.set_h(self.h)
+
     #
     def _layout_row_wrap(self) -> None:
         # Initialize row tracking variables
@@ -257,9 +498,10 @@ class ND_Elt_Container(ND_Elt):
         # First pass
         for elt in self.elements:
             #
-            elt_w: int = max(elt.w, self.min_space_width_containing_elements) + elt.get_margin_left() + elt.get_margin_right()
-            elt_h: int = max(elt.h, self.min_space_height_containing_elements) + elt.get_margin_top() + elt.get_margin_bottom()
-            elt_stretch_ratio: float = elt.get_width_stretch_ratio()
+            elt_w: int
+            elt_h: int
+            elt_stretch_ratio: float
+            elt_w, elt_h, elt_stretch_ratio, _ = self.get_element_measure(elt)
 
             # Si ca dépasse, on crée une nouvelle ligne
             if rows_width[-1] + elt_w >= max_x:
@@ -282,15 +524,13 @@ class ND_Elt_Container(ND_Elt):
         self.content_height = sum(rows_height)
         self.content_width = max(rows_width)
         #
-        self.last_scroll_y = self.scroll_y
-        self.last_scroll_x = self.scroll_x
-        crt_y: int = self.y + int(self.scroll_y)
+        crt_y: int = 0
         space_left: int = 0
 
         # Second pass
         for i_row in range(len(rows)):
             #
-            crt_x = self.x + int(self.scroll_x)
+            crt_x = 0
             space_left = self.w - rows_width[i_row]
             #
             for elt in rows[i_row]:
@@ -312,9 +552,8 @@ class ND_Elt_Container(ND_Elt):
                     margin_right = elt.get_margin_right(elt_space_left)
                     margin_top = elt.get_margin_top(rows_height[i_row] - elt.h)
                 #
-                elt.position.set_x(crt_x + margin_left)
+                self._place_element(elt, crt_x + margin_left, crt_y + margin_top)
                 crt_x += elt.w + margin_left + margin_right
-                elt.position.set_y(crt_y + margin_top)
             #
             crt_y += rows_height[i_row]
 
@@ -331,8 +570,9 @@ class ND_Elt_Container(ND_Elt):
         # First pass
         for elt in self.elements:
             #
-            elt_w: int = max(elt.w, self.min_space_width_containing_elements) + elt.get_margin_left() + elt.get_margin_right()
-            elt_stretch_ratio: float = elt.get_width_stretch_ratio()
+            elt_w: int
+            elt_stretch_ratio: float
+            elt_w, _, elt_stretch_ratio, _ = self.get_element_measure(elt)
 
             # On ajoute à la ligne actuelle
             row_width = row_width + elt_w
@@ -346,16 +586,14 @@ class ND_Elt_Container(ND_Elt):
             self.position.set_w(new_w=self.content_width)
             # self.position._w = self.content_width
         #
-        self.last_scroll_y = self.scroll_y
-        crt_y: int = self.y + int(self.scroll_y)
+        crt_y: int = 0
         space_left: int = 0
 
         # Second pass
         #
         self.content_height = 0
         #
-        self.last_scroll_x = self.scroll_x
-        crt_x = self.x + int(self.scroll_x)
+        crt_x = 0
         space_left = self.w - row_width
         #
         for elt in self.elements:
@@ -379,9 +617,8 @@ class ND_Elt_Container(ND_Elt):
                 margin_top = elt.get_margin_top(self.h - elt.h)
                 margin_bottom = elt.get_margin_bottom(self.h - elt.h)
             #
-            elt.position.set_x(crt_x + margin_left)
+            self._place_element(elt, crt_x + margin_left, crt_y + margin_top)
             crt_x += elt.w + margin_left + margin_right
-            elt.position.set_y(crt_y + margin_top)
             #
             if margin_top + elt.h + margin_bottom > self.content_height:
                 self.content_height = margin_top + elt.h + margin_bottom
@@ -402,9 +639,10 @@ class ND_Elt_Container(ND_Elt):
         # First pass
         for elt in self.elements:
             #
-            elt_w: int = max(elt.w, self.min_space_width_containing_elements) + elt.get_margin_left() + elt.get_margin_right()
-            elt_h: int = max(elt.h, self.min_space_height_containing_elements) + elt.get_margin_top() + elt.get_margin_bottom()
-            elt_stretch_ratio: float = elt.get_height_stretch_ratio()
+            elt_w: int
+            elt_h: int
+            elt_stretch_ratio: float
+            elt_w, elt_h, _, elt_stretch_ratio = self.get_element_measure(elt)
 
             # Si ca dépasse, on crée une nouvelle ligne
             if cols_height[-1] + elt_h > max_y:
@@ -427,15 +665,13 @@ class ND_Elt_Container(ND_Elt):
         self.content_height = max(cols_height)
         self.content_width = sum(cols_width)
         #
-        self.last_scroll_x = self.scroll_x
-        self.last_scroll_y = self.scroll_y
-        crt_x: int = self.x + int(self.scroll_x)
+        crt_x: int = 0
         space_left: int = 0
 
         # Second pass
         for i_col in range(len(cols)):
             #
-            crt_y = self.y + int(self.scroll_y)
+            crt_y = 0
             space_left = self.h - cols_height[i_col]
             #
             for elt in cols[i_col]:
@@ -457,8 +693,7 @@ class ND_Elt_Container(ND_Elt):
                     margin_bottom = elt.get_margin_bottom(elt_space_left)
                     margin_left = elt.get_margin_top(cols_width[i_col] - elt.w)
                 #
-                elt.position.set_x(crt_x + margin_left)
-                elt.position.set_y(crt_y + margin_top)
+                self._place_element(elt, crt_x + margin_left, crt_y + margin_top)
                 crt_y += elt.h + margin_top + margin_bottom
             #
             crt_x += cols_width[i_col]
@@ -476,8 +711,9 @@ class ND_Elt_Container(ND_Elt):
         # First pass
         for elt in self.elements:
             #
-            elt_h: int = max(elt.h, self.min_space_height_containing_elements) + elt.get_margin_top() + elt.get_margin_bottom()
-            elt_stretch_ratio: float = elt.get_height_stretch_ratio()
+            elt_h: int
+            elt_stretch_ratio: float
+            _, elt_h, _, elt_stretch_ratio = self.get_element_measure(elt)
 
             # Sinon, on ajoute à la ligne actuelle
             #
@@ -485,8 +721,7 @@ class ND_Elt_Container(ND_Elt):
             col_left_height_total_weight += elt_stretch_ratio
 
         #
-        self.last_scroll_x = self.scroll_x
-        crt_x: int = self.x + int(self.scroll_x)
+        crt_x: int = 0
         space_left: int = 0
 
 
@@ -502,8 +737,7 @@ class ND_Elt_Container(ND_Elt):
         #
         self.content_width = 0
         #
-        self.last_scroll_y = self.scroll_y
-        crt_y = self.y + int(self.scroll_y)
+        crt_y = 0
         space_left = self.h - col_height
         #
         for elt in self.elements:
@@ -527,8 +761,7 @@ class ND_Elt_Container(ND_Elt):
                 margin_left = elt.get_margin_left(self.w - elt.w)
                 margin_right = elt.get_margin_right(self.w - elt.w)
             #
-            elt.position.set_x(crt_x + margin_left)
-            elt.position.set_y(crt_y + margin_top)
+            self._place_element(elt, crt_x + margin_left, crt_y + margin_top)
             crt_y += elt.h + margin_top + margin_bottom
             #
             if margin_left + elt.w + margin_right > self.content_width:
@@ -550,10 +783,6 @@ class ND_Elt_Container(ND_Elt):
         #
         row_height: int = 0
 
-        #
-        self.last_scroll_x = self.scroll_x
-        self.last_scroll_y = self.scroll_y
-
         #
         for i, element in enumerate(self.elements):
             #
@@ -565,10 +794,7 @@ class ND_Elt_Container(ND_Elt):
                 y += row_height + row_spacing
                 row_height = 0
             #
-            element.position.set_x(new_x=self.x + int(self.scroll_x) + x)
-            element.position.set_y(new_y=self.y + int(self.scroll_y) + y)
-            # element._x = self.x + int(self.scroll_x) + x
-            # element._y = self.y + int(self.scroll_y) + y
+            self._place_element(element, x, y)
             #
             x += element.w + col_spacing
             # x += element.tx + col_spacing
@@ -580,16 +806,16 @@ class ND_Elt_Container(ND_Elt):
         self.content_height = y + row_height
 
     #
-    def render(self) -> None:
-        #
-        if not self.visible:
+    def invalidate_render_cache(self) -> None:
+        # If the cache is frozen, the changes are already taken into account
+        if self.render_cache is not None and not self.render_cache.invalidate():
             return
-
         #
-        if self.overflow_hidden:
-            self.window.enable_area_drawing_constraints(self.x, self.y, self.w, self.h)
+        super().invalidate_render_cache()
 
-        # Render each element with the scrollbar offsets applied
+    #
+    def _render_elements(self) -> None:
+        #
         elt: ND_Elt
         rendering_order = range(len(self.elements))
         #
@@ -603,10 +829,61 @@ class ND_Elt_Container(ND_Elt):
             #
             elt.render()
 
+    #
+    def _rebuild_render_cache(self, render_cache: ND_RenderCache) -> None:
+        #
+        if not render_cache.begin_rebuild(max(self.w, self.content_width), max(self.h, self.content_height)):
+            return
+
+        # The elements are rendered from the top left corner of the texture, without scroll
+        origin_x: int = self.content_x
+        origin_y: int = self.content_y
+        #
+        self.content_origin_override = (0, 0)
+        self.translate_elements(-origin_x, -origin_y)
+
+        #
+        self._render_elements()
+
+        # Go back to the real positions, the nested containers place again their own elements in window coordinates
+        self.content_origin_override = None
+        self.translate_elements(origin_x, origin_y)
+        self.update_layout()
+
+        #
+        render_cache.end_rebuild()
+
+    #
+    def render(self) -> None:
+        #
+        if not self.visible:
+            return
+
+        # Layout deferred by the elements changes, or moves of the container
+        self.refresh_layout()
+
+        #
+        if self.render_cache is not None and self.render_cache.supported:
+            #
+            if not self.render_cache.valid:
+                self._rebuild_render_cache(self.render_cache)
+
+        #
+        if self.render_cache is not None and self.render_cache.valid:
+            # The scroll only changes the visible part of the cached content
+            self.render_cache.blit(self.x, self.y, self.w, self.h, -int(self.scroll_x), -int(self.scroll_y))
+        #
+        else:
+            #
+            if self.overflow_hidden:
+                self.window.enable_area_drawing_constraints(self.x, self.y, self.w, self.h)
+
+            # The elements positions already include the container position and the scroll (see ND_Position_Container)
+            self._render_elements()
 
-        # Remove clipping
-        if self.overflow_hidden:
-            self.window.disable_area_drawing_constraints()
+            # Remove clipping
+            if self.overflow_hidden:
+                self.window.disable_area_drawing_constraints()
 
         # Render scrollbars
         if self.w_scrollbar:
@@ -619,6 +896,8 @@ class ND_Elt_Container(ND_Elt):
         #
         if event.blocked:
             return
+        # The elements have to be at their right place to receive the pointer events
+        self.refresh_layout()
         #
         if self.w_scrollbar:
             self.w_scrollbar.handle_event(event)
@@ -699,6 +978,40 @@ class ND_Position_Container(ND_Position):
         self.positions_constraints: Optional[ND_Position_Constraints] = position_constraints
         self.position_margins: Optional[ND_Position_Margins] = position_margins
 
+    #
+    @property
+    def x(self) -> int:
+        #
+        container: ND_Elt_Container = self.container
+        # Read before the next layout (ex: right after adding elements), lay out on demand
+        if container.layout_dirty and not container.layout_in_progress:
+            container.refresh_layout()
+        # Stored relative to the content of the container, so moving or scrolling the container doesn't move its elements
+        return self._x + container.content_x
+
+    #
+    @x.setter
+    def x(self, new_x: int) -> None:
+        #
+        self._set_attr_and_notify("_x", new_x)
+
+    #
+    @property
+    def y(self) -> int:
+        #
+        container: ND_Elt_Container = self.container
+        #
+        if container.layout_dirty and not container.layout_in_progress:
+            container.refresh_layout()
+        #
+        return self._y + container.content_y
+
+    #
+    @y.setter
+    def y(self, new_y: int) -> None:
+        #
+        self._set_attr_and_notify("_y", new_y)
+
     #
     def is_w_auto(self) -> bool:
         return self.w_str == "auto"
@@ -46,7 +46,7 @@ class ND_Elt_LineEdit(ND_Elt):
         on_line_edit_escaped: Optional[Callable[["ND_Elt_LineEdit"], None]] = None
     ) -> None:
         super().__init__(window=window, elt_id=elt_id, position=position)
-        self.state: str = "normal"
+        self.state = "normal"
         self.text: str = text
         self.place_holder: str = place_holder
         self.font_name: Optional[str] = font_name
@@ -85,6 +85,8 @@ class ND_Elt_LineEdit(ND_Elt):
         #
         self.text = txt
         self.cursor = len(self.text)
+        #
+        self.mark_dirty()
 
     #
     def get_value(self) -> Any:
@@ -181,6 +183,8 @@ class ND_Elt_LineEdit(ND_Elt):
         #
         self.full_text_width = self.window.get_text_size_with_font(self.text, self.font_size, self.font_name).x
         self.scrollbar.content_width = self.full_text_width
+        #
+        self.mark_dirty()
 
     #
     def print_debug_infos(self) -> None:
@@ -223,8 +227,12 @@ class ND_Elt_LineEdit(ND_Elt):
             if self.full_text_width > self.w:
                 self.scrollbar.handle_event(event)
                 self.scroll_offset = int(self.scrollbar.get_scroll_ratio() * (self.full_text_width - self.w))
+                #
+                self.mark_dirty()
 
         elif isinstance(event, nd_event.ND_EventKeyDown) and self.focused:
+            # The text, the cursor or the scroll offset may change
+            self.mark_dirty()
             #
             shift_pressed: bool = self.window.main_app.events_manager.is_shift_pressed()
             #
@@ -14,6 +14,7 @@ import lib_nadisplay_events as nd_event
 from lib_nadisplay_position import ND_Position, ND_Position_Constraints, ND_Position_Margins
 from lib_nadisplay_utils import get_percentage_from_str
 from lib_nadisplay_core import ND_Window, ND_Elt
+from lib_nadisplay_render_cache import ND_RenderCache
 
 
 
@@ -27,12 +28,18 @@ class ND_Elt_MultiLayer(ND_Elt):
                     window: ND_Window,
                     elt_id: str,
                     position: ND_Position,
-                    elements_layers: dict[int, ND_Elt] = {}
+                    elements_layers: dict[int, ND_Elt] = {},
+                    render_cache: bool = False
     ) -> None:
 
         #
         super().__init__(window=window, elt_id=elt_id, position=position)
 
+        # Opt-in render to texture cache, for the static subtrees (the layers content is clipped to the multi-layer area when cached)
+        self.render_cache: Optional[ND_RenderCache] = ND_RenderCache(window) if render_cache else None
+        # Origin of the layers in window coordinates while they are rendered into the render cache texture, None otherwise
+        self.layers_origin_override: Optional[tuple[int, int]] = None
+
 
         # list of elements sorted by render importance with layers (ascending order)
         self.elements_layers: dict[int, ND_Elt] = elements_layers
@@ -51,6 +58,7 @@ class ND_Elt_MultiLayer(ND_Elt):
                 raise UserWarning(f"Error: at least two elements have the same id: {element_id}!")
             #
             self.elements_by_id[element_id] = elt
+            elt.parent = self
             #
             self.update_layout_of_element(elt)
         #
@@ -108,8 +116,11 @@ class ND_Elt_MultiLayer(ND_Elt):
         emt: int = elt.get_margin_top(self.h - eh)
         eml: int = elt.get_margin_left(self.w - ew)
         #
-        enx: int = self.x + eml
-        eny: int = self.y + emt
+        origin_x: int = self.x if self.layers_origin_override is None else self.layers_origin_override[0]
+        origin_y: int = self.y if self.layers_origin_override is None else self.layers_origin_override[1]
+        #
+        enx: int = origin_x + eml
+        eny: int = origin_y + emt
         #
         elt.position.set_x(enx)
         elt.position.set_y(eny)
@@ -152,15 +163,26 @@ class ND_Elt_MultiLayer(ND_Elt):
         if layer_id not in self.elements_layers:
             self.elements_layers[layer_id] = elt
             self.elements_by_id[elt.elt_id] = elt
+            elt.parent = self
             self.insert_to_layers_keys(layer_id)
             #
+            self.invalidate_render_cache()
+            #
             self.update_layout_of_element(elt)
         #
         else:
             raise UserWarning(f"Error: trying to insert an element to multi-layer {self.elt_id} on the same layer than another element!")
 
     #
-    def render(self) -> None:
+    def invalidate_render_cache(self) -> None:
+        # If the cache is frozen, the changes are already taken into account
+        if self.render_cache is not None and not self.render_cache.invalidate():
+            return
+        #
+        super().invalidate_render_cache()
+
+    #
+    def _render_layers(self) -> None:
         #
         layer_key: int
         for layer_key in self.layers_keys:
@@ -169,6 +191,42 @@ class ND_Elt_MultiLayer(ND_Elt):
             #
             element.render()
 
+    #
+    def _rebuild_render_cache(self, render_cache: ND_RenderCache) -> None:
+        #
+        if not render_cache.begin_rebuild(self.w, self.h):
+            return
+
+        # Lay out the layers from the top left corner of the texture
+        # (the position itself is not changed, its x / y can be relative to a container)
+        self.layers_origin_override = (0, 0)
+        self.update_layout()
+
+        #
+        self._render_layers()
+
+        # Go back to the real layout
+        self.layers_origin_override = None
+        self.update_layout()
+
+        #
+        render_cache.end_rebuild()
+
+    #
+    def render(self) -> None:
+        #
+        if self.render_cache is not None and self.render_cache.supported:
+            #
+            if not self.render_cache.valid:
+                self._rebuild_render_cache(self.render_cache)
+            #
+            if self.render_cache.valid:
+                self.render_cache.blit(self.x, self.y, self.w, self.h)
+                return
+
+        #
+        self._render_layers()
+
 
 
 
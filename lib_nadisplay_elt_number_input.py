@@ -109,6 +109,8 @@ class ND_Elt_NumberInput(ND_Elt):
     def set_value(self, new_value: Any) -> None:
         #
         self.value = int(new_value)
+        #
+        self.mark_dirty()
 
     #
     def update_layout(self) -> None:
@@ -0,0 +1,91 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Overlay element displaying the statistics of the last frame recorded by the frame profiler of the main app
+(frame times, draw calls, and the elements with the highest render times).
+
+"""
+
+#
+from typing import Any, Optional
+#
+from lib_nadisplay_colors import ND_Color
+from lib_nadisplay_position import ND_Position
+from lib_nadisplay_core import ND_Window, ND_Elt
+
+
+# ND_Elt_ProfilerOverlay class implementation
+class ND_Elt_ProfilerOverlay(ND_Elt):
+    #
+    def __init__(
+            self,
+            window: ND_Window,
+            elt_id: str,
+            position: ND_Position,
+            font_size: int = 14,
+            nb_top_elements: int = 5,
+            font_color: ND_Color = ND_Color(255, 255, 255),
+            bg_color: ND_Color = ND_Color(0, 0, 0, 180)
+        ) -> None:
+
+        #
+        super().__init__(window=window, elt_id=elt_id, position=position)
+        #
+        self.font_size: int = font_size
+        self.nb_top_elements: int = nb_top_elements
+        self.font_color: ND_Color = font_color
+        self.bg_color: ND_Color = bg_color
+        # The profiler marks the overlay dirty at the end of each frame
+        self.window.main_app.profiler.overlays.append(self)
+
+    #
+    def get_lines(self) -> list[str]:
+        #
+        frame: Optional[dict[str, Any]] = self.window.main_app.profiler.get_last_frame()
+        #
+        if frame is None:
+            return ["Profiler: no frame recorded"]
+
+        #
+        lines: list[str] = [
+            f"Frame {frame['frame']} : {frame['total_ms']:.2f} ms ({self.window.main_app.current_fps} fps)",
+            f"Events {frame['events_ms']:.2f} ms | Display {frame['display_ms']:.2f} ms",
+            " | ".join(f"{queue_name} {duration:.2f} ms" for queue_name, duration in frame["queues_ms"].items()),
+            f"Draw calls {frame['draw_calls'].get(self.window.window_id, 0)} | Textures {frame['texture_uploads'].get(self.window.window_id, 0)}"
+            + (f" | GPU draw calls {frame['gpu_draw_calls'][self.window.window_id]}" if self.window.window_id in frame["gpu_draw_calls"] else "")
+        ]
+        #
+        elt_id: str
+        duration: float
+        for elt_id, duration in self.window.main_app.profiler.get_top_elements(self.nb_top_elements):
+            lines.append(f"  {elt_id} : {duration:.3f} ms")
+        #
+        return [line for line in lines if line != ""]
+
+    #
+    def render(self) -> None:
+        #
+        if not self.visible:
+            return
+        #
+        self.window.draw_filled_rect(self.x, self.y, self.w, self.h, self.bg_color)
+        #
+        line_y: int = self.y + 2
+        #
+        line: str
+        for line in self.get_lines():
+            #
+            if line_y + self.font_size > self.y + self.h:
+                break
+            #
+            self.window.draw_text(line, self.x + 4, line_y, self.font_size, self.font_color)
+            line_y += self.font_size + 2
+
+    #
+    def remove_from_profiler(self) -> None:
+        # Stop redrawing this overlay at each frame
+        #
+        if self in self.window.main_app.profiler.overlays:
+            self.window.main_app.profiler.overlays.remove(self)
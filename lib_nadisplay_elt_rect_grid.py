@@ -8,10 +8,9 @@ Main file for lib_nadisplay, all front-end elements and abstract classes of fron
 """
 
 
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, cast
 #
 import math
-import random
 #
 import numpy as np
 #
@@ -22,6 +21,8 @@ from lib_nadisplay_position import ND_Position
 from lib_nadisplay_utils import clamp
 from lib_nadisplay_core import ND_Window, ND_Elt
 from lib_nadisplay_transformation import ND_Transformation
+from lib_nadisplay_chunked_grid import ND_ChunkedGrid
+from lib_nadisplay_render_cache import ND_GridChunksRenderCache
 
 
 
@@ -29,9 +30,22 @@ from lib_nadisplay_transformation import ND_Transformation
 #
 class ND_Elt_CameraGrid(ND_Elt):
     #
-    def __init__(self, window: ND_Window, elt_id: str, position: ND_Position, grids_to_render: list["ND_Elt_RectGrid"], zoom_x: float = 1.0, zoom_y: float = 1.0) -> None:
+    def __init__(
+        self,
+        window: ND_Window,
+        elt_id: str,
+        position: ND_Position,
+        grids_to_render: list["ND_Elt_RectGrid"],
+        zoom_x: float = 1.0,
+        zoom_y: float = 1.0,
+        chunks_render_cache: bool = False,
+        chunks_cache_memory_budget: int = 256 * 1024 * 1024,
+        chunks_cache_max_chunks: int = 16384
+    ) -> None:
         #
         super().__init__(window=window, elt_id=elt_id, position=position)
+        # Pre-rendered textures of the chunks of the grids, for the mostly static grids
+        self.chunks_render_cache: Optional[ND_GridChunksRenderCache] = ND_GridChunksRenderCache(window, chunks_cache_memory_budget, max_chunks=chunks_cache_max_chunks) if chunks_render_cache else None
         #
         self.grids_to_render: list[ND_Elt_RectGrid] = grids_to_render
         #
@@ -61,8 +75,8 @@ class ND_Elt_CameraGrid(ND_Elt):
         #
         self.window.enable_area_drawing_constraints(self.x, self.y, self.w, self.h)
         #
-        gtx: int = int(zx * self.grids_to_render[0].grid_tx)
-        gty: int = int(zy * self.grids_to_render[0].grid_ty)
+        gtx: int = max(1, int(zx * self.grids_to_render[0].grid_tx))
+        gty: int = max(1, int(zy * self.grids_to_render[0].grid_ty))
         #
         lines_width: int = 0
         if self.grid_lines_width > 0:
@@ -73,71 +87,219 @@ class ND_Elt_CameraGrid(ND_Elt):
         fin_x: int = self.origin.x + math.ceil( (self.w) / (gtx) ) + 1
         fin_y: int = self.origin.y + math.ceil( (self.h) / (gty) ) + 1
 
-        # Dessin des lignes
-        cx: int
-        cy: int
-        dcx: int
-        dcy: int
-        for cx in range(deb_x, fin_x + 1):
+        # Dessin des lignes, toutes envoyées en un seul appel
+        if lines_width > 0:
+            #
+            lines_xs: np.ndarray = self.x + np.arange(fin_x - deb_x + 1) * gtx
+            lines_ys: np.ndarray = self.y + np.arange(fin_y - deb_y + 1) * gty
             #
-            dcx = self.x + int((cx-deb_x) * gtx)
+            lines: np.ndarray = np.concatenate([
+                np.stack([lines_xs, np.full_like(lines_xs, self.y), lines_xs, np.full_like(lines_xs, self.y + self.h)], axis=1),
+                np.stack([np.full_like(lines_ys, self.x), lines_ys, np.full_like(lines_ys, self.x + self.w), lines_ys], axis=1)
+            ])
+            #
+            self.window.draw_thick_lines_batch(lines, lines_width, self.grid_lines_color)
 
-            # Dessin ligne
-            self.window.draw_thick_line(
-                                            x1=dcx, x2=dcx, y1=self.y, y2=self.y+self.h,
-                                            color=self.grid_lines_color,
-                                            line_thickness=lines_width
-            )
+        # Position réutilisée pour tous les éléments qui doivent être rendus un par un
+        tile_position: ND_Position = ND_Position(0, 0, gtx, gty)
 
         #
-        for cy in range(deb_y, fin_y + 1):
-            #
-            dcy = self.y + int((cy-deb_y) * gty)
-
-            # Dessin Ligne
-            self.window.draw_thick_line(
-                                            x1=self.x, x2=self.x+self.w, y1=dcy, y2=dcy,
-                                            color=self.grid_lines_color,
-                                            line_thickness=lines_width
-            )
+        if self.chunks_render_cache is not None:
+            self.chunks_render_cache.begin_frame()
 
         #
         grid_to_render: ND_Elt_RectGrid
         for grid_to_render in self.grids_to_render:
+            #
+            if self.chunks_render_cache is not None:
+                self.render_grid_with_chunks_cache(grid_to_render, deb_x, deb_y, fin_x, fin_y, gtx, gty, tile_position)
+            else:
+                self.render_grid(grid_to_render, deb_x, deb_y, fin_x, fin_y, gtx, gty, tile_position, self.x, self.y)
 
-            # Dessin des éléments
-            for cx in range(deb_x, fin_x + 1):
+        #
+        self.window.disable_area_drawing_constraints()
+        #
+
+    #
+    def render_grid(self, grid_to_render: "ND_Elt_RectGrid", deb_x: int, deb_y: int, fin_x: int, fin_y: int, gtx: int, gty: int, tile_position: ND_Position, screen_x: int, screen_y: int) -> None:
+        """
+        Render the occupied cases of [deb_x, fin_x] x [deb_y, fin_y] of a grid, the case (deb_x, deb_y) being drawn at (screen_x, screen_y).
+        The tiles that are just a texture (or a part of an atlas) are grouped by texture, and each group is sent in one batch.
+        """
+
+        # Seulement les cases occupées de la zone visible
+        ids: np.ndarray = grid_to_render.export_grid_ids_to_numpy(deb_x, deb_y, fin_x + 1, fin_y + 1)
+
+        # Les cases avec leurs propres transformations sont rendues une par une
+        transformed_cases: list[tuple[int, int, int]] = []
+        #
+        if grid_to_render.grid_transformations:
+            #
+            ids = ids.copy()
+            #
+            case: ND_Point
+            for case in grid_to_render.grid_transformations:
                 #
-                dcx = self.x + int((cx-deb_x) * gtx)
+                tx, ty = case
                 #
-                for cy in range(deb_y, fin_y + 1):
-                    #
-                    dcy = self.y + int((cy-deb_y) * gty)
+                if deb_x <= tx <= fin_x and deb_y <= ty <= fin_y and ids[tx - deb_x, ty - deb_y] >= 0:
                     #
-                    elt: Optional[ND_Elt] = grid_to_render.get_element_at_grid_case(ND_Point(cx, cy))
-                    #
-                    if elt is None:
+                    transformed_cases.append( (tx, ty, int(ids[tx - deb_x, ty - deb_y])) )
+                    ids[tx - deb_x, ty - deb_y] = -1
+
+        #
+        dxs: np.ndarray
+        dys: np.ndarray
+        dxs, dys = np.nonzero(ids >= 0)
+        #
+        rects: np.ndarray = np.stack([screen_x + dxs * gtx, screen_y + dys * gty, np.full_like(dxs, gtx), np.full_like(dxs, gty)], axis=1)
+
+        # Regroupement des cases par élément
+        elts_ids: np.ndarray
+        inverse: np.ndarray
+        elts_ids, inverse = np.unique(ids[dxs, dys], return_inverse=True)
+        inverse = inverse.ravel()
+        order: np.ndarray = np.argsort(inverse, kind="stable")
+        bounds: np.ndarray = np.searchsorted(inverse[order], np.arange(len(elts_ids) + 1))
+
+        # (texture_id, source rect) -> rects of all the tiles using it
+        batches: dict[tuple[int, Optional[tuple[int, int, int, int]]], list[np.ndarray]] = {}
+
+        #
+        i: int
+        for i in range(len(elts_ids)):
+            #
+            elt: Optional[ND_Elt] = grid_to_render.grid_elements_by_id.get(int(elts_ids[i]))
+            #
+            if elt is None or not elt.visible:
+                continue
+            #
+            elt_rects: np.ndarray = rects[order[bounds[i]:bounds[i+1]]]
+            #
+            tile: Optional[tuple[int, Optional[ND_Rect]]] = elt.get_tile_texture()
+            #
+            if tile is not None:
+                #
+                key: tuple[int, Optional[tuple[int, int, int, int]]] = (tile[0], tile[1].to_tuple() if tile[1] is not None else None)
+                batches.setdefault(key, []).append(elt_rects)
+            #
+            else:
+                #
+                x: int
+                y: int
+                for x, y, _, _ in elt_rects.tolist():
+                    self.render_tile(elt, x, y, tile_position)
+
+        #
+        texture_id: int
+        src: Optional[tuple[int, int, int, int]]
+        for (texture_id, src), rects_list in batches.items():
+            #
+            self.window.render_prepared_texture_batch(
+                texture_id,
+                np.concatenate(rects_list) if len(rects_list) > 1 else rects_list[0],
+                ND_Rect(*src) if src is not None else None
+            )
+
+        #
+        cx: int
+        cy: int
+        elt_id: int
+        for cx, cy, elt_id in transformed_cases:
+            #
+            transformed_elt: Optional[ND_Elt] = grid_to_render.grid_elements_by_id.get(elt_id)
+            #
+            if transformed_elt is None:
+                continue
+            #
+            self.render_tile(
+                transformed_elt, screen_x + (cx - deb_x) * gtx, screen_y + (cy - deb_y) * gty, tile_position,
+                grid_to_render.grid_transformations[ND_Point(cx, cy)]
+            )
+
+    #
+    def render_grid_with_chunks_cache(self, grid_to_render: "ND_Elt_RectGrid", deb_x: int, deb_y: int, fin_x: int, fin_y: int, gtx: int, gty: int, tile_position: ND_Position) -> None:
+        """
+        Render the visible chunks of a grid from their cached textures, the chunks that changed since their last rendering are rendered again into their textures.
+        """
+        #
+        cache: ND_GridChunksRenderCache = cast(ND_GridChunksRenderCache, self.chunks_render_cache)
+        cs: int = grid_to_render.render_chunk_size
+        #
+        chunk_w: int = cs * gtx
+        chunk_h: int = cs * gty
+
+        #
+        ccx: int
+        ccy: int
+        for ccx in range(deb_x // cs, fin_x // cs + 1):
+            for ccy in range(deb_y // cs, fin_y // cs + 1):
+                #
+                x_0: int = ccx * cs
+                y_0: int = ccy * cs
+                #
+                key: tuple[str, int, int, int, int] = (grid_to_render.elt_id, ccx, ccy, gtx, gty)
+                version: tuple[int, int] = grid_to_render.get_render_chunk_version(ccx, ccy)
+                #
+                texture_id: Optional[int] = cache.get(key, version)
+
+                #
+                if texture_id is None:
+
+                    # Nothing to render in this chunk
+                    if not np.any(grid_to_render.export_grid_ids_to_numpy(x_0, y_0, x_0 + cs, y_0 + cs) >= 0):
+                        #
+                        cache.set_empty(key, version)
                         continue
+
                     #
-                    old_position: ND_Position = elt.position
-                    #
-                    old_transformations: ND_Transformation = elt.transformations
-                    #
-                    if ND_Point(cx, cy) in grid_to_render.grid_transformations:
-                        elt.transformations = elt.transformations + grid_to_render.grid_transformations[ND_Point(cx, cy)]
-                    #
-                    elt.position = ND_Position(dcx, dcy, int(gtx), int(gty))
-                    #
-                    elt.render()
-                    #
-                    elt.position = old_position
-                    #
-                    elt.transformations = old_transformations
+                    texture_id = cache.begin_rebuild(key, chunk_w, chunk_h)
+
+                    # No texture available (budget, texture size, backend), only the visible part of the chunk is rendered directly
+                    if texture_id == -1:
+                        #
+                        vx_0: int = max(deb_x, x_0)
+                        vy_0: int = max(deb_y, y_0)
+                        #
+                        self.render_grid(
+                            grid_to_render, vx_0, vy_0, min(fin_x, x_0 + cs - 1), min(fin_y, y_0 + cs - 1), gtx, gty, tile_position,
+                            self.x + (vx_0 - deb_x) * gtx, self.y + (vy_0 - deb_y) * gty
+                        )
+                        continue
+
+                    # The chunk is rendered from the top left corner of its texture
+                    self.render_grid(grid_to_render, x_0, y_0, x_0 + cs - 1, y_0 + cs - 1, gtx, gty, tile_position, 0, 0)
                     #
+                    cache.end_rebuild(key, version)
+
+                # Empty chunk
+                if texture_id == -1:
+                    continue
+
+                #
+                self.window.render_part_of_prepared_texture(
+                    texture_id,
+                    self.x + (x_0 - deb_x) * gtx, self.y + (y_0 - deb_y) * gty, chunk_w, chunk_h,
+                    0, 0, chunk_w, chunk_h
+                )
 
+    #
+    def render_tile(self, elt: ND_Elt, x: int, y: int, tile_position: ND_Position, case_transformations: Optional[ND_Transformation] = None) -> None:
         #
-        self.window.disable_area_drawing_constraints()
+        old_position: ND_Position = elt.position
+        old_transformations: ND_Transformation = elt.transformations
+        #
+        if case_transformations is not None:
+            elt.transformations = elt.transformations + case_transformations
+        #
+        tile_position.x = x
+        tile_position.y = y
+        elt.position = tile_position
         #
+        elt.render()
+        #
+        elt.position = old_position
+        elt.transformations = old_transformations
 
     #
     def move_camera_to_grid_area(self, grid_area: ND_Rect, force_square_tiles: bool = True) -> None:
@@ -173,43 +335,64 @@ class ND_Elt_RectGrid(ND_Elt):
         self.grid_lines_color: ND_Color = grid_lines_color
         #
         self.grid_elements_by_id: dict[int, ND_Elt] = {}
-        self.grid_positions_by_id: dict[int, set[ND_Point]] = {}
         self.elements_to_grid_id: dict[ND_Elt, int] = {}  # hash = object's pointer / (general/memory) id
         #
         self.next_available_id: int = 0
-        #
-        self.grid: dict[ND_Point, int] = {}  # dict key = (ND_Point=hash(f"{x}_{y}")) -> elt_grid_id
+        # Chunked dense storage of the elt_grid_id of each case (-1 = empty case)
+        self.grid: ND_ChunkedGrid = ND_ChunkedGrid()
         self.grid_transformations: dict[ND_Point, ND_Transformation] = {}
 
+        # Versions of the render chunks (render_chunk_size x render_chunk_size cases), incremented when a case of the chunk changes,
+        # so the cameras know which of their pre-rendered chunks are outdated. render_version invalidates all the chunks at once.
+        self.render_chunk_size: int = 32
+        self.render_chunks_versions: dict[tuple[int, int], int] = {}
+        self.render_version: int = 0
+
     # Supprime tout, grille, éléments, ...
     def clean(self) -> None:
         #
-        self.default_elt_grid_id = -1
+        self.default_element_grid_id = -1
         #
         self.grid_elements_by_id = {}
-        self.grid_positions_by_id = {}
         self.elements_to_grid_id = {}
         #
         self.next_available_id = 0
         #
-        self.grid = {}
+        self.grid.clear()
+        #
+        self.render_version += 1
 
     #
-    def _set_grid_position(self, position: ND_Point, elt_grid_id: int = -1) -> None:
+    def get_render_chunk_version(self, chunk_x: int, chunk_y: int) -> tuple[int, int]:
         #
-        if elt_grid_id >= 0:
-            self.grid[position] = elt_grid_id
-            self.grid_positions_by_id[elt_grid_id].add(position)  # On ajoute la position de l'élement
+        return (self.render_version, self.render_chunks_versions.get((chunk_x, chunk_y), 0))
+
+    #
+    def _touch_render_chunks(self, x_0: int, y_0: int, x_1: int, y_1: int) -> None:
+        """Mark the render chunks overlapping the cases [x_0, x_1[ x [y_0, y_1[ as modified."""
         #
-        elif position in self.grid:
-            #
-            old_elt_grid_id: int = self.grid[position]
-            if old_elt_grid_id in self.grid_positions_by_id:  # On supprime la position de l'ancien element
-                #
-                if position in self.grid_positions_by_id[old_elt_grid_id]:
-                    self.grid_positions_by_id[old_elt_grid_id].remove(position)
-            #
-            del self.grid[position]
+        cs: int = self.render_chunk_size
+        #
+        cx: int
+        cy: int
+        for cx in range(x_0 // cs, (x_1 - 1) // cs + 1):
+            for cy in range(y_0 // cs, (y_1 - 1) // cs + 1):
+                self.render_chunks_versions[(cx, cy)] = self.render_chunks_versions.get((cx, cy), 0) + 1
+
+    #
+    def invalidate_render_cache(self) -> None:
+        # The appearance of the elements of the grid changed, all the pre-rendered chunks are outdated
+        self.render_version += 1
+        #
+        super().invalidate_render_cache()
+
+    #
+    def _set_grid_position(self, position: ND_Point | tuple[int, int], elt_grid_id: int = -1) -> None:
+        #
+        x, y = position
+        #
+        self.grid.set(x, y, elt_grid_id)
+        self._touch_render_chunks(x, y, x + 1, y + 1)
 
     #
     def add_element_to_grid(self, element: ND_Elt, position: ND_Point | list[ND_Point]) -> int:
@@ -217,7 +400,6 @@ class ND_Elt_RectGrid(ND_Elt):
         if element not in self.elements_to_grid_id:
             self.elements_to_grid_id[element] = self.next_available_id
             self.grid_elements_by_id[self.next_available_id] = element
-            self.grid_positions_by_id[self.next_available_id] = set()
             self.next_available_id += 1
         #
         elt_grid_id = self.elements_to_grid_id[element]
@@ -231,14 +413,36 @@ class ND_Elt_RectGrid(ND_Elt):
         #
         if isinstance(position, list):  # liste de points
             #
-            for pos in position:
-                self._set_grid_position(pos, elt_id)
+            xs: np.ndarray = np.fromiter((pos.x for pos in position), dtype=np.int64, count=len(position))
+            ys: np.ndarray = np.fromiter((pos.y for pos in position), dtype=np.int64, count=len(position))
+            #
+            self.grid.set_cells(xs, ys, elt_id)
+            #
+            cs: int = self.render_chunk_size
+            #
+            for cx, cy in np.unique(np.stack([xs // cs, ys // cs], axis=1), axis=0).tolist():
+                self.render_chunks_versions[(cx, cy)] = self.render_chunks_versions.get((cx, cy), 0) + 1
         #
         else:  # Point unique
             self._set_grid_position(position, elt_id)
 
+    #
+    def fill_area_with_element(self, elt_id: int, x_0: int, y_0: int, x_1: int, y_1: int) -> None:
+        """Set all the cases of [x_0, x_1[ x [y_0, y_1[ to the element elt_id (-1 to clear them)."""
+        #
+        self.grid.set_area(x_0, y_0, x_1, y_1, elt_id)
+        self._touch_render_chunks(x_0, y_0, x_1, y_1)
+
+    #
+    def clear_area(self, x_0: int, y_0: int, x_1: int, y_1: int) -> None:
+        #
+        self.grid.set_area(x_0, y_0, x_1, y_1, -1)
+        self._touch_render_chunks(x_0, y_0, x_1, y_1)
+
     #
     def set_transformations_to_position(self, position: ND_Point, transformations: Optional[ND_Transformation]) -> None:
+        #
+        self._touch_render_chunks(position.x, position.y, position.x + 1, position.y + 1)
         #
         if transformations is None:
             if position in self.grid_transformations:
@@ -256,118 +460,87 @@ class ND_Elt_RectGrid(ND_Elt):
         elt_id: int = self.elements_to_grid_id[element]
 
         # On va supprimer toutes les cases de la grille où l'élément était
-        position: ND_Point
-        for position in self.grid_positions_by_id[elt_id]:
-            #
-            self._set_grid_position(position, -1)
+        if self.grid.replace_value(elt_id, -1) > 0:
+            self.render_version += 1
 
         # Si l'élément était l'élément par défaut
-        if self.default_elt_grid_id == elt_id:
+        if self.default_element_grid_id == elt_id:
             #
-            self.default_elt_grid_id = -1
+            self.default_element_grid_id = -1
 
         #
-        del self.grid_positions_by_id[elt_id]
         del self.grid_elements_by_id[elt_id]
         del self.elements_to_grid_id[element]
 
     #
-    def remove_at_position(self, pos: ND_Point) -> None:
-        #
-        if pos not in self.grid:
-            return
+    def remove_at_position(self, pos: ND_Point | tuple[int, int]) -> None:
         #
-        elt_id: int = self.grid[pos]
-
-        #
-        if elt_id < 0:
-            return
-
-        # On supprimer la position de l'élément
-        self.grid_positions_by_id[elt_id].remove(pos)
         self._set_grid_position(pos, -1)
 
     #
-    def get_element_at_grid_case(self, case: ND_Point) -> Optional[ND_Elt]:
+    def get_element_positions(self, elt_id: int) -> list[ND_Point]:
         #
-        if case not in self.grid:
-            return None
+        return [ND_Point(x, y) for x, y in self.grid.get_cells_with_value(elt_id)]
+
+    #
+    def get_element_at_grid_case(self, case: ND_Point | tuple[int, int]) -> Optional[ND_Elt]:
         #
-        grid_elt_id: int = self.grid[case]
+        x, y = case
+        grid_elt_id: int = self.grid.get(x, y)
         #
-        if grid_elt_id not in self.grid_elements_by_id:
+        if grid_elt_id < 0:
             return None
         #
-        return self.grid_elements_by_id[grid_elt_id]
+        return self.grid_elements_by_id.get(grid_elt_id)
 
     #
-    def get_element_id_at_grid_case(self, case: ND_Point) -> Optional[int]:
+    def get_element_id_at_grid_case(self, case: ND_Point | tuple[int, int]) -> Optional[int]:
         #
-        if case not in self.grid:
-            return None
+        x, y = case
+        grid_elt_id: int = self.grid.get(x, y)
         #
-        return self.grid[case]
+        return grid_elt_id if grid_elt_id >= 0 else None
 
     #
     def get_empty_case_in_range(self, x_min: int, x_max: int, y_min: int, y_max: int) -> Optional[ND_Point]:
         #
-        if x_min > x_max or y_min > y_max:
-            #
-            return None
+        case: Optional[tuple[int, int]] = self.grid.find_empty_case(x_min, x_max, y_min, y_max)
         #
-        dx: int = x_max - x_min
-        dy: int = y_max - y_min
-        r: int = int(math.sqrt(dx**2 + dy**2))
-
-        # randoms
-        xx: int
-        yy: int
-        p: ND_Point
-        for _ in range(0, r):
-            #
-            xx = random.randint(x_min, x_max)
-            yy = random.randint(y_min, y_max)
-            p = ND_Point(xx, yy)
-            #
-            if p not in self.grid:
-                return p
-
-        # Brute si le random n'a rien trouvé
-        for xx in range(x_min, x_max+1):
-            for yy in range(y_min, y_max+1):
-                #
-                p = ND_Point(xx, yy)
-                #
-                if p not in self.grid:
-                    return p
-
+        if case is None:
+            return None
         #
-        return None
+        return ND_Point(case[0], case[1])
 
     #
     def render(self) -> None:
         # Do nothing here, because it is a camera that have to render
         return
 
+    #
+    def export_grid_ids_to_numpy(self, x_0: int, y_0: int, x_1: int, y_1: int) -> np.ndarray[Any, Any]:
+        """Elements grid ids (-1 for the empty cases) of [x_0, x_1[ x [y_0, y_1[, indexed [x - x_0, y - y_0]. Read-only and without copy when the area is exactly a chunk of the grid."""
+        #
+        return self.grid.export_area(x_0, y_0, x_1, y_1)
+
     #
     def export_chunk_of_grid_to_numpy(self, x_0: int, y_0: int, x_1: int, y_1: int, fn_elt_to_value: Callable[[Optional[ND_Elt], Optional[int]], int | float], np_type: type = np.float32) -> np.ndarray[Any, Any]:
         #
-        dtx: int = x_1 - x_0
-        dty: int = y_1 - y_0
+        ids: np.ndarray[Any, Any] = self.grid.export_area(x_0, y_0, x_1, y_1)
         #
-        grid: np.ndarray[Any, Any] = np.zeros((dtx, dty), dtype=np_type)
+        if ids.size == 0:
+            return np.zeros(ids.shape, dtype=np_type)
+
+        # fn_elt_to_value is only called once for each different element, then the values are scattered with NumPy
+        unique_ids: np.ndarray[Any, Any]
+        inverse: np.ndarray[Any, Any]
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
         #
-        for dx in range(dtx):
-            for dy in range(dty):
-                #
-                case_point: ND_Point = ND_Point(x_0 + dx, y_0 + dy)
-                #
-                elt: Optional[ND_Elt] = self.get_element_at_grid_case(case_point)
-                elt_id: Optional[int] = self.get_element_id_at_grid_case(case_point)
-                #
-                grid[dx, dy] = fn_elt_to_value(elt, elt_id)
+        values: np.ndarray[Any, Any] = np.array([
+            fn_elt_to_value(self.grid_elements_by_id.get(elt_id), elt_id) if elt_id >= 0 else fn_elt_to_value(None, None)
+            for elt_id in unique_ids.tolist()
+        ], dtype=np_type)
         #
-        return grid
+        return values[inverse.reshape(ids.shape)]
 
 
 #
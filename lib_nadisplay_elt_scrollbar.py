@@ -96,6 +96,8 @@ class ND_Elt_H_ScrollBar(ND_Elt):
                         self.scroll_position = max(0, min(self.content_width - self.w,
                                                     int(relative_x * self.content_width / self.w)))
                         #
+                        self.mark_dirty()
+                        #
                         if self.on_value_changed is not None:
                             self.on_value_changed(self, self.scroll_position)
 
@@ -111,6 +113,8 @@ class ND_Elt_H_ScrollBar(ND_Elt):
                     self.scroll_position = max(0, min(self.content_width - self.w,
                                                     int(relative_x * self.content_width / self.w)))
                     #
+                    self.mark_dirty()
+                    #
                     if self.on_value_changed is not None:
                         self.on_value_changed(self, self.scroll_position)
 
@@ -173,6 +177,8 @@ class ND_Elt_V_ScrollBar(ND_Elt):
                     #
                     self.scroll_position = clamp(int(((event.y - self.y) / self.h) * self.content_height), 0, self.content_height)
                     #
+                    self.mark_dirty()
+                    #
                     if self.on_value_changed is not None:
                         self.on_value_changed(self, self.scroll_position)
                     #
@@ -192,6 +198,8 @@ class ND_Elt_V_ScrollBar(ND_Elt):
                 self.scroll_position = max(0, min(self.content_height - self.h,
                                                 int(relative_y * self.content_height / self.h)))
                 #
+                self.mark_dirty()
+                #
                 if self.on_value_changed is not None:
                     self.on_value_changed(self, self.scroll_position)
 
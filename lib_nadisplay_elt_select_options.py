@@ -13,6 +13,7 @@ from typing import Callable, Any, Optional
 import lib_nadisplay_events as nd_event
 from lib_nadisplay_point import ND_Point
 from lib_nadisplay_position import ND_Position
+from lib_nadisplay_rects import ND_Rect
 from lib_nadisplay_core import ND_Window, ND_Elt
 from lib_nadisplay_elt_clickable import ND_Elt_Clickable
 from lib_nadisplay_elt_button import ND_Elt_Button
@@ -49,7 +50,7 @@ class ND_Elt_SelectOptions(ND_Elt):
         #
         self.option_list_buttons_height: int = option_list_buttons_height
         #
-        self.state: str = "base"  # "base" or "selection"
+        self.state = "base"  # "base" or "selection"
         #
         # 1st side: the main button to show which element is selected, and if clicked, hide itself and show the 2nd part of it
         #
@@ -99,6 +100,8 @@ class ND_Elt_SelectOptions(ND_Elt):
         if new_value in self.options:
             #
             self.value = new_value
+            #
+            self.mark_dirty()
 
     #
     def render(self) -> None:
@@ -205,6 +208,14 @@ class ND_Elt_SelectOptions(ND_Elt):
         #
         self.update_layout()
 
+    #
+    def get_hit_rect(self) -> ND_Rect:
+        # The options list goes below the select rect when it is opened
+        if self.state == "base":
+            return self.position.rect
+        #
+        return self.position.rect.union(self.bts_options_container.position.rect)
+
     #
     def set_state_base(self) -> None:
         #
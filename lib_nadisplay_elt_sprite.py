@@ -10,6 +10,7 @@ Main file for lib_nadisplay, all front-end elements and abstract classes of fron
 
 from typing import Callable, Optional
 #
+from lib_nadisplay_rects import ND_Rect
 from lib_nadisplay_position import ND_Position
 from lib_nadisplay_core import ND_Window
 from lib_nadisplay_transformation import ND_Transformation
@@ -47,11 +48,7 @@ class ND_Elt_Sprite(ND_Elt_Clickable):
         self.transformations = ND_Transformation()
 
     #
-    def render(self) -> None:
-        #
-        if not self.visible:
-            return
-
+    def get_current_texture(self) -> Optional[int]:
         #
         texture: Optional[int] = None
 
@@ -72,6 +69,30 @@ class ND_Elt_Sprite(ND_Elt_Clickable):
                 self.base_texture = self.window.prepare_image_to_render(self.base_texture)
             #
             texture = self.base_texture
+        #
+        return texture
+
+    #
+    def get_tile_texture(self) -> Optional[tuple[int, Optional[ND_Rect]]]:
+        #
+        if not self.transformations.is_identity():
+            return None
+        #
+        texture: Optional[int] = self.get_current_texture()
+        #
+        if texture is None:
+            return None
+        #
+        return (texture, None)
+
+    #
+    def render(self) -> None:
+        #
+        if not self.visible:
+            return
+
+        #
+        texture: Optional[int] = self.get_current_texture()
 
         # Drawing the background rect color or texture
         if texture is not None:
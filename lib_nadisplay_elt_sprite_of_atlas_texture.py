@@ -11,6 +11,7 @@ Main file for lib_nadisplay, all front-end elements and abstract classes of fron
 from typing import Optional
 #
 from lib_nadisplay_point import ND_Point
+from lib_nadisplay_rects import ND_Rect
 from lib_nadisplay_position import ND_Position
 from lib_nadisplay_utils import clamp
 from lib_nadisplay_core import ND_Window, ND_Elt
@@ -33,35 +34,40 @@ class ND_AtlasTexture:
         self.texture_dim: ND_Point = ND_Point(-1, -1)
 
     #
-    def render_texture_at_position(self,
-                                    at_win_x: int, at_win_y: int, at_win_w: int, at_win_h: int,
-                                    tile_x: int, tile_y: int, nb_tiles_w: int = 1, nb_tiles_h: int = 1,
-                                    transformations: ND_Transformation = ND_Transformation()
-        ) -> None:
-
+    def get_tile_src_rect(self, tile_x: int, tile_y: int, nb_tiles_w: int = 1, nb_tiles_h: int = 1) -> ND_Rect:
         #
         if self.texture_atlas is None:
             #
             self.texture_atlas = self.window.prepare_image_to_render(self.texture_atlas_path)
             self.texture_dim = self.window.get_prepared_texture_size(self.texture_atlas)
-
         #
         src_x: int = self.tiles_size.x * tile_x
         src_y: int = self.tiles_size.y * tile_y
         src_w: int = self.tiles_size.x * nb_tiles_w
         src_h: int = self.tiles_size.y * nb_tiles_h
-
         #
         src_x = clamp(src_x, 0, self.texture_dim.x)
         src_y = clamp(src_y, 0, self.texture_dim.y)
         src_w = clamp(src_w, 0, self.texture_dim.x-src_x)
         src_h = clamp(src_h, 0, self.texture_dim.y-src_y)
+        #
+        return ND_Rect(src_x, src_y, src_w, src_h)
+
+    #
+    def render_texture_at_position(self,
+                                    at_win_x: int, at_win_y: int, at_win_w: int, at_win_h: int,
+                                    tile_x: int, tile_y: int, nb_tiles_w: int = 1, nb_tiles_h: int = 1,
+                                    transformations: ND_Transformation = ND_Transformation()
+        ) -> None:
+
+        #
+        src: ND_Rect = self.get_tile_src_rect(tile_x, tile_y, nb_tiles_w, nb_tiles_h)
 
         #
         self.window.render_part_of_prepared_texture(
                 self.texture_atlas,
                 at_win_x, at_win_y, at_win_w, at_win_h,
-                src_x, src_y, src_w, src_h,
+                src.x, src.y, src.w, src.h,
                 transformations
         )
 
@@ -100,3 +106,16 @@ class ND_Elt_Sprite_of_AtlasTexture(ND_Elt):
                 self.tile_x, self.tile_y, self.nb_tiles_x, self.nb_tiles_y,
                 self.transformations
         )
+
+    #
+    def get_tile_texture(self) -> Optional[tuple[int, Optional[ND_Rect]]]:
+        #
+        if not self.transformations.is_identity():
+            return None
+        #
+        src: ND_Rect = self.atlas_texture.get_tile_src_rect(self.tile_x, self.tile_y, self.nb_tiles_x, self.nb_tiles_y)
+        #
+        if self.atlas_texture.texture_atlas is None or self.atlas_texture.texture_atlas < 0:
+            return None
+        #
+        return (self.atlas_texture.texture_atlas, src)
@@ -61,6 +61,8 @@ class ND_Elt_Text(ND_Elt):
     def set_value(self, new_value: Any) -> None:
         #
         self.text = str(new_value)
+        #
+        self.mark_dirty()
 
     #
     def render(self) -> None:
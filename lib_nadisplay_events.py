@@ -8,6 +8,10 @@ Bases abstract unified classes for events.
 """
 
 
+#
+from typing import Any, Optional
+
+
 #
 class ND_Event:
 
@@ -15,6 +19,14 @@ class ND_Event:
         #
         self.blocked: bool = False
 
+    #
+    def get_dispatch_key(self) -> Optional[str]:
+        """
+        Key of the typed subscriptions this event is dispatched to (with the subscriptions to all the keys).
+        """
+        #
+        return None
+
 
 #
 class ND_EventQuit(ND_Event):
@@ -34,6 +46,11 @@ class ND_EventKeyboard(ND_Event):
         self.keyboard_id: int = keyboard_id
         self.key: str = key
 
+    #
+    def get_dispatch_key(self) -> Optional[str]:
+        #
+        return self.key if self.key != "" else None
+
 
 #
 class ND_EventKeyDown(ND_EventKeyboard):
@@ -109,6 +126,8 @@ class ND_EventMouseWheelScrolled(ND_EventMouse):
 class ND_EventWindow(ND_Event):
 
     def __init__(self, window_id: int = 0) -> None:
+        #
+        super().__init__()
         #
         self.window_id: int = window_id
 
@@ -175,6 +194,24 @@ class ND_EventWindowClose(ND_EventWindow):
         super().__init__(window_id=window_id)
 
 
+#
+class ND_EventJobDone(ND_Event):
+
+    def __init__(self, job_id: int, job_name: str, result: Any = None, error: Optional[BaseException] = None) -> None:
+        #
+        super().__init__()
+        #
+        self.job_id: int = job_id
+        self.job_name: str = job_name
+        self.result: Any = result
+        self.error: Optional[BaseException] = error
+
+    #
+    def get_dispatch_key(self) -> Optional[str]:
+        #
+        return self.job_name
+
+
 #
 class ND_EventEmpty(ND_Event):
 
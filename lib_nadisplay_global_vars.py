@@ -0,0 +1,479 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Shared state store of ND_MainApp (the global variables), used by the events, display and mainloop threads.
+
+The variables are kept in an immutable snapshot (dicts that are never modified once published):
+the reads don't take any lock, and a snapshot gives a consistent view of several variables at once.
+The writes build a new snapshot under one lock, without copying all the variables (see ND_GlobalVarsSnapshot),
+several writes can be grouped in a transaction
+(that fails at its commit if a variable it has read was changed by another writer in the meantime), and the functions subscribed to a variable are called after each change of it (instead of polling it).
+
+The numeric states updated very often by several threads (counters, statistics, ...) can be stored in typed NumPy arrays,
+they are updated in place under striped locks (one lock per group of arrays) and don't create new snapshots.
+
+"""
+
+#
+from typing import Any, Callable, Iterator, Mapping, Optional
+from threading import Lock
+from math import isqrt
+from contextlib import contextmanager
+#
+import numpy as np
+
+
+# Marker of the deleted variables in the transactions
+_DELETED: object = object()
+# Marker of the variables that don't exist, for the conflicts checks
+_MISSING: object = object()
+# Minimum number of changes kept aside before they are merged into a new base of the snapshots
+_MIN_CHANGES_BEFORE_MERGE: int = 32
+
+
+#
+class ND_GlobalVarsConflictError(UserWarning):
+    """
+    Raised at the commit of a transaction when a variable read by the transaction was changed by another writer since its beginning.
+    """
+    pass
+
+
+#
+class ND_GlobalVarsSnapshot(Mapping[str, Any]):
+    """
+    Read-only view of the variables at one instant: a base dict plus a small dict of the changes made since (_DELETED for the deleted variables).
+    A write only copies the changes dict, which is merged into a new base once it has more than about sqrt(number of variables) entries,
+    so a write costs O(sqrt(number of variables)) (amortized) instead of a copy of all the variables.
+    """
+    #
+    __slots__ = ("base", "changes")
+
+    #
+    def __init__(self, base: dict[str, Any], changes: dict[str, Any]) -> None:
+        # Never modified once the snapshot is created
+        self.base: dict[str, Any] = base
+        self.changes: dict[str, Any] = changes
+
+    #
+    def __getitem__(self, var_name: str) -> Any:
+        #
+        value: Any = self.changes.get(var_name, _MISSING)
+        #
+        if value is _MISSING:
+            return self.base[var_name]
+        #
+        if value is _DELETED:
+            raise KeyError(var_name)
+        #
+        return value
+
+    #
+    def get(self, var_name: str, default: Any = None) -> Any:
+        #
+        value: Any = self.changes.get(var_name, _MISSING)
+        #
+        if value is _MISSING:
+            return self.base.get(var_name, default)
+        #
+        return default if value is _DELETED else value
+
+    #
+    def __contains__(self, var_name: object) -> bool:
+        #
+        value: Any = self.changes.get(var_name, _MISSING)  # type: ignore
+        #
+        if value is _MISSING:
+            return var_name in self.base
+        #
+        return value is not _DELETED
+
+    #
+    def __iter__(self) -> Iterator[str]:
+        #
+        var_name: str
+        for var_name in self.base:
+            if var_name not in self.changes:
+                yield var_name
+        #
+        value: Any
+        for var_name, value in self.changes.items():
+            if value is not _DELETED:
+                yield var_name
+
+    #
+    def __len__(self) -> int:
+        #
+        return sum(1 for _ in self)
+
+    #
+    def with_changes(self, changes: dict[str, Any]) -> "ND_GlobalVarsSnapshot":
+        """
+        New snapshot with the changes applied (_DELETED for the deleted variables), this one is not modified.
+        """
+        #
+        new_changes: dict[str, Any] = dict(self.changes)
+        new_changes.update(changes)
+        #
+        if len(new_changes) <= max(_MIN_CHANGES_BEFORE_MERGE, isqrt(len(self.base))):
+            return ND_GlobalVarsSnapshot(self.base, new_changes)
+        #
+        new_base: dict[str, Any] = dict(self.base)
+        #
+        var_name: str
+        value: Any
+        for var_name, value in new_changes.items():
+            #
+            if value is _DELETED:
+                new_base.pop(var_name, None)
+            else:
+                new_base[var_name] = value
+        #
+        return ND_GlobalVarsSnapshot(new_base, {})
+
+
+#
+class ND_GlobalVarsTransaction:
+    #
+    def __init__(self, store: "ND_GlobalVarsStore") -> None:
+        #
+        self.store: ND_GlobalVarsStore = store
+        # Snapshot at the beginning of the transaction, the reads of the transaction see it with the changes of the transaction
+        self.base: ND_GlobalVarsSnapshot = store.snapshot()
+        self.changes: dict[str, Any] = {}
+        # Variables read from the base snapshot, the commit checks that they haven't changed since
+        self.reads: set[str] = set()
+
+    #
+    def __contains__(self, var_name: str) -> bool:
+        #
+        if var_name in self.changes:
+            return self.changes[var_name] is not _DELETED
+        #
+        self.reads.add(var_name)
+        #
+        return var_name in self.base
+
+    #
+    def get(self, var_name: str, default: Any = None) -> Any:
+        #
+        if var_name not in self.changes:
+            self.reads.add(var_name)
+        #
+        value: Any = self.changes.get(var_name, self.base.get(var_name, default))
+        #
+        return default if value is _DELETED else value
+
+    #
+    def __getitem__(self, var_name: str) -> Any:
+        #
+        if var_name not in self:
+            raise KeyError(var_name)
+        #
+        return self.get(var_name)
+
+    #
+    def __setitem__(self, var_name: str, value: Any) -> None:
+        #
+        self.changes[var_name] = value
+
+    #
+    def __delitem__(self, var_name: str) -> None:
+        #
+        self.changes[var_name] = _DELETED
+
+
+#
+class ND_GlobalVarsStore:
+    #
+    def __init__(self, nb_arrays_stripes: int = 16) -> None:
+
+        # Published snapshot, never modified in place
+        self.values: ND_GlobalVarsSnapshot = ND_GlobalVarsSnapshot({}, {})
+        # Incremented at each published snapshot
+        self.version: int = 0
+        #
+        self.mutex_write: Lock = Lock()
+
+        # var_name -> functions fn(var_name, new_value), called after each change (new_value is None when the variable is deleted)
+        self.subscribers: dict[str, list[Callable[[str, Any], None]]] = {}
+        self.mutex_subscribers: Lock = Lock()
+
+        # Typed numeric arrays, updated in place
+        self.arrays: dict[str, np.ndarray] = {}
+        self.arrays_stripes: list[Lock] = [Lock() for _ in range(max(1, nb_arrays_stripes))]
+
+    # Reads (lock-free)
+
+    #
+    def __contains__(self, var_name: str) -> bool:
+        #
+        return var_name in self.values
+
+    #
+    def get(self, var_name: str, default: Any = None) -> Any:
+        #
+        return self.values.get(var_name, default)
+
+    #
+    def snapshot(self) -> ND_GlobalVarsSnapshot:
+        """
+        Read-only view of all the variables at the same instant, it is not affected by the next writes.
+        """
+        #
+        return self.values
+
+    # Writes
+
+    #
+    def _apply(self, changes: dict[str, Any]) -> None:
+        # Must be called with mutex_write
+        self.values = self.values.with_changes(changes)
+        self.version += 1
+
+    #
+    def _publish(self, changes: dict[str, Any]) -> None:
+        #
+        if not changes:
+            return
+        #
+        with self.mutex_write:
+            self._apply(changes)
+        #
+        self._notify(changes)
+
+    #
+    def _commit(self, tx: ND_GlobalVarsTransaction) -> bool:
+        """
+        Publish the changes of the transaction, returns False (without publishing anything) if a variable it has read changed since its beginning.
+        """
+        #
+        with self.mutex_write:
+            # The snapshots values are never modified in place, so a changed variable is a different object
+            var_name: str
+            for var_name in tx.reads:
+                if self.values.get(var_name, _MISSING) is not tx.base.get(var_name, _MISSING):
+                    return False
+            #
+            if not tx.changes:
+                return True
+            #
+            self._apply(tx.changes)
+        #
+        self._notify(tx.changes)
+        #
+        return True
+
+    #
+    def _notify(self, changes: dict[str, Any]) -> None:
+        #
+        if not self.subscribers:
+            return
+        #
+        var_name: str
+        for var_name, value in changes.items():
+            #
+            fn: Callable[[str, Any], None]
+            for fn in self.subscribers.get(var_name, []):
+                fn(var_name, None if value is _DELETED else value)
+
+    #
+    def set(self, var_name: str, value: Any) -> None:
+        #
+        self._publish({var_name: value})
+
+    #
+    def set_default(self, var_name: str, value: Any) -> bool:
+        """
+        Create the variable if it doesn't exist yet, returns False if it already existed.
+        """
+        #
+        with self.mutex_write:
+            #
+            if var_name in self.values:
+                return False
+            #
+            self._apply({var_name: value})
+        #
+        self._notify({var_name: value})
+        #
+        return True
+
+    #
+    def set_many(self, values: dict[str, Any]) -> None:
+        """
+        Set several variables at once, the readers see all of them changed or none of them.
+        """
+        #
+        self._publish(dict(values))
+
+    #
+    def delete(self, var_name: str) -> None:
+        #
+        if var_name in self.values:
+            self._publish({var_name: _DELETED})
+
+    #
+    def update(self, var_name: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """
+        Atomic read-modify-write: the variable becomes fn(old value) (default if it doesn't exist), returns the new value.
+        fn must not modify the old value in place (it is still visible by the readers), but return a new one.
+        """
+        #
+        with self.mutex_write:
+            #
+            new_value: Any = fn(self.values.get(var_name, default))
+            #
+            self._apply({var_name: new_value})
+        #
+        self._notify({var_name: new_value})
+        #
+        return new_value
+
+    #
+    def update_existing(self, var_name: str, fn: Callable[[Any], Any]) -> bool:
+        """
+        Like update, but only if the variable exists (checked under the same lock), returns False without changing anything else.
+        """
+        #
+        with self.mutex_write:
+            #
+            if var_name not in self.values:
+                return False
+            #
+            new_value: Any = fn(self.values[var_name])
+            #
+            self._apply({var_name: new_value})
+        #
+        self._notify({var_name: new_value})
+        #
+        return True
+
+    #
+    def increment(self, var_name: str, delta: int | float = 1) -> int | float:
+        #
+        return self.update(var_name, lambda value: value + delta, 0)
+
+    #
+    @contextmanager
+    def transaction(self) -> Iterator[ND_GlobalVarsTransaction]:
+        """
+        Usage: with store.transaction() as tx: tx["a"] = tx.get("a", 0) + 1; tx["b"] = ...
+        All the changes are published at once at the end of the with block (and dropped if an exception is raised).
+        The other writers are not blocked during the transaction: if one of them changed a variable read by the transaction,
+        nothing is published and ND_GlobalVarsConflictError is raised (use run_transaction to retry automatically).
+        """
+        #
+        tx: ND_GlobalVarsTransaction = ND_GlobalVarsTransaction(self)
+        #
+        yield tx
+        #
+        if not self._commit(tx):
+            raise ND_GlobalVarsConflictError(f"Error: conflict at the commit of a global variables transaction, variables read: {sorted(tx.reads)}")
+
+    #
+    def run_transaction(self, fn: Callable[[ND_GlobalVarsTransaction], Any], max_retries: int = 100) -> Any:
+        """
+        Call fn(tx) in a new transaction until it commits without conflict, returns the result of the last call of fn.
+        fn can be called several times, so it must not have other side effects than its changes in tx.
+        """
+        #
+        _: int
+        for _ in range(max(1, max_retries)):
+            #
+            tx: ND_GlobalVarsTransaction = ND_GlobalVarsTransaction(self)
+            result: Any = fn(tx)
+            #
+            if self._commit(tx):
+                return result
+        #
+        raise ND_GlobalVarsConflictError(f"Error: global variables transaction still in conflict after {max_retries} tries")
+
+    # Subscriptions
+
+    #
+    def subscribe(self, var_name: str, fn: Callable[[str, Any], None]) -> None:
+        """
+        fn(var_name, new_value) will be called in the thread of the writer after each change of the variable.
+        """
+        #
+        with self.mutex_subscribers:
+            # Copy on write too, the writers iterate over the lists without lock
+            self.subscribers[var_name] = self.subscribers.get(var_name, []) + [fn]
+
+    #
+    def unsubscribe(self, var_name: str, fn: Callable[[str, Any], None]) -> None:
+        #
+        with self.mutex_subscribers:
+            #
+            if fn in self.subscribers.get(var_name, []):
+                self.subscribers[var_name] = [f for f in self.subscribers[var_name] if f is not fn]
+
+    # Typed arrays
+
+    #
+    def _get_stripe(self, array_name: str) -> Lock:
+        #
+        return self.arrays_stripes[hash(array_name) % len(self.arrays_stripes)]
+
+    #
+    def create_array(self, array_name: str, shape: int | tuple[int, ...], dtype: Any = np.float64, fill_value: int | float = 0) -> np.ndarray:
+        #
+        with self._get_stripe(array_name):
+            #
+            if array_name not in self.arrays:
+                self.arrays[array_name] = np.full(shape, fill_value, dtype=dtype)
+            #
+            return self.arrays[array_name]
+
+    #
+    def get_array(self, array_name: str) -> np.ndarray:
+        """
+        Returns the array itself (not a copy), the reads of single values are safe, use get_array_copy for a consistent copy.
+        """
+        #
+        if array_name not in self.arrays:
+            raise UserWarning(f"Error: there is no global array named {array_name}")
+        #
+        return self.arrays[array_name]
+
+    #
+    def get_array_copy(self, array_name: str) -> np.ndarray:
+        #
+        with self._get_stripe(array_name):
+            return self.get_array(array_name).copy()
+
+    #
+    def array_add(self, array_name: str, idx: Any, value: int | float | np.ndarray) -> None:
+        #
+        arr: np.ndarray = self.get_array(array_name)
+        #
+        with self._get_stripe(array_name):
+            arr[idx] += value
+
+    #
+    def array_set(self, array_name: str, idx: Any, value: int | float | np.ndarray) -> None:
+        #
+        arr: np.ndarray = self.get_array(array_name)
+        #
+        with self._get_stripe(array_name):
+            arr[idx] = value
+
+    #
+    def array_apply(self, array_name: str, fn: Callable[[np.ndarray], None]) -> None:
+        """
+        Call fn(array) with the lock of the array, for the in-place updates of several values at once.
+        """
+        #
+        arr: np.ndarray = self.get_array(array_name)
+        #
+        with self._get_stripe(array_name):
+            fn(arr)
+
+    #
+    def delete_array(self, array_name: str) -> None:
+        #
+        with self._get_stripe(array_name):
+            self.arrays.pop(array_name, None)
@@ -0,0 +1,457 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Process pool to offload the CPU-heavy jobs (pathfinding, procedural generation, images decoding, ...) out of the GIL of the main loop.
+
+The jobs are submitted with ND_MainApp.submit_job, there is a bounded number of jobs in flight.
+When a job is done, its result is delivered in the main process, in the thread of the chosen mainloop queue
+("events" for the events loop): the callback of the job is called there, and an ND_EventJobDone event is posted.
+
+The big NumPy arrays (inputs and outputs) go through shared memory instead of being pickled.
+The job function must be a top-level function (so it can be pickled), it receives the shared input arrays as keyword arguments.
+
+"""
+
+#
+from typing import Any, Callable, Optional, TYPE_CHECKING
+#
+import os
+from collections import deque
+from threading import Lock, Condition
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing.shared_memory import SharedMemory
+#
+import numpy as np
+
+#
+import lib_nadisplay_events as nd_event
+
+#
+if TYPE_CHECKING:
+    from lib_nadisplay_core import ND_MainApp
+
+
+# (shared memory name, shape, dtype)
+ND_SharedArrayDesc = tuple[str, tuple[int, ...], str]
+
+# Marker of the results values that are arrays in shared memory
+SHARED_ARRAY_MARKER: str = "__nd_shared_array__"
+
+
+#
+def _attach_shared_memory(name: str) -> SharedMemory:
+    """
+    Attach to an existing shared memory segment.
+    The main process and the workers share the same resource tracker (see ND_JobsPool._start_executor),
+    where registering a segment again does nothing, so it is only unregistered once, by the unlink() of its owner.
+    """
+    #
+    return SharedMemory(name=name)
+
+
+#
+def _array_to_shared_memory(arr: np.ndarray) -> tuple[SharedMemory, ND_SharedArrayDesc]:
+    #
+    shm: SharedMemory = SharedMemory(create=True, size=max(1, arr.nbytes))
+    #
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    #
+    return shm, (shm.name, tuple(arr.shape), arr.dtype.str)
+
+
+#
+def _array_from_shared_memory(desc: ND_SharedArrayDesc) -> tuple[SharedMemory, np.ndarray]:
+    #
+    shm: SharedMemory = _attach_shared_memory(desc[0])
+    #
+    return shm, np.ndarray(desc[1], dtype=np.dtype(desc[2]), buffer=shm.buf)
+
+
+#
+def _run_job_in_worker(
+    fn: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    shared_inputs: dict[str, ND_SharedArrayDesc],
+    shm_threshold: int
+) -> Any:
+    """
+    Executed in the worker process: attach the shared inputs, call the job function,
+    and put the big output arrays (returned directly or as values of a dict) into new shared memory segments.
+    """
+
+    #
+    shms: list[SharedMemory] = []
+    #
+    try:
+        #
+        arg_name: str
+        desc: ND_SharedArrayDesc
+        for arg_name, desc in shared_inputs.items():
+            #
+            shm, arr = _array_from_shared_memory(desc)
+            shms.append(shm)
+            kwargs[arg_name] = arr
+
+        #
+        result: Any = fn(*args, **kwargs)
+
+        #
+        def to_shared(value: Any) -> Any:
+            #
+            if isinstance(value, np.ndarray) and value.nbytes >= shm_threshold:
+                #
+                out_shm, out_desc = _array_to_shared_memory(value)
+                # The segment stays alive until the main process unlinks it
+                out_shm.close()
+                #
+                return (SHARED_ARRAY_MARKER, out_desc)
+            #
+            return value
+
+        #
+        if isinstance(result, dict):
+            return {k: to_shared(v) for k, v in result.items()}
+        #
+        return to_shared(result)
+
+    #
+    finally:
+        #
+        for shm in shms:
+            shm.close()
+
+
+#
+def _is_shared_array_marker(value: Any) -> bool:
+    #
+    return isinstance(value, tuple) and len(value) == 2 and value[0] == SHARED_ARRAY_MARKER
+
+
+#
+def _resolve_shared_value(value: Any) -> Any:
+    """
+    Copy an output array out of its shared memory segment, and release the segment.
+    """
+    #
+    if not _is_shared_array_marker(value):
+        return value
+    #
+    shm, arr = _array_from_shared_memory(value[1])
+    #
+    res: np.ndarray = arr.copy()
+    #
+    del arr
+    shm.close()
+    shm.unlink()
+    #
+    return res
+
+
+#
+def _release_shared_value(value: Any) -> None:
+    """
+    Release the shared memory of an output that won't be read (cancelled job).
+    """
+    #
+    if not _is_shared_array_marker(value):
+        return
+    #
+    shm: SharedMemory = _attach_shared_memory(value[1][0])
+    shm.close()
+    shm.unlink()
+
+
+#
+class ND_Job:
+    #
+    def __init__(
+        self,
+        job_id: int,
+        job_name: str,
+        callback: Optional[Callable[["ND_MainApp", "ND_Job"], None]],
+        deliver_queue: str,
+        shared_inputs: list[SharedMemory]
+    ) -> None:
+        #
+        self.job_id: int = job_id
+        self.job_name: str = job_name
+        self.callback: Optional[Callable[[ND_MainApp, ND_Job], None]] = callback
+        self.deliver_queue: str = deliver_queue
+
+        # "pending", "done", "error" or "cancelled"
+        self.state: str = "pending"
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+        #
+        self.future: Optional[Future] = None
+        # Input segments owned by this job, unlinked when the job is finished
+        self.shared_inputs: list[SharedMemory] = shared_inputs
+
+    #
+    def release_shared_inputs(self) -> None:
+        #
+        shm: SharedMemory
+        for shm in self.shared_inputs:
+            shm.close()
+            shm.unlink()
+        #
+        self.shared_inputs = []
+
+
+#
+class ND_JobsPool:
+    #
+    def __init__(self, main_app: "ND_MainApp", max_workers: Optional[int] = None, max_in_flight: int = 16, shm_threshold: int = 1024 * 1024) -> None:
+        #
+        self.main_app: ND_MainApp = main_app
+
+        # The worker processes are only started at the first submitted job
+        self.max_workers: Optional[int] = max_workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+        # Maximum number of jobs submitted and not delivered yet
+        self.max_in_flight: int = max_in_flight
+        # Arrays of at least shm_threshold bytes go through shared memory
+        self.shm_threshold: int = shm_threshold
+
+        #
+        self.jobs: dict[int, ND_Job] = {}
+        self.next_job_id: int = 0
+        # Finished jobs waiting to be delivered, by deliver queue
+        self.finished_jobs: dict[str, deque[ND_Job]] = {}
+        #
+        self.mutex_jobs: Lock = Lock()
+        self.condition_in_flight: Condition = Condition(self.mutex_jobs)
+
+        # Statistics
+        self.nb_submitted: int = 0
+        self.nb_rejected: int = 0
+        self.nb_cancelled: int = 0
+
+    #
+    def get_nb_in_flight(self) -> int:
+        #
+        return len(self.jobs)
+
+    #
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        args: tuple[Any, ...] = (),
+        kwargs: Optional[dict[str, Any]] = None,
+        arrays: Optional[dict[str, np.ndarray]] = None,
+        callback: Optional[Callable[["ND_MainApp", ND_Job], None]] = None,
+        deliver_queue: str = "events",
+        job_name: str = "job",
+        block: bool = False
+    ) -> int:
+        """
+        Submit fn(*args, **kwargs, **arrays) to the process pool.
+        Returns the job id, or -1 if there are already max_in_flight jobs in flight (and block is False).
+        Don't block in the thread of deliver_queue, the jobs in flight are only freed when they are delivered there.
+        """
+
+        # A job for a queue that is never run would never be delivered, and would keep its slot forever
+        if deliver_queue != "events" and deliver_queue not in self.main_app.mainloop_queue_functions:
+            raise UserWarning(f"Error: unknown deliver queue `{deliver_queue}` for the job {job_name}, available ones are: events, {', '.join(self.main_app.mainloop_queue_functions)}")
+
+        #
+        with self.condition_in_flight:
+            #
+            if len(self.jobs) >= self.max_in_flight:
+                #
+                if not block:
+                    self.nb_rejected += 1
+                    return -1
+                #
+                self.condition_in_flight.wait_for(lambda: len(self.jobs) < self.max_in_flight)
+            #
+            job_id: int = self.next_job_id
+            self.next_job_id += 1
+            # The slot is reserved now, so concurrent submits can't exceed max_in_flight
+            job: ND_Job = ND_Job(job_id, job_name, callback, deliver_queue, [])
+            self.jobs[job_id] = job
+
+        # Big input arrays in shared memory, the small ones are pickled with the other arguments
+        job_kwargs: dict[str, Any] = dict(kwargs) if kwargs is not None else {}
+        shared_inputs: dict[str, ND_SharedArrayDesc] = {}
+        #
+        if arrays is not None:
+            #
+            arg_name: str
+            arr: np.ndarray
+            for arg_name, arr in arrays.items():
+                #
+                if arr.nbytes >= self.shm_threshold:
+                    shm, desc = _array_to_shared_memory(np.ascontiguousarray(arr))
+                    job.shared_inputs.append(shm)
+                    shared_inputs[arg_name] = desc
+                else:
+                    job_kwargs[arg_name] = arr
+
+        #
+        with self.mutex_jobs:
+            #
+            if self.executor is None:
+                self._start_executor()
+            #
+            job.future = self.executor.submit(_run_job_in_worker, fn, args, job_kwargs, shared_inputs, self.shm_threshold)
+            self.nb_submitted += 1
+
+        # Called in a thread of the executor, or directly if the future is already done
+        job.future.add_done_callback(lambda _: self._on_job_finished(job))
+        #
+        return job_id
+
+    #
+    def _start_executor(self) -> None:
+        # The resource tracker is started before the workers, so they use it instead of starting their own one
+        # (a segment created by a worker and unlinked by the main process would else be reported as leaked by the worker tracker)
+        if os.name == "posix":
+            #
+            from multiprocessing import resource_tracker
+            resource_tracker.ensure_running()
+        #
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    #
+    def _on_job_finished(self, job: ND_Job) -> None:
+        #
+        with self.mutex_jobs:
+            #
+            if job.deliver_queue not in self.finished_jobs:
+                self.finished_jobs[job.deliver_queue] = deque()
+            #
+            self.finished_jobs[job.deliver_queue].append(job)
+
+    #
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job: if it hasn't started yet it will not run, else its result will be discarded.
+        Returns False if the job is unknown or already delivered.
+        """
+        #
+        with self.mutex_jobs:
+            #
+            job: Optional[ND_Job] = self.jobs.get(job_id)
+            #
+            if job is None or job.state != "pending":
+                return False
+            #
+            job.state = "cancelled"
+            self.nb_cancelled += 1
+        #
+        if job.future is not None:
+            job.future.cancel()
+        #
+        return True
+
+    #
+    def deliver_finished_jobs(self, queue_name: str) -> int:
+        """
+        Called by the main loops, in the thread of the queue queue_name.
+        Call the callbacks of the jobs finished for this queue and post their ND_EventJobDone events.
+        Returns the number of jobs delivered.
+        """
+
+        #
+        if not self.finished_jobs.get(queue_name):
+            return 0
+
+        #
+        with self.mutex_jobs:
+            #
+            jobs: list[ND_Job] = list(self.finished_jobs[queue_name])
+            self.finished_jobs[queue_name].clear()
+
+        #
+        nb_delivered: int = 0
+        #
+        job: ND_Job
+        for job in jobs:
+            #
+            self._collect_result(job)
+            #
+            with self.condition_in_flight:
+                #
+                del self.jobs[job.job_id]
+                self.condition_in_flight.notify_all()
+            #
+            if job.state == "cancelled":
+                continue
+            #
+            if job.callback is not None:
+                job.callback(self.main_app, job)
+            #
+            self.main_app.post_event(nd_event.ND_EventJobDone(job.job_id, job.job_name, job.result, job.error))
+            #
+            nb_delivered += 1
+
+        #
+        return nb_delivered
+
+    #
+    def _collect_result(self, job: ND_Job) -> None:
+        #
+        job.release_shared_inputs()
+        #
+        if job.future is None or job.future.cancelled():
+            return
+
+        #
+        error: Optional[BaseException] = job.future.exception()
+        #
+        if error is not None:
+            #
+            if job.state != "cancelled":
+                job.state = "error"
+                job.error = error
+            #
+            return
+
+        #
+        result: Any = job.future.result()
+
+        # The result of a cancelled job is not read, but its shared memory must be released
+        if job.state == "cancelled":
+            #
+            for value in (result.values() if isinstance(result, dict) else [result]):
+                _release_shared_value(value)
+            #
+            return
+
+        #
+        if isinstance(result, dict):
+            job.result = {k: _resolve_shared_value(v) for k, v in result.items()}
+        else:
+            job.result = _resolve_shared_value(result)
+        #
+        job.state = "done"
+
+    #
+    def shutdown(self) -> None:
+        #
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+        # Release the shared memory of the jobs that will never be delivered
+        with self.mutex_jobs:
+            #
+            queue_name: str
+            for queue_name in list(self.finished_jobs):
+                #
+                for job in self.finished_jobs[queue_name]:
+                    job.state = "cancelled"
+                    self._collect_result(job)
+                #
+                self.finished_jobs[queue_name].clear()
+            #
+            for job in self.jobs.values():
+                job.release_shared_inputs()
+            #
+            self.jobs.clear()
@@ -8,7 +8,7 @@ Some utility classes for manipuling points, rects and base elements positions.
 """
 
 #
-from typing import Any
+from typing import Any, Iterator, Optional
 #
 from math import sqrt
 import numpy as np
@@ -16,6 +16,9 @@ import numpy as np
 
 #
 class ND_Point:
+    # No instance __dict__, points are created a lot (positions, grids, events)
+    __slots__ = ("x", "y")
+
     #
     def __init__(self, x: int, y: int) -> None:
         #
@@ -23,9 +26,9 @@ class ND_Point:
         self.y: int = y
 
 
-    #
+    # Same hash as the tuple (x, y), so a dict with ND_Point keys can be queried with plain (x, y) tuples
     def __hash__(self) -> int:
-        return hash(f"{self.x}_{self.y}")
+        return hash((self.x, self.y))
 
 
     #
@@ -37,10 +40,20 @@ class ND_Point:
     #
     def __eq__(self, other: object) -> bool:
         #
-        if not isinstance(other, ND_Point):
-            return NotImplemented
+        if isinstance(other, ND_Point):
+            return self.x == other.x and self.y == other.y
+        #
+        if isinstance(other, tuple):
+            return len(other) == 2 and self.x == other[0] and self.y == other[1]
         #
-        return self.x == other.x and self.y == other.y
+        return NotImplemented
+
+
+    #
+    def __iter__(self) -> Iterator[int]:
+        #
+        yield self.x
+        yield self.y
 
 
     #
@@ -84,3 +97,60 @@ class ND_Point:
     def to_tuple(self) -> tuple[int, int]:
         #
         return (self.x, self.y)
+
+
+#
+class ND_ImmutablePoint(ND_Point):
+    """
+    Point that cannot be modified, safe to use as a dict key or to share.
+    Use ND_ImmutablePoint.get(x, y) to get a cached instance instead of creating a new one.
+    """
+    #
+    __slots__ = ()
+
+    # Cache of the already created points, cleared when it becomes too big
+    _cache: dict[tuple[int, int], "ND_ImmutablePoint"] = {}
+    _cache_max_size: int = 65536
+
+    #
+    def __init__(self, x: int, y: int) -> None:
+        #
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+
+
+    #
+    def __setattr__(self, name: str, value: Any) -> None:
+        #
+        raise UserWarning(f"Error: cannot modify the attribute {name} of an ND_ImmutablePoint!")
+
+
+    # Needed by pickle / copy, that would use __setattr__ otherwise
+    def __reduce__(self) -> tuple[Any, ...]:
+        #
+        return (ND_ImmutablePoint, (self.x, self.y))
+
+
+    #
+    def __repr__(self) -> str:
+        #
+        return f"ND_ImmutablePoint(x={self.x}, y={self.y})"
+
+
+    #
+    @classmethod
+    def get(cls, x: int, y: int) -> "ND_ImmutablePoint":
+        #
+        key: tuple[int, int] = (x, y)
+        #
+        pt: Optional["ND_ImmutablePoint"] = cls._cache.get(key)
+        #
+        if pt is None:
+            #
+            if len(cls._cache) >= cls._cache_max_size:
+                cls._cache.clear()
+            #
+            pt = ND_ImmutablePoint(x, y)
+            cls._cache[key] = pt
+        #
+        return pt
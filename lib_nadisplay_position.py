@@ -8,7 +8,7 @@ Some utility classes for manipuling points, rects and base elements positions.
 """
 
 #
-from typing import Optional
+from typing import Callable, Optional
 #
 from lib_nadisplay_rects import ND_Rect
 
@@ -96,6 +96,23 @@ class ND_Position:
         self._w: int = w
         self._h: int = h
 
+        # Called with the previous rect after each change of x, y, w or h (used by the elements to mark their dirty areas)
+        self.on_change: Optional[Callable[[ND_Rect], None]] = None
+
+    #
+    def _set_attr_and_notify(self, attr_name: str, new_value: int) -> None:
+        #
+        if getattr(self, attr_name) == new_value:
+            return
+        #
+        if self.on_change is None:
+            setattr(self, attr_name, new_value)
+            return
+        #
+        old_rect: ND_Rect = self.rect
+        setattr(self, attr_name, new_value)
+        self.on_change(old_rect)
+
     #
     @property
     def x(self) -> int:
@@ -106,7 +123,7 @@ class ND_Position:
     @x.setter
     def x(self, new_x: int) -> None:
         #
-        self._x = new_x
+        self._set_attr_and_notify("_x", new_x)
 
     #
     @property
@@ -118,7 +135,7 @@ class ND_Position:
     @y.setter
     def y(self, new_y: int) -> None:
         #
-        self._y = new_y
+        self._set_attr_and_notify("_y", new_y)
 
     #
     @property
@@ -130,7 +147,7 @@ class ND_Position:
     @w.setter
     def w(self, new_w: int) -> None:
         #
-        self._w = new_w
+        self._set_attr_and_notify("_w", new_w)
 
     #
     @property
@@ -142,7 +159,7 @@ class ND_Position:
     @h.setter
     def h(self, new_h: int) -> None:
         #
-        self._h = new_h
+        self._set_attr_and_notify("_h", new_h)
 
     #
     @property
@@ -162,19 +179,19 @@ class ND_Position:
 
     #
     def set_x(self, new_x: int) -> None:
-        self._x = new_x
+        self._set_attr_and_notify("_x", new_x)
 
     #
     def set_y(self, new_y: int) -> None:
-        self._y = new_y
+        self._set_attr_and_notify("_y", new_y)
 
     #
     def set_w(self, new_w: int) -> None:
-        self._w = new_w
+        self._set_attr_and_notify("_w", new_w)
 
     #
     def set_h(self, new_h: int) -> None:
-        self._h = new_h
+        self._set_attr_and_notify("_h", new_h)
 
     #
     def get_min_width(self) -> int:
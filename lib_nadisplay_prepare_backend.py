@@ -40,10 +40,15 @@ def prepare_backend(backend: str = "sdl2_sdlgfx"):
         #
         from lib_nadisplay_backend_pygame import ND_Display_Pygame as DisplayClass, ND_Window_Pygame as WindowClass, ND_EventsManager_Pygame as EventsManagerClass     # type: ignore
 
+    # In-memory framebuffers, for the benchmarks and the rendering tests without display
+    elif backend == "headless":
+        #
+        from lib_nadisplay_backend_headless import ND_Display_Headless as DisplayClass, ND_Window_Headless as WindowClass, ND_EventsManager_Headless as EventsManagerClass     # type: ignore
+
     #
     else:
         #
-        raise UserWarning(f"Unsupportend backend : `{backend}`.\n\nList of supported backends :\n\t- `sdl2_sdlgfx`\n\t- `sdl2_opengl`\n\t- `glfw_opengl`\n\t- `glfw_vulkan`\n\t- `pygame`\n")
+        raise UserWarning(f"Unsupportend backend : `{backend}`.\n\nList of supported backends :\n\t- `sdl2_sdlgfx`\n\t- `sdl2_opengl`\n\t- `glfw_opengl`\n\t- `glfw_vulkan`\n\t- `pygame`\n\t- `headless`\n")
 
     #
     return DisplayClass, WindowClass, EventsManagerClass
@@ -0,0 +1,358 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Built-in frame profiler of ND_MainApp.
+
+For each frame it records the time spent handling the events, in each mainloop queue, in the display,
+in the render of each scene and of each element (self time, without the time of its children),
+and the number of draw calls and texture creations of each window.
+The frames are kept in a ring buffer, and can be exported to JSON / CSV or displayed with ND_Elt_ProfilerOverlay.
+
+When the profiler is enabled, the render methods of the elements / scenes and the drawing methods of the windows
+are wrapped at the class level, and they are restored when it is disabled: the profiler costs nothing when disabled.
+(The classes defined after the call to enable are not profiled.)
+
+"""
+
+#
+from typing import Any, Callable, Optional, TYPE_CHECKING
+#
+import time
+import json
+import csv
+from collections import deque
+from threading import Lock
+
+#
+if TYPE_CHECKING:
+    from lib_nadisplay_core import ND_MainApp
+
+
+# Methods of ND_Window counted as draw calls
+DRAW_METHODS: list[str] = [
+    "blit_texture", "render_prepared_texture", "render_part_of_prepared_texture", "render_prepared_texture_batch", "draw_text",
+    "draw_pixel", "draw_hline", "draw_vline", "draw_line", "draw_thick_line", "draw_thick_lines_batch", "draw_rounded_rect",
+    "draw_unfilled_rect", "draw_filled_rect", "draw_unfilled_circle", "draw_filled_circle", "draw_unfilled_ellipse",
+    "draw_filled_ellipse", "draw_arc", "draw_unfilled_pie", "draw_filled_pie", "draw_unfilled_triangle", "draw_filled_triangle",
+    "draw_unfilled_polygon", "draw_filled_polygon", "draw_textured_polygon", "draw_bezier_curve"
+]
+
+# Methods of ND_Window counted as texture uploads
+TEXTURE_UPLOAD_METHODS: list[str] = [
+    "prepare_text_to_render", "prepare_image_to_render", "create_render_target_texture"
+]
+
+
+#
+def get_all_subclasses(cls: type) -> list[type]:
+    #
+    res: list[type] = []
+    #
+    sub: type
+    for sub in cls.__subclasses__():
+        res.append(sub)
+        res += get_all_subclasses(sub)
+    #
+    return res
+
+
+#
+class ND_FrameProfiler:
+    #
+    def __init__(self, main_app: "ND_MainApp", history_size: int = 300) -> None:
+        #
+        self.main_app: ND_MainApp = main_app
+        #
+        self.enabled: bool = False
+
+        # Last frames records
+        self.frames: deque[dict[str, Any]] = deque(maxlen=history_size)
+        self.nb_frames: int = 0
+
+        # Record of the current frame
+        self.current_frame: dict[str, Any] = self.new_frame_record()
+        self.frame_start: float = 0.0
+        # The mainloop queues can run in other threads
+        self.mutex_current_frame: Lock = Lock()
+
+        # Stack of the elements / scenes being rendered: [object, time spent in the children]
+        self.render_stack: list[list[Any]] = []
+        # Depth of the counted calls of each category ("draw_calls", "texture_uploads"),
+        # a drawing method calling another one is counted once, but a texture upload inside a drawing method is counted
+        self.counted_depths: dict[str, int] = {"draw_calls": 0, "texture_uploads": 0}
+
+        # (class, method name, original method) of the wrapped methods, to restore them
+        self.patched_methods: list[tuple[type, str, Callable[..., Any]]] = []
+
+        # Number of draw calls of the OpenGL batches of each window at the beginning of the frame
+        self.gpu_draw_calls_start: dict[int, int] = {}
+
+        # Overlays to redraw at each frame
+        self.overlays: list[Any] = []
+
+    #
+    def new_frame_record(self) -> dict[str, Any]:
+        #
+        return {
+            "frame": self.nb_frames,
+            "total_ms": 0.0,
+            "events_ms": 0.0,
+            "display_ms": 0.0,
+            "queues_ms": {},
+            "scenes_ms": {},
+            "elements_ms": {},
+            "draw_calls": {},
+            "gpu_draw_calls": {},
+            "texture_uploads": {}
+        }
+
+    #
+    def enable(self, window_class: type, scene_class: type, elt_class: type) -> None:
+        #
+        if self.enabled:
+            return
+        #
+        cls: type
+        for cls in [elt_class] + get_all_subclasses(elt_class):
+            self._wrap_method(cls, "render", self._make_timed_render("elements_ms", lambda elt: elt.elt_id))
+        #
+        for cls in [scene_class] + get_all_subclasses(scene_class):
+            self._wrap_method(cls, "render", self._make_timed_render("scenes_ms", lambda scene: scene.scene_id))
+        #
+        for cls in [window_class] + get_all_subclasses(window_class):
+            #
+            method_name: str
+            for method_name in DRAW_METHODS:
+                self._wrap_method(cls, method_name, self._make_counted_method("draw_calls"))
+            for method_name in TEXTURE_UPLOAD_METHODS:
+                self._wrap_method(cls, method_name, self._make_counted_method("texture_uploads"))
+        #
+        self.enabled = True
+        self.begin_frame()
+
+    #
+    def disable(self) -> None:
+        #
+        cls: type
+        method_name: str
+        original: Callable[..., Any]
+        for cls, method_name, original in reversed(self.patched_methods):
+            setattr(cls, method_name, original)
+        #
+        self.patched_methods.clear()
+        self.render_stack.clear()
+        self.counted_depths = {"draw_calls": 0, "texture_uploads": 0}
+        #
+        self.enabled = False
+
+    #
+    def _wrap_method(self, cls: type, method_name: str, make_wrapper: Callable[[Callable[..., Any]], Callable[..., Any]]) -> None:
+        # Only the methods defined by this class, the inherited ones are wrapped in the parent class
+        if method_name not in cls.__dict__:
+            return
+        #
+        original: Callable[..., Any] = cls.__dict__[method_name]
+        #
+        self.patched_methods.append((cls, method_name, original))
+        setattr(cls, method_name, make_wrapper(original))
+
+    #
+    def _make_timed_render(self, category: str, get_key: Callable[[Any], str]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        #
+        profiler: ND_FrameProfiler = self
+
+        #
+        def make_wrapper(original: Callable[..., Any]) -> Callable[..., Any]:
+            #
+            def timed_render(obj: Any, *args: Any, **kwargs: Any) -> Any:
+                #
+                stack: list[list[Any]] = profiler.render_stack
+                # super().render() of the same object, already timed
+                if stack and stack[-1][0] is obj:
+                    return original(obj, *args, **kwargs)
+                #
+                entry: list[Any] = [obj, 0.0]
+                stack.append(entry)
+                t0: float = time.perf_counter()
+                #
+                try:
+                    return original(obj, *args, **kwargs)
+                #
+                finally:
+                    #
+                    dt: float = time.perf_counter() - t0
+                    stack.pop()
+                    #
+                    if stack:
+                        stack[-1][1] += dt
+                    # Self time for the elements, total time for the scenes
+                    times: dict[str, float] = profiler.current_frame[category]
+                    key: str = get_key(obj)
+                    times[key] = times.get(key, 0.0) + ((dt - entry[1]) if category == "elements_ms" else dt) * 1000.0
+            #
+            return timed_render
+        #
+        return make_wrapper
+
+    #
+    def _make_counted_method(self, category: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        #
+        profiler: ND_FrameProfiler = self
+
+        #
+        def make_wrapper(original: Callable[..., Any]) -> Callable[..., Any]:
+            #
+            def counted_method(window: Any, *args: Any, **kwargs: Any) -> Any:
+                #
+                depths: dict[str, int] = profiler.counted_depths
+                #
+                if depths[category] == 0:
+                    counts: dict[int, int] = profiler.current_frame[category]
+                    counts[window.window_id] = counts.get(window.window_id, 0) + 1
+                #
+                depths[category] += 1
+                #
+                try:
+                    return original(window, *args, **kwargs)
+                #
+                finally:
+                    depths[category] -= 1
+            #
+            return counted_method
+        #
+        return make_wrapper
+
+    #
+    def _get_gpu_draw_calls(self) -> dict[int, int]:
+        # Only the OpenGL windows have batches
+        res: dict[int, int] = {}
+        #
+        if self.main_app.display is None:
+            return res
+        #
+        for win in list(self.main_app.display.windows.values()):
+            #
+            if win is None:
+                continue
+            #
+            nb: int = sum(getattr(batch, "nb_draw_calls", 0) for batch in (getattr(win, "sprite_batch", None), getattr(win, "geometry_batch", None)) if batch is not None)
+            #
+            if nb > 0:
+                res[win.window_id] = nb
+        #
+        return res
+
+    #
+    def begin_frame(self) -> None:
+        #
+        with self.mutex_current_frame:
+            #
+            self.current_frame = self.new_frame_record()
+            self.frame_start = time.perf_counter()
+        #
+        self.gpu_draw_calls_start = self._get_gpu_draw_calls()
+
+    #
+    def end_frame(self) -> None:
+        #
+        with self.mutex_current_frame:
+            #
+            frame: dict[str, Any] = self.current_frame
+            frame["total_ms"] = (time.perf_counter() - self.frame_start) * 1000.0
+        #
+        window_id: int
+        nb: int
+        for window_id, nb in self._get_gpu_draw_calls().items():
+            frame["gpu_draw_calls"][window_id] = nb - self.gpu_draw_calls_start.get(window_id, 0)
+        #
+        self.frames.append(frame)
+        self.nb_frames += 1
+        # The overlays display the stats of the frame that just ended, they are redrawn at the next frame
+        for overlay in self.overlays:
+            overlay.mark_dirty()
+        #
+        self.begin_frame()
+
+    #
+    def add_time(self, category: str, duration_ms: float, key: Optional[str] = None) -> None:
+        """
+        Add a duration to the current frame, category is "events_ms", "display_ms" or "queues_ms" (with the queue name as key).
+        """
+        #
+        with self.mutex_current_frame:
+            #
+            if key is None:
+                self.current_frame[category] += duration_ms
+            #
+            else:
+                times: dict[str, float] = self.current_frame[category]
+                times[key] = times.get(key, 0.0) + duration_ms
+
+    #
+    def get_last_frame(self) -> Optional[dict[str, Any]]:
+        #
+        return self.frames[-1] if self.frames else None
+
+    #
+    def get_top_elements(self, nb_elements: int = 10) -> list[tuple[str, float]]:
+        """
+        Elements with the highest mean render self time (in ms per frame) over the recorded frames.
+        """
+        #
+        if not self.frames:
+            return []
+        #
+        totals: dict[str, float] = {}
+        #
+        frame: dict[str, Any]
+        for frame in self.frames:
+            #
+            elt_id: str
+            duration: float
+            for elt_id, duration in frame["elements_ms"].items():
+                totals[elt_id] = totals.get(elt_id, 0.0) + duration
+        #
+        return sorted(((elt_id, total / len(self.frames)) for elt_id, total in totals.items()), key=lambda x: -x[1])[:nb_elements]
+
+    #
+    def export_json(self, path: str) -> None:
+        #
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(list(self.frames), f, indent=1)
+
+    #
+    def export_csv(self, path: str) -> None:
+        """
+        One row per frame, with one column per mainloop queue / scene / window, and the sum of the elements times.
+        """
+        #
+        frames: list[dict[str, Any]] = list(self.frames)
+        #
+        queues: list[str] = sorted({q for frame in frames for q in frame["queues_ms"]})
+        scenes: list[str] = sorted({s for frame in frames for s in frame["scenes_ms"]})
+        windows: list[int] = sorted({w for frame in frames for w in frame["draw_calls"]} | {w for frame in frames for w in frame["texture_uploads"]})
+
+        #
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            #
+            writer = csv.writer(f)
+            #
+            writer.writerow(
+                ["frame", "total_ms", "events_ms", "display_ms", "elements_ms"]
+                + [f"queue_{q}_ms" for q in queues]
+                + [f"scene_{s}_ms" for s in scenes]
+                + [f"window_{w}_draw_calls" for w in windows]
+                + [f"window_{w}_texture_uploads" for w in windows]
+            )
+            #
+            frame: dict[str, Any]
+            for frame in frames:
+                writer.writerow(
+                    [frame["frame"], f"{frame['total_ms']:.3f}", f"{frame['events_ms']:.3f}", f"{frame['display_ms']:.3f}", f"{sum(frame['elements_ms'].values()):.3f}"]
+                    + [f"{frame['queues_ms'].get(q, 0.0):.3f}" for q in queues]
+                    + [f"{frame['scenes_ms'].get(s, 0.0):.3f}" for s in scenes]
+                    + [frame["draw_calls"].get(w, 0) for w in windows]
+                    + [frame["texture_uploads"].get(w, 0) for w in windows]
+                )
@@ -3,7 +3,11 @@ Author: CERISARA Nathan (https://github.com/nath54)
 
 File Description:
 
-Main file for lib_nadisplay, all front-end elements and abstract classes of front-end classes.
+Dynamic quadtree used as a spatial index for the elements of the scenes (collisions, hit tests).
+
+Each object is identified by its id, and can be inserted, moved (update) and removed.
+The root keeps a map id -> node that holds the object, so the removes and updates
+don't have to search the object in the tree.
 
 """
 
@@ -25,7 +29,8 @@ class ND_Quadtree:
         height: Optional[int] = None,
         max_objects: int = 10,
         max_levels: int = 4,
-        level: int = 0
+        level: int = 0,
+        parent: Optional["ND_Quadtree"] = None
     ) -> None:
         """Initialize the quadtree node with optional bounds and no fixed size."""
 
@@ -38,143 +43,441 @@ class ND_Quadtree:
         self.nodes: list['ND_Quadtree'] = []
         self.has_fixed_bounds: bool = x is not None and y is not None and width is not None and height is not None
 
+        #
+        self.parent: Optional[ND_Quadtree] = parent
+        # Map obj_id -> node that holds the object, shared by all the nodes of the tree
+        self.objects_nodes: dict[str, ND_Quadtree] = parent.objects_nodes if parent is not None else {}
+
+    #
+    def __len__(self) -> int:
+        #
+        return len(self.objects_nodes)
+
+    #
+    def __contains__(self, obj_id: str) -> bool:
+        #
+        return obj_id in self.objects_nodes
+
+    #
+    def _contains_rect(self, rect: ND_Rect) -> bool:
+        """Test if the rect is entirely inside the bounds of this node."""
+
+        #
+        return (rect.x >= self.bounds.x and rect.y >= self.bounds.y and
+                rect.x + rect.w <= self.bounds.x + self.bounds.w and
+                rect.y + rect.h <= self.bounds.y + self.bounds.h)
+
+    #
+    def _overlaps_rect(self, rect: ND_Rect) -> bool:
+        """Test if the rect overlaps the bounds of this node (edges included, for the points and empty rects)."""
+
+        #
+        return (rect.x <= self.bounds.x + self.bounds.w and rect.x + rect.w >= self.bounds.x and
+                rect.y <= self.bounds.y + self.bounds.h and rect.y + rect.h >= self.bounds.y)
+
     #
     def _expand(self, rect: ND_Rect) -> None:
         """Expand the quadtree boundaries to accommodate the new rect."""
 
         #
-        if self.bounds.w == 0 and self.bounds.h == 0:
+        if not self.objects_nodes:
             # First insertion, establish the boundary with the size of the object
-            self.bounds = ND_Rect(rect.x, rect.y, rect.w, rect.h)
+            self.bounds = ND_Rect(rect.x, rect.y, max(1, rect.w), max(1, rect.h))
+            self.nodes.clear()
             return
 
-        # Expand the current bounds if the rect is outside
-        new_x = min(self.bounds.x, rect.x)
-        new_y = min(self.bounds.y, rect.y)
-        new_right = max(self.bounds.x + self.bounds.w, rect.x + rect.w)
-        new_bottom = max(self.bounds.y + self.bounds.h, rect.y + rect.h)
+        #
+        if self._contains_rect(rect):
+            return
 
-        new_width = new_right - new_x
-        new_height = new_bottom - new_y
+        # Expand the current bounds if the rect is outside
+        new_x: int = min(self.bounds.x, rect.x)
+        new_y: int = min(self.bounds.y, rect.y)
+        new_right: int = max(self.bounds.x + self.bounds.w, rect.x + rect.w)
+        new_bottom: int = max(self.bounds.y + self.bounds.h, rect.y + rect.h)
+
+        # At least double the size in the growing direction, so objects moving at the border don't rebuild the tree each time
+        if new_right - new_x < 2 * self.bounds.w:
+            if new_x < self.bounds.x:
+                new_x = new_right - 2 * self.bounds.w
+            else:
+                new_right = new_x + 2 * self.bounds.w
+        #
+        if new_bottom - new_y < 2 * self.bounds.h:
+            if new_y < self.bounds.y:
+                new_y = new_bottom - 2 * self.bounds.h
+            else:
+                new_bottom = new_y + 2 * self.bounds.h
 
         # Create a new root that covers the expanded area
-        new_bounds = ND_Rect(new_x, new_y, new_width, new_height)
+        new_bounds: ND_Rect = ND_Rect(new_x, new_y, new_right - new_x, new_bottom - new_y)
         self._shift_and_expand(new_bounds)
 
     #
     def _shift_and_expand(self, new_bounds: ND_Rect) -> None:
-        """Shift current tree and redistribute existing objects."""
+        """Shift current tree and redistribute all the existing objects, including the ones held by the sub-nodes."""
 
+        #
+        all_objects: list[tuple[ND_Rect, str]] = self.get_all_objects()
         #
         self.bounds = new_bounds
+        self._reset()
+        #
+        self._bulk_insert(all_objects)
 
-        # If this was a non-empty quadtree, we need to reinsert the existing elements
-        if self.objects or self.nodes:
-            temp_objects = self.objects[:]
-            self.objects.clear()
+    #
+    def _reset(self) -> None:
+        #
+        self.objects.clear()
+        self.nodes.clear()
+        #
+        if self.parent is None:
+            self.objects_nodes.clear()
 
-            # Reset the nodes and reinsert objects
-            self.nodes.clear()
-            for obj, obj_id in temp_objects:
-                self.insert(obj, obj_id)
+    #
+    def get_all_objects(self) -> list[tuple[ND_Rect, str]]:
+        """Returns all the objects of this node and of its sub-nodes."""
+
+        #
+        result: list[tuple[ND_Rect, str]] = self.objects[:]
+        #
+        node: ND_Quadtree
+        for node in self.nodes:
+            result.extend(node.get_all_objects())
+        #
+        return result
+
+    #
+    def clear(self) -> None:
+        #
+        self.objects.clear()
+        self.nodes.clear()
+        self.objects_nodes.clear()
+        #
+        if not self.has_fixed_bounds:
+            self.bounds = ND_Rect(0, 0, 0, 0)
 
     #
     def subdivide(self) -> None:
         """Subdivide the current node into 4 quadrants."""
 
         #
-        sub_width = self.bounds.w // 2
-        sub_height = self.bounds.h // 2
+        sub_width: int = self.bounds.w // 2
+        sub_height: int = self.bounds.h // 2
+        rest_width: int = self.bounds.w - sub_width
+        rest_height: int = self.bounds.h - sub_height
         x, y = self.bounds.x, self.bounds.y
 
         self.nodes = [
-            ND_Quadtree(x, y, sub_width, sub_height, self.max_objects, self.max_levels, self.level + 1),
-            ND_Quadtree(x + sub_width, y, sub_width, sub_height, self.max_objects, self.max_levels, self.level + 1),
-            ND_Quadtree(x, y + sub_height, sub_width, sub_height, self.max_objects, self.max_levels, self.level + 1),
-            ND_Quadtree(x + sub_width, y + sub_height, sub_width, sub_height, self.max_objects, self.max_levels, self.level + 1)
+            ND_Quadtree(x, y, sub_width, sub_height, self.max_objects, self.max_levels, self.level + 1, self),
+            ND_Quadtree(x + sub_width, y, rest_width, sub_height, self.max_objects, self.max_levels, self.level + 1, self),
+            ND_Quadtree(x, y + sub_height, sub_width, rest_height, self.max_objects, self.max_levels, self.level + 1, self),
+            ND_Quadtree(x + sub_width, y + sub_height, rest_width, rest_height, self.max_objects, self.max_levels, self.level + 1, self)
         ]
 
     #
     def insert(self, rect: ND_Rect, obj_id: str) -> None:
-        """Insert an object (with its id) into the quadtree, expanding it as needed."""
+        """Insert an object (with its id) into the quadtree, expanding it as needed. If the id is already in the tree, the object is moved."""
 
         #
-        if not self.has_fixed_bounds:
+        if obj_id in self.objects_nodes:
+            self.update(obj_id, rect)
+            return
+
+        # Copy, so the indexed rect doesn't change behind the tree
+        rect = ND_Rect(rect.x, rect.y, rect.w, rect.h)
+
+        #
+        if not self.has_fixed_bounds and self.parent is None:
             # If the quadtree is dynamically expanding, we may need to adjust the boundaries
             self._expand(rect)
 
-        if self.nodes:
+        #
+        self._insert_in_node(rect, obj_id)
+
+    #
+    def _insert_in_node(self, rect: ND_Rect, obj_id: str) -> None:
+
+        # Objects that are not (entirely) in the bounds of a fixed size tree stay at the root
+        node: ND_Quadtree = self
+        #
+        index: int
+        while node.nodes:
             # Insert into one of the sub-nodes if we are subdivided
-            index = self.get_index(rect)
-            if index != -1:
-                self.nodes[index].insert(rect, obj_id)
-                return
+            index = node.get_index(rect)
+            if index == -1:
+                break
+            node = node.nodes[index]
 
         # Otherwise, insert into this node
-        self.objects.append((rect, obj_id))
+        node.objects.append((rect, obj_id))
+        self.objects_nodes[obj_id] = node
 
         # If the number of objects exceeds the limit, subdivide if necessary
-        if len(self.objects) > self.max_objects and self.level < self.max_levels:
-            if not self.nodes:
-                self.subdivide()
+        if len(node.objects) > node.max_objects and node.level < node.max_levels and not node.nodes:
+            node._split()
 
-            i = 0
-            while i < len(self.objects):
-                obj_rect, obj_id = self.objects[i]
-                index = self.get_index(obj_rect)
-                if index != -1:
-                    self.objects.pop(i)
-                    self.nodes[index].insert(obj_rect, obj_id)
-                else:
-                    i += 1
+    #
+    def _split(self) -> None:
+        """Subdivide this node and push down the objects that fit entirely in a quadrant."""
+
+        #
+        self.subdivide()
+        #
+        objects: list[tuple[ND_Rect, str]] = self.objects
+        self.objects = []
+        #
+        obj_rect: ND_Rect
+        obj_id: str
+        for obj_rect, obj_id in objects:
+            #
+            index: int = self.get_index(obj_rect)
+            #
+            if index == -1:
+                self.objects.append((obj_rect, obj_id))
+                self.objects_nodes[obj_id] = self
+            else:
+                self.nodes[index]._insert_in_node(obj_rect, obj_id)
+
+    #
+    def bulk_load(self, objects: list[tuple[ND_Rect, str]]) -> None:
+        """Replace the content of the tree with the given objects, building the tree top-down in one pass."""
+
+        #
+        self.clear()
+        #
+        if not objects:
+            return
+
+        #
+        objects = [(ND_Rect(rect.x, rect.y, rect.w, rect.h), obj_id) for rect, obj_id in objects]
+
+        #
+        if not self.has_fixed_bounds:
+            #
+            min_x: int = min(rect.x for rect, _ in objects)
+            min_y: int = min(rect.y for rect, _ in objects)
+            max_x: int = max(rect.x + rect.w for rect, _ in objects)
+            max_y: int = max(rect.y + rect.h for rect, _ in objects)
+            #
+            self.bounds = ND_Rect(min_x, min_y, max(1, max_x - min_x), max(1, max_y - min_y))
+
+        #
+        self._bulk_insert(objects)
+
+    #
+    def _bulk_insert(self, objects: list[tuple[ND_Rect, str]]) -> None:
+
+        #
+        if len(objects) <= self.max_objects or self.level >= self.max_levels:
+            #
+            self.objects.extend(objects)
+            #
+            obj_id: str
+            for _, obj_id in objects:
+                self.objects_nodes[obj_id] = self
+            #
+            return
+
+        #
+        self.subdivide()
+        #
+        quadrants: list[list[tuple[ND_Rect, str]]] = [[], [], [], []]
+        #
+        obj: tuple[ND_Rect, str]
+        for obj in objects:
+            #
+            index: int = self.get_index(obj[0])
+            #
+            if index == -1:
+                self.objects.append(obj)
+                self.objects_nodes[obj[1]] = self
+            else:
+                quadrants[index].append(obj)
+
+        #
+        i: int
+        for i in range(4):
+            self.nodes[i]._bulk_insert(quadrants[i])
+
+    #
+    def remove(self, obj_id: str) -> bool:
+        """Remove the object with the given id, returns False if it was not in the tree."""
+
+        #
+        node: Optional[ND_Quadtree] = self.objects_nodes.pop(obj_id, None)
+        #
+        if node is None:
+            return False
+
+        #
+        i: int
+        for i in range(len(node.objects)):
+            if node.objects[i][1] == obj_id:
+                node.objects.pop(i)
+                break
+
+        # Merge back the sub-nodes that became almost empty
+        current: Optional[ND_Quadtree] = node if node.nodes else node.parent
+        while current is not None and current._try_merge():
+            current = current.parent
+
+        #
+        return True
+
+    #
+    def _try_merge(self) -> bool:
+        """Collapse the sub-nodes into this node if they are leaves and their objects fit in this node."""
+
+        #
+        if not self.nodes:
+            return False
+        #
+        total: int = len(self.objects)
+        #
+        node: ND_Quadtree
+        for node in self.nodes:
+            #
+            if node.nodes:
+                return False
+            #
+            total += len(node.objects)
+        #
+        if total > self.max_objects:
+            return False
+
+        #
+        for node in self.nodes:
+            #
+            obj: tuple[ND_Rect, str]
+            for obj in node.objects:
+                self.objects.append(obj)
+                self.objects_nodes[obj[1]] = self
+        #
+        self.nodes.clear()
+        #
+        return True
+
+    #
+    def update(self, obj_id: str, rect: ND_Rect) -> None:
+        """Move the object with the given id to the new rect (insert it if it is not in the tree)."""
+
+        #
+        node: Optional[ND_Quadtree] = self.objects_nodes.get(obj_id)
+        #
+        if node is None:
+            self.insert(rect, obj_id)
+            return
+
+        #
+        i: int
+        for i in range(len(node.objects)):
+            #
+            if node.objects[i][1] != obj_id:
+                continue
+            #
+            old_rect: ND_Rect = node.objects[i][0]
+            # Nothing changed
+            if old_rect.x == rect.x and old_rect.y == rect.y and old_rect.w == rect.w and old_rect.h == rect.h:
+                return
+            # Fast path: the object stays in the same node (still inside it, and fitting in none of its quadrants), the rect is just modified in place
+            if node.get_index(rect) == -1 and (node._contains_rect(rect) or (node.parent is None and self.has_fixed_bounds)):
+                old_rect.x, old_rect.y, old_rect.w, old_rect.h = rect.x, rect.y, rect.w, rect.h
+                return
+            #
+            break
+
+        #
+        self.remove(obj_id)
+        self.insert(rect, obj_id)
 
     #
     def get_index(self, rect: ND_Rect) -> int:
-        """Determine which quadrant the object belongs to in the current node."""
+        """Determine which quadrant the object fits entirely in, -1 if it fits in none of them."""
 
         #
-        mid_x = self.bounds.x + self.bounds.w / 2
-        mid_y = self.bounds.y + self.bounds.h / 2
+        if not self.nodes:
+            return -1
 
-        top = rect.y < mid_y
-        bottom = rect.y + rect.h > mid_y
-        left = rect.x < mid_x
-        right = rect.x + rect.w > mid_x
+        #
+        mid_x: int = self.nodes[0].bounds.x + self.nodes[0].bounds.w
+        mid_y: int = self.nodes[0].bounds.y + self.nodes[0].bounds.h
+
+        #
+        if not self._contains_rect(rect):
+            return -1
 
-        if top and right:
+        #
+        top: bool = rect.y + rect.h <= mid_y
+        bottom: bool = rect.y >= mid_y
+        left: bool = rect.x + rect.w <= mid_x
+        right: bool = rect.x >= mid_x
+
+        if top and left:
+            return 0
+        elif top and right:
             return 1
         elif bottom and left:
             return 2
         elif bottom and right:
             return 3
-        elif top and left:
-            return 0
         return -1
 
     #
     def retrieve(self, rect: ND_Rect) -> list[tuple[ND_Rect, str]]:
-        """Retrieve all objects that could collide with the given rect."""
+        """Retrieve all objects whose rect overlaps the given rect."""
 
         #
-        result = self.objects[:]
-        if self.nodes:
-            index = self.get_index(rect)
-            if index != -1:
-                result.extend(self.nodes[index].retrieve(rect))
+        result: list[tuple[ND_Rect, str]] = []
+        self._retrieve(rect, result)
         return result
 
     #
-    def get_colliding_ids(self, point: tuple[int, int]) -> list[str]:
-        """Retrieve IDs of all elements colliding with a given point."""
+    def _retrieve(self, rect: ND_Rect, result: list[tuple[ND_Rect, str]]) -> None:
+
+        #
+        obj: tuple[ND_Rect, str]
+        for obj in self.objects:
+            if obj[0].intersects_with_other_rect(rect):
+                result.append(obj)
+
+        #
+        node: ND_Quadtree
+        for node in self.nodes:
+            if node._overlaps_rect(rect):
+                node._retrieve(rect, result)
+
+    #
+    def get_colliding_ids_with_rect(self, rect: ND_Rect) -> list[str]:
+        """Retrieve IDs of all elements overlapping a given rect."""
 
         #
-        point_rect = ND_Rect(point[0], point[1], 1, 1)  # Represent the point as a tiny rectangle
-        potential_collisions = self.retrieve(point_rect)
+        return [obj_id for _, obj_id in self.retrieve(rect)]
+
+    #
+    def get_colliding_ids(self, point: tuple[int, int]) -> list[str]:
+        """Retrieve IDs of all elements containing a given point (left / top edges included, right / bottom edges excluded)."""
 
+        #
+        px, py = point
         colliding_ids: list[str] = []
-        for obj_rect, obj_id in potential_collisions:
-            if (obj_rect.x <= point[0] <= obj_rect.x + obj_rect.w and
-                obj_rect.y <= point[1] <= obj_rect.y + obj_rect.h):
-                colliding_ids.append(obj_id)
+        #
+        node: ND_Quadtree
+        nodes_to_visit: list[ND_Quadtree] = [self]
+        while nodes_to_visit:
+            #
+            node = nodes_to_visit.pop()
+            #
+            obj_rect: ND_Rect
+            obj_id: str
+            for obj_rect, obj_id in node.objects:
+                if obj_rect.x <= px < obj_rect.x + obj_rect.w and obj_rect.y <= py < obj_rect.y + obj_rect.h:
+                    colliding_ids.append(obj_id)
+            #
+            sub_node: ND_Quadtree
+            for sub_node in node.nodes:
+                if sub_node.bounds.x <= px <= sub_node.bounds.x + sub_node.bounds.w and sub_node.bounds.y <= py <= sub_node.bounds.y + sub_node.bounds.h:
+                    nodes_to_visit.append(sub_node)
 
+        #
         return colliding_ids
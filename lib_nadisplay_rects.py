@@ -8,13 +8,16 @@ Some utility classes for manipuling points, rects and base elements positions.
 """
 
 #
-from typing import Optional
+from typing import Optional, Iterator, Any
 #
 from lib_nadisplay_point import ND_Point
 
 
 #
 class ND_Rect:
+    # No instance __dict__, rects are created a lot (positions, clipping, collisions)
+    __slots__ = ("x", "y", "w", "h")
+
     #
     def __init__(self, x: int, y: int, w: int = 1, h: int = 1) -> None:
         #
@@ -24,9 +27,36 @@ class ND_Rect:
         self.h: int = h
 
 
-    #
+    # Same hash as the tuple (x, y, w, h), consistent with __eq__
     def __hash__(self) -> int:
-        return hash(f"{self.x}_{self.y}_{self.w}_{self.h}")
+        return hash((self.x, self.y, self.w, self.h))
+
+
+    #
+    def __eq__(self, other: object) -> bool:
+        #
+        if isinstance(other, ND_Rect):
+            return self.x == other.x and self.y == other.y and self.w == other.w and self.h == other.h
+        #
+        if isinstance(other, tuple):
+            return len(other) == 4 and self.x == other[0] and self.y == other[1] and self.w == other[2] and self.h == other[3]
+        #
+        return NotImplemented
+
+
+    #
+    def __iter__(self) -> Iterator[int]:
+        #
+        yield self.x
+        yield self.y
+        yield self.w
+        yield self.h
+
+
+    #
+    def to_tuple(self) -> tuple[int, int, int, int]:
+        #
+        return (self.x, self.y, self.w, self.h)
 
 
     #
@@ -129,3 +159,68 @@ class ND_Rect:
         return (self.left <= point.x < self.right and
                 self.top <= point.y < self.bottom)
 
+
+    #
+    def contains_xy(self, x: int, y: int) -> bool:
+        # Same as contains_point, without having to create an ND_Point
+        return (self.x <= x < self.x + self.w and
+                self.y <= y < self.y + self.h)
+
+
+#
+class ND_ImmutableRect(ND_Rect):
+    """
+    Rect that cannot be modified, safe to use as a dict key or to share.
+    Use ND_ImmutableRect.get(x, y, w, h) to get a cached instance instead of creating a new one.
+    """
+    #
+    __slots__ = ()
+
+    # Cache of the already created rects, cleared when it becomes too big
+    _cache: dict[tuple[int, int, int, int], "ND_ImmutableRect"] = {}
+    _cache_max_size: int = 16384
+
+    #
+    def __init__(self, x: int, y: int, w: int = 1, h: int = 1) -> None:
+        #
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+        object.__setattr__(self, "w", w)
+        object.__setattr__(self, "h", h)
+
+
+    #
+    def __setattr__(self, name: str, value: Any) -> None:
+        #
+        raise UserWarning(f"Error: cannot modify the attribute {name} of an ND_ImmutableRect!")
+
+
+    # Needed by pickle / copy, that would use __setattr__ otherwise
+    def __reduce__(self) -> tuple[Any, ...]:
+        #
+        return (ND_ImmutableRect, (self.x, self.y, self.w, self.h))
+
+
+    #
+    def __repr__(self) -> str:
+        #
+        return f"ND_ImmutableRect(x={self.x}, y={self.y}, w={self.w}, h={self.h})"
+
+
+    #
+    @classmethod
+    def get(cls, x: int, y: int, w: int = 1, h: int = 1) -> "ND_ImmutableRect":
+        #
+        key: tuple[int, int, int, int] = (x, y, w, h)
+        #
+        rect: Optional["ND_ImmutableRect"] = cls._cache.get(key)
+        #
+        if rect is None:
+            #
+            if len(cls._cache) >= cls._cache_max_size:
+                cls._cache.clear()
+            #
+            rect = ND_ImmutableRect(x, y, w, h)
+            cls._cache[key] = rect
+        #
+        return rect
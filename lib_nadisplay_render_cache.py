@@ -0,0 +1,294 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Render-to-texture cache used by the container elements (ND_Elt_Container, ND_Elt_MultiLayer).
+
+The subtree of the container is rendered once into an offscreen texture
+(a FBO on OpenGL, a target texture on SDL renderer, a Surface on pygame),
+then this texture is blitted each frame until an element of the subtree invalidates it.
+
+Also contains the chunks cache of the rect grids (ND_Elt_CameraGrid): each chunk of cases is rendered once
+into its own texture, re-rendered only when one of its cases changes, and the off-screen chunks are evicted
+(least recently used first) when the memory budget is exceeded.
+
+"""
+
+#
+from typing import Any, Optional
+from collections import OrderedDict
+#
+from lib_nadisplay_core import ND_Window
+
+
+#
+class ND_RenderCache:
+    #
+    def __init__(self, window: ND_Window) -> None:
+        #
+        self.window: ND_Window = window
+
+        # Render target texture, -1 if not created yet
+        self.texture_id: int = -1
+        self.width: int = 0
+        self.height: int = 0
+
+        # If the content of the texture is up to date with the subtree
+        self.valid: bool = False
+        # When frozen, the changes of the subtree don't invalidate the cache (during rebuilds and scrolls, when only the elements positions change)
+        self.frozen: bool = False
+        # False if the backend cannot render into a texture, the container renders then its elements directly
+        self.supported: bool = True
+
+        # Statistics
+        self.nb_rebuilds: int = 0
+
+    #
+    def invalidate(self) -> bool:
+        """
+        Returns False if the cache is frozen, and then hasn't been invalidated.
+        """
+        #
+        if self.frozen:
+            return False
+        #
+        self.valid = False
+        #
+        return True
+
+    #
+    def begin_rebuild(self, width: int, height: int) -> bool:
+        """
+        Prepare a render target of the given size and redirect the next drawings into it.
+        Returns False if the subtree has to be rendered directly on the window.
+        """
+        #
+        if not self.supported or width <= 0 or height <= 0:
+            return False
+
+        # The render target size is fixed, a new one is needed if the content size changed
+        if self.texture_id != -1 and (self.width != width or self.height != height):
+            self.destroy()
+
+        #
+        if self.texture_id == -1:
+            #
+            self.texture_id = self.window.create_render_target_texture(width, height)
+            #
+            if self.texture_id == -1:
+                #
+                print("Warning: render to texture is not supported by this window, render cache disabled.")
+                #
+                self.supported = False
+                return False
+            #
+            self.width, self.height = width, height
+
+        #
+        if not self.window.begin_render_to_texture(self.texture_id):
+            return False
+
+        #
+        self.frozen = True
+        #
+        return True
+
+    #
+    def end_rebuild(self) -> None:
+        #
+        self.window.end_render_to_texture()
+        #
+        self.frozen = False
+        self.valid = True
+        #
+        self.nb_rebuilds += 1
+
+    #
+    def blit(self, x: int, y: int, w: int, h: int, src_x: int = 0, src_y: int = 0) -> None:
+        """
+        Render the (src_x, src_y, w, h) area of the cached texture at (x, y) on the current render target.
+        """
+        #
+        src_x = max(0, min(src_x, self.width - w))
+        src_y = max(0, min(src_y, self.height - h))
+        #
+        self.window.render_part_of_prepared_texture(self.texture_id, x, y, w, h, src_x, src_y, w, h)
+
+    #
+    def destroy(self) -> None:
+        #
+        if self.texture_id != -1:
+            self.window.destroy_prepared_texture(self.texture_id)
+        #
+        self.texture_id = -1
+        self.width, self.height = 0, 0
+        self.valid = False
+
+
+#
+class ND_GridChunksRenderCache:
+    #
+    def __init__(self, window: ND_Window, memory_budget: int = 256 * 1024 * 1024, max_texture_size: int = 4096, max_chunks: int = 16384) -> None:
+        #
+        self.window: ND_Window = window
+
+        # Maximum number of bytes used by the textures of the chunks (RGBA, 4 bytes per pixel)
+        self.memory_budget: int = memory_budget
+        # Maximum number of cached chunks, the empty chunks don't use any memory but their entries still have to be evicted
+        # (the chunks used during the current frame are never evicted, so they can exceed it)
+        self.max_chunks: int = max(1, max_chunks)
+        self.max_texture_size: int = max_texture_size
+        self.memory_used: int = 0
+
+        # chunk key -> (texture_id, version, nb_bytes), in least recently used order. texture_id = -1 for the empty chunks
+        self.chunks: OrderedDict[Any, tuple[int, Any, int]] = OrderedDict()
+
+        # Chunks used during the current frame, they are never evicted.
+        # They are all moved to the end of chunks when they are used, so the evictions stop at the first one from the front.
+        self.frame_keys: set[Any] = set()
+
+        # False if the backend cannot render into a texture, the chunks are then rendered directly
+        self.supported: bool = True
+
+        # Statistics
+        self.nb_rebuilds: int = 0
+        self.nb_evictions: int = 0
+
+    #
+    def begin_frame(self) -> None:
+        #
+        self.frame_keys.clear()
+
+    #
+    def get(self, key: Any, version: Any) -> Optional[int]:
+        """
+        Returns the texture of the chunk (-1 if the chunk is empty), or None if the chunk is not cached or outdated.
+        """
+        #
+        entry: Optional[tuple[int, Any, int]] = self.chunks.get(key)
+        #
+        if entry is None or entry[1] != version:
+            return None
+        #
+        self.chunks.move_to_end(key)
+        self.frame_keys.add(key)
+        #
+        return entry[0]
+
+    #
+    def _remove(self, key: Any) -> None:
+        #
+        texture_id: int
+        nb_bytes: int
+        texture_id, _, nb_bytes = self.chunks.pop(key)
+        #
+        if texture_id != -1:
+            self.window.destroy_prepared_texture(texture_id)
+        #
+        self.memory_used -= nb_bytes
+
+    #
+    def _evict(self, nb_bytes: int) -> bool:
+        """
+        Destroy the least recently used chunks that are not on screen until nb_bytes can be allocated and a new chunk can be added.
+        Returns False if there is not enough memory even after the evictions.
+        """
+        #
+        while self.memory_used + nb_bytes > self.memory_budget or len(self.chunks) >= self.max_chunks:
+            #
+            key: Any = next(iter(self.chunks), None)
+            # All the remaining chunks are used by the current frame
+            if key is None or key in self.frame_keys:
+                break
+            #
+            self._remove(key)
+            self.nb_evictions += 1
+        #
+        return self.memory_used + nb_bytes <= self.memory_budget
+
+    #
+    def set_empty(self, key: Any, version: Any) -> None:
+        """
+        Mark a chunk as empty, it doesn't need any texture.
+        """
+        #
+        if key in self.chunks:
+            self._remove(key)
+        #
+        self._evict(0)
+        #
+        self.chunks[key] = (-1, version, 0)
+        self.frame_keys.add(key)
+
+    #
+    def begin_rebuild(self, key: Any, width: int, height: int) -> int:
+        """
+        Prepare the texture of a chunk and redirect the next drawings into it.
+        Returns -1 if the chunk has to be rendered directly on the window.
+        """
+        #
+        if not self.supported or width <= 0 or height <= 0 or width > self.max_texture_size or height > self.max_texture_size:
+            return -1
+
+        #
+        nb_bytes: int = width * height * 4
+        #
+        entry: Optional[tuple[int, Any, int]] = self.chunks.get(key)
+        #
+        texture_id: int = -1
+        # The chunk has already a texture of the right size, it is reused
+        if entry is not None and entry[0] != -1 and entry[2] == nb_bytes:
+            texture_id = entry[0]
+            self.chunks.move_to_end(key)
+        #
+        else:
+            #
+            if entry is not None:
+                self._remove(key)
+            #
+            if not self._evict(nb_bytes):
+                return -1
+            #
+            texture_id = self.window.create_render_target_texture(width, height)
+            #
+            if texture_id == -1:
+                #
+                print("Warning: render to texture is not supported by this window, grid chunks cache disabled.")
+                #
+                self.supported = False
+                return -1
+            #
+            self.memory_used += nb_bytes
+
+        # The version is set at the end of the rebuild, the chunk stays outdated if the rebuild fails
+        self.chunks[key] = (texture_id, None, nb_bytes)
+        self.frame_keys.add(key)
+
+        #
+        if not self.window.begin_render_to_texture(texture_id):
+            return -1
+        #
+        return texture_id
+
+    #
+    def end_rebuild(self, key: Any, version: Any) -> None:
+        #
+        self.window.end_render_to_texture()
+        #
+        texture_id: int
+        nb_bytes: int
+        texture_id, _, nb_bytes = self.chunks[key]
+        self.chunks[key] = (texture_id, version, nb_bytes)
+        #
+        self.nb_rebuilds += 1
+
+    #
+    def destroy(self) -> None:
+        #
+        key: Any
+        for key in list(self.chunks):
+            self._remove(key)
+        #
+        self.frame_keys.clear()
+        self.memory_used = 0
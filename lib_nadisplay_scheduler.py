@@ -0,0 +1,194 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+Timing helpers of the main loops of ND_MainApp.
+
+ND_FixedTimestepScheduler cuts the real elapsed time into fixed steps (accumulator), so the physics
+functions always get the same delta, whatever the rendering speed is. The number of steps per frame is capped,
+the time that cannot be simulated is dropped (and counted) instead of making the application spiral down.
+The remaining fraction of step (interpolation alpha) can be used by the rendering to interpolate between two physics states.
+
+ND_FrameStats keeps the durations of the last frames, to compute the fps and frame times statistics.
+
+All the times are in milliseconds.
+
+"""
+
+#
+from typing import Optional
+from collections import deque
+
+
+#
+class ND_FixedTimestepScheduler:
+    #
+    def __init__(self, step_duration: float, max_steps_per_frame: int = 5) -> None:
+        #
+        self.step_duration: float = step_duration
+        self.max_steps_per_frame: int = max(1, max_steps_per_frame)
+
+        # Time not simulated yet
+        self.accumulator: float = 0.0
+        # Time of the last call to advance, None before the first call
+        self.last_time: Optional[float] = None
+        # Fraction of step remaining in the accumulator, in [0, 1[
+        self.alpha: float = 0.0
+
+        # Statistics
+        self.nb_steps: int = 0
+        self.nb_overruns: int = 0
+        self.dropped_time: float = 0.0
+
+    #
+    def reset(self) -> None:
+        #
+        self.accumulator = 0.0
+        self.last_time = None
+        self.alpha = 0.0
+
+    #
+    def set_step_duration(self, step_duration: float) -> None:
+        #
+        if step_duration <= 0:
+            raise UserWarning(f"Error: the step duration must be positive, got {step_duration}")
+        #
+        self.step_duration = step_duration
+        self.accumulator = min(self.accumulator, step_duration)
+
+    #
+    def advance(self, current_time: float) -> int:
+        """
+        Add the time elapsed since the last call to the accumulator, and returns the number of fixed steps to simulate now.
+        """
+        #
+        if self.last_time is not None:
+            self.accumulator += max(0.0, current_time - self.last_time)
+        #
+        self.last_time = current_time
+
+        #
+        nb_steps: int = int(self.accumulator // self.step_duration)
+        #
+        if nb_steps > self.max_steps_per_frame:
+            # Too late to catch up, the excess time is dropped
+            dropped: float = (nb_steps - self.max_steps_per_frame) * self.step_duration
+            #
+            self.accumulator -= dropped
+            self.dropped_time += dropped
+            self.nb_overruns += 1
+            #
+            nb_steps = self.max_steps_per_frame
+
+        #
+        self.accumulator -= nb_steps * self.step_duration
+        self.alpha = self.accumulator / self.step_duration
+        #
+        self.nb_steps += nb_steps
+        #
+        return nb_steps
+
+    #
+    def get_time_before_next_step(self, current_time: float) -> float:
+        """
+        Returns the time to wait before the next step is due.
+        """
+        #
+        if self.last_time is None:
+            return 0.0
+        #
+        return max(0.0, self.step_duration - self.accumulator - (current_time - self.last_time))
+
+
+#
+class ND_FrameStats:
+    #
+    def __init__(self, history_size: int = 120) -> None:
+        #
+        # Time between the starts of two consecutive frames
+        self.frames_intervals: deque[float] = deque(maxlen=history_size)
+        # Time spent working in each frame (without the waiting time)
+        self.frames_times: deque[float] = deque(maxlen=history_size)
+        #
+        self.last_frame_start: Optional[float] = None
+        self.nb_frames: int = 0
+
+    #
+    def reset(self) -> None:
+        #
+        self.frames_intervals.clear()
+        self.frames_times.clear()
+        self.last_frame_start = None
+        self.nb_frames = 0
+
+    #
+    def begin_frame(self, current_time: float) -> float:
+        """
+        Returns the time elapsed since the start of the previous frame (0 for the first frame).
+        """
+        #
+        interval: float = 0.0
+        #
+        if self.last_frame_start is not None:
+            interval = max(0.0, current_time - self.last_frame_start)
+            self.frames_intervals.append(interval)
+        #
+        self.last_frame_start = current_time
+        #
+        return interval
+
+    #
+    def end_frame(self, current_time: float) -> None:
+        #
+        if self.last_frame_start is not None:
+            self.frames_times.append(max(0.0, current_time - self.last_frame_start))
+        #
+        self.nb_frames += 1
+
+    #
+    def get_fps(self) -> float:
+        #
+        total: float = sum(self.frames_intervals)
+        #
+        if total <= 0:
+            return 0.0
+        #
+        return 1000.0 * len(self.frames_intervals) / total
+
+    #
+    def get_mean_frame_time(self) -> float:
+        #
+        if not self.frames_times:
+            return 0.0
+        #
+        return sum(self.frames_times) / len(self.frames_times)
+
+    #
+    def get_max_frame_time(self) -> float:
+        #
+        if not self.frames_times:
+            return 0.0
+        #
+        return max(self.frames_times)
+
+    #
+    def get_percentile_frame_time(self, percentile: float) -> float:
+        #
+        if not self.frames_times:
+            return 0.0
+        #
+        sorted_times: list[float] = sorted(self.frames_times)
+        #
+        return sorted_times[min(len(sorted_times) - 1, int(len(sorted_times) * percentile / 100.0))]
+
+    #
+    def get_stats(self) -> dict[str, float]:
+        #
+        return {
+            "fps": self.get_fps(),
+            "frame_time_mean": self.get_mean_frame_time(),
+            "frame_time_p95": self.get_percentile_frame_time(95),
+            "frame_time_max": self.get_max_frame_time(),
+            "nb_frames": float(self.nb_frames)
+        }
@@ -0,0 +1,296 @@
+"""
+Author: CERISARA Nathan (https://github.com/nath54)
+
+File Description:
+
+NumPy structure-of-arrays spatial index, an alternative to ND_Quadtree for the scenes with a lot of elements.
+
+The rects are stored in contiguous NumPy arrays (x, y, w, h, layer), and the point / rect
+queries are answered with vectorized comparisons on all the rects at once.
+The removed slots are kept in a free list and reused by the next insertions.
+
+It has the same interface as ND_Quadtree (insert, update, remove, bulk_load, retrieve,
+get_colliding_ids, get_colliding_ids_with_rect), so it can be used for the collisions layers of a scene.
+
+"""
+
+
+#
+from typing import Optional
+#
+import numpy as np
+
+#
+from lib_nadisplay_rects import ND_Rect
+
+
+
+#
+class ND_SpatialIndex_NP:
+    #
+    def __init__(self, initial_capacity: int = 1024) -> None:
+
+        #
+        self.capacity: int = max(16, initial_capacity)
+
+        # Structure of arrays, one slot per object
+        self.xs: np.ndarray = np.zeros((self.capacity,), dtype=np.int32)
+        self.ys: np.ndarray = np.zeros((self.capacity,), dtype=np.int32)
+        self.ws: np.ndarray = np.zeros((self.capacity,), dtype=np.int32)
+        self.hs: np.ndarray = np.zeros((self.capacity,), dtype=np.int32)
+        self.layers: np.ndarray = np.zeros((self.capacity,), dtype=np.int32)
+        self.alive: np.ndarray = np.zeros((self.capacity,), dtype=np.bool_)
+
+        # Ids of the objects, the index of an id in this list is the slot of the object in the arrays
+        self.ids: list[Optional[str]] = [None] * self.capacity
+        self.ids_slots: dict[str, int] = {}
+
+        # Number of slots used (alive or free), the queries only look at the slots [0, nb_slots[
+        self.nb_slots: int = 0
+        # Removed slots, reused by the next insertions
+        self.free_slots: list[int] = []
+
+        # Scratch buffers for the queries, to avoid allocating new arrays at each query
+        self.mask: np.ndarray = np.zeros((self.capacity,), dtype=np.bool_)
+        self.tmp: np.ndarray = np.zeros((self.capacity,), dtype=np.bool_)
+        self.tmp_int: np.ndarray = np.zeros((self.capacity,), dtype=np.int32)
+
+    #
+    def __len__(self) -> int:
+        #
+        return len(self.ids_slots)
+
+    #
+    def __contains__(self, obj_id: str) -> bool:
+        #
+        return obj_id in self.ids_slots
+
+    #
+    def _grow(self, needed: int) -> None:
+        #
+        if needed <= self.capacity:
+            return
+
+        #
+        new_capacity: int = self.capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+
+        #
+        def grown(arr: np.ndarray) -> np.ndarray:
+            #
+            new_arr: np.ndarray = np.zeros((new_capacity,), dtype=arr.dtype)
+            new_arr[:self.nb_slots] = arr[:self.nb_slots]
+            return new_arr
+
+        #
+        self.xs = grown(self.xs)
+        self.ys = grown(self.ys)
+        self.ws = grown(self.ws)
+        self.hs = grown(self.hs)
+        self.layers = grown(self.layers)
+        self.alive = grown(self.alive)
+        #
+        self.ids.extend([None] * (new_capacity - self.capacity))
+        #
+        self.mask = np.zeros((new_capacity,), dtype=np.bool_)
+        self.tmp = np.zeros((new_capacity,), dtype=np.bool_)
+        self.tmp_int = np.zeros((new_capacity,), dtype=np.int32)
+        #
+        self.capacity = new_capacity
+
+    #
+    def clear(self) -> None:
+        #
+        self.alive[:self.nb_slots] = False
+        self.ids = [None] * self.capacity
+        self.ids_slots.clear()
+        self.free_slots.clear()
+        self.nb_slots = 0
+
+    #
+    def insert(self, rect: ND_Rect, obj_id: str, layer: int = 0) -> None:
+        """Insert an object (with its id) into the index. If the id is already in the index, the object is moved."""
+
+        #
+        if obj_id in self.ids_slots:
+            self.update(obj_id, rect, layer)
+            return
+
+        #
+        slot: int
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            self._grow(self.nb_slots + 1)
+            slot = self.nb_slots
+            self.nb_slots += 1
+
+        #
+        self.xs[slot] = rect.x
+        self.ys[slot] = rect.y
+        self.ws[slot] = rect.w
+        self.hs[slot] = rect.h
+        self.layers[slot] = layer
+        self.alive[slot] = True
+        #
+        self.ids[slot] = obj_id
+        self.ids_slots[obj_id] = slot
+
+    #
+    def update(self, obj_id: str, rect: ND_Rect, layer: Optional[int] = None) -> None:
+        """Move the object with the given id to the new rect (insert it if it is not in the index)."""
+
+        #
+        if obj_id not in self.ids_slots:
+            self.insert(rect, obj_id, layer if layer is not None else 0)
+            return
+
+        #
+        slot: int = self.ids_slots[obj_id]
+        #
+        self.xs[slot] = rect.x
+        self.ys[slot] = rect.y
+        self.ws[slot] = rect.w
+        self.hs[slot] = rect.h
+        #
+        if layer is not None:
+            self.layers[slot] = layer
+
+    #
+    def remove(self, obj_id: str) -> bool:
+        """Remove the object with the given id, returns False if it was not in the index."""
+
+        #
+        slot: Optional[int] = self.ids_slots.pop(obj_id, None)
+        #
+        if slot is None:
+            return False
+
+        #
+        self.alive[slot] = False
+        self.ids[slot] = None
+        self.free_slots.append(slot)
+        #
+        return True
+
+    #
+    def bulk_load(self, objects: list[tuple[ND_Rect, str]], layer: int = 0) -> None:
+        """Replace the content of the index with the given objects, filling the arrays in one pass."""
+
+        #
+        self.clear()
+        #
+        N: int = len(objects)
+        if N == 0:
+            return
+
+        #
+        self._grow(N)
+        #
+        self.xs[:N] = np.fromiter((rect.x for rect, _ in objects), dtype=np.int32, count=N)
+        self.ys[:N] = np.fromiter((rect.y for rect, _ in objects), dtype=np.int32, count=N)
+        self.ws[:N] = np.fromiter((rect.w for rect, _ in objects), dtype=np.int32, count=N)
+        self.hs[:N] = np.fromiter((rect.h for rect, _ in objects), dtype=np.int32, count=N)
+        self.layers[:N] = layer
+        self.alive[:N] = True
+
+        #
+        i: int
+        obj_id: str
+        for i, (_, obj_id) in enumerate(objects):
+            #
+            if obj_id in self.ids_slots:
+                # Duplicated id, the last rect wins
+                self.alive[self.ids_slots[obj_id]] = False
+                self.free_slots.append(self.ids_slots[obj_id])
+                self.ids[self.ids_slots[obj_id]] = None
+            #
+            self.ids[i] = obj_id
+            self.ids_slots[obj_id] = i
+        #
+        self.nb_slots = N
+
+    #
+    def _query(self, x0: int, y0: int, x1: int, y1: int, strict: bool, layer: Optional[int]) -> np.ndarray:
+        """
+        Returns the slots of the alive objects whose rect overlaps [x0, x1[ x [y0, y1[ (strict)
+        or contains the point (x0, y0) with x1 = x0, y1 = y0 (not strict).
+        """
+
+        #
+        n: int = self.nb_slots
+        #
+        if n == 0:
+            return np.zeros((0,), dtype=np.intp)
+
+        #
+        mask: np.ndarray = self.mask[:n]
+        tmp: np.ndarray = self.tmp[:n]
+        tmp_int: np.ndarray = self.tmp_int[:n]
+        #
+        xs: np.ndarray = self.xs[:n]
+        ys: np.ndarray = self.ys[:n]
+
+        # Left / top : rect.x <= x1 (point) or rect.x < x1 (rect)
+        if strict:
+            np.less(xs, x1, out=mask)
+            np.less(ys, y1, out=tmp)
+        else:
+            np.less_equal(xs, x1, out=mask)
+            np.less_equal(ys, y1, out=tmp)
+        mask &= tmp
+
+        # Right / bottom : rect.x + rect.w > x0
+        np.add(xs, self.ws[:n], out=tmp_int)
+        np.greater(tmp_int, x0, out=tmp)
+        mask &= tmp
+        #
+        np.add(ys, self.hs[:n], out=tmp_int)
+        np.greater(tmp_int, y0, out=tmp)
+        mask &= tmp
+
+        #
+        mask &= self.alive[:n]
+        #
+        if layer is not None:
+            np.equal(self.layers[:n], layer, out=tmp)
+            mask &= tmp
+
+        #
+        return np.flatnonzero(mask)
+
+    #
+    def get_colliding_ids(self, point: tuple[int, int], layer: Optional[int] = None) -> list[str]:
+        """Retrieve IDs of all elements containing a given point (left / top edges included, right / bottom edges excluded)."""
+
+        #
+        ids: list[Optional[str]] = self.ids
+        #
+        return [obj_id for obj_id in (ids[slot] for slot in self._query(point[0], point[1], point[0], point[1], False, layer).tolist()) if obj_id is not None]
+
+    #
+    def get_colliding_ids_with_rect(self, rect: ND_Rect, layer: Optional[int] = None) -> list[str]:
+        """Retrieve IDs of all elements overlapping a given rect."""
+
+        #
+        ids: list[Optional[str]] = self.ids
+        #
+        return [obj_id for obj_id in (ids[slot] for slot in self._query(rect.x, rect.y, rect.x + rect.w, rect.y + rect.h, True, layer).tolist()) if obj_id is not None]
+
+    #
+    def retrieve(self, rect: ND_Rect, layer: Optional[int] = None) -> list[tuple[ND_Rect, str]]:
+        """Retrieve all objects whose rect overlaps the given rect."""
+
+        #
+        result: list[tuple[ND_Rect, str]] = []
+        #
+        slot: int
+        for slot in self._query(rect.x, rect.y, rect.x + rect.w, rect.y + rect.h, True, layer).tolist():
+            #
+            obj_id: Optional[str] = self.ids[slot]
+            #
+            if obj_id is not None:
+                result.append( (ND_Rect(int(self.xs[slot]), int(self.ys[slot]), int(self.ws[slot]), int(self.hs[slot])), obj_id) )
+        #
+        return result
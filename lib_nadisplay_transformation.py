@@ -65,6 +65,11 @@ class ND_Transformation:
         #
         return nt
 
+    #
+    def is_identity(self) -> bool:
+        #
+        return self.color_modulation is None and not self.rotation and not self.flip_x and not self.flip_y
+
     #
     def __repr__(self) -> str:
         #
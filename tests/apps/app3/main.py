@@ -0,0 +1,142 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../"))
+
+from typing import Optional
+from threading import current_thread, main_thread
+#
+import lib_nadisplay as nd
+from lib_nadisplay_backend_headless import ND_Display_Headless
+
+#
+# Threaded mode on the headless backend: the "physics" mainloop queue runs in a worker thread
+# and publishes the ball position in a snapshot buffer, the display (main thread) only reads the published snapshots.
+#
+DisplayClass, WindowClass, EventsManagerClass = nd.prepare_backend("headless")
+
+#
+MAIN_WINDOW_ID: int = 0
+NB_FRAMES: int = 60
+
+
+#
+def new_ball_state() -> dict[str, float]:
+    #
+    return {"x": 0.0, "steps": 0}
+
+
+#
+def copy_ball_state(dst: dict[str, float], src: dict[str, float]) -> None:
+    #
+    dst.update(src)
+
+
+#
+class Ball(nd.ND_Elt):
+    #
+    def __init__(self, window: nd.ND_Window, elt_id: str, position: nd.ND_Position, ball_state: nd.ND_DoubleBuffer) -> None:
+        #
+        super().__init__(window=window, elt_id=elt_id, position=position)
+        #
+        self.ball_state: nd.ND_DoubleBuffer = ball_state
+        # (snapshot version, physics steps, x) read at each frame, and if all the frames were rendered in the main thread
+        self.reads: list[tuple[int, float, float]] = []
+        self.rendered_in_main_thread: bool = True
+
+    #
+    def render(self) -> None:
+        #
+        self.rendered_in_main_thread = self.rendered_in_main_thread and current_thread() is main_thread()
+        #
+        with self.ball_state.read() as state:
+            #
+            self.reads.append((self.ball_state.version, state["steps"], state["x"]))
+            #
+            self.window.draw_filled_rect(self.x + int(state["x"]) % (self.w - 20), self.y, 20, 20, nd.ND_Color(255, 0, 0))
+
+
+#
+physics_threads: set[str] = set()
+
+
+#
+def physics_step(app: nd.ND_MainApp, delta: float) -> None:
+    #
+    physics_threads.add(current_thread().name)
+    #
+    buffer: nd.ND_DoubleBuffer = app.get_snapshot_buffer("ball")
+    state: dict[str, float] = buffer.get_back()
+    #
+    state["x"] += 0.2 * delta
+    state["steps"] += 1
+    #
+    buffer.publish()
+
+
+#
+if __name__ == "__main__":
+
+    #
+    app = nd.ND_MainApp(
+                DisplayClass=DisplayClass,
+                WindowClass=WindowClass,
+                EventsManagerClass=EventsManagerClass,
+                global_vars_to_save=[],
+                path_to_global_vars_save_file=""
+        )
+
+    #
+    if not isinstance(app.display, ND_Display_Headless):
+        exit(1)
+
+    #
+    display: ND_Display_Headless = app.display
+    display.uncapped_fps = False
+    display.max_frames = NB_FRAMES
+    app.set_target_fps(fps_display=60, fps_physics=120)
+
+    #
+    win_id: int = display.create_window({
+        "title": "LibNadisplay App test 3",
+        "size": (400, 100),
+        "window_id": MAIN_WINDOW_ID,
+        "init_state": "main"
+    }, True)
+
+    #
+    win: Optional[nd.ND_Window] = display.get_window(win_id)
+
+    #
+    if win is None:
+        exit(1)
+
+    #
+    ball_state: nd.ND_DoubleBuffer = app.create_snapshot_buffer("ball", new_ball_state, copy_ball_state)
+    app.add_function_to_mainloop_fns_queue("physics", physics_step)
+
+    #
+    scene: nd.ND_Scene = nd.ND_Scene(window=win, scene_id="main", origin=nd.ND_Point(0, 0), elements_layers={}, on_window_state="main")
+    ball: Ball = Ball(window=win, elt_id="ball", position=nd.ND_Position(0, 40, 400, 20), ball_state=ball_state)
+    scene.add_element(0, ball)
+    win.add_scene(scene)
+
+    #
+    app.run()
+
+    #
+    versions: list[int] = [version for version, _, _ in ball.reads]
+    #
+    print(f"frames: {len(ball.reads)}, physics threads: {sorted(physics_threads)}, snapshot versions read: {versions[0]} .. {versions[-1]}")
+    #
+    ok: bool = (
+        app.is_threading
+        and ball.rendered_in_main_thread
+        and main_thread().name not in physics_threads
+        and versions == sorted(versions) and versions[-1] > versions[0]
+        # A published snapshot is always complete: steps and x were written together
+        and all(abs(x - steps * 0.2 * app.physics_scheduler.step_duration) < 1e-6 for _, steps, x in ball.reads)
+    )
+    #
+    print("ok" if ok else "FAILED")
+    #
+    sys.exit(0 if ok else 1)